@@ -10,13 +10,32 @@ Usage:
     python cost_model.py
     python cost_model.py --target-kw 25
     python cost_model.py --teg marlow --target-kw 50
+    python cost_model.py --arrow costs.arrow     # also write SystemCost rows
 """
 
 from __future__ import annotations
 
 import argparse
+import importlib.util
 import math
+import sys
 from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Sequence
+
+TEG_CATALOG_PATH = Path(__file__).resolve().parents[1] / "modeling" / "coolprop" / "teg_catalog.py"
+
+
+def _teg_catalog():
+    """The model's ``teg_catalog`` module, loaded by path (see cost_bridge.py)."""
+    mod = sys.modules.get("teg_catalog")
+    if mod is None:
+        spec = importlib.util.spec_from_file_location("teg_catalog", TEG_CATALOG_PATH)
+        mod = importlib.util.module_from_spec(spec)
+        sys.modules["teg_catalog"] = mod
+        spec.loader.exec_module(mod)
+    return mod
+
 
 # ---------------------------------------------------------------------------
 # TEG specs
@@ -36,40 +55,14 @@ class TEGCost:
     hx_material: str         # "copper" or "stainless"
 
 
-MARLOW = TEGCost(
-    name="Marlow TG1-1008 (BiTe)",
-    power_w=6.16, unit_price=25.00, heat_flux_w=122.0,
-    life_years=20.0, cell_size_mm=40, hot_temp_c=200, cold_temp_c=50,
-    fluid_type="water_glycol", hx_material="copper",
-)
-
-THERMONAMIC = TEGCost(
-    name="Thermonamic TEG1-PB-12611 (PbTe)",
-    power_w=13.0, unit_price=50.00, heat_flux_w=310.0,
-    life_years=8.0, cell_size_mm=56, hot_temp_c=350, cold_temp_c=100,
-    fluid_type="therminol", hx_material="stainless",
-)
+# Ratings come from the shared module catalog (modeling/coolprop/teg_modules.csv)
+CATALOG = _teg_catalog().load_catalog()
+TEG_OPTIONS = {key: TEGCost(**CATALOG.cost_kwargs(key)) for key in CATALOG.keys}
 
-THERMONAMIC_DERATED = TEGCost(
-    name="Thermonamic (PbTe @ 320C derated)",
-    power_w=10.5, unit_price=50.00, heat_flux_w=270.0,
-    life_years=8.0, cell_size_mm=56, hot_temp_c=320, cold_temp_c=100,
-    fluid_type="therminol", hx_material="stainless",
-)
-
-ALPHABET_PB = TEGCost(
-    name="Alphabet Pb-enhanced (est.)",
-    power_w=19.0, unit_price=65.00, heat_flux_w=280.0,
-    life_years=10.0, cell_size_mm=40, hot_temp_c=400, cold_temp_c=100,
-    fluid_type="therminol", hx_material="stainless",
-)
-
-TEG_OPTIONS = {
-    "marlow": MARLOW,
-    "thermonamic": THERMONAMIC,
-    "thermonamic_derated": THERMONAMIC_DERATED,
-    "alphabet": ALPHABET_PB,
-}
+MARLOW = TEG_OPTIONS["marlow"]
+THERMONAMIC = TEG_OPTIONS["thermonamic"]
+THERMONAMIC_DERATED = TEG_OPTIONS["thermonamic_derated"]
+ALPHABET_PB = TEG_OPTIONS["alphabet"]
 
 # ---------------------------------------------------------------------------
 # Per-board cost constants
@@ -219,8 +212,14 @@ class SystemCost:
 
 def calculate_system_cost(teg: TEGCost, target_kw: float = 10.0,
                           cooling: str = "dry",
-                          volume_discount_pct: float = 0.15) -> SystemCost:
-    """Calculate full system cost for a given TEG type and target power."""
+                          volume_discount_pct: float = 0.15,
+                          teg_count: Optional[int] = None) -> SystemCost:
+    """Calculate full system cost for a given TEG type and target power.
+
+    ``teg_count`` prices an already-sized design (rounded up to full PCM
+    boards) instead of sizing from ``target_kw``; ``target_kw`` still sets
+    the inverter and fluid-system scaling, so pass the design's net kW.
+    """
     r = SystemCost()
     r.teg_name = teg.name
     r.target_kw = target_kw
@@ -228,7 +227,7 @@ def calculate_system_cost(teg: TEGCost, target_kw: float = 10.0,
     target_w = target_kw * 1000.0
 
     # Sizing
-    tegs_raw = math.ceil(target_w / teg.power_w)
+    tegs_raw = math.ceil(target_w / teg.power_w) if teg_count is None else int(teg_count)
     r.pcm_count = math.ceil(tegs_raw / TEGS_PER_PCM)
     r.teg_count = r.pcm_count * TEGS_PER_PCM   # round up to full boards
     r.node_count = math.ceil(r.pcm_count / PCMS_PER_NODE)
@@ -424,6 +423,24 @@ def print_comparison(results: list[SystemCost]) -> None:
         print(line)
 
 
+def print_scaling(teg: TEGCost = MARLOW, targets_kw: Sequence[float] = (5, 10, 25, 50),
+                  cooling: str = "dry", label: str = "Marlow BiTe, dry cooler",
+                  results: Optional[Sequence[SystemCost]] = None) -> None:
+    """Print cost vs. system size; ``results`` (one per target) skips the costing."""
+    if results is None:
+        results = [calculate_system_cost(teg, kw, cooling) for kw in targets_kw]
+    print(f"\n\n{'=' * 70}")
+    print(f"  SCALING ANALYSIS ({label})")
+    print(f"{'=' * 70}")
+    print(f"  {'Target':>8s}  {'TEGs':>6s}  {'PCMs':>5s}  {'Nodes':>5s}  "
+          f"{'Total $':>10s}  {'$/kW':>8s}  {'$/kWh 20yr':>10s}")
+    print(f"  {'─' * 66}")
+    for kw, r in zip(targets_kw, results):
+        print(f"  {kw:>6g} kW  {r.teg_count:>6d}  {r.pcm_count:>5d}  "
+              f"{r.node_count:>5d}  ${r.estimated_total:>9,.0f}  "
+              f"${r.cost_per_kw:>7,.0f}  ${r.lifecycle_cost_per_kwh:>9.4f}")
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -436,12 +453,16 @@ def main():
                         help="Target net electrical output (kW)")
     parser.add_argument("--cooling", choices=["dry", "ground"], default="dry",
                         help="Cooling system type")
+    parser.add_argument("--arrow", metavar="FILE", default=None,
+                        help="Also write the SystemCost rows to an Arrow/Feather file "
+                             "(needs pyarrow; see modeling/coolprop/arrow_io.py)")
     args = parser.parse_args()
 
     if args.teg:
         teg = TEG_OPTIONS[args.teg]
         r = calculate_system_cost(teg, args.target_kw, args.cooling)
         print_cost(r)
+        results = [r]
     else:
         # Compare all TEG types
         results = []
@@ -453,17 +474,18 @@ def main():
         print_comparison(results)
 
         # Also show scaling
-        print(f"\n\n{'=' * 70}")
-        print(f"  SCALING ANALYSIS (Marlow BiTe, dry cooler)")
-        print(f"{'=' * 70}")
-        print(f"  {'Target':>8s}  {'TEGs':>6s}  {'PCMs':>5s}  {'Nodes':>5s}  "
-              f"{'Total $':>10s}  {'$/kW':>8s}  {'$/kWh 20yr':>10s}")
-        print(f"  {'─' * 66}")
-        for kw in [5, 10, 25, 50]:
-            r = calculate_system_cost(MARLOW, kw, "dry")
-            print(f"  {kw:>6d} kW  {r.teg_count:>6d}  {r.pcm_count:>5d}  "
-                  f"{r.node_count:>5d}  ${r.estimated_total:>9,.0f}  "
-                  f"${r.cost_per_kw:>7,.0f}  ${r.lifecycle_cost_per_kwh:>9.4f}")
+        print_scaling()
+
+    if args.arrow:
+        # The Arrow writer lives with the model; reach it from this CLI only,
+        # and let its cost_bridge reuse this module rather than load a copy
+        sys.path.append(str(TEG_CATALOG_PATH.parent))
+        sys.modules.setdefault("cost_model", sys.modules[__name__])
+        from arrow_io import costs_to_arrow, write_feather
+        try:
+            write_feather(args.arrow, costs_to_arrow(results))
+        except (OSError, RuntimeError) as e:
+            sys.exit(f"  arrow error: {e}")
 
 
 if __name__ == "__main__":
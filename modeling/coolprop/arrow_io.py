@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+arrow_io.py  --  Apache Arrow export / import of configs and results.
+
+Notebooks and the fleet dashboard should not have to parse printed tables.
+Each result type has a fixed Arrow schema, tagged in the schema metadata
+(``teg.schema`` = kind, ``teg.schema_version``):
+
+    system_config   one row per SystemConfig: ``teg_spec.name``, every numeric
+                    field as a dotted path (``teg_count``, ``hx.n_channels``,
+                    ``teg_spec.r_thermal`` ...), fluids, pumps and the
+                    ``teg_spec.curves`` CSV path
+    model_results   one row per ModelResults field set
+    mcf_result      McfResult; ``cost_per_kwh`` / ``fuel_cost_per_day`` are
+                    map<gas price, value>
+    system_cost     costs/cost_model.py SystemCost
+
+``*_to_arrow`` returns a ``pyarrow.RecordBatch`` and ``*_from_arrow`` takes a
+batch or table back to the Python objects.  Columnar sources are handed
+over without per-row Python work: ``results_to_arrow(BatchResults)`` and
+``columns_to_arrow`` wrap the NumPy buffers as Arrow buffers (zero copy for
+numeric columns), and ``results_from_arrow`` returns a ``BatchResults``
+whose numeric columns are views of the Arrow buffers.  Lists of scalar
+dataclasses are gathered one column at a time.
+
+``write_feather`` writes one batch, a table or an iterable of batches to an
+Arrow IPC file (Feather v2, readable by ``pandas.read_feather``) without
+holding them all; ``read_feather`` memory-maps it, so uncompressed files
+are read without copying.
+
+PyArrow is optional and imported on first use.
+
+Usage:
+    python arrow_io.py info results.arrow
+    python arrow_io.py corpus corpus/tz-ai corpus.arrow --compression zstd
+    python mcf_to_watts.py --arrow mcf.arrow
+    python ../../costs/cost_model.py --arrow costs.arrow
+
+In code::
+
+    write_feather("sweep.arrow", results_to_arrow(run_batch(cfg, overrides)))
+    res = results_from_arrow(read_feather("sweep.arrow"))
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+from dataclasses import fields
+from pathlib import Path
+from typing import Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from batch_model import (BatchResults, CONFIG_FIELDS, HX_FIELDS, INTEGER_FIELDS,
+                         TEG_FIELDS, config_columns)
+from cost_bridge import SystemCost
+from mcf_to_watts import McfResult
+from teg_system_model import HXGeometry, ModelResults, SystemConfig, TEGSpec
+
+
+SCHEMA_VERSION = 1
+KINDS = ("system_config", "model_results", "mcf_result", "system_cost")
+COMPRESSIONS = ("lz4", "zstd")
+
+#: SystemConfig string columns (nullable ones may be None)
+CONFIG_STRINGS = ("teg_spec.name", "hot_fluid", "cold_fluid")
+CONFIG_NULLABLE = ("hot_pump", "cold_pump", "teg_spec.curves")
+CONFIG_NUMERIC = tuple(CONFIG_FIELDS + [f"hx.{f}" for f in HX_FIELDS]
+                       + [f"teg_spec.{f}" for f in TEG_FIELDS])
+OPTIONAL_FIELDS = {f"{prefix}{f.name}" for prefix, cls in
+                   (("", SystemConfig), ("hx.", HXGeometry), ("teg_spec.", TEGSpec))
+                   for f in fields(cls) if f.type == "Optional[float]"}
+
+Source = Union["pa.RecordBatch", "pa.Table"]
+
+
+def _pa():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Arrow export needs PyArrow: pip install pyarrow") from None
+    return pyarrow
+
+
+# ---------------------------------------------------------------------------
+# Schemas
+# ---------------------------------------------------------------------------
+
+def _arrow_type(type_name: str):
+    pa = _pa()
+    return {"float": pa.float64(), "int": pa.int64(), "str": pa.string(),
+            "bool": pa.bool_(), "Optional[float]": pa.float64(),
+            "dict": pa.map_(pa.float64(), pa.float64())}[type_name]
+
+
+def _tagged(kind: str, schema_fields: list):
+    pa = _pa()
+    return pa.schema(schema_fields, metadata={"teg.schema": kind,
+                                              "teg.schema_version": str(SCHEMA_VERSION)})
+
+
+def schema(kind: str):
+    """The Arrow schema for one of ``KINDS``."""
+    pa = _pa()
+    if kind == "system_config":
+        return _tagged(kind, [pa.field(c, pa.string(), nullable=False) for c in CONFIG_STRINGS]
+                       + [pa.field(c, pa.int64() if c in INTEGER_FIELDS else pa.float64(),
+                                   nullable=c in OPTIONAL_FIELDS) for c in CONFIG_NUMERIC]
+                       + [pa.field(c, pa.string()) for c in CONFIG_NULLABLE])
+    cls = {"model_results": ModelResults, "mcf_result": McfResult,
+           "system_cost": SystemCost}.get(kind)
+    if cls is None:
+        raise ValueError(f"unknown schema {kind!r} (choose from {', '.join(KINDS)})")
+    return _tagged(kind, [pa.field(f.name, _arrow_type(f.type), nullable=f.type == "dict")
+                          for f in fields(cls)])
+
+
+def schema_kind(source: Source) -> str:
+    """``teg.schema`` of a batch / table, checking the version is readable."""
+    meta = source.schema.metadata or {}
+    kind = meta.get(b"teg.schema", b"").decode()
+    version = int(meta.get(b"teg.schema_version", b"0"))
+    if kind not in KINDS:
+        raise ValueError("not a TEG model Arrow batch (no teg.schema metadata)")
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"{kind} schema version {version} is newer than this reader "
+                         f"({SCHEMA_VERSION})")
+    return kind
+
+
+def _expect(source: Source, kind: str) -> None:
+    got = schema_kind(source)
+    if got != kind:
+        raise ValueError(f"expected a {kind} batch, got {got}")
+
+
+# ---------------------------------------------------------------------------
+# Columns <-> record batches
+# ---------------------------------------------------------------------------
+
+def _array(values, field):
+    """Arrow array for one column; NumPy numeric buffers are wrapped, not copied."""
+    pa = _pa()
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+        mask = np.isnan(values) if field.nullable and values.dtype.kind == "f" else None
+        if mask is not None and not mask.any():
+            mask = None
+        return pa.array(values, type=field.type, mask=mask)
+    return pa.array(values.tolist() if isinstance(values, np.ndarray) else values,
+                    type=field.type)
+
+
+def _batch(kind: str, cols: Mapping[str, object]):
+    pa = _pa()
+    sch = schema(kind)
+    return pa.RecordBatch.from_arrays([_array(cols[f.name], f) for f in sch], schema=sch)
+
+
+def _numpy(column) -> np.ndarray:
+    """NumPy view of a numeric Arrow column (copies only if chunked or nullable)."""
+    pa = _pa()
+    if isinstance(column, pa.ChunkedArray):
+        column = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+    if column.null_count:
+        return column.to_numpy(zero_copy_only=False)      # nulls -> NaN
+    if pa.types.is_string(column.type) or pa.types.is_map(column.type):
+        return np.array(column.to_pylist(), dtype=object)
+    return column.to_numpy(zero_copy_only=not pa.types.is_boolean(column.type))
+
+
+def columns_to_arrow(cols: Mapping[str, object],
+                     metadata: Optional[Mapping[str, Mapping[str, str]]] = None,
+                     schema_metadata: Optional[Mapping[str, str]] = None):
+    """Untyped columns (e.g. ``tz_corpus`` shards) as a batch, zero copy.
+
+    Values are NumPy arrays or Arrow arrays.  ``metadata`` maps a column to
+    its Arrow field metadata (unit, role ...).
+    """
+    pa = _pa()
+    arrays = [v if isinstance(v, pa.Array) else pa.array(v) for v in cols.values()]
+    sch = pa.schema([pa.field(k, a.type, metadata=(metadata or {}).get(k))
+                     for k, a in zip(cols, arrays)], metadata=schema_metadata)
+    return pa.RecordBatch.from_arrays(arrays, schema=sch)
+
+
+def _gather(items: Sequence[object], cls) -> dict[str, object]:
+    """Column lists from scalar dataclass instances."""
+    return {f.name: [getattr(x, f.name) for x in items] for f in fields(cls)}
+
+
+def _rebuild(source: Source, cls) -> list:
+    cols = {f.name: source.column(f.name).to_pylist() for f in fields(cls)}
+    return [cls(**{k: v[i] for k, v in cols.items()}) for i in range(source.num_rows)]
+
+
+# ---------------------------------------------------------------------------
+# Per-type export / import
+# ---------------------------------------------------------------------------
+
+def configs_to_arrow(cfgs: Sequence[SystemConfig]):
+    cols = config_columns(cfgs)
+    for c in INTEGER_FIELDS:
+        cols[c] = cols[c].astype(np.int64)
+    cols["teg_spec.name"] = [c.teg_spec.name for c in cfgs]
+    cols["teg_spec.curves"] = [c.teg_spec.curves.source if c.teg_spec.curves is not None
+                               else None for c in cfgs]
+    return _batch("system_config", cols)
+
+
+def configs_from_arrow(source: Source) -> list[SystemConfig]:
+    _expect(source, "system_config")
+    cols = {c: source.column(c).to_pylist()
+            for c in CONFIG_STRINGS + CONFIG_NUMERIC + CONFIG_NULLABLE}
+    out = []
+    for i in range(source.num_rows):
+        spec = TEGSpec(name=cols["teg_spec.name"][i],
+                       **{f: cols[f"teg_spec.{f}"][i] for f in TEG_FIELDS})
+        if cols["teg_spec.curves"][i]:
+            spec = spec.with_curves(cols["teg_spec.curves"][i])
+        hx = HXGeometry(**{f: cols[f"hx.{f}"][i] for f in HX_FIELDS})
+        top = {f: cols[f][i] for f in CONFIG_FIELDS}
+        out.append(SystemConfig(teg_spec=spec, hx=hx, hot_fluid=cols["hot_fluid"][i],
+                                cold_fluid=cols["cold_fluid"][i], hot_pump=cols["hot_pump"][i],
+                                cold_pump=cols["cold_pump"][i], **top))
+    return out
+
+
+def results_to_arrow(results: Union[BatchResults, Sequence[ModelResults]]):
+    """``BatchResults`` (zero copy) or a list of ``ModelResults``."""
+    if isinstance(results, BatchResults):
+        return _batch("model_results", results.columns)
+    return _batch("model_results", _gather(results, ModelResults))
+
+
+def results_from_arrow(source: Source) -> BatchResults:
+    """``BatchResults`` whose numeric columns view the Arrow buffers."""
+    _expect(source, "model_results")
+    names, n = source.schema.names, source.num_rows
+    return BatchResults({f.name: _numpy(source.column(f.name)) if f.name in names
+                         else np.full(n, np.nan)        # written before the field existed
+                         for f in fields(ModelResults)})
+
+
+def mcf_to_arrow(results: Sequence[McfResult]):
+    cols = _gather(results, McfResult)
+    for k in ("cost_per_kwh", "fuel_cost_per_day"):
+        cols[k] = [list(d.items()) for d in cols[k]]
+    return _batch("mcf_result", cols)
+
+
+def mcf_from_arrow(source: Source) -> list[McfResult]:
+    _expect(source, "mcf_result")
+    out = _rebuild(source, McfResult)
+    for r in out:
+        r.cost_per_kwh = dict(r.cost_per_kwh or [])
+        r.fuel_cost_per_day = dict(r.fuel_cost_per_day or [])
+    return out
+
+
+def costs_to_arrow(costs: Sequence[SystemCost]):
+    return _batch("system_cost", _gather(costs, SystemCost))
+
+
+def costs_from_arrow(source: Source) -> list[SystemCost]:
+    _expect(source, "system_cost")
+    return _rebuild(source, SystemCost)
+
+
+# ---------------------------------------------------------------------------
+# IPC / Feather files
+# ---------------------------------------------------------------------------
+
+def write_feather(path: Union[str, Path], data, compression: Optional[str] = None) -> int:
+    """Write a batch, a table or an iterable of batches (one schema); returns rows.
+
+    ``compression`` is None, ``"lz4"`` or ``"zstd"``.  Uncompressed files can
+    be memory-mapped by readers without copying.
+    """
+    pa = _pa()
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be None or one of {COMPRESSIONS}")
+    if isinstance(data, (pa.Table, pa.RecordBatch)):
+        batches, sch = iter(data.to_batches() if isinstance(data, pa.Table) else [data]), \
+            data.schema
+    else:
+        it = iter(data)
+        first = next(it, None)
+        if first is None:
+            raise ValueError("nothing to write")
+        batches, sch = itertools.chain([first], it), first.schema
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    rows = 0
+    try:
+        with pa.OSFile(str(tmp), "wb") as sink, \
+                pa.ipc.new_file(sink, sch, options=pa.ipc.IpcWriteOptions(
+                    compression=compression)) as w:
+            for batch in batches:
+                w.write_batch(batch)
+                rows += batch.num_rows
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    tmp.replace(path)
+    return rows
+
+
+def read_feather(path: Union[str, Path]):
+    """Memory-mapped ``pyarrow.Table`` from an Arrow IPC / Feather v2 file."""
+    pa = _pa()
+    return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+def corpus_batches(corpus: Union[str, Path]):
+    """``tz_corpus`` shards as record batches, with unit / role / topic metadata.
+
+    ``teg_type`` becomes a dictionary column over the manifest's categories.
+    """
+    from tz_corpus import iter_shards, read_manifest
+
+    pa = _pa()
+    manifest = read_manifest(corpus)
+    meta = {k: {"unit": c["unit"], "role": c["role"], "topic": c["topic"],
+                "description": c["description"]}
+            for k, c in manifest["columns"].items()}
+    tag = {"teg.schema": "tz_corpus", "teg.schema_version": str(manifest["version"])}
+    teg_types = pa.array(manifest["categories"]["teg_type"], type=pa.string())
+    for cols in iter_shards(corpus):
+        cols["teg_type"] = pa.DictionaryArray.from_arrays(cols["teg_type"], teg_types)
+        yield columns_to_arrow(cols, meta, tag)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def print_info(path: Union[str, Path]) -> None:
+    table = read_feather(path)
+    meta = table.schema.metadata or {}
+    kind = meta.get(b"teg.schema", b"-").decode()
+    version = meta.get(b"teg.schema_version", b"-").decode()
+    print("=" * 80)
+    print(f"  ARROW FILE -- {path}")
+    print("=" * 80)
+    print(f"  Schema:   {kind} (version {version})")
+    print(f"  Rows:     {table.num_rows:,} in {len(table.to_batches())} batches")
+    print(f"  Size:     {Path(path).stat().st_size / 1e6:,.2f} MB")
+    print()
+    print(f"  {'Column':<28s}  {'Type':<28s}  {'Nulls':>8s}")
+    print(f"  {'─' * 68}")
+    for name, col in zip(table.column_names, table.columns):
+        print(f"  {name:<28s}  {str(col.type):<28s}  {col.null_count:>8,d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arrow export of TEG model data")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("info", help="Schema and size of an Arrow file")
+    p.add_argument("path")
+    p = sub.add_parser("corpus", help="Convert a tz_corpus directory to one Arrow file")
+    p.add_argument("corpus")
+    p.add_argument("out")
+    p.add_argument("--compression", choices=COMPRESSIONS, default=None)
+    args = parser.parse_args()
+
+    try:
+        if args.cmd == "info":
+            print_info(args.path)
+        else:
+            rows = write_feather(args.out, corpus_batches(args.corpus), args.compression)
+            print(f"  {rows:,} rows -> {args.out} "
+                  f"({Path(args.out).stat().st_size / 1e6:,.1f} MB)")
+    except (OSError, ValueError, RuntimeError) as e:
+        sys.exit(f"  arrow error: {e}")
+
+
+if __name__ == "__main__":
+    main()
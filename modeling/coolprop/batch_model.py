@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+"""
+batch_model.py  --  Vectorized (columnar) version of ``run_model``.
+
+Evaluates many system configurations at once with NumPy array math instead
+of one ``run_model`` call per point.  Inputs are columns keyed by config field
+path -- ``"teg_count"``, ``"hot_inlet_c"``, ``"hx.hot_tim_thickness_m"``,
+``"teg_spec.r_thermal"`` ... -- and results come back as one array per
+``ModelResults`` field.  The physics is line-for-line the scalar model's, so
+``run_batch(cfg).row(0)`` matches ``run_model(cfg)`` to round-off.
+
+Fluid properties are looked up once per unique (fluid, temperature), which
+makes Monte Carlo / sensitivity batches that do not vary the loop
+temperatures essentially free on the CoolProp side.  Water/glycol (from the
+precomputed table) and Therminol are evaluated as arrays with the scalar
+functions' arithmetic, so batches with continuous random temperatures do
+not fall back to one Python call per row.
+
+Usage:
+    python batch_model.py                 # self-check against run_model
+                                          # (and flat TEG curves vs constants)
+    python batch_model.py --points 100000 # throughput check
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import time
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+
+from instrumentation import PROFILE, add_profile_arguments, profiling_from_args
+from progress import SweepProgress, counting, result_health
+from pumps import PUMP_LIBRARY, select_pumps
+from teg_system_model import (
+    HXGeometry, ModelResults, SystemConfig, TEGSpec, TEG_CATALOG,
+    THERMAL_OIL_NAMES, WATER_GLYCOL_NAMES, _water_glycol_table,
+    get_fluid_props, run_model, water_glycol_props,
+)
+
+ArrayLike = object
+
+#: Flat characterization fixture (Marlow datasheet constants at every Th/Tc).
+FLAT_CURVES = Path(__file__).parent / "curves" / "marlow_tg1_1008_flat.csv"
+
+# ---------------------------------------------------------------------------
+# Columns
+# ---------------------------------------------------------------------------
+
+def _numeric_fields(cls) -> list[str]:
+    # Optional[float] fields become NaN columns when None
+    return [f.name for f in fields(cls) if f.type in ("int", "float", "Optional[float]")]
+
+
+HX_FIELDS = _numeric_fields(HXGeometry)
+TEG_FIELDS = _numeric_fields(TEGSpec)
+CONFIG_FIELDS = _numeric_fields(SystemConfig)
+#: Integer-valued fields (the model floors ``teg_count``).
+INTEGER_FIELDS = ({f.name for f in fields(SystemConfig) if f.type == "int"}
+                  | {f"hx.{f.name}" for f in fields(HXGeometry) if f.type == "int"})
+OBJECT_FIELDS = ["hot_fluid", "cold_fluid", "hot_pump", "cold_pump", "teg_spec.curves"]
+
+#: Every overridable column, as a dotted field path.
+INPUT_COLUMNS = (CONFIG_FIELDS + [f"hx.{f}" for f in HX_FIELDS]
+                 + [f"teg_spec.{f}" for f in TEG_FIELDS])
+
+
+def get_field(cfg: SystemConfig, path: str):
+    """Read a dotted field path (``"hx.n_channels"``) from a config."""
+    obj = cfg
+    for part in path.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def config_columns(cfgs: Sequence[SystemConfig]) -> dict[str, np.ndarray]:
+    """Stack a list of configs into input columns."""
+    cols = {p: np.array([get_field(c, p) for c in cfgs], dtype=float)
+            for p in INPUT_COLUMNS}
+    for p in OBJECT_FIELDS:
+        cols[p] = np.array([get_field(c, p) for c in cfgs], dtype=object)
+    return cols
+
+
+def broadcast_columns(base: SystemConfig,
+                      overrides: Optional[Mapping[str, ArrayLike]] = None,
+                      n: Optional[int] = None) -> dict[str, np.ndarray]:
+    """Input columns for ``base`` with some fields replaced by arrays.
+
+    Override keys are dotted field paths; values are scalars or 1-D arrays
+    that broadcast to a common length (``n`` if given).
+    """
+    overrides = dict(overrides or {})
+    unknown = set(overrides) - set(INPUT_COLUMNS) - set(OBJECT_FIELDS)
+    if unknown:
+        raise KeyError(f"Unknown config fields: {sorted(unknown)}")
+    lengths = [np.size(v) for k, v in overrides.items() if np.ndim(v) > 0]
+    size = n if n is not None else (max(lengths) if lengths else 1)
+
+    cols = {}
+    for p in INPUT_COLUMNS:
+        v = overrides.get(p, get_field(base, p))
+        cols[p] = np.broadcast_to(np.asarray(v, dtype=float), (size,))
+    for p in OBJECT_FIELDS:
+        v = overrides.get(p, get_field(base, p))
+        arr = np.empty(size, dtype=object)
+        arr[:] = list(v) if np.ndim(v) > 0 else [v] * size
+        cols[p] = arr
+    return cols
+
+
+# ---------------------------------------------------------------------------
+# Vectorized correlations and properties
+# ---------------------------------------------------------------------------
+
+def nusselt_array(re, pr, heating: bool = True) -> np.ndarray:
+    """Array form of ``nusselt_dittus_boelter``."""
+    n = 0.4 if heating else 0.3
+    nu_turb = 0.023 * re**0.8 * pr**n
+    frac = (re - 2300) / (6000 - 2300)
+    return np.where(re < 2300, 3.66,
+                    np.where(re < 6000, 3.66 + frac * (nu_turb - 3.66), nu_turb))
+
+
+def friction_array(re, d_h, roughness_m: float = 1e-6) -> np.ndarray:
+    """Array form of ``friction_factor`` (Colebrook, fixed 20 sweeps)."""
+    re = np.asarray(re, dtype=float)
+    eps_d = roughness_m / np.asarray(d_h, dtype=float)
+    re_t = np.maximum(re, 2300.0)
+    f = np.full(np.shape(re), 0.02)
+    for _ in range(20):
+        rhs = -2.0 * np.log10(eps_d / 3.7 + 2.51 / (re_t * np.sqrt(f)))
+        f_new = 1.0 / rhs**2
+        done = np.abs(f_new - f) < 1e-8
+        f = np.where(done, f, f_new)
+        if done.all():
+            break
+    return np.where(re < 2300, 64.0 / np.maximum(re, 1.0), f)
+
+
+PROP_KEYS = ("rho", "cp", "mu", "k", "pr")
+
+
+def fluid_props_array(fluid: np.ndarray, temp_c: np.ndarray) -> dict[str, np.ndarray]:
+    """Fluid properties per row, one scalar lookup per unique (fluid, T)."""
+    if PROFILE.enabled:
+        with PROFILE.stage("batch.properties"):
+            out = _fluid_props_array(fluid, temp_c)
+        PROFILE.count("batch_property_rows", len(temp_c))
+        return out
+    return _fluid_props_array(fluid, temp_c)
+
+
+def _fluid_props_array(fluid: np.ndarray, temp_c: np.ndarray) -> dict[str, np.ndarray]:
+    out = {k: np.empty(len(temp_c)) for k in PROP_KEYS}
+    names = np.empty(len(temp_c), dtype=object)
+    for fl in set(fluid):
+        mask = fluid == fl
+        temps, inv = np.unique(temp_c[mask], return_inverse=True)
+        props = _unique_props(fl, temps)
+        for k in PROP_KEYS:
+            out[k][mask] = props[k][inv]
+        names[mask] = props["name"][inv]
+    out["name"] = names
+    return out
+
+
+def _exp(x: np.ndarray) -> np.ndarray:
+    # math.exp, not np.exp: the SIMD exp can differ from libm in the last bit
+    return np.array([math.exp(v) for v in x.tolist()])
+
+
+def _unique_props(fluid: str, temps: np.ndarray) -> dict[str, np.ndarray]:
+    """``get_fluid_props`` at each of ``temps``, as arrays.
+
+    The table and polynomial paths repeat the scalar functions' arithmetic
+    elementwise (bit-identical); anything else goes through the scalar call.
+    """
+    table = _water_glycol_table() if fluid in WATER_GLYCOL_NAMES else None
+    if fluid in THERMAL_OIL_NAMES:
+        # teg_system_model.thermal_oil_props
+        rho = 1078.0 - 0.85 * temps
+        cp = 1510.0 + 2.5 * temps
+        mu = np.where(temps > 20, 0.001 * _exp(5.25 - 0.02 * temps), 0.004)
+        mu = np.maximum(mu, 0.0002)
+        k = np.maximum(0.137 - 0.00005 * temps, 0.08)
+        props = {"rho": rho, "cp": cp, "mu": mu, "k": k,
+                 "name": np.full(len(temps), "Therminol VP-1 (polynomial fit)", dtype=object)}
+        vector = np.ones(len(temps), dtype=bool)
+    elif table is not None:
+        # teg_system_model.water_glycol_props, table path
+        t = table["t_c"]
+        vector = (temps >= t[0]) & (temps <= t[-1])
+        props = {k: np.interp(temps, t, table[k]) for k in ("rho", "cp", "k")}
+        props["mu"] = _exp(np.interp(temps, t, table["log_mu"]))
+        props["name"] = np.full(len(temps), "Water/Glycol 50/50", dtype=object)
+    else:
+        table_rows = [get_fluid_props(fluid, float(t)) for t in temps]
+        return {k: np.array([p[k] for p in table_rows],
+                            dtype=object if k == "name" else float)
+                for k in PROP_KEYS + ("name",)}
+
+    props["pr"] = props["cp"] * props["mu"] / props["k"]
+    if PROFILE.enabled:
+        PROFILE.count("property_lookups", len(temps))
+        if table is not None:
+            PROFILE.count("fluid_table_hits", int(vector.sum()))
+    for i in np.flatnonzero(~vector):
+        p = water_glycol_props(float(temps[i]))      # outside the table: fallback
+        for k in PROP_KEYS + ("name",):
+            props[k][i] = p[k]
+    return props
+
+
+def _teg_groups(curves_col: np.ndarray) -> list[tuple[object, np.ndarray]]:
+    """Row indices for each distinct curve set (by identity)."""
+    groups: dict[int, tuple[object, list[int]]] = {}
+    for i, c in enumerate(curves_col):
+        if c is not None:
+            groups.setdefault(id(c), (c, []))[1].append(i)
+    return [(c, np.array(idx)) for c, idx in groups.values()]
+
+
+def _teg_props(cols, groups, t_hot, t_cold):
+    """Seebeck, internal R and thermal R per row (curves where present)."""
+    seebeck = cols["teg_spec.seebeck_v_per_k"].copy()
+    r_int = cols["teg_spec.internal_r_ohm"].copy()
+    r_th = cols["teg_spec.r_thermal"].copy()
+    for curves, idx in groups:
+        p = curves.lookup(np.broadcast_to(t_hot, r_th.shape)[idx],
+                          np.broadcast_to(t_cold, r_th.shape)[idx])
+        seebeck[idx], r_int[idx], r_th[idx] = p[:, 0], p[:, 1], 1.0 / p[:, 2]
+    return seebeck, r_int, r_th
+
+
+def pump_power_array(cols, loop: str, dp, flow, rho):
+    """Pump power and (name, count, speed, eff) columns for one loop."""
+    n = len(dp)
+    power = dp * flow / cols["pump_efficiency"]
+    name = np.full(n, "", dtype=object)
+    count = np.zeros(n)
+    speed = np.ones(n)
+    eff = cols["pump_efficiency"].astype(float).copy()
+    pump_col = cols[f"{loop}_pump"]
+    for pump in set(pump_col) - {None}:
+        idx = np.flatnonzero(pump_col == pump)
+        library = PUMP_LIBRARY if pump == "auto" else {pump: PUMP_LIBRARY[pump]}
+        max_par = int(cols["max_parallel_pumps"][idx].max()) if pump == "auto" else 1
+        sel = select_pumps(dp[idx], flow[idx], rho[idx], library, max_par)
+        ok = sel.choice >= 0
+        good, bad = idx[ok], idx[~ok]
+        keys = list(library)
+        power[good] = sel.op.power_w[ok]
+        name[good] = [library[keys[c]].name for c in sel.choice[ok]]
+        count[good] = sel.op.n_parallel[ok]
+        speed[good] = sel.op.speed[ok]
+        eff[good] = sel.op.efficiency[ok]
+        name[bad] = "(none feasible)"
+    return power, name, count, speed, eff
+
+
+# ---------------------------------------------------------------------------
+# Batch results
+# ---------------------------------------------------------------------------
+
+RESULT_FIELDS = [f.name for f in fields(ModelResults)]
+
+
+@dataclass
+class BatchResults:
+    """Columnar model results: one array per ``ModelResults`` field."""
+    columns: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.columns["net_electrical_w"])
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def row(self, i: int) -> ModelResults:
+        """Materialize one row as a scalar ``ModelResults``."""
+        r = ModelResults()
+        for f in fields(ModelResults):
+            v = self.columns[f.name][i]
+            setattr(r, f.name, v if f.type == "str" else
+                    int(v) if f.type == "int" else float(v))
+        return r
+
+    def take(self, idx) -> "BatchResults":
+        return BatchResults({k: v[idx] for k, v in self.columns.items()})
+
+    @staticmethod
+    def concat(parts: Sequence["BatchResults"]) -> "BatchResults":
+        keys = parts[0].columns.keys()
+        return BatchResults({k: np.concatenate([p.columns[k] for p in parts])
+                             for k in keys})
+
+
+# ---------------------------------------------------------------------------
+# Core batch model
+# ---------------------------------------------------------------------------
+
+def evaluate(cols: Mapping[str, np.ndarray],
+             warm_start: Optional[Mapping[str, ArrayLike]] = None,
+             iterations: int = 10) -> BatchResults:
+    """Run the thermal-hydraulic model over input columns.
+
+    ``warm_start`` may supply converged ``r_hot_conv`` / ``r_cold_conv`` (and
+    ``r_teg`` for curve-backed TEGs) from a nearby solution, replacing the
+    crude first-pass estimate; ``iterations`` sets the fixed-point passes.
+    """
+    c = cols
+    n_teg = np.floor(c["teg_count"])
+    dtf = c["target_dt_fluid_c"]
+    dtc = np.where(np.isnan(c["cold_dt_fluid_c"]), dtf, c["cold_dt_fluid_c"])
+    out: dict[str, np.ndarray] = {}
+
+    # ---- Geometry ----
+    w, h_ch = c["hx.channel_width_m"], c["hx.channel_height_m"]
+    n_ch, length = c["hx.n_channels"], c["hx.channel_length_m"]
+    dh = 4.0 * (w * h_ch) / (2.0 * (w + h_ch))
+    flow_area = n_ch * w * h_ch
+    a_contact = length * (n_ch * w + c["hx.n_fins"] * c["hx.fin_thickness_m"])
+    a_wetted = 2.0 * (w + h_ch) * length * n_ch
+
+    # ---- Fluid properties at bulk average temp ----
+    t_hot_avg = c["hot_inlet_c"] - dtf / 2.0
+    t_cold_avg = c["cold_inlet_c"] + dtc / 2.0
+    hp = fluid_props_array(c["hot_fluid"], t_hot_avg)
+    cp_ = fluid_props_array(c["cold_fluid"], t_cold_avg)
+    dt_total = t_hot_avg - t_cold_avg
+
+    def conv_r(props, vol_per_teg, heating):
+        vel = vol_per_teg / flow_area
+        re = props["rho"] * vel * dh / props["mu"]
+        nu = nusselt_array(re, props["pr"], heating)
+        h = nu * props["k"] / dh
+        with np.errstate(divide="ignore"):
+            r_conv = np.where(h > 0, 1.0 / (h * a_wetted), 999.0)
+        return r_conv, vel, re, nu, h
+
+    # ---- First pass ----
+    q_est = dt_total / (c["teg_spec.r_thermal"] * 1.5)
+    hot_vol = q_est * n_teg / (hp["cp"] * dtf) / hp["rho"]
+    vol_per_teg = hot_vol / n_teg
+    r_hot_conv, *_ = conv_r(hp, vol_per_teg, False)
+    r_hot_tim = c["hx.hot_tim_thickness_m"] / (c["hx.hot_tim_k"] * a_contact)
+    r_cold_tim = c["hx.cold_tim_thickness_m"] / (c["hx.cold_tim_k"] * a_contact)
+    r_teg = c["teg_spec.r_thermal"].astype(float).copy()
+    r_cold_conv, *_ = conv_r(cp_, vol_per_teg, True)
+    groups = _teg_groups(c["teg_spec.curves"])
+    if warm_start is not None:
+        r_hot_conv = np.broadcast_to(warm_start["r_hot_conv"], n_teg.shape)
+        r_cold_conv = np.broadcast_to(warm_start["r_cold_conv"], n_teg.shape)
+        if groups and "r_teg" in warm_start:
+            r_teg = np.broadcast_to(warm_start["r_teg"], n_teg.shape).copy()
+    r_total = r_hot_conv + r_hot_tim + r_teg + r_cold_tim + r_cold_conv
+
+    # ---- Iterate to converge Q and flow rate ----
+    r_prev = np.full(n_teg.shape, np.inf)
+    for _ in range(iterations):
+        r_prev = r_total
+        q = dt_total / r_total
+        total_heat = q * n_teg
+        hot_vol = total_heat / (hp["cp"] * dtf) / hp["rho"]
+        r_hot_conv, velocity, re, nu, h_hot = conv_r(hp, hot_vol / n_teg, False)
+        cold_vol = total_heat / (cp_["cp"] * dtc) / cp_["rho"]
+        r_cold_conv, *_ = conv_r(cp_, cold_vol / n_teg, True)
+        if groups:
+            t_face_hot = t_hot_avg - q * (r_hot_conv + r_hot_tim)
+            t_face_cold = t_cold_avg + q * (r_cold_conv + r_cold_tim)
+            r_teg = _teg_props(c, groups, t_face_hot, t_face_cold)[2]
+        r_total = r_hot_conv + r_hot_tim + r_teg + r_cold_tim + r_cold_conv
+    q = dt_total / r_total
+    total_heat = q * n_teg
+    with np.errstate(invalid="ignore"):
+        residual = np.abs(r_total - r_prev) / np.abs(r_total)
+
+    # ---- Temperatures and TEG output ----
+    t_hot_fin = t_hot_avg - q * r_hot_conv
+    t_teg_hot = t_hot_fin - q * r_hot_tim
+    t_teg_cold = t_teg_hot - q * r_teg
+    dt_teg = t_teg_hot - t_teg_cold
+
+    seebeck, r_int, r_th_elec = _teg_props(c, groups, t_teg_hot, t_teg_cold)
+    v_oc = seebeck * dt_teg
+    p_teg = (v_oc / 2.0) * (v_oc / (2.0 * r_int))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q_teg = np.where(r_th_elec > 0, dt_teg / r_th_elec, 0.0)
+        eff = np.where(q_teg > 0, p_teg / q_teg, 0.0)
+    gross = p_teg * n_teg
+
+    # ---- Pressure drop ----
+    rho_h, mu_h = hp["rho"], hp["mu"]
+    dp_channel = friction_array(re, dh) * (length / dh) * 0.5 * rho_h * velocity**2
+    n_towers = np.maximum(1, n_teg // (c["tegs_per_panel"] * c["panels_per_tower"]))
+    m_id = c["hx.manifold_id_m"]
+    m_vel = hot_vol / (np.pi * (m_id / 2.0)**2)
+    re_m = rho_h * m_vel * m_id / mu_h
+    dp_manifold = (friction_array(re_m, m_id) * (n_towers * 2.0 / m_id)
+                   * 0.5 * rho_h * m_vel**2)
+    p_id = c["pipe_id_m"]
+    p_vel = hot_vol / (np.pi * (p_id / 2.0)**2)
+    re_p = rho_h * p_vel * p_id / mu_h
+    dp_pipe = (friction_array(re_p, p_id) * (c["hot_pipe_length_m"] / p_id)
+               * 0.5 * rho_h * p_vel**2)
+    dp_hot = dp_channel + dp_manifold + dp_pipe
+    dp_cold = dp_hot * 0.9
+
+    # ---- Parasitics ----
+    pump_hot = pump_power_array(c, "hot", dp_hot, hot_vol, rho_h)
+    pump_cold = pump_power_array(c, "cold", dp_cold, cold_vol, cp_["rho"])
+    reject = total_heat - gross
+    fan = reject / 1000.0 * 15.0
+    n_pcms = np.maximum(1, n_teg // 36)
+    electronics = n_pcms * 1.5 + np.maximum(1, n_pcms // 3) * 3.0
+    parasitic = pump_hot[0] + pump_cold[0] + fan + electronics
+    net = gross - parasitic
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        parasitic_fraction = np.where(gross > 0, parasitic / gross, 0.0)
+
+    out.update(
+        dt_across_teg_c=dt_teg, power_per_teg_w=p_teg, heat_per_teg_w=q,
+        teg_efficiency=eff, teg_voltage_v=v_oc / 2.0,
+        teg_current_a=v_oc / (2.0 * r_int),
+        total_teg_count=n_teg.astype(int), gross_electrical_w=gross,
+        total_heat_input_w=total_heat, total_heat_rejection_w=reject,
+        hot_fluid_name=hp["name"], hot_flow_rate_m3s=hot_vol,
+        hot_flow_rate_gpm=hot_vol * 15850.3, hot_velocity_channel_ms=velocity,
+        hot_reynolds=re, hot_nusselt=nu, hot_h_conv=h_hot,
+        cold_fluid_name=cp_["name"], cold_flow_rate_m3s=cold_vol,
+        cold_flow_rate_gpm=cold_vol * 15850.3,
+        hot_dp_channel_pa=dp_channel, hot_dp_manifold_pa=dp_manifold,
+        hot_dp_pipe_pa=dp_pipe, hot_dp_total_pa=dp_hot, cold_dp_total_pa=dp_cold,
+        pump_power_hot_w=pump_hot[0], pump_power_cold_w=pump_cold[0],
+        pump_power_total_w=pump_hot[0] + pump_cold[0],
+        hot_pump_name=pump_hot[1], hot_pump_count=pump_hot[2].astype(int),
+        hot_pump_speed=pump_hot[3], hot_pump_efficiency=pump_hot[4],
+        cold_pump_name=pump_cold[1], cold_pump_count=pump_cold[2].astype(int),
+        cold_pump_speed=pump_cold[3], cold_pump_efficiency=pump_cold[4],
+        fan_power_w=fan, electronics_w=electronics,
+        net_electrical_w=net, net_electrical_kw=net / 1000.0,
+        parasitic_fraction=parasitic_fraction,
+        r_hot_conv=r_hot_conv, r_hot_tim=r_hot_tim, r_teg=r_teg,
+        r_cold_tim=r_cold_tim, r_cold_conv=r_cold_conv, r_total=r_total,
+        t_hot_fluid_avg_c=t_hot_avg, t_hot_fin_surface_c=t_hot_fin,
+        t_teg_hot_c=t_teg_hot, t_teg_cold_c=t_teg_cold,
+        t_cold_fin_surface_c=t_teg_cold - q * r_cold_tim,
+        t_cold_fluid_avg_c=t_cold_avg, convergence_residual=residual,
+    )
+    size = len(n_teg)
+    return BatchResults({k: np.broadcast_to(out[k], (size,)) for k in RESULT_FIELDS})
+
+
+def run_batch(base: SystemConfig,
+              overrides: Optional[Mapping[str, ArrayLike]] = None,
+              n: Optional[int] = None, **solver_kw) -> BatchResults:
+    """Evaluate ``base`` with some fields swept as arrays.
+
+    Example::
+
+        run_batch(cfg, {"teg_count": np.arange(500, 8001, 36),
+                        "hx.hot_tim_k": 7.5})
+    """
+    cols = broadcast_columns(base, overrides, n)
+    if PROFILE.enabled:
+        PROFILE.count("batch_points", len(cols["teg_count"]))
+        with PROFILE.stage("batch.model"):
+            return evaluate(cols, **solver_kw)
+    return evaluate(cols, **solver_kw)
+
+
+def run_configs(cfgs: Sequence[SystemConfig]) -> BatchResults:
+    """Evaluate a list of independent configs in one batch."""
+    cols = config_columns(cfgs)
+    if PROFILE.enabled:
+        PROFILE.count("batch_points", len(cfgs))
+        with PROFILE.stage("batch.model"):
+            return evaluate(cols)
+    return evaluate(cols)
+
+
+CHUNK_SIZE = 50_000
+
+
+def _eval_chunk(base: SystemConfig, overrides: Mapping[str, ArrayLike],
+                outputs: Sequence[str]) -> dict[str, np.ndarray]:
+    res = run_batch(base, overrides)
+    return {k: np.asarray(res.columns[k]) for k in outputs}
+
+
+def _eval_chunk_stats(base: SystemConfig, overrides: Mapping[str, ArrayLike],
+                      outputs: Sequence[str]) -> tuple[dict[str, np.ndarray], dict]:
+    """``_eval_chunk`` plus the per-chunk figures a ``SweepProgress`` takes."""
+    t0 = time.perf_counter()
+    with counting() as counters:
+        res = run_batch(base, overrides)
+    failed, nonconv = result_health(res.columns)
+    stats = dict(points=len(res), busy_s=time.perf_counter() - t0, worker=os.getpid(),
+                 failed=failed, nonconverged=nonconv, counters=dict(counters))
+    return {k: np.asarray(res.columns[k]) for k in outputs}, stats
+
+
+def run_batch_chunked(base: SystemConfig, overrides: Mapping[str, ArrayLike],
+                      outputs: Sequence[str], workers: int = 1,
+                      chunk_size: int = CHUNK_SIZE,
+                      progress: Optional[SweepProgress] = None) -> dict[str, np.ndarray]:
+    """``run_batch`` for very large inputs, keeping only ``outputs``.
+
+    Array overrides are split into chunks of ``chunk_size`` rows (bounding
+    peak memory) and evaluated on a process pool when ``workers > 1``.
+    Output order matches input order.  Each finished chunk is reported to
+    ``progress`` if given.
+    """
+    n = max([np.size(v) for v in overrides.values() if np.ndim(v) > 0] or [1])
+    chunks = []
+    for lo in range(0, n, chunk_size):
+        hi = min(lo + chunk_size, n)
+        chunks.append({k: (v[lo:hi] if np.ndim(v) > 0 else v)
+                       for k, v in overrides.items()})
+
+    def done(out):
+        if progress is None:
+            return out
+        cols, stats = out
+        progress.update(**stats)
+        return cols
+
+    fn = _eval_chunk if progress is None else _eval_chunk_stats
+    if workers > 1 and len(chunks) > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        parts = [None] * len(chunks)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(fn, base, ch, tuple(outputs)): i
+                       for i, ch in enumerate(chunks)}
+            for fut in as_completed(futures):
+                parts[futures[fut]] = done(fut.result())
+    else:
+        parts = [done(fn(base, ch, outputs)) for ch in chunks]
+    return {k: np.concatenate([p[k] for p in parts]) for k in outputs}
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized TEG system model")
+    parser.add_argument("--points", type=int, default=0,
+                        help="Also time a batch of this many random points")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profiling_from_args(args):
+        cfgs = []
+        for key, teg in TEG_CATALOG.items():
+            for n in (500, 1620, 5000):
+                hot = min(teg.max_hot_c, 350.0)
+                fluid = "therminol" if hot > 220 else "water_glycol"
+                for pump in (None, "auto"):
+                    cfgs.append(SystemConfig(teg_count=n, teg_spec=teg, hot_fluid=fluid,
+                                             cold_fluid=fluid, hot_inlet_c=hot,
+                                             cold_inlet_c=40.0 if hot <= 220 else 100.0,
+                                             hot_pump=pump, cold_pump=pump))
+        batch = run_configs(cfgs)
+        worst = 0.0
+        for i, cfg in enumerate(cfgs):
+            ref = run_model(cfg)
+            for name in RESULT_FIELDS:
+                a, b = getattr(ref, name), batch.columns[name][i]
+                if isinstance(a, str):
+                    assert a == b, (name, a, b)
+                    continue
+                worst = max(worst, abs(a - b) / max(abs(a), 1e-9))
+        print(f"  {len(cfgs)} configs: max relative deviation vs run_model = {worst:.2e}")
+
+        # Flat measured curves must reproduce the constant-spec model
+        flat = TEG_CATALOG["marlow"].with_curves(FLAT_CURVES)
+        const = [SystemConfig(teg_count=n) for n in (36, 1620, 8064)]
+        curved = [replace(cfg, teg_spec=flat) for cfg in const]
+        batch = run_configs(curved)
+        worst = 0.0
+        for i, (cfg, cfg_c) in enumerate(zip(const, curved)):
+            ref, ref_c = run_model(cfg), run_model(cfg_c)
+            for name in RESULT_FIELDS:
+                a = getattr(ref, name)
+                if isinstance(a, str):
+                    continue
+                for b in (getattr(ref_c, name), batch.columns[name][i]):
+                    worst = max(worst, abs(a - b) / max(abs(a), 1e-9))
+        print(f"  flat TEG curves: max relative deviation vs constant spec = {worst:.2e}")
+        assert worst < 1e-9, worst
+
+        if args.points:
+            rng = np.random.default_rng(0)
+            base = SystemConfig()
+            t0 = time.perf_counter()
+            res = run_batch(base, {
+                "teg_count": rng.integers(500, 8000, args.points),
+                "hot_inlet_c": rng.uniform(150.0, 210.0, args.points).round(),
+                "hx.hot_tim_thickness_m": rng.uniform(2.5e-4, 5e-4, args.points),
+            })
+            dt = time.perf_counter() - t0
+            print(f"  {len(res):,} points in {dt:.2f} s  ({len(res) / dt:,.0f} points/s)")
+
+
+if __name__ == "__main__":
+    main()
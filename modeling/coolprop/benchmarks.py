@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+benchmarks.py  --  Timing and memory baselines for the modeling entry points.
+
+Representative workloads:
+
+    run_model.single     one SystemConfig through run_model
+    kernel.single        the same point through kernels.PointModel ($TEG_KERNELS)
+    sweep.scenario       sweep_scenario(): 10 TEG counts, one scenario
+    mcf.for_target       mcf_for_target(): binary search for 25 kW
+    mcf.full_report      print_full_report() over the default scenarios
+    batch.100k           run_batch() over 10^5 random points
+    cost.scaling         calculate_system_cost() over TEG x 50 kW targets x cooling
+
+Each is timed after a warm-up call (median and best of repeated runs, at
+least ``--min-time`` seconds) and its peak traced allocation measured in a
+separate call.  Results go to a versioned JSON baseline; a later run is
+compared against it and exits non-zero when a workload's best time is more
+than ``--tolerance`` slower (and at least ``--min-delta`` seconds slower) or
+its peak allocation more than ``--mem-tolerance`` larger than baseline.  The
+best time is gated rather than the median because it is far less sensitive to
+other load on the machine; the absolute floor keeps scheduler and timer jitter
+on the microsecond workloads from reading as a regression.
+
+Usage:
+    python benchmarks.py                      # compare with benchmarks_baseline.json
+    python benchmarks.py --save               # record a new baseline
+    python benchmarks.py --only batch.100k,run_model.single --tolerance 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from teg_system_model import SystemConfig, TEG_CATALOG, run_model
+from batch_model import run_batch
+from cost_bridge import TEG_OPTIONS, calculate_system_cost
+from kernels import PointModel
+from mcf_to_watts import REPORT_SCENARIOS, mcf_for_target, print_full_report
+from sweep import SCENARIOS, sweep_scenario
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / "benchmarks_baseline.json"
+BASELINE_VERSION = 1
+
+BATCH_POINTS = 100_000
+COST_TARGETS_KW = np.linspace(5.0, 100.0, 50).tolist()
+MIN_DELTA_S = 10e-6            # best-time growth below this is timer/scheduler noise
+
+
+@dataclass
+class Benchmark:
+    """A named workload: ``setup()`` returns the callable that is timed."""
+    name: str
+    items: int                 # work items per call, for throughput
+    unit: str
+    setup: Callable[[], Callable[[], object]]
+    version: int = 1           # bump when the workload changes; old baselines are skipped
+
+
+@dataclass
+class Measurement:
+    name: str
+    version: int
+    items: int
+    unit: str
+    runs: int
+    median_s: float
+    best_s: float
+    peak_mb: float
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.median_s if self.median_s > 0 else float("inf")
+
+    def to_dict(self) -> dict:
+        return {"version": self.version, "items": self.items, "unit": self.unit,
+                "runs": self.runs, "median_s": self.median_s, "best_s": self.best_s,
+                "throughput": self.throughput, "peak_mb": self.peak_mb}
+
+
+# ---------------------------------------------------------------------------
+# Workloads
+# ---------------------------------------------------------------------------
+
+def _single():
+    cfg = SystemConfig(teg_count=792, teg_spec=TEG_CATALOG["thermonamic"],
+                       hot_fluid="therminol", cold_fluid="therminol",
+                       hot_inlet_c=350.0, cold_inlet_c=100.0)
+    return lambda: run_model(cfg)
+
+
+def _kernel():
+    pm = PointModel(SystemConfig(teg_count=792, teg_spec=TEG_CATALOG["thermonamic"],
+                                 hot_fluid="therminol", cold_fluid="therminol",
+                                 hot_inlet_c=350.0, cold_inlet_c=100.0))
+    return pm.evaluate
+
+
+def _sweep():
+    return lambda: sweep_scenario(SCENARIOS[1])
+
+
+def _mcf_target():
+    return lambda: mcf_for_target(25.0, "thermonamic", 350.0, 100.0)
+
+
+def _mcf_report():
+    def call():
+        with contextlib.redirect_stdout(io.StringIO()):
+            print_full_report(REPORT_SCENARIOS)
+    return call
+
+
+def _batch():
+    rng = np.random.default_rng(0)
+    overrides = {
+        "teg_count": rng.integers(500, 8000, BATCH_POINTS),
+        "hot_inlet_c": rng.uniform(150.0, 210.0, BATCH_POINTS).round(),
+        "hx.hot_tim_thickness_m": rng.uniform(2.5e-4, 5e-4, BATCH_POINTS),
+    }
+    base = SystemConfig()
+    return lambda: run_batch(base, overrides)
+
+
+def _cost_scaling():
+    cases = [(teg, kw, cooling) for teg in TEG_OPTIONS.values()
+             for kw in COST_TARGETS_KW for cooling in ("dry", "ground")]
+
+    def call():
+        return [calculate_system_cost(teg, kw, cooling) for teg, kw, cooling in cases]
+    return call
+
+
+BENCHMARKS = [
+    Benchmark("run_model.single", 1, "runs", _single),
+    Benchmark("kernel.single", 1, "runs", _kernel),
+    Benchmark("sweep.scenario", 10, "points", _sweep),
+    Benchmark("mcf.for_target", 1, "targets", _mcf_target),
+    Benchmark("mcf.full_report", len(REPORT_SCENARIOS), "scenarios", _mcf_report),
+    Benchmark("batch.100k", BATCH_POINTS, "points", _batch),
+    Benchmark("cost.scaling", len(TEG_OPTIONS) * len(COST_TARGETS_KW) * 2, "systems",
+              _cost_scaling, version=2),
+]
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def measure(bench: Benchmark, min_time: float = 1.0, min_runs: int = 5,
+            max_runs: int = 10_000) -> Measurement:
+    """Time ``bench`` (warm) and measure its peak traced allocation."""
+    fn = bench.setup()
+    fn()                                    # warm-up: caches, lazy imports
+
+    times: list[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()                            # as timeit does: keep collections out of runs
+    try:
+        start = time.perf_counter()
+        while len(times) < max_runs and (len(times) < min_runs
+                                         or time.perf_counter() - start < min_time):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(bench.name, bench.version, bench.items, bench.unit, len(times),
+                       statistics.median(times), min(times), peak / 1e6)
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=Path(__file__).resolve().parent, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def machine_info() -> dict:
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "processor": platform.processor() or None}
+
+
+def save_baseline(results: list[Measurement], path: Path) -> None:
+    """Write (or update) the baseline with ``results``."""
+    data = load_baseline(path) or {}
+    entries = data.get("results", {}) if data.get("version") == BASELINE_VERSION else {}
+    entries.update({m.name: m.to_dict() for m in results})
+    data = {"version": BASELINE_VERSION,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": _git_rev(), "machine": machine_info(), "results": entries}
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def compare(m: Measurement, base: Optional[dict], tolerance: float,
+            mem_tolerance: float, min_delta: float = MIN_DELTA_S) -> tuple[str, list[str]]:
+    """(status, reasons) for one measurement against its baseline entry."""
+    if base is None:
+        return "new", []
+    if base.get("version") != m.version:
+        return "stale", [f"baseline is workload v{base.get('version')}"]
+    reasons = []
+    if m.best_s > max(base["best_s"] * (1.0 + tolerance), base["best_s"] + min_delta):
+        reasons.append(f"time {(m.best_s / base['best_s'] - 1) * 100:+.0f}%")
+    # Allocation noise floor: ignore growth below 0.1 MB
+    if m.peak_mb > base["peak_mb"] * (1.0 + mem_tolerance) + 0.1:
+        reasons.append(f"memory {(m.peak_mb / max(base['peak_mb'], 1e-9) - 1) * 100:+.0f}%")
+    return ("FAIL" if reasons else "ok"), reasons
+
+
+def _fmt_time(s: float) -> str:
+    if s < 1e-3:
+        return f"{s * 1e6:.1f} us"
+    if s < 1.0:
+        return f"{s * 1e3:.2f} ms"
+    return f"{s:.3f} s"
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Modeling benchmarks and baselines")
+    parser.add_argument("--only", default=None, help="Comma-separated benchmark names")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true",
+                        help="Record the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown of the best time (fraction, default 0.25)")
+    parser.add_argument("--mem-tolerance", type=float, default=0.25,
+                        help="Allowed growth of peak traced memory (fraction, default 0.25)")
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA_S,
+                        help="Ignore best-time growth below this many seconds "
+                             f"(default {MIN_DELTA_S:g})")
+    parser.add_argument("--min-time", type=float, default=1.0,
+                        help="Minimum timed seconds per benchmark")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for b in BENCHMARKS:
+            print(f"  {b.name:<20s}  {b.items:>8,d} {b.unit}")
+        return
+
+    only = set(args.only.split(",")) if args.only else None
+    if only and (unknown := only - {b.name for b in BENCHMARKS}):
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    selected = [b for b in BENCHMARKS if not only or b.name in only]
+
+    baseline = None if args.save else load_baseline(args.baseline)
+    if baseline and baseline.get("version") != BASELINE_VERSION:
+        print(f"  baseline format v{baseline.get('version')} != v{BASELINE_VERSION}; "
+              f"not comparing (re-run with --save)", file=sys.stderr)
+        baseline = None
+    entries = baseline["results"] if baseline else {}
+
+    results = [measure(b, min_time=args.min_time) for b in selected]
+    verdicts = [compare(m, entries.get(m.name), args.tolerance, args.mem_tolerance,
+                        args.min_delta) for m in results]
+    failed = sum(status == "FAIL" for status, _ in verdicts)
+
+    if args.json:
+        print(json.dumps({"results": {m.name: m.to_dict() | {"status": s, "reasons": r}
+                                      for m, (s, r) in zip(results, verdicts)},
+                          "baseline": str(args.baseline) if baseline else None,
+                          "failed": failed}, indent=2))
+    else:
+        print("=" * 100)
+        ref = f"vs baseline {baseline.get('git') or '?'} ({baseline.get('created', '?')})" \
+            if baseline else "no baseline"
+        print(f"  BENCHMARKS -- {ref}, tolerance time {args.tolerance:.0%} / "
+              f"memory {args.mem_tolerance:.0%}")
+        print("=" * 100)
+        print(f"  {'Benchmark':<20s}  {'Runs':>6s}  {'Median':>10s}  {'Best':>10s}  "
+              f"{'Throughput':>19s}  {'Peak MB':>8s}  {'Base best':>10s}  Status")
+        print(f"  {'─' * 96}")
+        for m, (status, reasons) in zip(results, verdicts):
+            base = entries.get(m.name)
+            base_t = _fmt_time(base["best_s"]) if base else "-"
+            note = f"{status}" + (f" ({', '.join(reasons)})" if reasons else "")
+            print(f"  {m.name:<20s}  {m.runs:>6d}  {_fmt_time(m.median_s):>10s}  "
+                  f"{_fmt_time(m.best_s):>10s}  {m.throughput:>9,.0f} {m.unit:<9s}  "
+                  f"{m.peak_mb:>8.2f}  {base_t:>10s}  {note}")
+        print(f"  {'─' * 96}")
+        print(f"  {'no regressions' if not failed else f'{failed} regression(s)'}")
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"\n  Baseline saved to: {args.baseline}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
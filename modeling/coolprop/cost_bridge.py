@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+cost_bridge.py  --  The one place modeling code reaches costs/cost_model.py.
+
+``costs/`` is a sibling directory, not a package.  Instead of each module
+putting it on ``sys.path`` (and ``cost_model`` putting this directory there
+in turn), ``costs/cost_model.py`` is loaded once by file path and registered
+as ``cost_model`` in ``sys.modules``.  Every importer then gets the same
+module object whichever script ran first, and no directory can shadow
+another's modules.
+
+On the other side ``cost_model`` needs only ``teg_catalog``, a leaf module
+it loads the same way; only its ``--arrow`` CLI option reaches further
+(``arrow_io``), from ``main()``.
+
+Usage:
+    from cost_bridge import TEG_OPTIONS, calculate_system_cost
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+COST_MODEL_PATH = Path(__file__).resolve().parents[2] / "costs" / "cost_model.py"
+
+
+def _load_cost_model():
+    mod = sys.modules.get("cost_model")
+    if mod is None:
+        spec = importlib.util.spec_from_file_location("cost_model", COST_MODEL_PATH)
+        mod = importlib.util.module_from_spec(spec)
+        sys.modules["cost_model"] = mod
+        try:
+            spec.loader.exec_module(mod)
+        except BaseException:
+            del sys.modules["cost_model"]
+            raise
+    return mod
+
+
+cost_model = _load_cost_model()
+
+from cost_model import (  # noqa: E402  (resolved from sys.modules above)
+    GROUND_LOOP_KW_PER_BOREHOLE, HX_COPPER, HX_STAINLESS, HXCosts, SystemCost,
+    TEGCost, TEG_OPTIONS, TEGS_PER_PCM, calculate_system_cost, print_comparison,
+    print_cost, print_scaling,
+)
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+design_search.py  --  NSGA-II multi-objective search over whole-system designs.
+
+Replaces hand-picking ``sweep.SCENARIOS`` / ``cost_model.TEG_OPTIONS`` with a
+search over mixed discrete and continuous genes:
+
+    teg        TEG type (keys present in both TEG_CATALOG and TEG_OPTIONS)
+    pcm_count  PCM boards (teg_count = 36 * pcm_count)
+    hot_c      hot inlet, 1 C resolution
+    cold_c     cold inlet, 1 C resolution
+    dt_c       loop dT, 0.5 C resolution
+    fluid      water_glycol | therminol
+    cooling    dry | ground
+    material   copper | stainless HX
+
+Objectives (all minimized): CAPEX ($), LCOE ($/kWh, 20-year capital plus
+fuel), McF/day and borehole count.  Constraints: TEG hot side under
+max_hot_c, water/glycol <= 220 C, copper HX <= 250 C, net output >= a floor.
+Infeasible designs lose to feasible ones and to each other by total
+violation (Deb's constrained domination).
+
+Each generation's unseen genomes are evaluated in chunks -- one batch-model
+call per TEG type plus the cost roll-up -- on a process pool.  Genes are
+discretized, so repeated genomes are served from a memo instead of being
+re-run.  The returned Pareto set is taken over every design evaluated.
+
+Usage:
+    python design_search.py
+    python design_search.py --pop 120 --generations 60 --workers 4
+    python design_search.py --objectives capex,lcoe --min-net-kw 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Optional, Sequence
+
+import numpy as np
+
+from batch_model import run_batch
+from cost_bridge import (
+    GROUND_LOOP_KW_PER_BOREHOLE, TEG_OPTIONS, TEGS_PER_PCM, calculate_system_cost,
+)
+from mcf_to_watts import DEFAULT_BURNER, HOURS_PER_DAY, KWH_THERMAL_PER_MCF
+from pareto import skyline
+from teg_system_model import SystemConfig, TEG_CATALOG
+
+
+OBJECTIVES = ("capex", "lcoe", "mcf_day", "boreholes")
+FLUIDS = ("water_glycol", "therminol")
+COOLING = ("dry", "ground")
+MATERIALS = ("copper", "stainless")
+
+MAX_WATER_GLYCOL_C = 220.0
+MAX_COPPER_C = 250.0
+CHUNK_SIZE = 64
+
+
+@dataclass(frozen=True)
+class DesignSpace:
+    """Gene bounds and choices.  Gene order: see ``GENES``."""
+    teg_types: tuple[str, ...] = tuple(k for k in TEG_CATALOG if k in TEG_OPTIONS)
+    pcm_count: tuple[int, int] = (5, 150)
+    hot_c: tuple[float, float] = (150.0, 420.0)
+    cold_c: tuple[float, float] = (25.0, 110.0)
+    dt_c: tuple[float, float] = (3.0, 40.0)
+
+    def bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        lo = [0, self.pcm_count[0], self.hot_c[0], self.cold_c[0], self.dt_c[0], 0, 0, 0]
+        hi = [len(self.teg_types) - 1, self.pcm_count[1], self.hot_c[1], self.cold_c[1],
+              self.dt_c[1], len(FLUIDS) - 1, len(COOLING) - 1, len(MATERIALS) - 1]
+        return np.array(lo, dtype=float), np.array(hi, dtype=float)
+
+
+GENES = ("teg", "pcm_count", "hot_c", "cold_c", "dt_c", "fluid", "cooling", "material")
+RESOLUTION = np.array([1, 1, 1.0, 1.0, 0.5, 1, 1, 1])
+CATEGORICAL = np.array([True, False, False, False, False, True, True, True])
+
+
+def snap(genomes: np.ndarray, space: DesignSpace) -> np.ndarray:
+    """Clip to bounds and round every gene to its resolution."""
+    lo, hi = space.bounds()
+    return np.clip(np.round(genomes / RESOLUTION) * RESOLUTION, lo, hi)
+
+
+def random_genomes(rng: np.random.Generator, n: int, space: DesignSpace) -> np.ndarray:
+    lo, hi = space.bounds()
+    x = lo + rng.random((n, len(GENES))) * (hi - lo + CATEGORICAL)
+    return snap(np.where(CATEGORICAL, np.floor(x), x), space)
+
+
+def describe(genome: np.ndarray, space: DesignSpace) -> dict:
+    """Human-readable genes."""
+    g = genome
+    return {"teg": space.teg_types[int(g[0])], "pcm_count": int(g[1]),
+            "hot_c": float(g[2]), "cold_c": float(g[3]), "dt_c": float(g[4]),
+            "fluid": FLUIDS[int(g[5])], "cooling": COOLING[int(g[6])],
+            "material": MATERIALS[int(g[7])]}
+
+
+# ---------------------------------------------------------------------------
+# Evaluation (physics batch + cost roll-up)
+# ---------------------------------------------------------------------------
+
+def evaluate_genomes(genomes: np.ndarray, space: DesignSpace, gas_price: float,
+                     min_net_kw: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Objectives (n, 4), constraint violation (n,) and net kW (n,)."""
+    n = len(genomes)
+    objs = np.zeros((n, len(OBJECTIVES)))
+    viol = np.zeros(n)
+    net_kw = np.zeros(n)
+
+    for t, key in enumerate(space.teg_types):
+        idx = np.flatnonzero(genomes[:, 0] == t)
+        if idx.size == 0:
+            continue
+        g = genomes[idx]
+        fluids = np.array(FLUIDS, dtype=object)[g[:, 5].astype(int)]
+        res = run_batch(SystemConfig(teg_spec=TEG_CATALOG[key]), {
+            "teg_count": g[:, 1] * TEGS_PER_PCM, "hot_inlet_c": g[:, 2],
+            "cold_inlet_c": g[:, 3], "target_dt_fluid_c": g[:, 4],
+            "hot_fluid": fluids, "cold_fluid": fluids,
+        }, idx.size)
+
+        max_hot = TEG_CATALOG[key].max_hot_c
+        v = (np.maximum(res.t_teg_hot_c - max_hot, 0.0)
+             + np.where(g[:, 5] == FLUIDS.index("water_glycol"),
+                        np.maximum(g[:, 2] - MAX_WATER_GLYCOL_C, 0.0), 0.0)
+             + np.where(g[:, 7] == MATERIALS.index("copper"),
+                        np.maximum(g[:, 2] - MAX_COPPER_C, 0.0), 0.0)
+             + 10.0 * np.maximum(min_net_kw - res.net_electrical_kw, 0.0))
+        viol[idx] = v
+        net_kw[idx] = res.net_electrical_kw
+
+        fuel_kw = res.total_heat_input_w / 1000.0 / DEFAULT_BURNER.delivery_efficiency
+        mcf_day = fuel_kw * HOURS_PER_DAY / KWH_THERMAL_PER_MCF
+        for j, i in enumerate(idx):
+            objs[i] = _cost_objectives(
+                key, g[j], res.net_electrical_kw[j], res.total_heat_rejection_w[j],
+                mcf_day[j], gas_price)
+    return objs, viol, net_kw
+
+
+def _cost_objectives(key: str, g: np.ndarray, net_kw: float, reject_w: float,
+                     mcf_day: float, gas_price: float) -> list[float]:
+    """CAPEX, LCOE, McF/day, boreholes for one design via cost_model."""
+    n_teg = int(g[1]) * TEGS_PER_PCM
+    cooling = COOLING[int(g[6])]
+    boreholes = (math.ceil(reject_w / 1000.0 / GROUND_LOOP_KW_PER_BOREHOLE)
+                 if cooling == "ground" else 0)
+    if net_kw <= 0:
+        return [math.inf, math.inf, mcf_day, boreholes]
+    # Size the cost model on the physics: per-TEG net power and heat rejected
+    teg = replace(TEG_OPTIONS[key], power_w=net_kw * 1000.0 / n_teg,
+                  heat_flux_w=reject_w / n_teg, fluid_type=FLUIDS[int(g[5])],
+                  hx_material=MATERIALS[int(g[7])])
+    cost = calculate_system_cost(teg, net_kw, cooling, teg_count=n_teg)
+    fuel_per_kwh = mcf_day * gas_price / (net_kw * HOURS_PER_DAY)
+    return [cost.estimated_total, cost.lifecycle_cost_per_kwh + fuel_per_kwh,
+            mcf_day, boreholes]
+
+
+# ---------------------------------------------------------------------------
+# NSGA-II
+# ---------------------------------------------------------------------------
+
+def constrained_dominates(f: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """dom[i, j] = design i dominates design j (feasibility first)."""
+    le = (f[:, None, :] <= f[None, :, :]).all(axis=2)
+    lt = (f[:, None, :] < f[None, :, :]).any(axis=2)
+    feas = v <= 0
+    both = feas[:, None] & feas[None, :]
+    return np.where(both, le & lt,
+                    (feas[:, None] & ~feas[None, :])
+                    | (~feas[:, None] & ~feas[None, :] & (v[:, None] < v[None, :])))
+
+
+def non_dominated_ranks(f: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Front index per design (0 = non-dominated)."""
+    dom = constrained_dominates(f, v)
+    count = dom.sum(axis=0)
+    rank = np.full(len(f), -1)
+    front = np.flatnonzero(count == 0)
+    r = 0
+    while front.size:
+        rank[front] = r
+        count = count - dom[front].sum(axis=0)
+        count[rank >= 0] = -1
+        front = np.flatnonzero(count == 0)
+        r += 1
+    return rank
+
+
+def crowding_distance(f: np.ndarray, rank: np.ndarray) -> np.ndarray:
+    """Crowding distance within each front."""
+    dist = np.zeros(len(f))
+    finite = np.where(np.isfinite(f), f, np.nan)
+    for r in np.unique(rank):
+        idx = np.flatnonzero(rank == r)
+        if idx.size <= 2:
+            dist[idx] = np.inf
+            continue
+        for k in range(f.shape[1]):
+            col = finite[idx, k]
+            order = np.argsort(col)
+            span = np.nanmax(col) - np.nanmin(col)
+            dist[idx[order[[0, -1]]]] = np.inf
+            if span > 0:
+                dist[idx[order[1:-1]]] += (col[order[2:]] - col[order[:-2]]) / span
+    return np.nan_to_num(dist, nan=0.0)
+
+
+def _tournament(rng, rank, crowd, n):
+    a, b = rng.integers(0, len(rank), (2, n))
+    better = (rank[a] < rank[b]) | ((rank[a] == rank[b]) & (crowd[a] > crowd[b]))
+    return np.where(better, a, b)
+
+
+def make_offspring(rng: np.random.Generator, parents: np.ndarray, rank: np.ndarray,
+                   crowd: np.ndarray, space: DesignSpace, eta_c: float = 15.0,
+                   eta_m: float = 20.0) -> np.ndarray:
+    """SBX / polynomial mutation on numeric genes, uniform crossover and
+    random reset on categorical genes."""
+    n, d = parents.shape
+    lo, hi = space.bounds()
+    span = np.maximum(hi - lo, 1e-12)
+    p1 = parents[_tournament(rng, rank, crowd, n)]
+    p2 = parents[_tournament(rng, rank, crowd, n)]
+
+    # Simulated binary crossover (numeric) / uniform swap (categorical)
+    u = rng.random((n, d))
+    beta = np.where(u <= 0.5, (2 * u) ** (1 / (eta_c + 1)),
+                    (1 / (2 * (1 - u))) ** (1 / (eta_c + 1)))
+    sbx = 0.5 * ((1 + beta) * p1 + (1 - beta) * p2)
+    swap = rng.random((n, d)) < 0.5
+    child = np.where(CATEGORICAL, np.where(swap, p2, p1), sbx)
+    child = np.where(rng.random((n, 1)) < 0.9, child, p1)
+
+    # Polynomial mutation (numeric) / random reset (categorical)
+    mutate = rng.random((n, d)) < 1.0 / d
+    u = rng.random((n, d))
+    delta = np.where(u < 0.5, (2 * u) ** (1 / (eta_m + 1)) - 1,
+                     1 - (2 * (1 - u)) ** (1 / (eta_m + 1)))
+    reset = random_genomes(rng, n, space)
+    mutated = np.where(CATEGORICAL, reset, child + delta * span)
+    return snap(np.where(mutate, mutated, child), space)
+
+
+@dataclass
+class DesignSearchResult:
+    """Every evaluated design plus search statistics."""
+    space: DesignSpace
+    objectives: tuple[str, ...]
+    genomes: np.ndarray          # (n, 8)
+    values: np.ndarray           # (n, 4) all OBJECTIVES
+    violation: np.ndarray
+    net_kw: np.ndarray
+    evaluations: int
+    cache_hits: int
+    generations: int
+    history: list[int] = field(default_factory=list)   # Pareto size per generation
+
+    def pareto(self) -> np.ndarray:
+        """Indices of the feasible non-dominated designs (selected objectives)."""
+        feas = np.flatnonzero(self.violation <= 0)
+        f = self.values[feas][:, [OBJECTIVES.index(o) for o in self.objectives]]
+        return feas[skyline(f)]
+
+
+def run_nsga2(space: DesignSpace = DesignSpace(), objectives: Sequence[str] = OBJECTIVES,
+              pop_size: int = 80, generations: int = 40, seed: int = 0,
+              gas_price: float = 4.00, min_net_kw: float = 1.0, workers: int = 1,
+              chunk_size: int = CHUNK_SIZE,
+              progress: Optional[callable] = None) -> DesignSearchResult:
+    """Run NSGA-II and return every evaluated design."""
+    objectives = tuple(objectives)
+    bad = [o for o in objectives if o not in OBJECTIVES]
+    if bad:
+        raise KeyError(f"Unknown objectives: {bad}")
+    cols = [OBJECTIVES.index(o) for o in objectives]
+    rng = np.random.default_rng(seed)
+    memo: dict[tuple, int] = {}
+    genomes, values, viol, net = [], [], [], []
+    hits = 0
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def evaluate(pop: np.ndarray) -> np.ndarray:
+        """Row index into the archive for each genome, evaluating new ones."""
+        nonlocal hits
+        keys = [tuple(g) for g in pop]
+        new = list(dict.fromkeys(k for k in keys if k not in memo))
+        hits += len(keys) - len(new)
+        if new:
+            arr = np.array(new)
+            chunks = [arr[i:i + chunk_size] for i in range(0, len(arr), chunk_size)]
+            args = ([space] * len(chunks), [gas_price] * len(chunks),
+                    [min_net_kw] * len(chunks))
+            parts = (pool.map(evaluate_genomes, chunks, *args) if pool
+                     else map(evaluate_genomes, chunks, *args))
+            for chunk, (o, v, nk) in zip(chunks, parts):
+                for k, g in enumerate(chunk):
+                    memo[tuple(g)] = len(genomes)
+                    genomes.append(g)
+                    values.append(o[k])
+                    viol.append(v[k])
+                    net.append(nk[k])
+        return np.array([memo[k] for k in keys])
+
+    history = []
+    try:
+        pop = random_genomes(rng, pop_size, space)
+        rows = evaluate(pop)
+        for gen in range(generations):
+            f, v = np.array(values)[rows][:, cols], np.array(viol)[rows]
+            rank = non_dominated_ranks(f, v)
+            crowd = crowding_distance(f, rank)
+            child_rows = evaluate(make_offspring(rng, pop, rank, crowd, space))
+
+            # Elitist (mu + lambda) survival, de-duplicated
+            union = np.array(list(dict.fromkeys(np.concatenate([rows, child_rows]))))
+            f, v = np.array(values)[union][:, cols], np.array(viol)[union]
+            rank = non_dominated_ranks(f, v)
+            crowd = crowding_distance(f, rank)
+            keep = np.lexsort((-crowd, rank))[:pop_size]
+            rows = union[keep]
+            pop = np.array(genomes)[rows]
+            history.append(int(((rank == 0) & (v <= 0)).sum()))
+            if progress:
+                progress(gen + 1, len(genomes), hits, history[-1])
+    finally:
+        if pool:
+            pool.shutdown()
+
+    return DesignSearchResult(space, objectives, np.array(genomes), np.array(values),
+                              np.array(viol), np.array(net), len(genomes), hits,
+                              generations, history)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def print_pareto(res: DesignSearchResult, limit: Optional[int] = None) -> None:
+    idx = res.pareto()
+    idx = idx[np.argsort(res.values[idx, 0])][:limit]
+    print(f"\n  {'TEG':<12s}  {'PCMs':>4s}  {'TEGs':>5s}  {'Hot':>4s}  {'Cold':>4s}  "
+          f"{'dT':>5s}  {'Fluid':<12s}  {'Cool':<6s}  {'HX':<9s}  {'Net kW':>7s}  "
+          f"{'CAPEX $':>10s}  {'LCOE':>7s}  {'McF/d':>7s}  {'Bores':>5s}")
+    print(f"  {'─' * 124}")
+    for i in idx:
+        d = describe(res.genomes[i], res.space)
+        capex, lcoe, mcf, bores = res.values[i]
+        print(f"  {d['teg']:<12s}  {d['pcm_count']:>4d}  {d['pcm_count'] * TEGS_PER_PCM:>5d}  "
+              f"{d['hot_c']:>4.0f}  {d['cold_c']:>4.0f}  {d['dt_c']:>5.1f}  "
+              f"{d['fluid']:<12s}  {d['cooling']:<6s}  {d['material']:<9s}  "
+              f"{res.net_kw[i]:>7.2f}  {capex:>10,.0f}  {lcoe:>7.3f}  {mcf:>7.2f}  "
+              f"{int(bores):>5d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NSGA-II system design search")
+    parser.add_argument("--objectives", default=",".join(OBJECTIVES),
+                        help=f"Comma-separated subset of {','.join(OBJECTIVES)}")
+    parser.add_argument("--pop", type=int, default=80)
+    parser.add_argument("--generations", type=int, default=40)
+    parser.add_argument("--min-net-kw", type=float, default=1.0,
+                        help="Net output floor (constraint), kW (default: 1)")
+    parser.add_argument("--gas-price", type=float, default=4.00)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Max Pareto rows to print")
+    args = parser.parse_args()
+
+    def progress(gen, n_eval, hits, n_front):
+        if gen % 10 == 0 or gen == args.generations:
+            print(f"  gen {gen:>4d}: {n_eval:>6,} designs evaluated, "
+                  f"{hits:>6,} memo hits, front {n_front}")
+
+    t0 = time.perf_counter()
+    res = run_nsga2(objectives=args.objectives.split(","), pop_size=args.pop,
+                    generations=args.generations, seed=args.seed,
+                    gas_price=args.gas_price, min_net_kw=args.min_net_kw,
+                    workers=args.workers, progress=progress)
+    elapsed = time.perf_counter() - t0
+
+    print("=" * 128)
+    print(f"  NSGA-II DESIGN SEARCH -- objectives: {', '.join(res.objectives)}")
+    print(f"  {res.evaluations:,} unique designs, {res.cache_hits:,} memo hits, "
+          f"{elapsed:.1f} s, gas ${args.gas_price:.2f}/McF, net >= {args.min_net_kw:g} kW")
+    print(f"  Pareto set: {len(res.pareto())} designs")
+    print("=" * 128)
+    print_pareto(res, args.limit)
+
+
+if __name__ == "__main__":
+    main()
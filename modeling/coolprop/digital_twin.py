@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+digital_twin.py  --  Live expected-vs-actual model for every site.
+
+Once per telemetry tick, every site with a fresh ``modbus_poller.py`` sample
+is re-solved in one batched model call (``batch_model.evaluate``) at its
+measured boundary conditions:
+
+    hot / cold supply temperature   model hot_inlet_c / cold_inlet_c
+    hot / cold loop flow            held at the measured value; the loop
+                                    temperature drops are solved so that the
+                                    model's heat balance carries exactly
+                                    these flows
+
+Each pass evaluates the model once and then closes the heat balance in
+closed form, Q = N (T_hot - T_cold) / (R_total + N/2 (1/C_hot + 1/C_cold))
+with C = rho cp V (loop capacity rates), so only the property and
+convection-resistance dependence on temperature is iterated.  Each site's
+loop drops and resistances from its previous solve seed the next one.  A
+second-to-second change usually converges in 1-2 passes, where a cold start
+from the design point takes 3-4.
+
+Published per site (same JSON-lines sample format as the poller):
+
+    tz.teg.twin.net_kw                 predicted net output
+    tz.teg.twin.gross_w                predicted gross TEG output
+    tz.teg.twin.dt_teg_c               expected dT across the TEGs
+    tz.teg.twin.q_hot_kw               predicted heat input
+    tz.teg.twin.hot_return_c           predicted hot / cold return temperatures
+    tz.teg.twin.cold_return_c
+    tz.teg.twin.residual_w             measured - predicted gross output (needs
+    tz.teg.twin.residual_pct           the DC meter), in W and % of predicted
+    tz.teg.twin.hot_return_residual_c  measured - predicted hot return (> 0:
+                                       less heat taken out than expected)
+    tz.teg.twin.degraded               EWMA of residual_pct (time constant
+                                       ``--ewma-s``) below -``--alarm-pct``
+
+Fouled HX cells and failing TIMs add thermal resistance the model does not
+have, so they show up as a persistent negative residual at unchanged supply
+temperatures and flows.
+
+Usage:
+    python digital_twin.py --self-test --sim 40 --degraded 4
+    python digital_twin.py --sites sites.toml --out twin.jsonl
+    python modbus_poller.py --sites sites.toml | python digital_twin.py --sites sites.toml --input -
+    python digital_twin.py --bench 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Callable, Iterable, Optional, Sequence
+
+import numpy as np
+
+from batch_model import BatchResults, config_columns, evaluate
+from modbus_poller import (LATENCY_WINDOW, REGMAP_PATH, SIM_BASE_PORT, DeviceMap,
+                           PollStats, Site, load_register_map, load_sites, poll_sites,
+                           print_stats as print_poll_stats, sim_sites)
+from teg_system_model import SystemConfig, TEG_CATALOG
+
+TOLERANCE_C = 0.01           # loop temperature drop convergence
+MAX_PASSES = 12
+MIN_DRIVING_C = 5.0          # hot - cold supply below this: not producing, not solved
+EWMA_S = 60.0
+ALARM_PCT = 5.0
+
+#: point names (modbus_registers.toml) the twin reads; the first four are required
+INPUTS = ("t_hot_supply_c", "t_cold_supply_c", "flow_hot_lpm", "flow_cold_lpm",
+          "t_hot_return_c", "teg_power_w")
+#: resistances carried from one solve to the next
+WARM_KEYS = ("r_hot_conv", "r_cold_conv", "r_teg")
+
+TWIN_TOPICS = {
+    "net_kw": "tz.teg.twin.net_kw",
+    "gross_w": "tz.teg.twin.gross_w",
+    "dt_teg_c": "tz.teg.twin.dt_teg_c",
+    "q_hot_kw": "tz.teg.twin.q_hot_kw",
+    "hot_return_c": "tz.teg.twin.hot_return_c",
+    "cold_return_c": "tz.teg.twin.cold_return_c",
+    "residual_w": "tz.teg.twin.residual_w",
+    "residual_pct": "tz.teg.twin.residual_pct",
+    "hot_return_residual_c": "tz.teg.twin.hot_return_residual_c",
+    "degraded": "tz.teg.twin.degraded",
+}
+
+
+def site_config(site: Site) -> SystemConfig:
+    """Design-point config of a site's array (supply temperatures are per tick)."""
+    if site.teg_count is None:
+        raise ValueError(f"site {site.name}: teg_count not set")
+    if site.teg_type not in TEG_CATALOG:
+        raise ValueError(f"site {site.name}: unknown teg_type {site.teg_type!r}")
+    return SystemConfig(teg_count=site.teg_count, teg_spec=TEG_CATALOG[site.teg_type],
+                        hot_fluid=site.hot_fluid, cold_fluid=site.cold_fluid)
+
+
+def input_topics(regmap: dict[str, DeviceMap]) -> dict[str, str]:
+    """Input name -> lex topic, from the register map."""
+    topics = {p.name: p.topic for dev in regmap.values() for p in dev.points
+              if p.name in INPUTS and p.topic}
+    missing = [n for n in INPUTS[:4] if n not in topics]
+    if missing:
+        raise ValueError(f"register map has no topic for {missing}")
+    return topics
+
+
+@dataclass
+class TwinStats:
+    """Counters across ticks; solve times in seconds."""
+    ticks: int = 0
+    solves: int = 0
+    skipped: int = 0
+    passes: int = 0
+    max_passes: int = 0
+    solve_s: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+
+class DigitalTwin:
+    """Batched, warm-started model state for a fixed list of sites."""
+
+    def __init__(self, sites: Sequence[Site], topics: dict[str, str],
+                 tolerance_c: float = TOLERANCE_C, max_passes: int = MAX_PASSES,
+                 ewma_s: float = EWMA_S, alarm_pct: float = ALARM_PCT):
+        self.sites = list(sites)
+        self.index = {s.name: i for i, s in enumerate(self.sites)}
+        self.topics = topics
+        self.tolerance_c, self.max_passes = tolerance_c, max_passes
+        self.ewma_s, self.alarm_pct = ewma_s, alarm_pct
+        self._cols = config_columns([site_config(s) for s in self.sites])
+        n = len(self.sites)
+        self.residual_ewma = np.full(n, np.nan)
+        self.last_ts = np.full(n, np.nan)
+        self.reset()
+        self.pending: dict[int, dict] = {}
+        self.stats = TwinStats()
+
+    def reset(self) -> None:
+        """Forget the warm starts: next solve starts from each site's design point."""
+        c = self._cols
+        design = evaluate(c)
+        self.dt_hot = c["target_dt_fluid_c"].copy()
+        self.dt_cold = np.where(np.isnan(c["cold_dt_fluid_c"]), self.dt_hot,
+                                c["cold_dt_fluid_c"])
+        self.warm = {k: design.columns[k].copy() for k in WARM_KEYS}
+
+    def submit(self, sample: dict) -> None:
+        """Queue a poller sample for the next tick (latest per site wins)."""
+        i = self.index.get(sample.get("site"))
+        if i is not None:
+            self.pending[i] = sample
+
+    def solve(self, idx: np.ndarray, t_hot: np.ndarray, t_cold: np.ndarray,
+              flow_hot_m3s: np.ndarray, flow_cold_m3s: np.ndarray
+              ) -> tuple[BatchResults, int]:
+        """Model rows ``idx`` at measured supply temperatures and flows.
+
+        Returns the results and the number of passes taken; the converged
+        loop drops and resistances become the rows' next warm start.
+        """
+        cols = {k: v[idx] for k, v in self._cols.items()}
+        cols["hot_inlet_c"], cols["cold_inlet_c"] = t_hot, t_cold
+        n_teg = np.floor(cols["teg_count"])
+        dt_hot, dt_cold = self.dt_hot[idx], self.dt_cold[idx]
+        warm = {k: v[idx] for k, v in self.warm.items()}
+        for passes in range(1, self.max_passes + 1):
+            cols["target_dt_fluid_c"], cols["cold_dt_fluid_c"] = dt_hot, dt_cold
+            res = evaluate(cols, warm, iterations=1)
+            warm = {k: res.columns[k] for k in WARM_KEYS}
+            # rho * cp from the model's own flow, times the measured flow: W/K
+            c_hot = res.total_heat_input_w / (res.hot_flow_rate_m3s * dt_hot) * flow_hot_m3s
+            c_cold = res.total_heat_input_w / (res.cold_flow_rate_m3s * dt_cold) * flow_cold_m3s
+            q = n_teg * (t_hot - t_cold) / (res.r_total + 0.5 * n_teg * (1.0 / c_hot + 1.0 / c_cold))
+            new_hot, new_cold = q / c_hot, q / c_cold
+            err = max(np.abs(new_hot - dt_hot).max(), np.abs(new_cold - dt_cold).max())
+            dt_hot, dt_cold = new_hot, new_cold
+            if not err > self.tolerance_c:          # also stops on NaN
+                break
+        ok = np.isfinite(dt_hot) & np.isfinite(dt_cold) & (dt_hot > 0) & (dt_cold > 0)
+        self.dt_hot[idx[ok]], self.dt_cold[idx[ok]] = dt_hot[ok], dt_cold[ok]
+        for k in WARM_KEYS:
+            self.warm[k][idx[ok]] = warm[k][ok]
+        return res, passes
+
+    def tick(self) -> list[dict]:
+        """Solve every site with a queued sample; one twin sample per solved site."""
+        pending, self.pending = self.pending, {}
+        t0 = time.perf_counter()
+        rows, values = [], []
+        for i, sample in sorted(pending.items()):
+            got = sample.get("topics", {})
+            v = [got.get(self.topics.get(n)) for n in INPUTS]
+            if (any(x is None for x in v[:4]) or v[2] <= 0 or v[3] <= 0
+                    or v[0] - v[1] < MIN_DRIVING_C):
+                self.stats.skipped += 1
+                continue
+            rows.append(i)
+            values.append([sample.get("ts", t0)] + [np.nan if x is None else x for x in v])
+        out = []
+        if rows:
+            idx = np.array(rows)
+            ts, t_hot, t_cold, f_hot, f_cold, ret_hot, power = np.array(values, dtype=float).T
+            res, passes = self.solve(idx, t_hot, t_cold, f_hot / 60_000.0, f_cold / 60_000.0)
+            pred = self._predictions(idx, ts, t_hot, t_cold, ret_hot, power, res)
+            names = [TWIN_TOPICS[k] for k in pred]
+            cols = [np.round(v, 4).tolist() if v.dtype.kind == "f" else v.tolist()
+                    for v in pred.values()]
+            for j, i in enumerate(rows):
+                topics = {}
+                for name, col in zip(names, cols):
+                    x = col[j]
+                    if x is not None and x == x:    # None / NaN: input not measured
+                        topics[name] = x
+                out.append({"ts": values[j][0], "site": self.sites[i].name, "topics": topics})
+            self.stats.solves += len(rows)
+            self.stats.passes += passes * len(rows)
+            self.stats.max_passes = max(self.stats.max_passes, passes)
+        self.stats.ticks += 1
+        self.stats.solve_s.append(time.perf_counter() - t0)
+        return out
+
+    def _predictions(self, idx, ts, t_hot, t_cold, ret_hot, power, res: BatchResults
+                     ) -> dict[str, np.ndarray]:
+        """Published columns; NaN where the needed measurement is missing."""
+        gross = res.gross_electrical_w
+        hot_return = 2.0 * res.t_hot_fluid_avg_c - t_hot
+        with np.errstate(divide="ignore", invalid="ignore"):
+            residual = np.where(gross > 0, power - gross, np.nan)
+            pct = 100.0 * residual / gross
+        # Residual EWMA; a site's first residual initialises it
+        metered = np.isfinite(pct)
+        ewma, last = self.residual_ewma[idx], self.last_ts[idx]
+        alpha = np.where(np.isnan(ewma), 1.0,
+                         1.0 - np.exp(-np.maximum(ts - last, 0.0) / self.ewma_s))
+        ewma = np.where(metered, np.nan_to_num(ewma) + alpha * (pct - np.nan_to_num(ewma)), ewma)
+        self.residual_ewma[idx] = ewma
+        self.last_ts[idx] = np.where(metered, ts, last)
+        degraded = np.where(metered, ewma < -self.alarm_pct, np.nan)
+        return {
+            "net_kw": res.net_electrical_kw,
+            "gross_w": gross,
+            "dt_teg_c": res.dt_across_teg_c,
+            "q_hot_kw": res.total_heat_input_w / 1000.0,
+            "hot_return_c": hot_return,
+            "cold_return_c": 2.0 * res.t_cold_fluid_avg_c - t_cold,
+            "residual_w": residual,
+            "residual_pct": pct,
+            "hot_return_residual_c": ret_hot - hot_return,
+            "degraded": np.array([None if d != d else bool(d) for d in degraded.tolist()],
+                                 dtype=object),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Drivers
+# ---------------------------------------------------------------------------
+
+async def run_live(twin: DigitalTwin, regmap: dict[str, DeviceMap],
+                   emit: Callable[[dict], None], period: float = 1.0,
+                   duration: float = float("inf"), pool_size: int = 1,
+                   timeout: float = 0.5, poll_stats: Optional[PollStats] = None) -> None:
+    """Poll the twin's sites and solve once per period until ``duration``."""
+    loop = asyncio.get_running_loop()
+    stop_at = loop.time() + duration
+
+    async def ticker():
+        tick = loop.time() + period
+        while tick <= stop_at + period:
+            await asyncio.sleep(max(0.0, tick - loop.time()))
+            for sample in twin.tick():
+                emit(sample)
+            tick += period
+
+    await asyncio.gather(
+        poll_sites(twin.sites, regmap, twin.submit, period, duration, pool_size, timeout,
+                   stats=poll_stats),
+        ticker())
+
+
+def replay(twin: DigitalTwin, lines: Iterable[str], emit: Callable[[dict], None],
+           period: float = 1.0) -> None:
+    """Feed recorded poller samples, one tick per ``period`` of sample time."""
+    window = None
+    for line in lines:
+        if not line.strip():
+            continue
+        sample = json.loads(line)
+        w = math.floor(sample.get("ts", 0.0) / period)
+        if window is not None and w != window:
+            for out in twin.tick():
+                emit(out)
+        window = w
+        twin.submit(sample)
+    for out in twin.tick():
+        emit(out)
+
+
+def bench(n_sites: int, ticks: int = 30, seed: int = 0) -> None:
+    """Warm-started vs cold solves for ``n_sites`` synthetic sites."""
+    from modbus_sim import Scenario, plant_values
+
+    scenarios = [Scenario(), Scenario("thermonamic", 320.0, 100.0, 792),
+                 Scenario("alphabet", 380.0, 90.0, 540), Scenario(teg_count=1008)]
+    plants = [(sc, plant_values(sc)) for sc in scenarios]
+    sites, base = [], []
+    for i in range(n_sites):
+        sc, values = plants[i % len(plants)]
+        fluid = "therminol" if sc.hot_temp > 220 else "water_glycol"
+        sites.append(Site(f"bench-{i:04d}", "", 0, fluid, fluid, teg_type=sc.teg_type,
+                          teg_count=sc.teg_count))
+        base.append([values[n] for n in INPUTS])
+    rng = np.random.default_rng(seed)
+    base = np.array(base)
+    base[:, 0] += rng.uniform(-15.0, 15.0, n_sites)            # off-design operation
+    base[:, 2:4] *= rng.uniform(0.7, 1.3, (n_sites, 1))
+    t0 = time.perf_counter()
+    twin = DigitalTwin(sites, {n: n for n in INPUTS})
+    setup_s = time.perf_counter() - t0
+
+    print(f"\n{'=' * 72}")
+    print(f"  Digital twin: {n_sites:,} sites, {ticks} ticks (setup {setup_s * 1e3:.0f} ms)")
+    print(f"{'=' * 72}")
+    print(f"  {'Start':<22s}  {'passes':>6s}  {'ms/tick':>8s}  {'p99 ms':>7s}  "
+          f"{'us/site':>7s}  {'1 Hz budget':>11s}")
+    print(f"  {'─' * 68}")
+    for label, warm in (("cold (design point)", False), ("warm (previous tick)", True)):
+        twin.stats = TwinStats()
+        x = base.copy()
+        for _ in range(ticks):
+            x[:, 0] += rng.normal(0.0, 0.3, n_sites)          # hot supply wander
+            x[:, 2:4] *= 1.0 + rng.normal(0.0, 0.003, (n_sites, 2))
+            if not warm:
+                twin.reset()
+            for i, s in enumerate(sites):
+                twin.submit({"ts": 0.0, "site": s.name,
+                             "topics": dict(zip(INPUTS, x[i].tolist()))})
+            twin.tick()
+        st = twin.stats
+        ms = np.array(st.solve_s) * 1e3
+        print(f"  {label:<22s}  {st.passes / st.solves:>6.2f}  {ms.mean():>8.2f}  "
+              f"{np.percentile(ms, 99):>7.2f}  {ms.mean() * 1e3 / n_sites:>7.1f}  "
+              f"{ms.mean() / 10.0:>10.1f}%")
+
+
+def print_stats(stats: TwinStats, elapsed: float) -> None:
+    solves = max(stats.solves, 1)
+    ms = np.array(stats.solve_s) * 1e3 if stats.solve_s else np.array([np.nan])
+    print(f"\n{'=' * 64}", file=sys.stderr)
+    print(f"  Digital twin: {stats.ticks:,} ticks, {elapsed:.1f} s", file=sys.stderr)
+    print(f"{'=' * 64}", file=sys.stderr)
+    rows = [
+        ("site solves", f"{stats.solves:,}  ({stats.skipped:,} samples skipped)"),
+        ("passes", f"mean {stats.passes / solves:.2f}   max {stats.max_passes}"),
+        ("tick time", f"p50 {np.percentile(ms, 50):.1f} ms   p99 {np.percentile(ms, 99):.1f} ms"
+                      f"   max {ms.max():.1f} ms"),
+    ]
+    for label, text in rows:
+        print(f"  {label:<14s}  {text}", file=sys.stderr)
+
+
+def self_test_report(last: dict[str, dict], degraded: set[str]) -> bool:
+    """Healthy sites track the model; degraded ones are flagged."""
+    print(f"\n  {'Sites':<10s}  {'n':>4s}  {'residual %':>18s}  {'flagged':>7s}",
+          file=sys.stderr)
+    print(f"  {'─' * 46}", file=sys.stderr)
+    ok = True
+    for label, names in (("healthy", set(last) - degraded), ("degraded", degraded & set(last))):
+        if not names:
+            continue
+        pct = [last[n]["topics"][TWIN_TOPICS["residual_pct"]] for n in names]
+        flagged = sum(last[n]["topics"][TWIN_TOPICS["degraded"]] for n in names)
+        want = len(names) if label == "degraded" else 0
+        good = flagged == want and (label == "degraded" or max(map(abs, pct)) < 0.5)
+        ok &= good
+        print(f"  {label:<10s}  {len(names):>4d}  {min(pct):>8.2f} .. {max(pct):>6.2f}  "
+              f"{flagged:>7d}{'' if good else '  FAIL'}", file=sys.stderr)
+    return ok
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+async def _main(args, twin: DigitalTwin, regmap: dict[str, DeviceMap]) -> int:
+    servers = []
+    if args.self_test:
+        from modbus_sim import Scenario, start_sites
+        servers = await start_sites(len(twin.sites), regmap, Scenario(), host=args.host,
+                                    base_port=args.base_port, noise=0.0,
+                                    degraded=args.degraded, tim_factor=args.tim_factor)
+    out = open(args.out, "w") if args.out else sys.stdout
+    last: dict[str, dict] = {}
+
+    def emit(sample: dict) -> None:
+        last[sample["site"]] = sample
+        if not args.quiet:
+            out.write(json.dumps(sample, separators=(",", ":")) + "\n")
+
+    poll_stats = PollStats()
+    t0 = time.perf_counter()
+    try:
+        await run_live(twin, regmap, emit, args.period, args.duration, args.pool,
+                       args.timeout, poll_stats)
+    finally:                                     # also on Ctrl-C
+        if out is not sys.stdout:
+            out.close()
+        for srv in servers:
+            srv.close()
+        elapsed = time.perf_counter() - t0
+        print_poll_stats(poll_stats, args.period, elapsed)
+        print_stats(twin.stats, elapsed)
+
+    if args.self_test:
+        ok = self_test_report(last, {s.name for s in twin.sites[:args.degraded]})
+        ok &= poll_stats.errors == 0 and poll_stats.missed_ticks == 0
+        print(f"\n  self-test {'passed' if ok else 'FAILED'}", file=sys.stderr)
+        return 0 if ok else 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live expected-vs-actual model per site")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--sites", default=None, metavar="FILE",
+                     help="Site list (as for modbus_poller.py, with teg_type / teg_count)")
+    src.add_argument("--sim", type=int, default=None, metavar="N",
+                     help="N local simulator sites (modbus_sim.py defaults)")
+    src.add_argument("--bench", type=int, default=None, metavar="N",
+                     help="Time warm vs cold solves for N synthetic sites")
+    parser.add_argument("--input", default=None, metavar="FILE",
+                        help="Replay recorded poller samples (- for stdin) instead of polling")
+    parser.add_argument("--map", default=str(REGMAP_PATH), help="Register map file")
+    parser.add_argument("--host", default="127.0.0.1", help="Simulator host (--sim)")
+    parser.add_argument("--base-port", type=int, default=SIM_BASE_PORT,
+                        help="First simulator port (--sim)")
+    parser.add_argument("--self-test", action="store_true",
+                        help="Start the --sim sites in-process and check the residuals")
+    parser.add_argument("--degraded", type=int, default=0, metavar="K",
+                        help="Degraded simulator sites (--self-test)")
+    parser.add_argument("--tim-factor", type=float, default=0.5,
+                        help="TIM conductivity multiplier of degraded sites (--self-test)")
+    parser.add_argument("--period", type=float, default=1.0, help="Tick period, s")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="Stop after this many seconds (default: run until Ctrl-C; "
+                             "5 with --self-test)")
+    parser.add_argument("--pool", type=int, default=1, help="Connections per endpoint")
+    parser.add_argument("--timeout", type=float, default=0.5, help="Per-request timeout, s")
+    parser.add_argument("--ewma-s", type=float, default=EWMA_S,
+                        help="Residual smoothing time constant, s")
+    parser.add_argument("--alarm-pct", type=float, default=ALARM_PCT,
+                        help="Flag sites whose smoothed residual is below -this %%")
+    parser.add_argument("--ticks", type=int, default=30, help="Ticks per --bench run")
+    parser.add_argument("--out", default=None, metavar="FILE",
+                        help="Write twin samples to FILE instead of stdout")
+    parser.add_argument("--quiet", action="store_true", help="Statistics only, no samples")
+    args = parser.parse_args()
+
+    if args.bench is not None:
+        bench(args.bench, args.ticks)
+        return
+    if args.self_test and args.sim is None:
+        parser.error("--self-test needs --sim N")
+    if args.duration is None:
+        args.duration = 5.0 if args.self_test else float("inf")
+
+    try:
+        regmap = load_register_map(args.map)
+        if args.sim is not None:
+            from modbus_sim import Scenario
+            sc = Scenario()
+            sites = [replace(s, teg_type=sc.teg_type, teg_count=sc.teg_count)
+                     for s in sim_sites(args.sim, args.host, args.base_port)]
+        else:
+            sites = load_sites(args.sites)
+        twin = DigitalTwin(sites, input_topics(regmap), ewma_s=args.ewma_s,
+                           alarm_pct=args.alarm_pct)
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        sys.exit(f"  config error: {e}")
+
+    if args.input:
+        out = open(args.out, "w") if args.out else sys.stdout
+        emit = (lambda s: None) if args.quiet else \
+            (lambda s: out.write(json.dumps(s, separators=(",", ":")) + "\n"))
+        t0 = time.perf_counter()
+        lines = sys.stdin if args.input == "-" else open(args.input)
+        try:
+            replay(twin, lines, emit, args.period)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if out is not sys.stdout:
+                out.close()
+            print_stats(twin.stats, time.perf_counter() - t0)
+        return
+
+    try:
+        sys.exit(asyncio.run(_main(args, twin, regmap)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+hx_optimizer.py  --  Fin-channel geometry and TIM search over HXGeometry.
+
+The default cell (9 channels x 3 mm, 1 mm fins) fixes the hydraulic diameter,
+wetted area and contact area that set r_hot_conv and the channel pressure
+drop.  This enumerates every manufacturable design on a machining grid:
+
+    n_channels        4-16          (n_fins = n_channels + 1)
+    channel_width_m   1.0-6.0 mm    in 0.1 mm steps
+    fin_thickness_m   0.5-3.0 mm    in 0.1 mm steps
+    hot TIM           TIM_OPTIONS   (k, thickness, cost, temperature limit)
+
+subject to the fin pack fitting the TEG face width.  The whole population
+(~10^4 designs) goes through the batch model at once and is ranked by one of
+
+    resistance   R_total + pump_weight * pump W per TEG     (C/W, minimize)
+    net          net electrical output                      (kW, maximize)
+    cost         (TEG + HX cell + TIM) $ per net W           ($/W, minimize)
+
+Cell costs come from costs/cost_model.py (HX_COPPER below 220 C hot inlet,
+HX_STAINLESS above), with the fin-machining share scaled by fin count.
+
+Usage:
+    python hx_optimizer.py
+    python hx_optimizer.py --objective cost --teg-count 1620
+    python hx_optimizer.py --teg-type thermonamic --hot-temp 350 --cold-temp 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from batch_model import run_batch_chunked
+from cost_bridge import HX_COPPER, HX_STAINLESS, HXCosts
+from teg_system_model import HXGeometry, SystemConfig, TEG_CATALOG
+
+
+
+@dataclass(frozen=True)
+class TIMOption:
+    """Hot-side thermal interface material choice."""
+    name: str
+    k: float                 # W/m-K
+    thickness_m: float
+    cost_factor: float       # x HXCosts.hot_tim
+    max_temp_c: float        # max continuous service temperature
+
+
+TIM_OPTIONS = {
+    "graphite": TIMOption("Flexible graphite 0.375 mm", 7.5, 0.000375, 1.0, 400.0),
+    "graphite_thin": TIMOption("Flexible graphite 0.2 mm", 7.5, 0.0002, 1.4, 400.0),
+    "phase_change": TIMOption("Phase-change pad 0.1 mm", 3.0, 0.0001, 1.2, 150.0),
+    "indium": TIMOption("Indium foil 0.1 mm", 80.0, 0.0001, 6.0, 140.0),
+}
+
+
+@dataclass(frozen=True)
+class HXBounds:
+    """Manufacturability limits for the fin pack."""
+    n_channels: tuple[int, int] = (4, 16)
+    channel_width_m: tuple[float, float] = (0.0010, 0.0060)
+    fin_thickness_m: tuple[float, float] = (0.0005, 0.0030)
+    step_m: float = 0.0001           # machining increment
+
+
+BASE_N_FINS = HXGeometry().n_fins
+FIN_COST_SHARE = 0.4     # share of cell price that scales with fin count (machining)
+PUMP_WEIGHT = 0.5        # C/W of penalty per W of pump power per TEG
+OBJECTIVES = ("resistance", "net", "cost")
+
+OUTPUTS = ("r_total", "r_hot_conv", "r_hot_tim", "net_electrical_kw",
+           "pump_power_total_w", "hot_dp_channel_pa", "t_teg_hot_c")
+
+
+def hx_costs_for(cfg: SystemConfig) -> HXCosts:
+    """Copper cells for water/glycol loops, stainless above 220 C."""
+    return HX_COPPER if cfg.hot_inlet_c <= 220 else HX_STAINLESS
+
+
+def candidate_grid(cfg: SystemConfig, bounds: HXBounds = HXBounds(),
+                   tims=tuple(TIM_OPTIONS)) -> dict[str, np.ndarray]:
+    """All designs on the machining grid that fit the TEG face.
+
+    TIMs rated below the hot inlet temperature are dropped.
+    """
+    def axis(lo, hi):
+        return np.round(np.arange(lo, hi + bounds.step_m / 2, bounds.step_m), 6)
+
+    tims = [t for t in tims if TIM_OPTIONS[t].max_temp_c >= cfg.hot_inlet_c]
+    if not tims:
+        raise ValueError(f"No TIM option rated for {cfg.hot_inlet_c} C")
+    n_ch, w, t_fin, tim = np.meshgrid(
+        np.arange(bounds.n_channels[0], bounds.n_channels[1] + 1),
+        axis(*bounds.channel_width_m), axis(*bounds.fin_thickness_m),
+        np.arange(len(tims)), indexing="ij")
+    n_ch, w, t_fin, tim = (a.ravel() for a in (n_ch, w, t_fin, tim))
+    n_fins = n_ch + 1
+    fits = n_ch * w + n_fins * t_fin <= cfg.teg_spec.width_m + 1e-9
+    n_ch, w, t_fin, tim, n_fins = (a[fits] for a in (n_ch, w, t_fin, tim, n_fins))
+    opts = [TIM_OPTIONS[t] for t in tims]
+    return {
+        "hx.n_channels": n_ch.astype(float),
+        "hx.n_fins": n_fins.astype(float),
+        "hx.channel_width_m": w,
+        "hx.fin_thickness_m": t_fin,
+        "hx.hot_tim_k": np.array([o.k for o in opts])[tim],
+        "hx.hot_tim_thickness_m": np.array([o.thickness_m for o in opts])[tim],
+        "tim": np.array(tims, dtype=object)[tim],
+    }
+
+
+def cell_cost(costs: HXCosts, n_fins: np.ndarray, tim: np.ndarray) -> np.ndarray:
+    """HX cell + TIM cost per TEG ($)."""
+    scale = 1.0 - FIN_COST_SHARE + FIN_COST_SHARE * n_fins / BASE_N_FINS
+    factor = np.array([TIM_OPTIONS[t].cost_factor for t in tim])
+    return ((costs.hot_cell + costs.cold_cell) * scale
+            + costs.hot_tim * factor + costs.cold_tim)
+
+
+@dataclass
+class HXSearch:
+    """Evaluated candidate population, ranked by ``objective`` (lower is better)."""
+    objective_name: str
+    columns: dict[str, np.ndarray]
+    objective: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.objective)
+
+    def top(self, k: int = 10) -> np.ndarray:
+        return np.argsort(self.objective, kind="stable")[:k]
+
+    def geometry(self, i: int, base: HXGeometry) -> HXGeometry:
+        """HXGeometry for candidate i."""
+        c = self.columns
+        return replace(base, n_channels=int(c["hx.n_channels"][i]),
+                       n_fins=int(c["hx.n_fins"][i]),
+                       channel_width_m=float(c["hx.channel_width_m"][i]),
+                       fin_thickness_m=float(c["hx.fin_thickness_m"][i]),
+                       hot_tim_k=float(c["hx.hot_tim_k"][i]),
+                       hot_tim_thickness_m=float(c["hx.hot_tim_thickness_m"][i]))
+
+
+def search_hx(cfg: SystemConfig, objective: str = "resistance",
+              bounds: HXBounds = HXBounds(), pump_weight: float = PUMP_WEIGHT,
+              workers: int = 1) -> HXSearch:
+    """Evaluate the candidate grid in batch and score it."""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+    cand = candidate_grid(cfg, bounds)
+    overrides = {k: v for k, v in cand.items() if k.startswith("hx.")}
+    cols = run_batch_chunked(cfg, overrides, OUTPUTS, workers=workers)
+    cols.update(cand)
+    cols["cell_cost"] = cell_cost(hx_costs_for(cfg), cand["hx.n_fins"], cand["tim"])
+    net_w = cols["net_electrical_kw"] * 1000.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cols["usd_per_w"] = np.where(
+            net_w > 0, cfg.teg_count * (cfg.teg_spec.price_usd + cols["cell_cost"]) / net_w,
+            np.inf)
+
+    over = cols["t_teg_hot_c"] > cfg.teg_spec.max_hot_c
+    if objective == "resistance":
+        score = cols["r_total"] + pump_weight * cols["pump_power_total_w"] / cfg.teg_count
+    elif objective == "net":
+        score = -cols["net_electrical_kw"]
+    else:
+        score = cols["usd_per_w"]
+    return HXSearch(objective, cols, np.where(over, np.inf, score))
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="HX fin-channel geometry optimizer")
+    parser.add_argument("--teg-type", choices=list(TEG_CATALOG.keys()), default="marlow")
+    parser.add_argument("--teg-count", type=int, default=1620)
+    parser.add_argument("--hot-temp", type=float, default=200.0)
+    parser.add_argument("--cold-temp", type=float, default=40.0)
+    parser.add_argument("--objective", choices=OBJECTIVES, default="resistance")
+    parser.add_argument("--pump-weight", type=float, default=PUMP_WEIGHT,
+                        help="C/W penalty per W of pump power per TEG (resistance objective)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    fluid = "therminol" if args.hot_temp > 220 else "water_glycol"
+    cfg = SystemConfig(teg_count=args.teg_count, teg_spec=TEG_CATALOG[args.teg_type],
+                       hot_fluid=fluid, cold_fluid=fluid,
+                       hot_inlet_c=args.hot_temp, cold_inlet_c=args.cold_temp)
+    t0 = time.perf_counter()
+    res = search_hx(cfg, args.objective, pump_weight=args.pump_weight,
+                    workers=args.workers)
+    elapsed = time.perf_counter() - t0
+
+    # Baseline geometry, scored the same way
+    base = search_hx(cfg, args.objective, HXBounds(
+        n_channels=(cfg.hx.n_channels,) * 2,
+        channel_width_m=(cfg.hx.channel_width_m,) * 2,
+        fin_thickness_m=(cfg.hx.fin_thickness_m,) * 2), args.pump_weight)
+    b = int(np.flatnonzero(base.columns["tim"] == "graphite")[0])
+
+    print("=" * 100)
+    print(f"  HX GEOMETRY SEARCH -- {cfg.teg_spec.name}, {cfg.teg_count} TEGs, "
+          f"hot {cfg.hot_inlet_c} C / cold {cfg.cold_inlet_c} C")
+    print(f"  {len(res):,} manufacturable designs in {elapsed:.2f} s, "
+          f"objective: {args.objective}")
+    print("=" * 100)
+    print(f"  {'Ch':>3s}  {'Width':>6s}  {'Fin':>5s}  {'TIM':<14s}  {'R_tot':>6s}  "
+          f"{'R_conv':>6s}  {'dP ch':>7s}  {'Pump W':>7s}  {'Net kW':>7s}  "
+          f"{'Cell $':>6s}  {'$/W':>6s}  {'Score':>8s}")
+    print(f"  {'':>3s}  {'(mm)':>6s}  {'(mm)':>5s}  {'':<14s}  {'(C/W)':>6s}  "
+          f"{'(C/W)':>6s}  {'(Pa)':>7s}")
+    print(f"  {'─' * 96}")
+
+    def row(r: HXSearch, i: int, tag: str = "") -> None:
+        c = r.columns
+        print(f"  {int(c['hx.n_channels'][i]):>3d}  {c['hx.channel_width_m'][i] * 1000:>6.1f}  "
+              f"{c['hx.fin_thickness_m'][i] * 1000:>5.1f}  {c['tim'][i]:<14s}  "
+              f"{c['r_total'][i]:>6.3f}  {c['r_hot_conv'][i]:>6.3f}  "
+              f"{c['hot_dp_channel_pa'][i]:>7.0f}  {c['pump_power_total_w'][i]:>7.1f}  "
+              f"{c['net_electrical_kw'][i]:>7.3f}  {c['cell_cost'][i]:>6.2f}  "
+              f"{c['usd_per_w'][i]:>6.2f}  {r.objective[i]:>8.4g}{tag}")
+
+    row(base, b, "  <- current HXGeometry")
+    for i in res.top(args.top):
+        row(res, i)
+
+
+if __name__ == "__main__":
+    main()
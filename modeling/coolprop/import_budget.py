@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+import_budget.py  --  Measured import-time budget for the modeling scripts.
+
+Short CLI calls from the site controller and cron jobs pay module import
+time on every run.  Each module here is imported in a fresh interpreter
+(best of ``--repeat``), optionally followed by a smoke call, and checked
+against
+
+    - its import-time budget (ms, excluding interpreter startup), and
+    - the heavy optional dependencies (CoolProp, matplotlib, scipy, numba,
+      pyarrow) that must not have been loaded as a side effect.
+
+Exits non-zero on any overrun, so it can gate CI or a cron wrapper.
+
+Usage:
+    python import_budget.py
+    python import_budget.py --repeat 5 --scale 2.0     # slower machine
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY = ("CoolProp", "matplotlib", "scipy", "numba", "pyarrow")
+
+# (module, import budget ms, statement run after the import -- still must not
+# load HEAVY; the model runs off the precomputed fluid table)
+BUDGETS = [
+    ("pumps", 200, ""),
+    ("teg_system_model", 250, "m.run_model(m.SystemConfig())"),
+    ("mcf_to_watts", 250, ""),
+    ("sweep", 250, ""),
+    ("batch_model", 300, "m.run_batch(m.SystemConfig(), {'teg_count': [500, 1000]})"),
+    ("jacobian", 300, ""),
+    ("pareto", 300, ""),
+    ("sensitivity", 300, ""),
+    ("result_store", 300, ""),
+    ("sweep_plot", 300, ""),
+    ("progress", 200, ""),
+    ("teg_catalog", 150, ""),
+    ("cost_bridge", 200, ""),
+    ("kernels", 250, "m.PointModel(m.SystemConfig()).net_kw()"),
+    ("teg_screen", 300, ""),
+    ("tz_corpus", 300, ""),
+    ("arrow_io", 300, ""),
+    ("modbus_poller", 250, ""),
+    ("modbus_sim", 300, ""),
+    ("digital_twin", 300, ""),
+]
+
+PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import {module} as m
+dt = time.perf_counter() - t0
+{after}
+heavy = sorted({{k.split(".")[0] for k in sys.modules}} & set({heavy!r}))
+print(dt * 1000.0, ",".join(heavy))
+"""
+
+
+def measure(module: str, after: str = "", repeat: int = 3) -> tuple[float, list[str]]:
+    """Best-of-``repeat`` import time (ms) and heavy modules loaded."""
+    best, heavy = float("inf"), []
+    code = PROBE.format(module=module, after=after, heavy=HEAVY)
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parent)
+        if out.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{out.stderr}")
+        ms, _, loaded = out.stdout.strip().splitlines()[-1].partition(" ")
+        best = min(best, float(ms))
+        heavy = [h for h in loaded.split(",") if h]
+    return best, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budget check")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply all budgets (slow or loaded machines)")
+    parser.add_argument("--modules", default=None, help="Comma-separated subset")
+    args = parser.parse_args()
+
+    only = set(args.modules.split(",")) if args.modules else None
+    print("=" * 66)
+    print(f"  IMPORT-TIME BUDGET -- best of {args.repeat}, budget x{args.scale:g}")
+    print("=" * 66)
+    print(f"  {'Module':<20s}  {'ms':>7s}  {'Budget':>7s}  {'Heavy deps loaded':<20s}")
+    print(f"  {'─' * 62}")
+    failed = 0
+    for module, budget, after in BUDGETS:
+        if only and module not in only:
+            continue
+        ms, heavy = measure(module, after, args.repeat)
+        limit = budget * args.scale
+        ok = ms <= limit and not heavy
+        failed += not ok
+        print(f"  {module:<20s}  {ms:>7.1f}  {limit:>7.0f}  {', '.join(heavy) or '-':<20s}"
+              f"{'' if ok else '  FAIL'}")
+    print(f"  {'─' * 62}")
+    print(f"  {'all within budget' if not failed else f'{failed} over budget'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+instrumentation.py  --  Opt-in counters and stage timers for the model hot path.
+
+``run_model``, the property lookups, ``friction_factor`` and the batch
+model report into the module-level ``PROFILE``:
+
+    stages     properties, convergence, electrical, pressure_drop, pumps,
+               assembly (run_model); batch.properties, batch.model
+    counters   run_model calls, fixed-point iterations, property lookups,
+               CoolProp calls, fluid-table hits, fallbacks, friction solves,
+               Colebrook iterations, batch points vs. unique lookups ...
+
+Disabled (the default), each hook is one attribute test.  The CLIs take
+
+    --profile           print the breakdown to stderr when the run ends
+    --pstats FILE       also run under cProfile and dump pstats to FILE
+
+In code::
+
+    from instrumentation import PROFILE
+    PROFILE.enable()
+    ...
+    PROFILE.report()
+
+Counts from worker processes (``--workers``) are not collected; the
+breakdown covers the parent process only.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Optional, TextIO
+
+perf_counter = time.perf_counter
+
+
+class Profile:
+    """Stage timers (seconds) and event counters."""
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self) -> None:
+        self.counters: Counter = Counter()
+        self.timers: defaultdict = defaultdict(float)
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def lap(self, stage: str, t0: float) -> float:
+        """Charge the time since ``t0`` to ``stage``; returns now."""
+        t = perf_counter()
+        self.timers[stage] += t - t0
+        return t
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block (coarse stages only; use ``lap`` inside hot loops)."""
+        if not self.enabled:
+            yield
+            return
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            self.lap(name, t0)
+
+    def report(self, wall_s: Optional[float] = None, file: TextIO = sys.stderr) -> None:
+        """Print the per-stage breakdown and counters."""
+        print("=" * 64, file=file)
+        print("  PROFILE" + (f" -- wall time {wall_s:.3f} s" if wall_s else ""), file=file)
+        print("=" * 64, file=file)
+        total = sum(v for k, v in self.timers.items() if "." not in k)
+        print(f"  {'Stage':<24s}  {'Time (s)':>10s}  {'Share':>7s}  {'Per call':>10s}",
+              file=file)
+        print(f"  {'─' * 58}", file=file)
+        calls = self.counters.get("run_model_calls", 0)
+        for name, t in sorted(self.timers.items(), key=lambda kv: -kv[1]):
+            share = f"{t / total * 100:>6.1f}%" if total and "." not in name else f"{'':>7s}"
+            per = f"{t / calls * 1e6:>8.1f}us" if calls and "." not in name else f"{'':>10s}"
+            print(f"  {name:<24s}  {t:>10.4f}  {share}  {per}", file=file)
+        if self.counters:
+            print(f"\n  {'Counter':<36s}  {'Count':>12s}", file=file)
+            print(f"  {'─' * 50}", file=file)
+            for name, n in sorted(self.counters.items()):
+                print(f"  {name:<36s}  {n:>12,d}", file=file)
+
+
+PROFILE = Profile()
+
+
+def add_profile_arguments(parser) -> None:
+    """``--profile`` / ``--pstats`` on a CLI's argparse parser."""
+    parser.add_argument("--profile", action="store_true",
+                        help="Print a per-stage timing and counter breakdown (stderr)")
+    parser.add_argument("--pstats", metavar="FILE", default=None,
+                        help="Also run under cProfile and dump pstats to FILE")
+
+
+@contextmanager
+def profiling(enabled: bool = True, pstats_path: Optional[str] = None, top: int = 15,
+              file: TextIO = sys.stderr):
+    """Collect PROFILE (and cProfile with ``pstats_path``) over a block."""
+    if not enabled and not pstats_path:
+        yield
+        return
+    import cProfile
+    import pstats
+
+    PROFILE.reset()
+    PROFILE.enable()
+    prof = cProfile.Profile() if pstats_path else None
+    t0 = perf_counter()
+    if prof:
+        prof.enable()
+    try:
+        yield
+    finally:
+        if prof:
+            prof.disable()
+            prof.dump_stats(pstats_path)
+        PROFILE.disable()
+        PROFILE.report(perf_counter() - t0, file=file)
+        if prof:
+            print(f"\n  cProfile (top {top} by cumulative time), full stats in {pstats_path}",
+                  file=file)
+            pstats.Stats(prof, stream=file).sort_stats("cumulative").print_stats(top)
+
+
+def profiling_from_args(args):
+    """``profiling`` configured from ``add_profile_arguments`` flags."""
+    return profiling(getattr(args, "profile", False), getattr(args, "pstats", None))
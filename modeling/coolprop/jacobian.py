@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+jacobian.py  --  Local finite-difference sensitivities ("what-if" table).
+
+Replaces re-running ``teg_system_model.py`` by hand with a nudged
+``--hot-temp`` or ``--dt-fluid``: returns d(output)/d(input) for any
+``ModelResults`` fields with respect to any config fields, at one or many
+operating points.
+
+All perturbed configurations (2k rows per point for central differences)
+go through the batch model as one call, warm-started from the base
+solution's converged convection resistances.  Integer fields (``teg_count``,
+``hx.n_channels`` ...) use a +/-1 step.
+
+Complex-step differentiation is not offered: the model branches on flow
+regime, floors TEG/PCM counts and calls CoolProp, none of which are analytic.
+
+Usage:
+    python jacobian.py
+    python jacobian.py --teg-type thermonamic --hot-temp 350 --cold-temp 100
+    python jacobian.py --inputs hot_inlet_c,hx.hot_tim_k --outputs net_electrical_kw,t_teg_hot_c
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+
+from batch_model import (
+    INPUT_COLUMNS, INTEGER_FIELDS, RESULT_FIELDS, get_field, run_batch,
+)
+from teg_system_model import SystemConfig, TEG_CATALOG
+
+DEFAULT_INPUTS = [
+    "hot_inlet_c", "cold_inlet_c", "target_dt_fluid_c", "teg_count",
+    "pump_efficiency", "pipe_id_m", "hot_pipe_length_m",
+    "hx.n_channels", "hx.channel_width_m", "hx.hot_tim_k",
+    "hx.hot_tim_thickness_m", "hx.cold_tim_k", "teg_spec.r_thermal",
+    "teg_spec.seebeck_v_per_k", "teg_spec.internal_r_ohm",
+]
+DEFAULT_OUTPUTS = ["net_electrical_kw", "gross_electrical_w",
+                   "pump_power_total_w", "t_teg_hot_c"]
+
+# Optional inputs (None in the config) and the field the model uses instead
+FALLBACK_INPUTS = {"cold_dt_fluid_c": "target_dt_fluid_c"}
+
+
+@dataclass
+class Jacobian:
+    """d(outputs)/d(inputs) at m points: ``matrix`` is (m, n_out, n_in)."""
+    inputs: list[str]
+    outputs: list[str]
+    x: np.ndarray            # (m, n_in) input values at the base points
+    y: np.ndarray            # (m, n_out) output values at the base points
+    matrix: np.ndarray       # (m, n_out, n_in)
+    step: np.ndarray         # (m, n_in) absolute steps used
+
+    def elasticity(self) -> np.ndarray:
+        """Dimensionless d ln(y) / d ln(x), same shape as ``matrix``."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.matrix * self.x[:, None, :] / self.y[:, :, None]
+
+    def at(self, output: str, inp: str) -> np.ndarray:
+        """Derivative column for one (output, input) pair across points."""
+        return self.matrix[:, self.outputs.index(output), self.inputs.index(inp)]
+
+
+def jacobian(base: SystemConfig, inputs: Sequence[str] = DEFAULT_INPUTS,
+             outputs: Sequence[str] = DEFAULT_OUTPUTS,
+             points: Optional[Mapping[str, np.ndarray]] = None,
+             method: str = "central", rel_step: float = 1e-4) -> Jacobian:
+    """Finite-difference Jacobian of ``outputs`` w.r.t. ``inputs``.
+
+    ``points`` optionally sweeps some config fields (arrays of length m) so
+    the Jacobian is computed at m operating points in the same batch.
+    ``method`` is ``"central"`` (2 runs per input) or ``"forward"`` (1).
+    An input left None in ``base`` (``cold_dt_fluid_c``) is taken at the
+    value the model falls back to (``FALLBACK_INPUTS``).
+    """
+    inputs, outputs = list(inputs), list(outputs)
+    bad = [p for p in inputs if p not in INPUT_COLUMNS]
+    bad += [o for o in outputs if o not in RESULT_FIELDS]
+    if bad:
+        raise KeyError(f"Unknown fields: {bad}")
+    if method not in ("central", "forward"):
+        raise ValueError(f"Unknown method: {method}")
+
+    points = {k: np.atleast_1d(np.asarray(v, dtype=float))
+              for k, v in (points or {}).items()}
+    m = max([len(v) for v in points.values()] or [1])
+    base_cols = {}
+    for p in inputs:
+        v = points.get(p, get_field(base, p))
+        if v is None and p in FALLBACK_INPUTS:
+            q = FALLBACK_INPUTS[p]
+            v = points.get(q, get_field(base, q))
+        if v is None:
+            raise ValueError(f"{p} is None in the base config: set it to "
+                             f"differentiate with respect to it")
+        base_cols[p] = np.broadcast_to(v, (m,)).astype(float)
+
+    # Base solution (cold start) -> warm start for every perturbation
+    res0 = run_batch(base, points, m)
+    warm_keys = ("r_hot_conv", "r_cold_conv", "r_teg")
+
+    k = len(inputs)
+    signs = (1.0, -1.0) if method == "central" else (1.0,)
+    x = np.stack([base_cols[p] for p in inputs], axis=1)              # (m, k)
+    step = np.where([p in INTEGER_FIELDS for p in inputs], 1.0,
+                    rel_step * np.maximum(np.abs(x), 1e-8))           # (m, k)
+
+    # Row layout: [base] + [sign, input] blocks, each block m rows
+    n_blocks = 1 + len(signs) * k
+    overrides = {p: np.tile(v, n_blocks) for p, v in points.items()}
+    for j, p in enumerate(inputs):
+        col = np.tile(base_cols[p], n_blocks)
+        for s_i, sign in enumerate(signs):
+            blk = 1 + s_i * k + j
+            col[blk * m:(blk + 1) * m] += sign * step[:, j]
+        overrides[p] = col
+    warm = {w: np.tile(res0.columns[w], n_blocks) for w in warm_keys}
+    res = run_batch(base, overrides, m * n_blocks, warm_start=warm)
+
+    y_all = np.stack([np.asarray(res.columns[o], dtype=float) for o in outputs],
+                     axis=1).reshape(n_blocks, m, len(outputs))
+    y_base = y_all[0]
+    y_plus = y_all[1:1 + k].transpose(1, 2, 0)                       # (m, out, k)
+    if method == "central":
+        y_minus = y_all[1 + k:].transpose(1, 2, 0)
+        d = (y_plus - y_minus) / (2.0 * step[:, None, :])
+    else:
+        d = (y_plus - y_base[:, :, None]) / step[:, None, :]
+    return Jacobian(inputs, outputs, x, y_base, d, step)
+
+
+# ---------------------------------------------------------------------------
+# What-if table
+# ---------------------------------------------------------------------------
+
+def print_whatif(jac: Jacobian, pct: float = 1.0, point: int = 0) -> None:
+    """Print the change in each output for a +pct% nudge of each input."""
+    el = jac.elasticity()[point]
+    print(f"\n--- What-if: change in output for +{pct:g}% input "
+          f"(integers: +1 unit) ---")
+    header = f"  {'Input':<26s}  {'Base':>10s}"
+    for o in jac.outputs:
+        header += f"  {o[:16]:>16s}"
+    print(header)
+    base_line = f"  {'(base value)':<26s}  {'':>10s}"
+    for val in jac.y[point]:
+        base_line += f"  {val:>16.4g}"
+    print(base_line)
+    print(f"  {'─' * (38 + 18 * len(jac.outputs))}")
+    for j, p in enumerate(jac.inputs):
+        integer = p in INTEGER_FIELDS
+        line = f"  {p:<26s}  {jac.x[point, j]:>10.4g}"
+        for i in range(len(jac.outputs)):
+            if integer:
+                delta = jac.matrix[point, i, j]
+            else:
+                delta = jac.matrix[point, i, j] * jac.x[point, j] * pct / 100.0
+            line += f"  {delta:>+16.4g}"
+        print(line)
+    print(f"  {'max |elasticity|':<26s}  {'':>10s}" + "".join(
+        f"  {np.nanmax(np.abs(el[i])):>16.2f}" for i in range(len(jac.outputs))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local sensitivity / what-if table")
+    parser.add_argument("--teg-type", choices=list(TEG_CATALOG.keys()), default="marlow")
+    parser.add_argument("--teg-count", type=int, default=1620)
+    parser.add_argument("--hot-temp", type=float, default=200.0)
+    parser.add_argument("--cold-temp", type=float, default=40.0)
+    parser.add_argument("--dt-fluid", type=float, default=10.0)
+    parser.add_argument("--inputs", default=",".join(DEFAULT_INPUTS))
+    parser.add_argument("--outputs", default=",".join(DEFAULT_OUTPUTS))
+    parser.add_argument("--method", choices=["central", "forward"], default="central")
+    parser.add_argument("--pct", type=float, default=1.0,
+                        help="Nudge size for the what-if table, percent (default: 1)")
+    args = parser.parse_args()
+
+    fluid = "therminol" if args.hot_temp > 220 else "water_glycol"
+    base = SystemConfig(teg_count=args.teg_count, teg_spec=TEG_CATALOG[args.teg_type],
+                        hot_fluid=fluid, cold_fluid=fluid, hot_inlet_c=args.hot_temp,
+                        cold_inlet_c=args.cold_temp, target_dt_fluid_c=args.dt_fluid)
+    jac = jacobian(base, args.inputs.split(","), args.outputs.split(","),
+                   method=args.method)
+    print(f"  {base.teg_spec.name}, {base.teg_count} TEGs, hot {base.hot_inlet_c} C, "
+          f"cold {base.cold_inlet_c} C, dT fluid {base.target_dt_fluid_c} C")
+    print_whatif(jac, args.pct)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,646 @@
+#!/usr/bin/env python3
+"""
+job_queue.py  --  Local study job queue for a shared compute box.
+
+One ``serve`` process per machine owns a job root (``--root``, default
+``$TEG_JOBS_ROOT`` or ``~/.cache/teg_jobs``) and runs submitted studies
+``--workers`` at a time, highest priority first (FIFO within a priority).
+Clients talk to it over a Unix socket in the root.
+
+A study is a kind plus CLI parameters.  Each kind is one of the existing
+scripts, run in its own process with the job directory as working
+directory, so outputs come from the scripts' own writers: printed tables
+in ``stdout.txt``, plots, ``result_store`` stores, and progress metrics
+(``metrics.jsonl``) for the sweeps.
+
+    sweep, sweep_plot, grid_store, design_search, hx_optimizer,
+    operating_point, sensitivity, uncertainty, mcf_report, cost_report
+
+Parameters map to flags: ``points=1000000`` -> ``--points 1000000``,
+``no_plot=true`` -> ``--no-plot``, lists repeat the flag.  Each kind accepts
+only its own whitelist of parameters, and no path flags: output-file
+parameters (``out``, ``arrow``, ``pstats``) take a bare file name, written in
+the job directory.
+
+The socket is group-only (mode 0660): engineers sharing the box need the
+service's group.  Jobs belong to the submitting user, taken from the
+socket's peer credentials; only that user, the service's user or root can
+cancel or resume a job or shut the service down.  The service refuses a
+root it does not own or that others can write to (mode 0750 when it creates
+one), and opens job output files without following symlinks.
+
+Jobs are identified by a hash of (kind, parameters): submitting an
+identical study returns the existing job (and its result once done)
+instead of running it twice.  Queued or running jobs can be cancelled
+(the process group is terminated); cancelled or failed jobs can be
+resumed, i.e. queued again.  Job state lives in ``<root>/jobs/<id>/job.json``;
+jobs that were running when the service stopped are re-queued when it
+starts again.
+
+Usage:
+    python job_queue.py serve --workers 2
+    python job_queue.py submit sweep_plot --param points=10000000 --param workers=4 --priority 5
+    python job_queue.py submit design_search --param generations=80
+    python job_queue.py list
+    python job_queue.py status 3f9c0a1b2d4e
+    python job_queue.py cancel 3f9c0a1b2d4e
+    python job_queue.py resume 3f9c0a1b2d4e
+    python job_queue.py result 3f9c0a1b2d4e
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import pwd
+import signal
+import socket
+import struct
+import stat
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Mapping, Optional
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_ROOT = Path(os.environ.get("TEG_JOBS_ROOT") or
+                    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+                    / "teg_jobs")
+ROOT_MODE = 0o750               # group members reach the socket but cannot plant files
+OUTPUT_MODE = 0o640
+SOCKET_NAME = "queue.sock"
+SOCKET_MODE = 0o660             # the service's group may submit; others may not connect
+TERMINATE_GRACE_S = 10.0
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+#: Files the service itself keeps in a job directory.
+RESERVED_FILES = frozenset({"job.json", "stdout.txt", "stderr.txt", "metrics.jsonl"})
+
+
+@dataclass(frozen=True)
+class StudyKind:
+    """A study type: the script that runs it and its fixed leading arguments.
+
+    ``params`` are the parameters a client may set; ``files`` the subset
+    whose value names an output file in the job directory.
+    """
+    script: Path
+    leading: tuple[str, ...] = ()
+    params: frozenset = frozenset()
+    files: frozenset = frozenset()
+    metrics: bool = False      # accepts --metrics (progress.py)
+    description: str = ""
+
+
+_PROFILE = {"profile", "pstats"}             # instrumentation.add_profile_arguments
+_TEMPS = {"teg_type", "hot_temp", "cold_temp"}
+
+
+KINDS = {
+    "sweep": StudyKind(HERE / "sweep.py", params=frozenset({"no_plot"} | _PROFILE),
+                       files=frozenset({"pstats"}), metrics=True,
+                       description="Scenario tables (and sweep_results.png)"),
+    "sweep_plot": StudyKind(HERE / "sweep_plot.py", params=frozenset({
+                                "points", "out", "stat", "value", "bins", "gas_price",
+                                "seed", "workers"}),
+                            files=frozenset({"out"}), metrics=True,
+                            description="Binned density plots of a large sweep"),
+    "grid_store": StudyKind(HERE / "result_store.py", ("build", "store"), params=frozenset({
+                                "teg_types", "hot_temps", "cold_temps", "teg_counts",
+                                "workers"}),
+                            description="Grid study written to a result store (./store)"),
+    "design_search": StudyKind(HERE / "design_search.py", params=frozenset({
+                                   "objectives", "pop", "generations", "min_net_kw",
+                                   "gas_price", "workers", "seed", "limit"}),
+                               description="NSGA-II multi-objective design search"),
+    "hx_optimizer": StudyKind(HERE / "hx_optimizer.py", params=frozenset(_TEMPS | {
+                                  "teg_count", "objective", "pump_weight", "top", "workers"}),
+                              description="HX fin-channel geometry search"),
+    "operating_point": StudyKind(HERE / "operating_point.py", params=frozenset(_TEMPS | {
+                                     "teg_counts", "dt_fluid", "dt_min", "dt_max", "pump"}),
+                                 description="Optimal loop delta-T"),
+    "sensitivity": StudyKind(HERE / "sensitivity.py", params=frozenset(_TEMPS | {
+                                 "teg_count", "rel", "param", "log2n", "gas_price",
+                                 "bootstrap", "workers", "seed", "top"}),
+                             description="Sobol global sensitivity"),
+    "uncertainty": StudyKind(HERE / "uncertainty.py", params=frozenset(_TEMPS | {
+                                 "teg_count", "draws", "seed", "workers", "param",
+                                 "no_defaults"}),
+                             description="Monte Carlo tolerance propagation"),
+    "mcf_report": StudyKind(HERE / "mcf_to_watts.py",
+                            params=frozenset(_TEMPS | {"arrow"} | _PROFILE),
+                            files=frozenset({"arrow", "pstats"}),
+                            description="McF-to-watts-to-cost report"),
+    "cost_report": StudyKind(HERE.parents[1] / "costs" / "cost_model.py",
+                             params=frozenset({"teg", "target_kw", "cooling", "arrow"}),
+                             files=frozenset({"arrow"}),
+                             description="System cost report"),
+}
+
+
+def _check_param(kind: str, key: str, value: object) -> None:
+    """ValueError unless ``key=value`` is allowed for ``kind``."""
+    spec = KINDS[kind]
+    if key not in spec.params:
+        raise ValueError(f"{kind}: parameter {key!r} is not allowed "
+                         f"(choose from {', '.join(sorted(spec.params))})")
+    values = value if isinstance(value, (list, tuple)) else [value]
+    for v in values:
+        if isinstance(v, (dict, list, tuple)):
+            raise ValueError(f"{kind}: {key} must be a scalar or a list of scalars")
+        if isinstance(v, str) and v.startswith("-"):
+            raise ValueError(f"{kind}: {key}={v!r} looks like a flag")
+        if key in spec.files and (not isinstance(v, str) or Path(v).name != v
+                                  or v.startswith(".") or v in RESERVED_FILES):
+            raise ValueError(f"{kind}: {key} must be a file name in the job directory, "
+                             f"not {v!r}")
+
+
+def study_argv(kind: str, params: Mapping[str, object]) -> list[str]:
+    """CLI arguments for a study: ``{"teg_type": "marlow"}`` -> ``--teg-type marlow``.
+
+    Raises ValueError for parameters the kind does not allow.
+    """
+    argv = list(KINDS[kind].leading)
+    for key, value in params.items():
+        _check_param(kind, key, value)
+        flag = "--" + key.replace("_", "-")
+        if value is True:
+            argv.append(flag)
+        elif value is False or value is None:
+            continue
+        elif isinstance(value, (list, tuple)):
+            for v in value:
+                argv += [flag, str(v)]
+        else:
+            argv += [flag, str(value)]
+    return argv
+
+
+def job_key(kind: str, params: Mapping[str, object]) -> str:
+    """Stable id for a study definition (parameter order does not matter)."""
+    canon = json.dumps({"kind": kind, "params": params}, sort_keys=True,
+                       separators=(",", ":"))
+    return hashlib.sha256(canon.encode()).hexdigest()[:12]
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    params: dict
+    priority: int = 0
+    owner: str = ""
+    uid: Optional[int] = None      # submitter, from the socket's peer credentials
+    status: str = QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    returncode: Optional[int] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+    def runtime_s(self) -> Optional[float]:
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class JobService:
+    """Priority queue of studies, run ``workers`` at a time as subprocesses."""
+
+    def __init__(self, root: Path, workers: int = 1):
+        self.root = Path(root)
+        self.jobs_dir = self.root / "jobs"
+        _private_dir(self.root)
+        _private_dir(self.jobs_dir)
+        self.workers = max(1, workers)
+        self.jobs: dict[str, Job] = {}
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self.procs: dict[str, asyncio.subprocess.Process] = {}
+        self._seq = itertools.count()
+        self._stopping = asyncio.Event()
+
+    # -- persistence ------------------------------------------------------
+
+    def job_dir(self, job_id: str) -> Path:
+        return self.jobs_dir / job_id
+
+    def save(self, job: Job) -> None:
+        path = self.job_dir(job.id) / "job.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(job), indent=2) + "\n")
+        os.replace(tmp, path)
+
+    def load(self) -> None:
+        """Reload job state; jobs interrupted mid-run are queued again."""
+        for path in sorted(self.jobs_dir.glob("*/job.json")):
+            job = Job(**json.loads(path.read_text()))
+            if job.status == RUNNING:
+                job.status = QUEUED
+                self.save(job)
+            self.jobs[job.id] = job
+        for job in sorted(self.jobs.values(), key=lambda j: j.submitted):
+            if job.status == QUEUED:
+                self._enqueue(job)
+
+    def _enqueue(self, job: Job) -> None:
+        self.queue.put_nowait((-job.priority, next(self._seq), job.id))
+
+    # -- operations -------------------------------------------------------
+
+    def submit(self, kind: str, params: dict, priority: int = 0,
+               uid: Optional[int] = None) -> dict:
+        if kind not in KINDS:
+            raise ValueError(f"unknown study kind {kind!r} (choose from {', '.join(KINDS)})")
+        params = {k.replace("-", "_"): v for k, v in params.items()}
+        study_argv(kind, params)                      # reject disallowed parameters now
+        job_id = job_key(kind, params)
+        job = self.jobs.get(job_id)
+        if job is not None:
+            if job.status in (FAILED, CANCELLED) and self.may_control(job, uid):
+                return {**self.resume(job_id), "duplicate": True}
+            if job.status == QUEUED and priority > job.priority:
+                job.priority = priority             # stale entry is skipped when popped
+                self.save(job)
+                self._enqueue(job)
+            return {"id": job_id, "status": job.status, "duplicate": True}
+        job = Job(job_id, kind, params, priority, _user_name(uid), uid)
+        self.jobs[job_id] = job
+        self.save(job)
+        self._enqueue(job)
+        return {"id": job_id, "status": job.status, "duplicate": False}
+
+    def cancel(self, job_id: str) -> dict:
+        job = self._get(job_id)
+        if job.status == QUEUED:
+            job.status, job.finished = CANCELLED, time.time()
+            self.save(job)
+        elif job.status == RUNNING:
+            proc = self.procs.get(job.id)
+            job.status = CANCELLED                   # the runner sees this on exit
+            self.save(job)
+            if proc is not None:
+                _terminate(proc)
+        return {"id": job.id, "status": job.status}
+
+    def resume(self, job_id: str) -> dict:
+        job = self._get(job_id)
+        if job.status in (FAILED, CANCELLED):
+            job.status, job.error = QUEUED, None
+            job.started = job.finished = job.returncode = None
+            self.save(job)
+            self._enqueue(job)
+        return {"id": job.id, "status": job.status}
+
+    def status(self, job_id: Optional[str] = None) -> dict:
+        jobs = [self._get(job_id)] if job_id else sorted(
+            self.jobs.values(), key=lambda j: (j.status != RUNNING, j.status != QUEUED,
+                                               -j.priority, j.submitted))
+        return {"jobs": [self._describe(j) for j in jobs]}
+
+    def _describe(self, job: Job) -> dict:
+        d = asdict(job)
+        d["dir"] = str(self.job_dir(job.id))
+        d["runtime_s"] = job.runtime_s()
+        d["progress"] = _last_metrics(self.job_dir(job.id) / "metrics.jsonl")
+        return d
+
+    def may_control(self, job: Optional[Job], uid: Optional[int]) -> bool:
+        """Whether peer ``uid`` may cancel / resume ``job`` (None: the service)."""
+        return uid is not None and (uid in (0, os.getuid())
+                                    or job is not None and uid == job.uid)
+
+    def _get(self, job_id: str) -> Job:
+        matches = [j for k, j in self.jobs.items() if k.startswith(job_id)]
+        if len(matches) != 1:
+            raise KeyError(f"no unique job {job_id!r}")
+        return matches[0]
+
+    # -- execution --------------------------------------------------------
+
+    async def worker(self) -> None:
+        while not self._stopping.is_set():
+            _, _, job_id = await self.queue.get()
+            if job_id is None:                        # shutdown sentinel
+                return
+            job = self.jobs.get(job_id)
+            if job is None or job.status != QUEUED or job_id in self.procs:
+                continue                              # cancelled or superseded entry
+            await self.run(job)
+
+    async def run(self, job: Job) -> None:
+        kind = KINDS[job.kind]
+        out_dir = self.job_dir(job.id)
+        try:
+            argv = study_argv(job.kind, job.params)
+        except ValueError as e:                         # saved before the whitelist
+            job.status, job.error, job.finished = FAILED, str(e), time.time()
+            self.save(job)
+            return
+        if kind.metrics:
+            argv += ["--no-progress", "--metrics", "metrics.jsonl"]
+        job.status, job.started, job.finished = RUNNING, time.time(), None
+        job.attempts += 1
+        self.save(job)
+        try:
+            out = _open_output(out_dir / "stdout.txt")
+            try:
+                err = _open_output(out_dir / "stderr.txt")
+            except OSError:
+                out.close()
+                raise
+        except OSError as e:                            # e.g. ELOOP on a planted symlink
+            job.status, job.error, job.finished = FAILED, str(e), time.time()
+            self.save(job)
+            return
+        with out, err:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    sys.executable, str(kind.script), *argv, cwd=out_dir,
+                    stdout=out, stderr=err, start_new_session=True)
+            except OSError as e:
+                job.status, job.error, job.finished = FAILED, str(e), time.time()
+                self.save(job)
+                return
+            self.procs[job.id] = proc
+            try:
+                rc = await proc.wait()
+            finally:
+                self.procs.pop(job.id, None)
+        job.returncode, job.finished = rc, time.time()
+        if job.status == RUNNING:
+            if self._stopping.is_set():
+                job.status, job.finished = QUEUED, None   # resumed at next start
+            else:
+                job.status = DONE if rc == 0 else FAILED
+                if rc != 0:
+                    job.error = _tail(out_dir / "stderr.txt")
+        elif job.status == QUEUED and not self._stopping.is_set():
+            self._enqueue(job)         # resumed while its cancelled run was exiting
+        self.save(job)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        uid = _peer_uid(writer)
+        try:
+            req = json.loads(await reader.readline())
+            op = req.pop("op")
+            if op == "submit":
+                reply = self.submit(req["kind"], req.get("params", {}),
+                                    int(req.get("priority", 0)), uid)
+            elif op in ("cancel", "resume"):
+                job = self._get(req["id"])
+                if not self.may_control(job, uid):
+                    raise PermissionError(f"{job.id} belongs to {job.owner or 'another user'}")
+                reply = getattr(self, op)(job.id)
+            elif op == "status":
+                reply = self.status(req.get("id"))
+            elif op == "shutdown":
+                if not self.may_control(None, uid):
+                    raise PermissionError("only the service's user can shut it down")
+                self._stopping.set()
+                reply = {"status": "stopping"}
+            else:
+                raise ValueError(f"unknown op {op!r}")
+            reply["ok"] = True
+        except (KeyError, ValueError, TypeError, PermissionError, json.JSONDecodeError) as e:
+            reply = {"ok": False, "error": str(e.args[0]) if e.args else repr(e)}
+        writer.write((json.dumps(reply) + "\n").encode())
+        await writer.drain()
+        writer.close()
+
+    async def serve(self) -> None:
+        self.load()
+        sock = self.root / SOCKET_NAME
+        if sock.exists():
+            sock.unlink()
+        server = await asyncio.start_unix_server(self.handle, path=str(sock))
+        os.chmod(sock, SOCKET_MODE)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._stopping.set)
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+        print(f"  job queue on {sock}, {self.workers} worker(s), "
+              f"{sum(j.status == QUEUED for j in self.jobs.values())} queued", file=sys.stderr)
+        async with server:
+            await self._stopping.wait()
+        for proc in list(self.procs.values()):
+            _terminate(proc)
+        for _ in workers:                            # wake idle workers
+            self.queue.put_nowait((float("-inf"), next(self._seq), None))
+        await asyncio.gather(*workers)               # running jobs record the interruption
+        sock.unlink(missing_ok=True)
+
+
+def _private_dir(path: Path) -> None:
+    """Create ``path`` (mode ROOT_MODE) or check an existing one is ours alone to write."""
+    path.mkdir(mode=ROOT_MODE, parents=True, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise SystemExit(f"  refusing job root {path}: not a directory")
+    if st.st_uid != os.getuid():
+        raise SystemExit(f"  refusing job root {path}: owned by uid {st.st_uid}, "
+                         f"not {os.getuid()}")
+    if st.st_mode & 0o022:
+        raise SystemExit(f"  refusing job root {path}: writable by group/others "
+                         f"(mode {stat.S_IMODE(st.st_mode):o}; chmod 750 it)")
+
+
+def _open_output(path: Path):
+    """Truncate-open a job output file for writing; a planted symlink is an error."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, OUTPUT_MODE)
+    return os.fdopen(fd, "wb")
+
+
+def _terminate(proc: asyncio.subprocess.Process) -> None:
+    """SIGTERM the job's process group (its own pools too), SIGKILL after a grace period."""
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+
+    def kill():
+        if proc.returncode is None:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+    asyncio.get_running_loop().call_later(TERMINATE_GRACE_S, kill)
+
+
+def _peer_uid(writer: asyncio.StreamWriter) -> Optional[int]:
+    """Uid of the process on the other end of the Unix socket (Linux), else None."""
+    try:
+        creds = writer.get_extra_info("socket").getsockopt(
+            socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    except (AttributeError, OSError):
+        return None
+    return struct.unpack("3i", creds)[1]
+
+
+def _user_name(uid: Optional[int]) -> str:
+    if uid is None:
+        return ""
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+
+def _tail(path: Path, n: int = 5) -> str:
+    try:
+        return "\n".join(path.read_text(errors="replace").strip().splitlines()[-n:])
+    except OSError:
+        return ""
+
+
+def _last_metrics(path: Path) -> Optional[dict]:
+    """Last progress.py JSON-lines snapshot of a job, if it writes one."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(max(0, os.path.getsize(path) - 4096))
+            lines = f.read().splitlines()
+        return json.loads(lines[-1]) if lines else None
+    except (OSError, ValueError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+def request(root: Path, **req) -> dict:
+    """Send one request to the service and return its reply."""
+    async def call():
+        reader, writer = await asyncio.open_unix_connection(str(Path(root) / SOCKET_NAME))
+        writer.write((json.dumps(req) + "\n").encode())
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        writer.close()
+        return reply
+    try:
+        reply = asyncio.run(call())
+    except (FileNotFoundError, ConnectionRefusedError):
+        raise SystemExit(f"  no job queue running on {root} (start: python job_queue.py serve)")
+    if not reply.get("ok"):
+        raise SystemExit(f"  error: {reply.get('error')}")
+    return reply
+
+
+def _parse_value(text: str) -> object:
+    """JSON scalars/lists where they parse (1e6, true, [1,2]), else the string."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def _fmt_s(s: Optional[float]) -> str:
+    if s is None:
+        return "-"
+    return f"{s:.0f} s" if s < 600 else f"{s / 60:.0f} min"
+
+
+def print_jobs(jobs: list[dict]) -> None:
+    print("=" * 100)
+    print(f"  STUDY JOBS -- {sum(j['status'] == RUNNING for j in jobs)} running, "
+          f"{sum(j['status'] == QUEUED for j in jobs)} queued")
+    print("=" * 100)
+    print(f"  {'Id':<12s}  {'Kind':<15s}  {'Pri':>4s}  {'Status':<9s}  {'Owner':<10s}  "
+          f"{'Runtime':>8s}  {'Progress':<30s}")
+    print(f"  {'─' * 96}")
+    for j in jobs:
+        p = j.get("progress")
+        prog = ""
+        if p and j["status"] == RUNNING:
+            eta = p.get("eta_s")
+            prog = (f"{p['fraction'] * 100:.0f}%  ETA {_fmt_s(eta)}" if eta is not None
+                    else f"{p['fraction'] * 100:.0f}%")
+        elif j["status"] == FAILED and j.get("returncode") is not None:
+            prog = f"exit {j['returncode']}"
+        print(f"  {j['id']:<12s}  {j['kind']:<15s}  {j['priority']:>4d}  {j['status']:<9s}  "
+              f"{j['owner'][:10]:<10s}  {_fmt_s(j['runtime_s']):>8s}  {prog:<30s}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local study job queue")
+    parser.add_argument("--root", type=Path, default=DEFAULT_ROOT,
+                        help=f"Job root shared by service and clients (default: {DEFAULT_ROOT})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    s = sub.add_parser("serve", help="Run the queue service")
+    s.add_argument("--workers", type=int, default=1, help="Studies run concurrently")
+
+    p = sub.add_parser("submit", help="Submit a study")
+    p.add_argument("kind", nargs="?", choices=list(KINDS))
+    p.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                   help="Study CLI parameter (repeatable), e.g. points=1000000")
+    p.add_argument("--file", type=Path, default=None,
+                   help='JSON study definition {"kind": ..., "params": {...}, "priority": n}')
+    p.add_argument("--priority", type=int, default=None, help="Higher runs first (default 0)")
+
+    for name, help_ in (("status", "Show one job"), ("cancel", "Cancel a queued or running job"),
+                        ("resume", "Queue a cancelled or failed job again"),
+                        ("result", "Print a finished job's output")):
+        c = sub.add_parser(name, help=help_)
+        c.add_argument("id", help="Job id (a unique prefix is enough)")
+    sub.add_parser("list", help="List jobs")
+    sub.add_parser("kinds", help="List study kinds")
+    sub.add_parser("shutdown", help="Stop the service (running jobs resume at next start)")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(JobService(args.root, args.workers).serve())
+    elif args.command == "kinds":
+        for name, k in KINDS.items():
+            print(f"  {name:<16s}  {k.description}")
+            print(f"  {'':<16s}  params: {', '.join(sorted(k.params))}")
+    elif args.command == "submit":
+        spec = json.loads(args.file.read_text()) if args.file else {}
+        kind = args.kind or spec.get("kind")
+        if kind is None:
+            parser.error("submit needs a kind or --file")
+        params = dict(spec.get("params", {}))
+        for item in args.param:
+            name, _, value = item.partition("=")
+            params[name.strip()] = _parse_value(value.strip())
+        priority = args.priority if args.priority is not None else spec.get("priority", 0)
+        reply = request(args.root, op="submit", kind=kind, params=params, priority=priority)
+        note = " (identical study already submitted)" if reply["duplicate"] else ""
+        print(f"  {reply['id']}  {reply['status']}{note}")
+    elif args.command == "list":
+        print_jobs(request(args.root, op="status")["jobs"])
+    elif args.command == "status":
+        print(json.dumps(request(args.root, op="status", id=args.id)["jobs"][0], indent=2))
+    elif args.command in ("cancel", "resume"):
+        reply = request(args.root, op=args.command, id=args.id)
+        print(f"  {reply['id']}  {reply['status']}")
+    elif args.command == "result":
+        job = request(args.root, op="status", id=args.id)["jobs"][0]
+        if job["status"] != DONE:
+            raise SystemExit(f"  {job['id']} is {job['status']}"
+                             + (f":\n{job['error']}" if job.get("error") else ""))
+        job_dir = Path(job["dir"])
+        sys.stdout.write((job_dir / "stdout.txt").read_text())
+        files = sorted(p.name for p in job_dir.iterdir()
+                       if p.name not in ("job.json", "stdout.txt", "stderr.txt"))
+        print(f"\n  Output directory: {job_dir}" + (f"  ({', '.join(files)})" if files else ""))
+    elif args.command == "shutdown":
+        request(args.root, op="shutdown")
+        print("  stopping")
+
+
+if __name__ == "__main__":
+    main()
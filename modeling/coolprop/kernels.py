@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""
+kernels.py  --  Compiled single-point kernels for the scalar model path.
+
+``run_model`` costs tens of microseconds, mostly dataclass and dict traffic
+around a few hundred flops.  Point-by-point work -- the TEG-count bisection
+in ``mcf_for_target``, controller-side checks -- cannot be batched, so this
+module restates the same arithmetic as plain-float kernels:
+
+    friction_factor_k         Colebrook / laminar Darcy friction factor
+    nusselt_k                 Dittus-Boelter with laminar / transition blend
+    electrical_output_k       TEG matched-load output (constant datasheet fit)
+    fluid_props_k             water/glycol from the fluid table, Therminol fit
+    model_k                   run_model's thermal chain, pressure drop, net
+
+Configs are packed once into a float array (``pack_config``); the kernel
+writes one float array of ``OUTPUT_FIELDS``.  Backends:
+
+    python   the kernels run by the interpreter (default)
+    numba    the same functions compiled with numba.njit: a few microseconds
+             per point, after ~0.6 s per process to import Numba and load the
+             on-disk compile cache (a few seconds the very first time)
+
+The Numba start-up only pays off past ~10^4 points, so it is opt-in:
+``TEG_KERNELS=numba`` (or ``auto``: numba when installed, else python) or
+``set_backend()`` in long-running processes.  Numba is imported on first
+use, never at import.
+Configs the kernel does not cover -- measured TEG curves, pump curves, or no
+fluid table -- go through ``run_model`` instead.  Results match
+``run_model`` to round-off.
+
+Usage:
+    python kernels.py                     # self-check + single-point latency
+    TEG_KERNELS=numba python kernels.py
+
+In code::
+
+    pm = PointModel(cfg)
+    pm.net_kw(teg_count=1512)             # one kernel call
+    run_model_fast(cfg)                   # ModelResults, like run_model(cfg)
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import math
+import os
+import time
+import types
+from dataclasses import fields
+from typing import Optional
+
+import numpy as np
+
+from instrumentation import PROFILE
+from teg_system_model import (
+    ModelResults, SystemConfig, THERMAL_OIL_NAMES, WATER_GLYCOL_NAMES, TEG_CATALOG,
+    _water_glycol_table, run_model,
+)
+
+BACKENDS = ("numba", "python")
+
+# Fluid codes in packed configs / outputs
+WATER_GLYCOL, THERMAL_OIL = 0.0, 1.0
+FLUID_TABLE_HIT, FLUID_FALLBACK, FLUID_OIL = 0.0, 1.0, 2.0
+FLUID_NAMES = {FLUID_TABLE_HIT: "Water/Glycol 50/50",
+               FLUID_FALLBACK: "Water/Glycol 50/50 (fallback)",
+               FLUID_OIL: "Therminol VP-1 (polynomial fit)"}
+
+PARAM_FIELDS = [
+    "teg_count", "hot_inlet_c", "cold_inlet_c", "target_dt_fluid_c", "cold_dt_fluid_c",
+    "hot_fluid", "cold_fluid",
+    "r_thermal", "seebeck_v_per_k", "internal_r_ohm",
+    "total_flow_area", "hydraulic_diameter", "wetted_area", "contact_area",
+    "hot_tim_thickness_m", "hot_tim_k", "cold_tim_thickness_m", "cold_tim_k",
+    "channel_length_m", "manifold_id_m",
+    "tegs_per_panel", "panels_per_tower", "pump_efficiency",
+    "hot_pipe_length_m", "pipe_id_m",
+]
+P = {name: i for i, name in enumerate(PARAM_FIELDS)}
+
+#: ``model_k`` output slots: every numeric ``ModelResults`` field, in field
+#: order (the kernel writes them by position), then the two fluid codes.
+OUTPUT_FIELDS = [f.name for f in fields(ModelResults) if f.type != "str"] + [
+    "hot_fluid_code", "cold_fluid_code"]
+O = {name: i for i, name in enumerate(OUTPUT_FIELDS)}
+
+# Index constants for the kernels (plain ints so Numba folds them)
+(_N, _T_HOT_IN, _T_COLD_IN, _DT_HOT, _DT_COLD, _HOT_FLUID, _COLD_FLUID, _R_TEG,
+ _SEEBECK, _R_INT, _FLOW_AREA, _DH, _A_WET, _A_CONTACT, _HOT_TIM_T, _HOT_TIM_K,
+ _COLD_TIM_T, _COLD_TIM_K, _CH_LEN, _MANIFOLD_ID, _PER_PANEL, _PER_TOWER, _PUMP_EFF,
+ _PIPE_LEN, _PIPE_ID) = range(len(PARAM_FIELDS))
+
+
+# ---------------------------------------------------------------------------
+# Kernels (plain floats / float arrays only)
+# ---------------------------------------------------------------------------
+
+def friction_factor_k(re, roughness_m, d_h):
+    """Darcy friction factor; ``teg_system_model.friction_factor``."""
+    if re < 2300:
+        return 64.0 / max(re, 1.0)
+    eps_d = roughness_m / d_h
+    f = 0.02
+    for _ in range(20):
+        rhs = -2.0 * math.log10(eps_d / 3.7 + 2.51 / (re * math.sqrt(f)))
+        f_new = 1.0 / rhs**2
+        if abs(f_new - f) < 1e-8:
+            break
+        f = f_new
+    return f
+
+
+def nusselt_k(re, pr, heating):
+    """``teg_system_model.nusselt_dittus_boelter``."""
+    n = 0.4 if heating else 0.3
+    if re < 2300:
+        return 3.66
+    elif re < 6000:
+        nu_turb = 0.023 * re**0.8 * pr**n
+        frac = (re - 2300) / (6000 - 2300)
+        return 3.66 + frac * (nu_turb - 3.66)
+    return 0.023 * re**0.8 * pr**n
+
+
+def electrical_output_k(seebeck, r_int, r_th, dt_c):
+    """(power, voltage, current, heat flow, efficiency) at matched load;
+    ``TEGSpec.electrical_output`` without measured curves."""
+    v_oc = seebeck * dt_c
+    v_mpp = v_oc / 2.0
+    i_mpp = v_oc / (2.0 * r_int)
+    p_mpp = v_mpp * i_mpp
+    q_teg = dt_c / r_th if r_th > 0 else 0.0
+    eff = p_mpp / q_teg if q_teg > 0 else 0.0
+    return p_mpp, v_mpp, i_mpp, q_teg, eff
+
+
+def table_index_k(x, xs):
+    """Bracket ``x`` in ascending ``xs``: i with xs[i] <= x <= xs[i + 1]."""
+    lo, hi = 0, len(xs) - 1
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if xs[mid] <= x:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def interp_k(i, x, xs, ys):
+    """``np.interp`` in bracket ``i`` (same rounding, exact at grid points)."""
+    if xs[i] == x:
+        return ys[i]
+    if xs[i + 1] == x:
+        return ys[i + 1]
+    slope = (ys[i + 1] - ys[i]) / (xs[i + 1] - xs[i])
+    return slope * (x - xs[i]) + ys[i]
+
+
+def fluid_props_k(fluid, temp_c, tab):
+    """(rho, cp, mu, k, pr, code) for a fluid code; ``get_fluid_props``.
+
+    ``tab`` rows: T (C), rho, cp, k, log(mu) of the water/glycol table.
+    """
+    if fluid == THERMAL_OIL:
+        t = temp_c
+        rho = 1078.0 - 0.85 * t
+        cp = 1510.0 + 2.5 * t
+        if t > 20:
+            mu = 0.001 * math.exp(5.25 - 0.02 * t)
+        else:
+            mu = 0.004
+        mu = max(mu, 0.0002)
+        k = 0.137 - 0.00005 * t
+        k = max(k, 0.08)
+        return rho, cp, mu, k, cp * mu / k, FLUID_OIL
+    t_tab = tab[0]
+    if t_tab[0] <= temp_c <= t_tab[len(t_tab) - 1]:
+        i = table_index_k(temp_c, t_tab)
+        rho = interp_k(i, temp_c, t_tab, tab[1])
+        cp = interp_k(i, temp_c, t_tab, tab[2])
+        k = interp_k(i, temp_c, t_tab, tab[3])
+        mu = math.exp(interp_k(i, temp_c, t_tab, tab[4]))
+        return rho, cp, mu, k, cp * mu / k, FLUID_TABLE_HIT
+    return 1040.0, 3400.0, 0.0008, 0.40, 6.8, FLUID_FALLBACK
+
+
+def model_k(p, out, tab):
+    """``run_model`` on a packed config ``p``; writes ``OUTPUT_FIELDS`` to ``out``."""
+    n = p[_N]
+    dt_hot_fluid = p[_DT_HOT]
+    dt_cold_fluid = p[_DT_COLD]
+    t_hot_avg = p[_T_HOT_IN] - dt_hot_fluid / 2.0
+    t_cold_avg = p[_T_COLD_IN] + dt_cold_fluid / 2.0
+    h_rho, h_cp, h_mu, h_k, h_pr, h_code = fluid_props_k(
+        p[_HOT_FLUID], t_hot_avg, tab)
+    c_rho, c_cp, c_mu, c_k, c_pr, c_code = fluid_props_k(
+        p[_COLD_FLUID], t_cold_avg, tab)
+
+    dt_total = t_hot_avg - t_cold_avg
+    area = p[_FLOW_AREA]
+    dh = p[_DH]
+    a_wetted = p[_A_WET]
+
+    # First pass from the TEG R_th alone
+    q_teg_est = dt_total / (p[_R_TEG] * 1.5)
+    total_heat_est = q_teg_est * n
+    hot_vol_flow = total_heat_est / (h_cp * dt_hot_fluid) / h_rho
+    vol_per_teg = hot_vol_flow / n
+    velocity = vol_per_teg / area
+    re = h_rho * velocity * dh / h_mu
+    nu = nusselt_k(re, h_pr, False)
+    h_hot = nu * h_k / dh
+    r_hot_conv = 1.0 / (h_hot * a_wetted) if h_hot > 0 else 999.0
+    r_hot_tim = p[_HOT_TIM_T] / (p[_HOT_TIM_K] * p[_A_CONTACT])
+    r_cold_tim = p[_COLD_TIM_T] / (p[_COLD_TIM_K] * p[_A_CONTACT])
+    r_teg = p[_R_TEG]
+    re_cold = c_rho * (vol_per_teg / area) * dh / c_mu
+    h_cold = nusselt_k(re_cold, c_pr, True) * c_k / dh
+    r_cold_conv = 1.0 / (h_cold * a_wetted) if h_cold > 0 else 999.0
+    r_total = r_hot_conv + r_hot_tim + r_teg + r_cold_tim + r_cold_conv
+
+    # Fixed-point passes on heat flow and flow rate
+    q_per_teg = total_heat = cold_vol_flow = 0.0
+    r_prev = math.inf
+    for _ in range(10):
+        r_prev = r_total
+        q_per_teg = dt_total / r_total
+        total_heat = q_per_teg * n
+        hot_mass_flow = total_heat / (h_cp * dt_hot_fluid)
+        hot_vol_flow = hot_mass_flow / h_rho
+        vol_per_teg = hot_vol_flow / n
+        velocity = vol_per_teg / area
+        re = h_rho * velocity * dh / h_mu
+        nu = nusselt_k(re, h_pr, False)
+        h_hot = nu * h_k / dh
+        r_hot_conv = 1.0 / (h_hot * a_wetted) if h_hot > 0 else 999.0
+        cold_mass_flow = total_heat / (c_cp * dt_cold_fluid)
+        cold_vol_flow = cold_mass_flow / c_rho
+        cold_vel = cold_vol_flow / n / area
+        re_cold = c_rho * cold_vel * dh / c_mu
+        h_cold = nusselt_k(re_cold, c_pr, True) * c_k / dh
+        r_cold_conv = 1.0 / (h_cold * a_wetted) if h_cold > 0 else 999.0
+        r_total = r_hot_conv + r_hot_tim + r_teg + r_cold_tim + r_cold_conv
+    q_per_teg = dt_total / r_total
+    total_heat = q_per_teg * n
+    residual = abs(r_total - r_prev) / abs(r_total)
+
+    t_hot_fin = t_hot_avg - q_per_teg * r_hot_conv
+    t_teg_hot = t_hot_fin - q_per_teg * r_hot_tim
+    t_teg_cold = t_teg_hot - q_per_teg * r_teg
+    t_cold_fin = t_teg_cold - q_per_teg * r_cold_tim
+    dt_teg = t_teg_hot - t_teg_cold
+    p_teg, v_teg, i_teg, _, eff = electrical_output_k(p[_SEEBECK], p[_R_INT], r_teg, dt_teg)
+    gross = p_teg * n
+    rejection = total_heat - gross
+
+    # Pressure drop: channels, manifold (~2 m per tower), piping
+    dp_channel = (friction_factor_k(re, 1e-6, dh) * (p[_CH_LEN] / dh)
+                  * 0.5 * h_rho * velocity**2)
+    n_towers = max(1.0, n // (p[_PER_PANEL] * p[_PER_TOWER]))
+    d_man = p[_MANIFOLD_ID]
+    manifold_area = math.pi * (d_man / 2.0)**2
+    manifold_vel = hot_vol_flow / manifold_area if manifold_area > 0 else 0.0
+    re_manifold = h_rho * manifold_vel * d_man / h_mu
+    dp_manifold = (friction_factor_k(re_manifold, 1e-6, d_man) * (n_towers * 2.0 / d_man)
+                   * 0.5 * h_rho * manifold_vel**2)
+    d_pipe = p[_PIPE_ID]
+    pipe_area = math.pi * (d_pipe / 2.0)**2
+    pipe_vel = hot_vol_flow / pipe_area if pipe_area > 0 else 0.0
+    re_pipe = h_rho * pipe_vel * d_pipe / h_mu
+    dp_pipe = (friction_factor_k(re_pipe, 1e-6, d_pipe) * (p[_PIPE_LEN] / d_pipe)
+               * 0.5 * h_rho * pipe_vel**2)
+    dp_hot = dp_channel + dp_manifold + dp_pipe
+    dp_cold = dp_hot * 0.9
+
+    pump_eff = p[_PUMP_EFF]
+    pump_hot = (dp_hot * hot_vol_flow) / pump_eff
+    pump_cold = (dp_cold * cold_vol_flow) / pump_eff
+    fan = rejection / 1000.0 * 15.0
+    n_pcms = max(1.0, n // 36)
+    n_nodes = max(1.0, n_pcms // 3)
+    electronics = n_pcms * 1.5 + n_nodes * 3.0
+    parasitic = pump_hot + pump_cold + fan + electronics
+    net = gross - parasitic
+
+    out[0] = dt_teg
+    out[1] = p_teg
+    out[2] = q_per_teg
+    out[3] = eff
+    out[4] = v_teg
+    out[5] = i_teg
+    out[6] = n
+    out[7] = gross
+    out[8] = total_heat
+    out[9] = rejection
+    out[10] = hot_vol_flow
+    out[11] = hot_vol_flow * 15850.3
+    out[12] = velocity
+    out[13] = re
+    out[14] = nu
+    out[15] = h_hot
+    out[16] = cold_vol_flow
+    out[17] = cold_vol_flow * 15850.3
+    out[18] = dp_channel
+    out[19] = dp_manifold
+    out[20] = dp_pipe
+    out[21] = dp_hot
+    out[22] = dp_cold
+    out[23] = pump_hot
+    out[24] = pump_cold
+    out[25] = pump_hot + pump_cold
+    out[26] = 0.0
+    out[27] = 1.0
+    out[28] = pump_eff
+    out[29] = 0.0
+    out[30] = 1.0
+    out[31] = pump_eff
+    out[32] = fan
+    out[33] = electronics
+    out[34] = net
+    out[35] = net / 1000.0
+    out[36] = parasitic / gross if gross > 0 else 0.0
+    out[37] = r_hot_conv
+    out[38] = r_hot_tim
+    out[39] = r_teg
+    out[40] = r_cold_tim
+    out[41] = r_cold_conv
+    out[42] = r_total
+    out[43] = t_hot_avg
+    out[44] = t_hot_fin
+    out[45] = t_teg_hot
+    out[46] = t_teg_cold
+    out[47] = t_cold_fin
+    out[48] = t_cold_avg
+    out[49] = residual
+    out[50] = h_code
+    out[51] = c_code
+    return out
+
+
+if len(OUTPUT_FIELDS) != 52 or OUTPUT_FIELDS[35] != "net_electrical_kw":
+    raise ImportError("ModelResults changed: update model_k's output slots")
+
+#: Compiled in this order (callees first).
+KERNELS = ("friction_factor_k", "nusselt_k", "electrical_output_k", "table_index_k",
+           "interp_k", "fluid_props_k", "model_k")
+
+
+# ---------------------------------------------------------------------------
+# Backend selection
+# ---------------------------------------------------------------------------
+
+_backend: Optional[str] = None
+
+
+def numba_available() -> bool:
+    import importlib.util
+    return importlib.util.find_spec("numba") is not None
+
+
+def set_backend(name: str = "auto") -> str:
+    """Select ``"numba"``, ``"python"`` or ``"auto"``; returns the backend used."""
+    global _backend
+    if name == "auto":
+        name = "numba" if numba_available() else "python"
+    if name not in BACKENDS:
+        raise ValueError(f"unknown kernel backend {name!r} (choose from auto, "
+                         f"{', '.join(BACKENDS)})")
+    if name == "numba" and not numba_available():
+        raise RuntimeError("the numba kernel backend needs: pip install numba")
+    _backend = name
+    return name
+
+
+def backend() -> str:
+    if _backend is None:
+        set_backend(os.environ.get("TEG_KERNELS", "python"))
+    return _backend
+
+
+_compiled: dict[str, types.SimpleNamespace] = {}
+
+
+def kernels() -> types.SimpleNamespace:
+    """The kernel functions for the current backend (compiled on first use)."""
+    name = backend()
+    if name not in _compiled:
+        funcs = {k: globals()[k] for k in KERNELS}
+        if name == "numba":
+            import numba
+            # Re-bind each kernel to a namespace where its callees are the
+            # compiled versions, so the whole chain runs in nopython mode.
+            ns = dict(globals())
+            for k in KERNELS:
+                fn = funcs[k]
+                fn = types.FunctionType(fn.__code__, ns, k, fn.__defaults__)
+                ns[k] = funcs[k] = numba.njit(cache=True, nogil=True)(fn)
+        _compiled[name] = types.SimpleNamespace(**funcs)
+    return _compiled[name]
+
+
+# ---------------------------------------------------------------------------
+# Packing and the point model
+# ---------------------------------------------------------------------------
+
+def _fluid_code(name: str) -> float:
+    if name in WATER_GLYCOL_NAMES:
+        return WATER_GLYCOL
+    if name in THERMAL_OIL_NAMES:
+        return THERMAL_OIL
+    raise ValueError(f"Unknown fluid type: {name}")
+
+
+def kernel_supported(cfg: SystemConfig) -> bool:
+    """True if ``model_k`` covers ``cfg`` (else use ``run_model``)."""
+    uses_table = WATER_GLYCOL in (_fluid_code(cfg.hot_fluid), _fluid_code(cfg.cold_fluid))
+    return (cfg.teg_spec.curves is None and cfg.hot_pump is None and cfg.cold_pump is None
+            and (not uses_table or _water_glycol_table() is not None))
+
+
+def pack_config(cfg: SystemConfig) -> np.ndarray:
+    """``PARAM_FIELDS`` of a config as a float array."""
+    hx, teg = cfg.hx, cfg.teg_spec
+    values = {
+        "teg_count": cfg.teg_count, "hot_inlet_c": cfg.hot_inlet_c,
+        "cold_inlet_c": cfg.cold_inlet_c, "target_dt_fluid_c": cfg.target_dt_fluid_c,
+        "cold_dt_fluid_c": (cfg.target_dt_fluid_c if cfg.cold_dt_fluid_c is None
+                            else cfg.cold_dt_fluid_c),
+        "hot_fluid": _fluid_code(cfg.hot_fluid), "cold_fluid": _fluid_code(cfg.cold_fluid),
+        "r_thermal": teg.r_thermal, "seebeck_v_per_k": teg.seebeck_v_per_k,
+        "internal_r_ohm": teg.internal_r_ohm,
+        "total_flow_area": hx.total_flow_area, "hydraulic_diameter": hx.hydraulic_diameter,
+        "wetted_area": hx.wetted_area_per_channel * hx.n_channels,
+        "contact_area": hx.teg_contact_area,
+        "hot_tim_thickness_m": hx.hot_tim_thickness_m, "hot_tim_k": hx.hot_tim_k,
+        "cold_tim_thickness_m": hx.cold_tim_thickness_m, "cold_tim_k": hx.cold_tim_k,
+        "channel_length_m": hx.channel_length_m, "manifold_id_m": hx.manifold_id_m,
+        "tegs_per_panel": cfg.tegs_per_panel, "panels_per_tower": cfg.panels_per_tower,
+        "pump_efficiency": cfg.pump_efficiency,
+        "hot_pipe_length_m": cfg.hot_pipe_length_m, "pipe_id_m": cfg.pipe_id_m,
+    }
+    return np.array([values[f] for f in PARAM_FIELDS], dtype=float)
+
+
+@functools.lru_cache(maxsize=None)
+def fluid_table(as_lists: bool = False):
+    """The water/glycol table as ``fluid_props_k`` rows (zeros if not built)."""
+    table = _water_glycol_table()
+    if table is None:
+        tab = np.zeros((5, 2))
+    else:
+        tab = np.stack([table[k] for k in ("t_c", "rho", "cp", "k", "log_mu")])
+    return tab.tolist() if as_lists else tab
+
+
+class PointModel:
+    """One config packed for repeated single-point kernel calls.
+
+    ``evaluate`` / ``net_kw`` take keyword overrides of ``PARAM_FIELDS``
+    (e.g. ``teg_count``, ``hot_inlet_c``) and return the kernel outputs.
+    """
+
+    def __init__(self, cfg: SystemConfig):
+        if not kernel_supported(cfg):
+            raise ValueError("config needs run_model (TEG curves, pump curves or no "
+                             "fluid table)")
+        self.cfg = cfg
+        self.params = pack_config(cfg)
+        self.out = np.empty(len(OUTPUT_FIELDS))
+        python = backend() == "python"
+        self._table = fluid_table(as_lists=python)
+        if python:
+            # Python floats: the interpreter is much slower on NumPy scalars
+            self.params = self.params.tolist()
+            self.out = self.out.tolist()
+        self._model = kernels().model_k
+
+    def evaluate(self, **overrides: float):
+        """Kernel outputs (an array; a list on the python backend)."""
+        p = self.params
+        for name, value in overrides.items():
+            p[P[name]] = value
+        if PROFILE.enabled:
+            PROFILE.count("kernel_calls")
+        return self._model(p, self.out, self._table)
+
+    def net_kw(self, **overrides: float) -> float:
+        return float(self.evaluate(**overrides)[O["net_electrical_kw"]])
+
+    def results(self, out=None) -> ModelResults:
+        """The last (or given) kernel output as ``ModelResults``."""
+        out = self.out if out is None else out
+        r = ModelResults()
+        for f in fields(ModelResults):
+            if f.type == "str":
+                continue
+            v = out[O[f.name]]
+            setattr(r, f.name, int(v) if f.type == "int" else float(v))
+        r.hot_fluid_name = FLUID_NAMES[out[O["hot_fluid_code"]]]
+        r.cold_fluid_name = FLUID_NAMES[out[O["cold_fluid_code"]]]
+        return r
+
+
+def run_model_fast(cfg: SystemConfig) -> ModelResults:
+    """``run_model`` through the kernel when it covers ``cfg``."""
+    if not kernel_supported(cfg):
+        return run_model(cfg)
+    pm = PointModel(cfg)
+    pm.evaluate()
+    return pm.results()
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def _check_configs() -> list[SystemConfig]:
+    cfgs = []
+    for teg_type, hot, cold in [("marlow", 200.0, 40.0), ("thermonamic", 350.0, 100.0),
+                                ("alphabet", 400.0, 100.0), ("marlow", 150.0, 20.0)]:
+        fluid = "therminol" if hot > 220 else "water_glycol"
+        for n in (36, 504, 1620, 8064, 50_004):
+            cfgs.append(SystemConfig(teg_count=n, teg_spec=TEG_CATALOG[teg_type],
+                                     hot_fluid=fluid, cold_fluid=fluid,
+                                     hot_inlet_c=hot, cold_inlet_c=cold))
+    cfgs.append(SystemConfig(hot_fluid="therminol", cold_fluid="water_glycol",
+                             cold_dt_fluid_c=4.0))
+    return cfgs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-point kernel self-check")
+    parser.add_argument("--backend", choices=("auto",) + BACKENDS, default=None,
+                        help="Kernel backend (default: $TEG_KERNELS or python)")
+    parser.add_argument("--repeat", type=int, default=20_000,
+                        help="Kernel calls timed per backend")
+    args = parser.parse_args()
+    if args.backend:
+        set_backend(args.backend)
+
+    t0 = time.perf_counter()
+    pm = PointModel(SystemConfig())
+    pm.evaluate()
+    first_s = time.perf_counter() - t0
+
+    worst = 0.0
+    for cfg in _check_configs():
+        fast = run_model_fast(cfg)
+        ref = run_model(cfg)
+        for name in OUTPUT_FIELDS[:-2]:
+            a, b = getattr(fast, name), getattr(ref, name)
+            worst = max(worst, abs(a - b) / max(abs(b), 1e-12))
+        assert fast.hot_fluid_name == ref.hot_fluid_name, (fast.hot_fluid_name, ref)
+
+    t0 = time.perf_counter()
+    for i in range(args.repeat):
+        pm.evaluate(teg_count=504 + 36 * (i % 100))
+    kernel_us = (time.perf_counter() - t0) / args.repeat * 1e6
+    cfg = SystemConfig()
+    n_ref = max(args.repeat // 10, 1)
+    t0 = time.perf_counter()
+    for _ in range(n_ref):
+        run_model(cfg)
+    ref_us = (time.perf_counter() - t0) / n_ref * 1e6
+
+    print(f"  backend {backend()}: {len(_check_configs())} configs, max relative deviation "
+          f"vs run_model = {worst:.2e}")
+    print(f"  first call (incl. compile / cache load) {first_s * 1e3:.1f} ms")
+    print(f"  kernel {kernel_us:.2f} us/point   run_model {ref_us:.2f} us/point   "
+          f"({ref_us / kernel_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
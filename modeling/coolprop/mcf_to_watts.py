@@ -11,6 +11,7 @@ Sweeps gas prices ($2.50, $4.00, $6.00 per McF) and system targets (10, 25, 50 k
 Usage:
     python mcf_to_watts.py
     python mcf_to_watts.py --teg-type thermonamic --hot-temp 350
+    python mcf_to_watts.py --arrow mcf.arrow      # also write results (arrow_io.py)
 """
 
 from __future__ import annotations
@@ -18,14 +19,15 @@ from __future__ import annotations
 import argparse
 import sys
 from dataclasses import dataclass
-
-import numpy as np
+from typing import Mapping, Optional, Sequence
 
 # Import the core thermal model
 from teg_system_model import (
-    SystemConfig, run_model, TEG_CATALOG,
+    ModelResults, SystemConfig, run_model, TEG_CATALOG,
     MARLOW_TG1_1008, THERMONAMIC_PB12611, ALPHABET_PB_ENHANCED,
 )
+from instrumentation import add_profile_arguments, profiling_from_args
+from kernels import PointModel, kernel_supported
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -61,6 +63,34 @@ class BurnerSpec:
 
 DEFAULT_BURNER = BurnerSpec()
 
+# Default report: compare all TEG types
+REPORT_SCENARIOS = [
+    {
+        "label": "BiTe 200 C (current Marlow)",
+        "teg_type": "marlow",
+        "hot_temp": 200.0,
+        "cold_temp": 40.0,
+    },
+    {
+        "label": "PbTe Hybrid 350 C (Thermonamic)",
+        "teg_type": "thermonamic",
+        "hot_temp": 350.0,
+        "cold_temp": 100.0,
+    },
+    {
+        "label": "PbTe Hybrid 320 C (Thermonamic, derated for life)",
+        "teg_type": "thermonamic",
+        "hot_temp": 320.0,
+        "cold_temp": 100.0,
+    },
+    {
+        "label": "Pb-enhanced Alphabet 400 C (estimated)",
+        "teg_type": "alphabet",
+        "hot_temp": 400.0,
+        "cold_temp": 100.0,
+    },
+]
+
 
 # ---------------------------------------------------------------------------
 # McF calculator
@@ -102,13 +132,9 @@ class McfResult:
             self.fuel_cost_per_day = {}
 
 
-def mcf_for_target(target_kw: float, teg_type: str = "marlow",
-                   hot_temp: float = 200.0, cold_temp: float = 40.0,
-                   burner: BurnerSpec = DEFAULT_BURNER) -> McfResult:
-    """Calculate McF/day needed for a target net electrical output.
-
-    Works backwards from target kW_e to required fuel input.
-    """
+def target_config(teg_type: str, teg_count: int, hot_temp: float,
+                  cold_temp: float) -> SystemConfig:
+    """System config for one McF operating point (fluid auto-selected)."""
     teg = TEG_CATALOG.get(teg_type, MARLOW_TG1_1008)
 
     # Auto-select fluid
@@ -117,48 +143,75 @@ def mcf_for_target(target_kw: float, teg_type: str = "marlow",
     else:
         fluid = "water_glycol"
 
-    # Binary search for TEG count that achieves target
+    return SystemConfig(
+        teg_count=teg_count,
+        teg_spec=teg,
+        hot_fluid=fluid,
+        cold_fluid=fluid,
+        hot_inlet_c=hot_temp,
+        cold_inlet_c=cold_temp,
+    )
+
+
+def teg_count_search(target_kw: float):
+    """Binary search for the TEG count that achieves a net kW target.
+
+    Generator: yields each TEG count to evaluate and is sent back its net
+    kW.  Returns (``StopIteration.value``) the count to report -- the last
+    one that met the target, or the upper bound if none did.
+    """
     lo, hi = 10, 50_000
-    best_cfg = None
-    best_result = None
+    best = None
 
     for _ in range(30):
         mid = (lo + hi) // 2
         # Round to nearest 36 (PCM board size)
         mid_rounded = max(36, round(mid / 36) * 36)
 
-        cfg = SystemConfig(
-            teg_count=mid_rounded,
-            teg_spec=teg,
-            hot_fluid=fluid,
-            cold_fluid=fluid,
-            hot_inlet_c=hot_temp,
-            cold_inlet_c=cold_temp,
-        )
-        r = run_model(cfg)
-
-        if r.net_electrical_kw < target_kw:
+        net_kw = yield mid_rounded
+
+        if net_kw < target_kw:
             lo = mid + 1
         else:
             hi = mid
-            best_cfg = cfg
-            best_result = r
+            best = mid_rounded
 
-    if best_result is None:
+    if best is None:
         # Use upper bound
-        cfg = SystemConfig(
-            teg_count=round(hi / 36) * 36,
-            teg_spec=teg,
-            hot_fluid=fluid,
-            cold_fluid=fluid,
-            hot_inlet_c=hot_temp,
-            cold_inlet_c=cold_temp,
-        )
-        best_result = run_model(cfg)
-        best_cfg = cfg
-
-    r = best_result
+        best = round(hi / 36) * 36
+    return best
+
+
+def mcf_for_target(target_kw: float, teg_type: str = "marlow",
+                   hot_temp: float = 200.0, cold_temp: float = 40.0,
+                   burner: BurnerSpec = DEFAULT_BURNER) -> McfResult:
+    """Calculate McF/day needed for a target net electrical output.
 
+    Works backwards from target kW_e to required fuel input.  Search steps
+    only need net kW, so they run on the single-point kernel (kernels.py)
+    when it covers the config; the reported point comes from ``run_model``.
+    """
+    cfg = target_config(teg_type, 36, hot_temp, cold_temp)
+    point = PointModel(cfg) if kernel_supported(cfg) else None
+    search = teg_count_search(target_kw)
+    count = next(search)
+    try:
+        while True:
+            if point is not None:
+                net_kw = point.net_kw(teg_count=count)
+            else:
+                net_kw = run_model(target_config(teg_type, count, hot_temp,
+                                                 cold_temp)).net_electrical_kw
+            count = search.send(net_kw)
+    except StopIteration as stop:
+        count = stop.value
+    r = run_model(target_config(teg_type, count, hot_temp, cold_temp))
+    return mcf_result(teg_type, count, hot_temp, cold_temp, r, burner)
+
+
+def mcf_result(teg_type: str, teg_count: int, hot_temp: float, cold_temp: float,
+               r: ModelResults, burner: BurnerSpec = DEFAULT_BURNER) -> McfResult:
+    """Fuel, efficiency and cost figures for one evaluated operating point."""
     # Calculate fuel input required
     # net_electrical = gross_electrical - parasitic
     # gross_electrical comes from total_heat_input * teg_efficiency
@@ -177,7 +230,7 @@ def mcf_for_target(target_kw: float, teg_type: str = "marlow",
 
     result = McfResult(
         teg_type=teg_type,
-        teg_count=best_cfg.teg_count,
+        teg_count=teg_count,
         hot_temp_c=hot_temp,
         cold_temp_c=cold_temp,
         mcf_per_day=mcf_per_day,
@@ -221,8 +274,15 @@ def print_energy_chain(res: McfResult) -> None:
     print(f"  Heat rejection (kW):    {res.heat_rejection_kw:8.1f}")
 
 
-def print_full_report(scenarios: list[dict]) -> None:
-    """Print the complete McF-to-watts report."""
+def print_full_report(scenarios: list[dict],
+                      results: Optional[Mapping[str, list[McfResult]]] = None,
+                      targets_kw: Sequence[float] = TARGETS_KW) -> dict[str, list[McfResult]]:
+    """Print the complete McF-to-watts report; returns the results shown.
+
+    ``results`` (per scenario label, one McfResult per target) skips the
+    searches, e.g. when a study plan has already evaluated them.
+    """
+    shown = {}
     print("=" * 80)
     print("  McF-TO-WATTS-TO-COST ANALYSIS")
     print("  Natural Gas -> Low-NOx Burner -> TEG Array -> Net Electrical")
@@ -247,10 +307,12 @@ def print_full_report(scenarios: list[dict]) -> None:
         print(f"  Hot: {hot_temp} C  /  Cold: {cold_temp} C")
         print(f"{'─' * 80}")
 
-        results = []
-        for target in TARGETS_KW:
-            res = mcf_for_target(target, teg_type, hot_temp, cold_temp)
-            results.append(res)
+        if results is not None:
+            scenario_results = results[label]
+        else:
+            scenario_results = [mcf_for_target(target, teg_type, hot_temp, cold_temp)
+                                for target in targets_kw]
+        shown[label] = scenario_results
 
         # Summary table header
         print(f"\n  {'Target':>8s}  {'TEGs':>6s}  {'McF/d':>7s}  "
@@ -261,27 +323,28 @@ def print_full_report(scenarios: list[dict]) -> None:
               f"{'($/kWh)':>8s}  {'($/kWh)':>8s}  {'($/kWh)':>8s}")
         print(f"  {'─' * 76}")
 
-        for target, res in zip(TARGETS_KW, results):
+        for target, res in zip(targets_kw, scenario_results):
             c250 = res.cost_per_kwh.get(2.50, 0)
             c400 = res.cost_per_kwh.get(4.00, 0)
             c600 = res.cost_per_kwh.get(6.00, 0)
-            print(f"  {target:>8d}  {res.teg_count:>6d}  {res.mcf_per_day:>7.1f}  "
+            print(f"  {target:>8g}  {res.teg_count:>6d}  {res.mcf_per_day:>7.1f}  "
                   f"{res.gross_electrical_kw:>7.2f}  {res.net_electrical_kw:>7.2f}  "
                   f"{res.heat_rejection_kw:>7.0f}  "
                   f"${c250:>7.4f}  ${c400:>7.4f}  ${c600:>7.4f}")
 
         # Detail for 10kW target
-        print(f"\n  --- Detail: {TARGETS_KW[0]} kW target ---")
-        print_energy_chain(results[0])
+        print(f"\n  --- Detail: {targets_kw[0]:g} kW target ---")
+        print_energy_chain(scenario_results[0])
 
         # Daily fuel cost
-        print(f"\n  --- Daily Fuel Cost ({TARGETS_KW[0]} kW) ---")
+        print(f"\n  --- Daily Fuel Cost ({targets_kw[0]:g} kW) ---")
         for price in GAS_PRICES:
-            daily = results[0].fuel_cost_per_day.get(price, 0)
+            daily = scenario_results[0].fuel_cost_per_day.get(price, 0)
             monthly = daily * 30
             yearly = daily * 365
             print(f"    @ ${price:.2f}/McF:  ${daily:>7.2f}/day  "
                   f"${monthly:>8.0f}/month  ${yearly:>9.0f}/year")
+    return shown
 
 
 def main():
@@ -291,6 +354,10 @@ def main():
                         help="Single TEG type to analyze (default: all)")
     parser.add_argument("--hot-temp", type=float, default=None)
     parser.add_argument("--cold-temp", type=float, default=None)
+    parser.add_argument("--arrow", metavar="FILE", default=None,
+                        help="Also write every McfResult to an Arrow/Feather file "
+                             "(needs pyarrow; see arrow_io.py)")
+    add_profile_arguments(parser)
     args = parser.parse_args()
 
     if args.teg_type:
@@ -305,34 +372,17 @@ def main():
         }]
     else:
         # Default: compare all TEG types
-        scenarios = [
-            {
-                "label": "BiTe 200 C (current Marlow)",
-                "teg_type": "marlow",
-                "hot_temp": 200.0,
-                "cold_temp": 40.0,
-            },
-            {
-                "label": "PbTe Hybrid 350 C (Thermonamic)",
-                "teg_type": "thermonamic",
-                "hot_temp": 350.0,
-                "cold_temp": 100.0,
-            },
-            {
-                "label": "PbTe Hybrid 320 C (Thermonamic, derated for life)",
-                "teg_type": "thermonamic",
-                "hot_temp": 320.0,
-                "cold_temp": 100.0,
-            },
-            {
-                "label": "Pb-enhanced Alphabet 400 C (estimated)",
-                "teg_type": "alphabet",
-                "hot_temp": 400.0,
-                "cold_temp": 100.0,
-            },
-        ]
-
-    print_full_report(scenarios)
+        scenarios = REPORT_SCENARIOS
+
+    with profiling_from_args(args):
+        shown = print_full_report(scenarios)
+
+    if args.arrow:
+        from arrow_io import mcf_to_arrow, write_feather
+        try:
+            write_feather(args.arrow, mcf_to_arrow([r for rs in shown.values() for r in rs]))
+        except (OSError, RuntimeError) as e:
+            sys.exit(f"  arrow error: {e}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,630 @@
+#!/usr/bin/env python3
+"""
+modbus_poller.py  --  Poll PGC Modbus devices and publish lex-topic samples.
+
+Reads the section 2.2 / 3.1 sensors (ESTREAM_CONTROLS_PLAN.md) from every
+site's Modbus TCP bridge at a fixed rate (1 Hz by default) and writes one
+JSON line per site per tick:
+
+    {"ts": 1760781600.0, "site": "pad-07", "topics": {"tz.teg.thermal...": 201.3, ...}}
+
+Register maps come from ``modbus_registers.toml`` (device type -> points);
+sites come from a TOML / JSON file (``[[sites]]`` with name, host, port,
+fluids, optional ``units = {device = unit_id}`` and, for ``digital_twin.py``,
+``teg_type`` / ``teg_count``).  Per device, points in
+the same table are coalesced into as few reads as the protocol allows
+(contiguous addresses, gaps up to ``--max-gap``), and all of a site's reads
+run concurrently over a small connection pool per endpoint.  Every site has
+its own schedule: a poll that overruns its period skips the missed ticks
+instead of queueing them, so a slow site never delays the others.
+
+Derived values (section 2.3 / 2.4) use the point names of the default map:
+
+    delta_t_c       t_hot_supply_c - t_cold_supply_c
+    q_hot_kw        flow_hot_lpm / 60 * rho * cp * (t_hot_supply_c - t_hot_return_c)
+    q_cold_kw       flow_cold_lpm / 60 * rho * cp * (t_cold_return_c - t_cold_supply_c)
+    efficiency_pct  teg_power_w / q_hot (if the site has a DC meter)
+
+with rho / cp from teg_system_model at the loop's mean temperature.  (The
+plan writes ``flow_lpm x 60``, which gives kJ/h; kW needs ``/ 60``.)
+
+``--sim N`` polls N local simulator sites (``modbus_sim.py``); ``--self-test``
+starts them in-process and checks the derived values against the model.
+
+Usage:
+    python modbus_poller.py --sites sites.toml
+    python modbus_poller.py --sites sites.toml --out samples.jsonl --period 1
+    python modbus_sim.py --sites 40 &  python modbus_poller.py --sim 40 --quiet --duration 30
+    python modbus_poller.py --self-test --sim 60 --latency-ms 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import struct
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Union
+
+from teg_system_model import get_fluid_props
+
+HERE = Path(__file__).resolve().parent
+REGMAP_PATH = HERE / "modbus_registers.toml"
+
+MODBUS_PORT = 502
+SIM_BASE_PORT = 15020
+MAX_READ_REGISTERS = 125     # FC3 / FC4 response limit
+MAX_READ_BITS = 2000         # FC1 / FC2
+MAX_GAP = 8                  # unused registers worth reading to save a request
+LATENCY_WINDOW = 100_000     # polls kept for percentiles
+
+#: table -> read function code
+TABLES = {"coil": 1, "discrete": 2, "holding": 3, "input": 4}
+#: type -> (registers, struct format of the big-endian raw value)
+TYPES = {"bool": (1, ""), "u16": (1, ">H"), "i16": (1, ">h"),
+         "u32": (2, ">I"), "i32": (2, ">i"), "f32": (2, ">f")}
+EXCEPTIONS = {1: "illegal function", 2: "illegal data address", 3: "illegal data value",
+              4: "server device failure", 6: "server device busy",
+              10: "gateway path unavailable", 11: "gateway target failed to respond"}
+
+#: derived value -> lex topic
+DERIVED_TOPICS = {
+    "delta_t_c": "tz.teg.thermal.profile.delta_t_c",
+    "q_hot_kw": "tz.teg.thermal.profile.q_hot_kw",
+    "q_cold_kw": "tz.teg.thermal.profile.q_cold_kw",
+    "efficiency_pct": "tz.teg.power.summary.efficiency_pct",
+}
+
+
+class ModbusError(Exception):
+    """Exception response from a device (the connection stays usable)."""
+
+    def __init__(self, code: int):
+        self.code = code
+        super().__init__(f"exception {code} ({EXCEPTIONS.get(code, 'unknown')})")
+
+
+# ---------------------------------------------------------------------------
+# Register maps
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RegisterPoint:
+    """One sensor value: where it lives and how raw words scale to units."""
+    name: str
+    table: str
+    address: int
+    type: str = "u16"
+    scale: float = 1.0
+    offset: float = 0.0
+    topic: str = ""
+    word_order: str = "big"
+
+    @property
+    def width(self) -> int:
+        return TYPES[self.type][0]
+
+    def decode(self, words: Sequence[int]) -> Union[float, bool]:
+        if self.type == "bool":
+            return bool(words[0])
+        if self.width == 2 and self.word_order == "little":
+            words = words[::-1]
+        raw, = struct.unpack(TYPES[self.type][1], struct.pack(f">{self.width}H", *words))
+        return raw * self.scale + self.offset
+
+    def encode(self, value: float) -> list[int]:
+        """Raw words for ``value``, clamped to the type's range (simulator side)."""
+        if self.type == "bool":
+            return [int(bool(value))]
+        raw = (value - self.offset) / self.scale
+        fmt = TYPES[self.type][1]
+        if self.type != "f32":
+            bits = 8 * struct.calcsize(fmt)
+            lo, hi = (-(1 << bits - 1), (1 << bits - 1) - 1) if fmt.islower() \
+                else (0, (1 << bits) - 1)
+            raw = min(max(round(raw), lo), hi)
+        words = list(struct.unpack(f">{self.width}H", struct.pack(fmt, raw)))
+        return words[::-1] if self.word_order == "little" else words
+
+
+@dataclass
+class DeviceMap:
+    """Points of one device type and its default unit id."""
+    name: str
+    unit: int
+    points: list[RegisterPoint]
+
+
+@dataclass(frozen=True)
+class ReadBlock:
+    """One read request covering one or more points."""
+    table: str
+    address: int
+    count: int
+    points: tuple[RegisterPoint, ...]
+
+
+def plan_reads(points: Sequence[RegisterPoint], max_gap: int = MAX_GAP) -> list[ReadBlock]:
+    """Coalesce points into the fewest reads per table.
+
+    Neighbouring points share a read while the gap between them is at most
+    ``max_gap`` and the read stays within the protocol's per-request limit.
+    """
+    blocks = []
+    for table in TABLES:
+        pts = sorted((p for p in points if p.table == table), key=lambda p: p.address)
+        limit = MAX_READ_BITS if TABLES[table] <= 2 else MAX_READ_REGISTERS
+        group: list[RegisterPoint] = []
+        for p in pts:
+            if group:
+                start = group[0].address
+                end = max(q.address + q.width for q in group)
+                if p.address - end > max_gap or p.address + p.width - start > limit:
+                    blocks.append(_block(table, group))
+                    group = []
+            group.append(p)
+        if group:
+            blocks.append(_block(table, group))
+    return blocks
+
+
+def _block(table: str, group: list[RegisterPoint]) -> ReadBlock:
+    start = group[0].address
+    end = max(p.address + p.width for p in group)
+    return ReadBlock(table, start, end - start, tuple(group))
+
+
+def _load_file(path: Union[str, Path]) -> dict:
+    """Parse a .toml or .json file."""
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:                          # Python < 3.11
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise RuntimeError("TOML files need Python 3.11+ or: pip install tomli")
+        return tomllib.loads(text)
+    return json.loads(text)
+
+
+def _point(spec: dict) -> RegisterPoint:
+    spec = dict(spec)
+    if "eng" in spec or "raw" in spec:
+        (r0, r1), (e0, e1) = spec.pop("raw"), spec.pop("eng")
+        spec["scale"] = (e1 - e0) / (r1 - r0)
+        spec["offset"] = e0 - r0 * spec["scale"]
+    p = RegisterPoint(**spec)
+    if p.table not in TABLES:
+        raise ValueError(f"{p.name}: unknown table {p.table!r} (expected one of {list(TABLES)})")
+    if p.type not in TYPES:
+        raise ValueError(f"{p.name}: unknown type {p.type!r} (expected one of {list(TYPES)})")
+    if (p.type == "bool") != (TABLES[p.table] <= 2):
+        raise ValueError(f"{p.name}: type bool goes with coil / discrete tables only")
+    return p
+
+
+def load_register_map(path: Union[str, Path] = REGMAP_PATH) -> dict[str, DeviceMap]:
+    """Device type -> DeviceMap from a register map file."""
+    devices = _load_file(path).get("devices", {})
+    if not devices:
+        raise ValueError(f"{path}: no [devices.*] tables")
+    return {name: DeviceMap(name, int(d["unit"]), [_point(p) for p in d["points"]])
+            for name, d in devices.items()}
+
+
+@dataclass
+class Site:
+    """One PGC unit behind a Modbus TCP bridge."""
+    name: str
+    host: str
+    port: int = MODBUS_PORT
+    hot_fluid: str = "water_glycol"
+    cold_fluid: str = "water_glycol"
+    units: Optional[dict[str, int]] = None   # device -> unit id (None: every device, map units)
+    teg_type: str = "marlow"                 # array, for digital_twin.py
+    teg_count: Optional[int] = None
+
+    def devices(self, regmap: dict[str, DeviceMap]) -> list[DeviceMap]:
+        if self.units is None:
+            return list(regmap.values())
+        missing = set(self.units) - set(regmap)
+        if missing:
+            raise ValueError(f"site {self.name}: unknown devices {sorted(missing)}")
+        return [DeviceMap(d, unit, regmap[d].points) for d, unit in self.units.items()]
+
+
+def load_sites(path: Union[str, Path]) -> list[Site]:
+    sites = [Site(**s) for s in _load_file(path).get("sites", [])]
+    if not sites:
+        raise ValueError(f"{path}: no [[sites]] entries")
+    return sites
+
+
+def sim_sites(n: int, host: str = "127.0.0.1", base_port: int = SIM_BASE_PORT) -> list[Site]:
+    """The sites ``modbus_sim.py --sites n`` serves: one port per site."""
+    return [Site(f"sim-{i:03d}", host, base_port + i) for i in range(n)]
+
+
+# ---------------------------------------------------------------------------
+# Modbus TCP client
+# ---------------------------------------------------------------------------
+
+def encode_frame(tid: int, unit: int, pdu: bytes) -> bytes:
+    """MBAP header (transaction id, protocol 0, length, unit id) + PDU."""
+    return struct.pack(">HHHB", tid, 0, len(pdu) + 1, unit) + pdu
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[int, int, bytes]:
+    """(transaction id, unit id, PDU) of the next frame."""
+    tid, proto, length, unit = struct.unpack(">HHHB", await reader.readexactly(7))
+    if proto != 0 or not 2 <= length <= 254:
+        raise ConnectionError(f"bad MBAP header (protocol {proto}, length {length})")
+    return tid, unit, await reader.readexactly(length - 1)
+
+
+def unpack_bits(data: bytes, count: int) -> list[int]:
+    return [(data[i >> 3] >> (i & 7)) & 1 for i in range(count)]
+
+
+def pack_bits(bits: Sequence[int]) -> bytes:
+    out = bytearray((len(bits) + 7) // 8)
+    for i, b in enumerate(bits):
+        if b:
+            out[i >> 3] |= 1 << (i & 7)
+    return bytes(out)
+
+
+class _Connection:
+    """One TCP connection; one outstanding request at a time."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader, self.writer = reader, writer
+        self._tid = itertools.count(1)
+
+    async def read(self, unit: int, fc: int, address: int, count: int) -> list[int]:
+        tid = next(self._tid) & 0xFFFF
+        self.writer.write(encode_frame(tid, unit, struct.pack(">BHH", fc, address, count)))
+        await self.writer.drain()
+        rtid, runit, pdu = await read_frame(self.reader)
+        if rtid != tid or runit != unit:
+            raise ConnectionError(f"response for transaction {rtid} unit {runit}, "
+                                  f"expected {tid} unit {unit}")
+        if pdu[0] == fc | 0x80:
+            raise ModbusError(pdu[1])
+        if pdu[0] != fc or len(pdu) < 2 + pdu[1]:
+            raise ConnectionError(f"malformed response to function {fc}")
+        data = pdu[2:2 + pdu[1]]
+        if fc <= 2:
+            return unpack_bits(data, count)
+        if len(data) != 2 * count:
+            raise ConnectionError(f"{len(data)} bytes for {count} registers")
+        return list(struct.unpack(f">{count}H", data))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class EndpointPool:
+    """Up to ``size`` connections to one host:port, opened on demand.
+
+    A connection that times out or breaks is dropped (a late response would
+    desynchronise it) and the next request opens a fresh one; device
+    exception responses leave the connection in the pool.
+    """
+
+    def __init__(self, host: str, port: int, size: int = 1, timeout: float = 0.5):
+        self.host, self.port, self.timeout = host, port, timeout
+        self._slots = asyncio.Semaphore(size)
+        self._idle: list[_Connection] = []
+
+    async def read(self, unit: int, table: str, address: int, count: int) -> list[int]:
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            try:
+                if conn is None:
+                    conn = _Connection(*await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.timeout))
+                words = await asyncio.wait_for(
+                    conn.read(unit, TABLES[table], address, count), self.timeout)
+            except ModbusError:
+                self._idle.append(conn)
+                raise
+            except (OSError, EOFError, asyncio.TimeoutError):
+                if conn is not None:
+                    conn.close()
+                raise
+            self._idle.append(conn)
+            return words
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop().close()
+
+
+# ---------------------------------------------------------------------------
+# Polling
+# ---------------------------------------------------------------------------
+
+def loop_heat_kw(fluid: str, flow_lpm: float, t_in: float, t_out: float) -> float:
+    """Heat a loop carries, kW: volumetric flow x rho x cp x (t_in - t_out)."""
+    props = get_fluid_props(fluid, 0.5 * (t_in + t_out))
+    return flow_lpm / 60_000.0 * props["rho"] * props["cp"] * (t_in - t_out) / 1000.0
+
+
+def derive(values: dict, hot_fluid: str, cold_fluid: str) -> dict[str, float]:
+    """Section 2.3 / 2.4 values from whichever inputs were read."""
+    v = values
+    out = {}
+    if {"t_hot_supply_c", "t_cold_supply_c"} <= v.keys():
+        out["delta_t_c"] = v["t_hot_supply_c"] - v["t_cold_supply_c"]
+    if {"flow_hot_lpm", "t_hot_supply_c", "t_hot_return_c"} <= v.keys():
+        out["q_hot_kw"] = loop_heat_kw(hot_fluid, v["flow_hot_lpm"],
+                                       v["t_hot_supply_c"], v["t_hot_return_c"])
+    if {"flow_cold_lpm", "t_cold_supply_c", "t_cold_return_c"} <= v.keys():
+        out["q_cold_kw"] = loop_heat_kw(cold_fluid, v["flow_cold_lpm"],
+                                        v["t_cold_return_c"], v["t_cold_supply_c"])
+    if "teg_power_w" in v and out.get("q_hot_kw", 0.0) > 0:
+        out["efficiency_pct"] = v["teg_power_w"] / (out["q_hot_kw"] * 10.0)
+    return out
+
+
+@dataclass
+class PollStats:
+    """Counters across all sites; latencies and lags in seconds."""
+    sites: int = 0
+    polls: int = 0
+    reads: int = 0
+    points: int = 0
+    errors: int = 0
+    missed_ticks: int = 0
+    latency: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    lag: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+
+class SitePoller:
+    """Reads one site's devices and turns the words into a sample."""
+
+    def __init__(self, site: Site, regmap: dict[str, DeviceMap], pool: EndpointPool,
+                 max_gap: int = MAX_GAP):
+        self.site, self.pool = site, pool
+        self.plan = [(dev.unit, block) for dev in site.devices(regmap)
+                     for block in plan_reads(dev.points, max_gap)]
+        self.n_points = sum(len(b.points) for _, b in self.plan)
+
+    async def poll(self, stats: Optional[PollStats] = None) -> dict:
+        ts = time.time()
+        results = await asyncio.gather(
+            *(self.pool.read(unit, b.table, b.address, b.count) for unit, b in self.plan),
+            return_exceptions=True)
+        values, topics, errors = {}, {}, []
+        for (unit, block), words in zip(self.plan, results):
+            if isinstance(words, BaseException):
+                errors.append(f"unit {unit} {block.table} {block.address}+{block.count}: "
+                              f"{type(words).__name__} {words}".rstrip())
+                continue
+            for p in block.points:
+                i = p.address - block.address
+                values[p.name] = p.decode(words[i:i + p.width])
+                if p.topic:
+                    topics[p.topic] = values[p.name]
+        for name, value in derive(values, self.site.hot_fluid, self.site.cold_fluid).items():
+            values[name] = value
+            topics[DERIVED_TOPICS[name]] = value
+        if stats is not None:
+            stats.polls += 1
+            stats.reads += len(self.plan)
+            stats.points += self.n_points
+            stats.errors += len(errors)
+        sample = {"ts": round(ts, 3), "site": self.site.name,
+                  "topics": {k: round(v, 4) if isinstance(v, float) else v
+                             for k, v in topics.items()}}
+        if errors:
+            sample["errors"] = errors
+        return sample
+
+
+async def run_site(poller: SitePoller, period: float, stop_at: float, phase: float,
+                   emit: Callable[[dict], None], stats: PollStats) -> None:
+    """Poll on a fixed schedule until loop time ``stop_at``, skipping missed ticks."""
+    loop = asyncio.get_running_loop()
+    tick = loop.time() + phase
+    while tick < stop_at:
+        delay = tick - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        start = loop.time()
+        sample = await poller.poll(stats)
+        done = loop.time()
+        stats.lag.append(start - tick)
+        stats.latency.append(done - start)
+        emit(sample)
+        tick += period
+        if done > tick:
+            missed = int((done - tick) // period) + 1
+            stats.missed_ticks += missed
+            tick += missed * period
+
+
+async def poll_sites(sites: Sequence[Site], regmap: dict[str, DeviceMap],
+                     emit: Callable[[dict], None], period: float = 1.0,
+                     duration: float = float("inf"), pool_size: int = 1,
+                     timeout: float = 0.5, max_gap: int = MAX_GAP,
+                     stats: Optional[PollStats] = None) -> PollStats:
+    """Poll every site until ``duration`` seconds have passed.
+
+    Sites on the same host:port (several PGC units behind one gateway)
+    share that endpoint's pool.  Start times are staggered across the
+    period so reads do not all land on the same instant.
+    """
+    pools: dict[tuple[str, int], EndpointPool] = {}
+    for s in sites:
+        if (s.host, s.port) not in pools:
+            pools[s.host, s.port] = EndpointPool(s.host, s.port, pool_size, timeout)
+    pollers = [SitePoller(s, regmap, pools[s.host, s.port], max_gap) for s in sites]
+    stats = stats if stats is not None else PollStats()
+    stats.sites = len(sites)
+    stop_at = asyncio.get_running_loop().time() + duration
+    try:
+        await asyncio.gather(*(run_site(p, period, stop_at, period * i / len(pollers),
+                                        emit, stats)
+                               for i, p in enumerate(pollers)))
+    finally:
+        for pool in pools.values():
+            pool.close()
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def _pct(values: deque, q: float) -> float:
+    if not values:
+        return float("nan")
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+def print_stats(stats: PollStats, period: float, elapsed: float) -> None:
+    polls = max(stats.polls, 1)
+    print(f"\n{'=' * 64}", file=sys.stderr)
+    print(f"  Modbus poll: {stats.sites} sites, {period:g} s period, {elapsed:.1f} s",
+          file=sys.stderr)
+    print(f"{'=' * 64}", file=sys.stderr)
+    rows = [
+        ("polls", f"{stats.polls:,}  ({stats.polls / max(elapsed, 1e-9):.1f}/s)"),
+        ("reads", f"{stats.reads:,}  ({stats.reads / polls:.1f} per poll for "
+                  f"{stats.points / polls:.1f} points)"),
+        ("read errors", f"{stats.errors:,}"),
+        ("missed ticks", f"{stats.missed_ticks:,}"),
+        ("poll latency", f"p50 {_pct(stats.latency, 0.5) * 1e3:.1f} ms   "
+                         f"p99 {_pct(stats.latency, 0.99) * 1e3:.1f} ms   "
+                         f"max {max(stats.latency, default=float('nan')) * 1e3:.1f} ms"),
+        ("tick lag", f"p50 {_pct(stats.lag, 0.5) * 1e3:.1f} ms   "
+                     f"p99 {_pct(stats.lag, 0.99) * 1e3:.1f} ms   "
+                     f"max {max(stats.lag, default=float('nan')) * 1e3:.1f} ms"),
+    ]
+    for label, text in rows:
+        print(f"  {label:<14s}  {text}", file=sys.stderr)
+
+
+def self_test_report(last: dict[str, dict], expected: dict[str, float],
+                     tolerance: float) -> bool:
+    """Compare each site's last sample with the model values it simulates."""
+    print(f"\n  {'Check':<40s}  {'model':>10s}  {'worst site':>10s}  {'error':>7s}",
+          file=sys.stderr)
+    print(f"  {'─' * 73}", file=sys.stderr)
+    ok = True
+    for topic, want in expected.items():
+        got = [s["topics"].get(topic, float("nan")) for s in last.values()]
+        worst = max(got, key=lambda g: abs(g - want) if g == g else float("inf"))
+        err = abs(worst - want) / abs(want) if want else abs(worst)
+        passed = err <= tolerance
+        ok &= passed
+        print(f"  {topic:<40s}  {want:>10.3f}  {worst:>10.3f}  {err:>6.2%}"
+              f"{'' if passed else '  FAIL'}", file=sys.stderr)
+    return ok
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+async def _main(args, sites: list[Site], regmap: dict[str, DeviceMap]) -> int:
+    servers = []
+    if args.self_test:
+        from modbus_sim import Scenario, expected_topics, start_sites
+        scenario = Scenario()
+        servers = await start_sites(len(sites), regmap, scenario, host=args.host,
+                                    base_port=args.base_port, noise=0.0,
+                                    latency_s=args.latency_ms / 1000.0)
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    last: dict[str, dict] = {}
+
+    def emit(sample: dict) -> None:
+        last[sample["site"]] = sample
+        if not args.quiet:
+            out.write(json.dumps(sample, separators=(",", ":")) + "\n")
+
+    stats = PollStats()
+    t0 = time.perf_counter()
+    try:
+        await poll_sites(sites, regmap, emit, args.period, args.duration,
+                         args.pool, args.timeout, args.max_gap, stats)
+    finally:                                     # also on Ctrl-C
+        if out is not sys.stdout:
+            out.close()
+        for srv in servers:
+            srv.close()
+        print_stats(stats, args.period, time.perf_counter() - t0)
+        if args.out and not args.quiet:
+            print(f"\n  {stats.polls:,} samples written to {args.out}", file=sys.stderr)
+
+    if args.self_test:
+        ok = self_test_report(last, expected_topics(regmap, scenario), 0.005)
+        ok &= stats.errors == 0 and stats.missed_ticks == 0
+        print(f"\n  self-test {'passed' if ok else 'FAILED'}", file=sys.stderr)
+        return 0 if ok else 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll PGC Modbus devices into lex topics")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--sites", default=None, metavar="FILE",
+                     help="Site list (.toml / .json with [[sites]])")
+    src.add_argument("--sim", type=int, default=None, metavar="N",
+                     help="Poll N local simulator sites (modbus_sim.py)")
+    parser.add_argument("--map", default=str(REGMAP_PATH), help="Register map file")
+    parser.add_argument("--host", default="127.0.0.1", help="Simulator host (--sim)")
+    parser.add_argument("--base-port", type=int, default=SIM_BASE_PORT,
+                        help="First simulator port (--sim)")
+    parser.add_argument("--self-test", action="store_true",
+                        help="Start the --sim sites in-process and check derived values "
+                             "against the model")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Simulated per-request bus latency (--self-test)")
+    parser.add_argument("--period", type=float, default=1.0, help="Poll period, s")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="Stop after this many seconds (default: run until Ctrl-C; "
+                             "10 with --self-test)")
+    parser.add_argument("--pool", type=int, default=1,
+                        help="Connections per endpoint")
+    parser.add_argument("--timeout", type=float, default=0.5, help="Per-request timeout, s")
+    parser.add_argument("--max-gap", type=int, default=MAX_GAP,
+                        help="Unused registers read to merge two reads")
+    parser.add_argument("--out", default=None, metavar="FILE",
+                        help="Write samples to FILE instead of stdout")
+    parser.add_argument("--quiet", action="store_true", help="Statistics only, no samples")
+    args = parser.parse_args()
+
+    if args.self_test and args.sim is None:
+        parser.error("--self-test needs --sim N")
+    if args.duration is None:
+        args.duration = 10.0 if args.self_test else float("inf")
+
+    try:
+        regmap = load_register_map(args.map)
+        sites = sim_sites(args.sim, args.host, args.base_port) if args.sim is not None \
+            else load_sites(args.sites)
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        sys.exit(f"  config error: {e}")
+
+    try:
+        sys.exit(asyncio.run(_main(args, sites, regmap)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
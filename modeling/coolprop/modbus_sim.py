@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+modbus_sim.py  --  Local Modbus TCP simulator for PGC sites.
+
+Serves the devices of ``modbus_registers.toml`` for N sites, one port per
+site (``--base-port`` + i, as if each site had its own RTU -> TCP bridge),
+so ``modbus_poller.py`` can be exercised without hardware.  Register values
+come from one ``run_model`` evaluation of the scenario: manifold supply /
+return temperatures, loop flows, loop pressure (static + model pressure
+drop), the gas rate that delivers the model's heat input through the
+default burner, and gross TEG power.  They are refreshed once a second with
+a slow drift of the hot supply (carried through to the returns, gas rate
+and power, see ``drifted``) and small sensor noise (``--noise 0`` serves
+the exact model values).  ``--degraded K`` runs the first K sites with both
+TIMs' conductivity scaled by ``--tim-factor`` (failing TIMs / fouled cells),
+at the same supply temperatures and loop temperature drops.
+
+Function codes 1-4 are implemented.  Unknown unit ids answer exception 11
+(gateway target failed to respond), reads past ``ADDRESS_SPACE`` exception
+2; unmapped addresses below it read as 0.  ``--latency-ms`` holds each
+request for that long, one at a time per site, like an RS-485 bus behind
+the bridge.
+
+Usage:
+    python modbus_sim.py --sites 40
+    python modbus_sim.py --sites 1 --base-port 5020 --teg-type thermonamic --hot 320 --cold 100
+    python modbus_sim.py --sites 60 --latency-ms 15 --noise 0
+    python modbus_sim.py --sites 40 --degraded 4 --tim-factor 0.4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import random
+import struct
+import sys
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from mcf_to_watts import DEFAULT_BURNER, HOURS_PER_DAY, KWH_THERMAL_PER_MCF, target_config
+from modbus_poller import (DERIVED_TOPICS, MAX_READ_BITS, MAX_READ_REGISTERS, REGMAP_PATH,
+                           SIM_BASE_PORT, TABLES, DeviceMap, ModbusError, derive,
+                           encode_frame, load_register_map, pack_bits, read_frame)
+from teg_system_model import TEG_CATALOG, run_model
+
+ADDRESS_SPACE = 1000         # per table and unit
+UPDATE_PERIOD_S = 1.0
+DRIFT_C = 2.0                # hot supply drift amplitude at noise 1
+DRIFT_PERIOD_S = 600.0
+NOISE_C = 0.05               # temperature sensor noise (1 sigma) at noise 1
+NOISE_REL = 0.003            # other analog sensors, relative
+STATIC_BAR = 1.5             # loop fill pressure
+GAS_PRESSURE_PSI = 15.0
+GAS_SPAN_MCF = 10.0          # burner modulation = gas rate / meter span
+EXHAUST_RISE_C = 150.0       # stack above hot supply
+
+
+@dataclass
+class Scenario:
+    """Operating point every simulated site runs at."""
+    teg_type: str = "marlow"
+    hot_temp: float = 200.0
+    cold_temp: float = 40.0
+    teg_count: int = 288         # flows inside the section 2.2 meter spans
+    ambient_c: float = 25.0
+    tim_factor: float = 1.0      # TIM conductivity multiplier (< 1: degraded)
+
+
+def plant_values(sc: Scenario) -> dict[str, float]:
+    """Point name -> engineering value at the scenario's steady state."""
+    cfg = target_config(sc.teg_type, sc.teg_count, sc.hot_temp, sc.cold_temp)
+    if sc.tim_factor != 1.0:
+        cfg.hx = replace(cfg.hx, hot_tim_k=cfg.hx.hot_tim_k * sc.tim_factor,
+                         cold_tim_k=cfg.hx.cold_tim_k * sc.tim_factor)
+    r = run_model(cfg)
+    dt_cold = cfg.cold_dt_fluid_c if cfg.cold_dt_fluid_c is not None else cfg.target_dt_fluid_c
+    gas = (r.total_heat_input_w / 1000.0 / DEFAULT_BURNER.delivery_efficiency
+           * HOURS_PER_DAY / KWH_THERMAL_PER_MCF)
+    return {
+        "t_hot_supply_c": sc.hot_temp,
+        "t_hot_return_c": sc.hot_temp - cfg.target_dt_fluid_c,
+        "t_cold_supply_c": sc.cold_temp,
+        "t_cold_return_c": sc.cold_temp + dt_cold,
+        "t_ambient_c": sc.ambient_c,
+        "flow_hot_lpm": r.hot_flow_rate_m3s * 60_000.0,
+        "flow_cold_lpm": r.cold_flow_rate_m3s * 60_000.0,
+        "p_hot_bar": STATIC_BAR + r.hot_dp_total_pa / 1e5,
+        "p_cold_bar": STATIC_BAR + r.cold_dp_total_pa / 1e5,
+        "gas_mcf_per_day": gas,
+        "gas_pressure_psi": GAS_PRESSURE_PSI,
+        "gas_temp_c": sc.ambient_c,
+        "exhaust_temp_c": sc.hot_temp + EXHAUST_RISE_C,
+        "modulation_pct": min(100.0, 100.0 * gas / GAS_SPAN_MCF),
+        "burner_on": 1.0,
+        "flame_detected": 1.0,
+        "teg_power_w": r.gross_electrical_w,
+    }
+
+
+def expected_topics(regmap: dict[str, DeviceMap], sc: Scenario) -> dict[str, float]:
+    """Derived topics the poller should publish for a noise-free site."""
+    cfg = target_config(sc.teg_type, sc.teg_count, sc.hot_temp, sc.cold_temp)
+    values = plant_values(sc)
+    points = {p.name for dev in regmap.values() for p in dev.points}
+    derived = derive({k: v for k, v in values.items() if k in points},
+                     cfg.hot_fluid, cfg.cold_fluid)
+    return {DERIVED_TOPICS[k]: v for k, v in derived.items()}
+
+
+def drifted(values: dict[str, float], drift_c: float) -> dict[str, float]:
+    """Plant values with the hot supply moved by ``drift_c`` at constant flows.
+
+    First order in the driving temperature difference: heat (and so both
+    loop drops and the gas rate) scales with it, TEG power with its square.
+    """
+    if not drift_c:
+        return values
+    v = dict(values)
+    driving = values["t_hot_supply_c"] - values["t_cold_supply_c"]
+    k = (driving + drift_c) / driving
+    v["t_hot_supply_c"] += drift_c
+    v["t_hot_return_c"] = v["t_hot_supply_c"] - k * (values["t_hot_supply_c"]
+                                                    - values["t_hot_return_c"])
+    v["t_cold_return_c"] = v["t_cold_supply_c"] + k * (values["t_cold_return_c"]
+                                                      - values["t_cold_supply_c"])
+    v["gas_mcf_per_day"] *= k
+    v["modulation_pct"] = min(100.0, v["modulation_pct"] * k)
+    v["teg_power_w"] *= k * k
+    return v
+
+
+class SiteSimulator:
+    """Register images of one site's devices, served over Modbus TCP."""
+
+    def __init__(self, regmap: dict[str, DeviceMap], values: dict[str, float],
+                 noise: float = 1.0, latency_s: float = 0.0, seed: Optional[int] = None):
+        self.units = {dev.unit: dev for dev in regmap.values()}
+        self.values, self.noise, self.latency_s = values, noise, latency_s
+        self.rng = random.Random(seed)
+        self.phase = self.rng.uniform(0.0, 2.0 * math.pi)
+        self.images: dict[int, dict[str, dict[int, int]]] = {}
+        self.requests = 0
+        self._bus = asyncio.Lock()
+        self.refresh(0.0)
+
+    def refresh(self, t: float) -> None:
+        """Re-encode every point at time ``t`` (s)."""
+        drift = DRIFT_C * self.noise * math.sin(2.0 * math.pi * t / DRIFT_PERIOD_S + self.phase)
+        values = drifted(self.values, drift)
+        images = {}
+        for unit, dev in self.units.items():
+            tables: dict[str, dict[int, int]] = {name: {} for name in TABLES}
+            for p in dev.points:
+                v = values.get(p.name, 0.0)
+                if p.type != "bool" and self.noise:
+                    v = (v + self.rng.gauss(0.0, NOISE_C * self.noise) if p.name.startswith("t_")
+                         else v * (1.0 + self.rng.gauss(0.0, NOISE_REL * self.noise)))
+                for i, w in enumerate(p.encode(v)):
+                    tables[p.table][p.address + i] = w
+            images[unit] = tables
+        self.images = images
+
+    def respond(self, unit: int, pdu: bytes) -> bytes:
+        """Response PDU for a request PDU."""
+        fc = pdu[0]
+        try:
+            if unit not in self.images:
+                raise ModbusError(11)
+            if fc not in TABLES.values() or len(pdu) != 5:
+                raise ModbusError(1)
+            address, count = struct.unpack(">HH", pdu[1:5])
+            if not 1 <= count <= (MAX_READ_BITS if fc <= 2 else MAX_READ_REGISTERS):
+                raise ModbusError(3)
+            if address + count > ADDRESS_SPACE:
+                raise ModbusError(2)
+        except ModbusError as e:
+            return bytes([fc | 0x80, e.code])
+        table = self.images[unit][next(t for t, c in TABLES.items() if c == fc)]
+        words = [table.get(a, 0) for a in range(address, address + count)]
+        if fc <= 2:
+            data = pack_bits(words)
+        else:
+            data = struct.pack(f">{count}H", *words)
+        return bytes([fc, len(data)]) + data
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                tid, unit, pdu = await read_frame(reader)
+                if self.latency_s:
+                    async with self._bus:
+                        await asyncio.sleep(self.latency_s)
+                self.requests += 1
+                writer.write(encode_frame(tid, unit, self.respond(unit, pdu)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:       # loop shutdown with the client still connected
+            pass
+        finally:
+            writer.close()
+
+    async def run(self) -> None:
+        """Refresh the registers every ``UPDATE_PERIOD_S``."""
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        while True:
+            await asyncio.sleep(UPDATE_PERIOD_S)
+            self.refresh(loop.time() - t0)
+
+
+class SimServer:
+    """A listening site; ``close()`` stops the server and its refresh task."""
+
+    def __init__(self, sim: SiteSimulator, server: asyncio.AbstractServer):
+        self.sim, self.server = sim, server
+        self.task = asyncio.get_running_loop().create_task(sim.run())
+
+    def close(self) -> None:
+        self.task.cancel()
+        self.server.close()
+
+
+async def start_sites(n: int, regmap: dict[str, DeviceMap], scenario: Scenario,
+                      host: str = "127.0.0.1", base_port: int = SIM_BASE_PORT,
+                      noise: float = 1.0, latency_s: float = 0.0,
+                      seed: int = 0, degraded: int = 0,
+                      tim_factor: float = 0.5) -> list[SimServer]:
+    """Start ``n`` sites on ports ``base_port`` .. ``base_port + n - 1``.
+
+    The first ``degraded`` sites run with TIM conductivity x ``tim_factor``.
+    """
+    values = plant_values(scenario)
+    bad = plant_values(replace(scenario, tim_factor=tim_factor)) if degraded else values
+    servers = []
+    for i in range(n):
+        sim = SiteSimulator(regmap, bad if i < degraded else values, noise, latency_s,
+                            seed + i)
+        server = await asyncio.start_server(sim.serve, host, base_port + i)
+        servers.append(SimServer(sim, server))
+    return servers
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+async def _serve(args, regmap: dict[str, DeviceMap], scenario: Scenario) -> None:
+    servers = await start_sites(args.sites, regmap, scenario, args.host, args.base_port,
+                                args.noise, args.latency_ms / 1000.0, args.seed,
+                                args.degraded, args.tim_factor)
+    values = plant_values(scenario)
+    print(f"\n{'=' * 64}")
+    print(f"  Modbus simulator: {args.sites} sites on {args.host}:"
+          f"{args.base_port}-{args.base_port + args.sites - 1}")
+    print(f"{'=' * 64}")
+    print(f"  {TEG_CATALOG[scenario.teg_type].name}, {scenario.teg_count:,} TEGs, "
+          f"hot {scenario.hot_temp:g} C / cold {scenario.cold_temp:g} C")
+    if args.degraded:
+        print(f"  sites 0-{args.degraded - 1}: TIM conductivity x {args.tim_factor:g}")
+    for dev in regmap.values():
+        print(f"  unit {dev.unit:>3d}  {dev.name:<8s}  " + ", ".join(
+            f"{p.name}={values.get(p.name, 0.0):.4g}" for p in dev.points))
+    print(f"\n  serving (Ctrl-C to stop)", flush=True)
+    try:
+        await asyncio.gather(*(s.server.serve_forever() for s in servers))
+    finally:
+        for s in servers:
+            s.close()
+        print(f"\n  {sum(s.sim.requests for s in servers):,} requests served")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate PGC Modbus TCP sites")
+    parser.add_argument("--sites", type=int, default=1, help="Number of sites (ports)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=SIM_BASE_PORT)
+    parser.add_argument("--map", default=str(REGMAP_PATH), help="Register map file")
+    parser.add_argument("--teg-type", choices=list(TEG_CATALOG.keys()), default="marlow")
+    parser.add_argument("--hot", type=float, default=Scenario.hot_temp, help="Hot supply, C")
+    parser.add_argument("--cold", type=float, default=Scenario.cold_temp, help="Cold supply, C")
+    parser.add_argument("--teg-count", type=int, default=Scenario.teg_count)
+    parser.add_argument("--ambient", type=float, default=Scenario.ambient_c)
+    parser.add_argument("--noise", type=float, default=1.0,
+                        help="Drift / noise scale (0 = exact model values)")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Per-request bus latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--degraded", type=int, default=0, metavar="K",
+                        help="Run the first K sites with degraded TIMs")
+    parser.add_argument("--tim-factor", type=float, default=0.5,
+                        help="TIM conductivity multiplier of the degraded sites")
+    args = parser.parse_args()
+
+    try:
+        regmap = load_register_map(args.map)
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        sys.exit(f"  config error: {e}")
+    scenario = Scenario(args.teg_type, args.hot, args.cold, args.teg_count, args.ambient)
+    try:
+        asyncio.run(_serve(args, regmap, scenario))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+operating_point.py  --  Optimal loop delta-T (flow rate) for maximum net output.
+
+``target_dt_fluid_c`` trades convection resistance and fluid-temperature glide
+(small dT, high flow) against pump parasitics (large dT, low flow).  This
+chooses the hot- and cold-loop dT per configuration to maximize
+``net_electrical_kw`` subject to ``t_teg_hot_c <= teg_spec.max_hot_c``.
+Flow rates follow from dT and the heat load and are reported with the result.
+
+The shared model scales the cold-loop pressure drop from the hot loop
+(0.9 x), which only holds while both loops run the same dT.  Once the cold dT
+is free that would make cold flow nearly free to pump, so here the cold pump
+is re-priced on the cold loop's own channel, manifold and pipe drop at the
+cold flow (same correlations, cold fluid, ``cold_pipe_length_m``).  Net
+output and pump power below include that correction.
+
+Method: projected gradient ascent in log(dT) inside [lo, hi] bounds, with a
+per-point step length that doubles on success and quarters on failure.  Each
+iteration is one base batch, one batch of central differences warm-started
+from it, and one batched trial evaluation, over all points still moving, so
+a whole sweep is optimized in a few dozen batch calls.  The temperature
+limit is an exact (L1) penalty.  ``x0`` warm-starts the search, e.g. from the
+optimum of a neighbouring sweep.
+
+Usage:
+    python operating_point.py
+    python operating_point.py --teg-type thermonamic --hot-temp 350 --cold-temp 100
+    python operating_point.py --teg-counts 500,1000,2000 --pump auto
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+import numpy as np
+
+from batch_model import (
+    broadcast_columns, evaluate, fluid_props_array, friction_array, pump_power_array,
+)
+from teg_system_model import SystemConfig, TEG_CATALOG
+
+VARIABLES = ("target_dt_fluid_c", "cold_dt_fluid_c")
+DT_BOUNDS = (2.0, 40.0)          # loop dT search range, C
+PENALTY_KW_PER_C = 1.0           # objective penalty per C over max_hot_c
+FD_STEP = 1e-4                   # central-difference step in log(dT)
+WARM_KEYS = ("r_hot_conv", "r_cold_conv", "r_teg")
+
+
+@dataclass
+class OperatingPoints:
+    """Optimal loop dT and the resulting operating point, one entry per point."""
+    dt_hot_c: np.ndarray
+    dt_cold_c: np.ndarray
+    net_kw: np.ndarray
+    start_net_kw: np.ndarray     # net output at the starting dT
+    t_teg_hot_c: np.ndarray
+    hot_flow_gpm: np.ndarray
+    cold_flow_gpm: np.ndarray
+    pump_power_w: np.ndarray
+    feasible: np.ndarray         # t_teg_hot_c within max_hot_c
+    converged: np.ndarray
+    iterations: int
+
+    @property
+    def gain_kw(self) -> np.ndarray:
+        return self.net_kw - self.start_net_kw
+
+
+def _objective(net_kw, t_hot, max_hot, penalty):
+    return net_kw - penalty * np.maximum(t_hot - max_hot, 0.0)
+
+
+def cold_loop_dp(cols, props, vol):
+    """Cold-loop channel + manifold + pipe pressure drop (Pa) at its own flow."""
+    n_teg = np.floor(cols["teg_count"])
+    w, h = cols["hx.channel_width_m"], cols["hx.channel_height_m"]
+    dh = 4.0 * (w * h) / (2.0 * (w + h))
+    rho, mu = props["rho"], props["mu"]
+    vel = vol / n_teg / (cols["hx.n_channels"] * w * h)
+    dp = (friction_array(rho * vel * dh / mu, dh) * (cols["hx.channel_length_m"] / dh)
+          * 0.5 * rho * vel**2)
+    n_towers = np.maximum(1, n_teg // (cols["tegs_per_panel"] * cols["panels_per_tower"]))
+    for d, pipe_length in ((cols["hx.manifold_id_m"], n_towers * 2.0),
+                           (cols["pipe_id_m"], cols["cold_pipe_length_m"])):
+        v = vol / (np.pi * (d / 2.0)**2)
+        dp = dp + (friction_array(rho * v * d / mu, d) * (pipe_length / d)
+                   * 0.5 * rho * v**2)
+    return dp
+
+
+def _evaluate(base: SystemConfig, points: Mapping[str, np.ndarray], u: np.ndarray,
+              warm_start: Optional[Mapping[str, np.ndarray]] = None):
+    """Batch run at log(dT) rows ``u``; returns (results, net kW, pump W).
+
+    Net output and total pump power use the cold pump re-priced on
+    ``cold_loop_dp``.
+    """
+    dt = np.exp(u)
+    cols = broadcast_columns(base, {**points, VARIABLES[0]: dt[:, 0],
+                                    VARIABLES[1]: dt[:, 1]}, len(u))
+    res = evaluate(cols, warm_start=warm_start)
+    props = fluid_props_array(cols["cold_fluid"], res.t_cold_fluid_avg_c)
+    vol = res.cold_flow_rate_m3s
+    pump_cold = pump_power_array(cols, "cold", cold_loop_dp(cols, props, vol), vol,
+                                 props["rho"])[0]
+    extra_w = pump_cold - res.pump_power_cold_w
+    return res, res.net_electrical_kw - extra_w / 1000.0, res.pump_power_total_w + extra_w
+
+
+def optimize_operating_points(base: SystemConfig,
+                              points: Optional[Mapping[str, np.ndarray]] = None,
+                              x0: Optional[np.ndarray] = None,
+                              bounds: tuple[float, float] = DT_BOUNDS,
+                              max_iter: int = 60, tol: float = 1e-3,
+                              penalty: float = PENALTY_KW_PER_C) -> OperatingPoints:
+    """Maximize net output over (hot dT, cold dT) at each point.
+
+    ``points`` sweeps config fields as in ``jacobian`` (arrays of length m).
+    ``x0`` is an (m, 2) or (2,) starting guess for (hot dT, cold dT); the
+    default is the config's own ``target_dt_fluid_c`` on both loops.
+    ``tol`` is the final step length in log(dT) (1e-3 ~ 0.1 %).
+    """
+    points = {k: np.atleast_1d(np.asarray(v, dtype=float))
+              for k, v in (points or {}).items() if k not in VARIABLES}
+    m = max([len(v) for v in points.values()] or [1])
+    points = {k: np.broadcast_to(v, (m,)) for k, v in points.items()}
+    max_hot = np.broadcast_to(points.get("teg_spec.max_hot_c", base.teg_spec.max_hot_c),
+                              (m,))
+
+    if x0 is None:
+        cold = base.cold_dt_fluid_c
+        x0 = [base.target_dt_fluid_c, base.target_dt_fluid_c if cold is None else cold]
+    lo, hi = np.log(bounds[0]), np.log(bounds[1])
+    u = np.clip(np.log(np.broadcast_to(np.asarray(x0, dtype=float), (m, 2))), lo, hi)
+    step = np.full(m, 0.5)
+    phi = np.full(m, -np.inf)
+    start_net = None
+    active = np.arange(m)
+    it = 0
+
+    shifts = FD_STEP * np.array([[1.0, 0.0], [-1.0, 0.0], [0.0, 1.0], [0.0, -1.0]])
+    for it in range(1, max_iter + 1):
+        sub = {k: v[active] for k, v in points.items()}
+        ua = u[active]
+        res, net, _ = _evaluate(base, sub, ua)
+        phi[active] = _objective(net, res.t_teg_hot_c, max_hot[active], penalty)
+        if start_net is None:
+            start_net = net.copy()
+
+        # Central differences of the objective in log(dT), warm-started from
+        # the base rows, then projected onto the box
+        k = len(active)
+        res_d, net_d, _ = _evaluate(
+            base, {n: np.tile(v, 4) for n, v in sub.items()},
+            (ua[None, :, :] + shifts[:, None, :]).reshape(-1, 2),
+            {w: np.tile(res.columns[w], 4) for w in WARM_KEYS})
+        phi_d = _objective(net_d, res_d.t_teg_hot_c, np.tile(max_hot[active], 4),
+                           penalty).reshape(4, k)
+        grad = np.stack([phi_d[0] - phi_d[1], phi_d[2] - phi_d[3]], axis=1) / (2.0 * FD_STEP)
+        grad[((ua <= lo) & (grad < 0)) | ((ua >= hi) & (grad > 0))] = 0.0
+        norm = np.linalg.norm(grad, axis=1)
+        moving = norm > 0
+        if not moving.any():
+            step[active] = 0.0
+            break
+
+        direction = np.where(moving[:, None], grad / np.where(moving, norm, 1.0)[:, None], 0.0)
+        trial = np.clip(ua + step[active, None] * direction, lo, hi)
+        res_t, net_t, _ = _evaluate(base, sub, trial)
+        phi_t = _objective(net_t, res_t.t_teg_hot_c, max_hot[active], penalty)
+
+        better = moving & (phi_t > phi[active])
+        u[active[better]] = trial[better]
+        step[active] = np.where(better, np.minimum(step[active] * 2.0, 1.0),
+                                np.where(moving, step[active] * 0.25, 0.0))
+        active = active[step[active] > tol]
+        if active.size == 0:
+            break
+
+    dt = np.exp(u)
+    res, net, pump_w = _evaluate(base, points, u)
+    return OperatingPoints(
+        dt_hot_c=dt[:, 0], dt_cold_c=dt[:, 1],
+        net_kw=net, start_net_kw=start_net,
+        t_teg_hot_c=res.t_teg_hot_c,
+        hot_flow_gpm=res.hot_flow_rate_gpm, cold_flow_gpm=res.cold_flow_rate_gpm,
+        pump_power_w=pump_w,
+        feasible=res.t_teg_hot_c <= max_hot + 1e-9,
+        converged=step <= tol, iterations=it,
+    )
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimal loop delta-T for max net output")
+    parser.add_argument("--teg-type", choices=list(TEG_CATALOG.keys()), default="marlow")
+    parser.add_argument("--teg-counts", default="500,750,1000,1500,2000,3000,4000,5000",
+                        help="Comma-separated TEG counts to sweep")
+    parser.add_argument("--hot-temp", type=float, default=200.0)
+    parser.add_argument("--cold-temp", type=float, default=40.0)
+    parser.add_argument("--dt-fluid", type=float, default=10.0,
+                        help="Starting / reference loop dT, C (default: 10)")
+    parser.add_argument("--dt-min", type=float, default=DT_BOUNDS[0])
+    parser.add_argument("--dt-max", type=float, default=DT_BOUNDS[1])
+    parser.add_argument("--pump", default=None,
+                        help="Pump for both loops: 'auto' or a pumps.PUMP_LIBRARY key")
+    args = parser.parse_args()
+
+    fluid = "therminol" if args.hot_temp > 220 else "water_glycol"
+    base = SystemConfig(teg_spec=TEG_CATALOG[args.teg_type],
+                        hot_fluid=fluid, cold_fluid=fluid,
+                        hot_inlet_c=args.hot_temp, cold_inlet_c=args.cold_temp,
+                        target_dt_fluid_c=args.dt_fluid,
+                        hot_pump=args.pump, cold_pump=args.pump)
+    counts = np.array([int(c) for c in args.teg_counts.split(",")], dtype=float)
+    opt = optimize_operating_points(base, {"teg_count": counts},
+                                    bounds=(args.dt_min, args.dt_max))
+
+    print("=" * 92)
+    print(f"  OPTIMAL LOOP dT -- {base.teg_spec.name}, hot {base.hot_inlet_c} C / "
+          f"cold {base.cold_inlet_c} C, max hot side {base.teg_spec.max_hot_c:.0f} C")
+    print(f"  dT bounds {args.dt_min:g}-{args.dt_max:g} C, reference dT {args.dt_fluid:g} C, "
+          f"{opt.iterations} iterations")
+    print("=" * 92)
+    print(f"  {'TEGs':>6s}  {'Ref kW':>7s}  {'dT hot':>7s}  {'dT cold':>7s}  {'Hot GPM':>8s}  "
+          f"{'Cold GPM':>8s}  {'Pump W':>8s}  {'T hot':>6s}  {'Net kW':>7s}  {'Gain':>7s}")
+    print(f"  {'─' * 88}")
+    for i, n in enumerate(counts):
+        flag = "" if opt.feasible[i] else "  over max_hot_c"
+        flag += "" if opt.converged[i] else "  (not converged)"
+        print(f"  {int(n):>6d}  {opt.start_net_kw[i]:>7.3f}  {opt.dt_hot_c[i]:>7.2f}  "
+              f"{opt.dt_cold_c[i]:>7.2f}  {opt.hot_flow_gpm[i]:>8.1f}  "
+              f"{opt.cold_flow_gpm[i]:>8.1f}  {opt.pump_power_w[i]:>8.1f}  "
+              f"{opt.t_teg_hot_c[i]:>6.1f}  {opt.net_kw[i]:>7.3f}  "
+              f"{opt.gain_kw[i]:>+7.3f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+"""
+pareto.py  --  Non-dominated sorting and skylines for large columnar results.
+
+Works on column dicts (``BatchResults.columns``, ``run_batch_chunked``
+output) with an objective spec such as
+
+    {"net_kw": "max", "cost_per_kwh": "min", "boreholes": "min", "mcf_day": "min"}
+
+which is turned into an (n, d) minimization matrix.
+
+    skyline(f)          non-dominated mask.  Rows are de-duplicated and
+                        lexicographically sorted once; d = 2 is a prefix-min
+                        scan, d >= 3 is Kung's divide and conquer (top half
+                        filters bottom half on the remaining d-1 objectives),
+                        after a pass that drops rows dominated by the front
+                        of a random sample.  The filter recurses on the next
+                        objective down to a sorted prefix-min sweep, so the
+                        front is O(n log^(d-1) n).
+    pareto_ranks(f)     front index per point.  d = 2 uses the O(n log n)
+                        staircase assignment (binary search over front
+                        minima); d >= 3 is Jensen's divide-and-conquer
+                        non-dominated sort with Fortin's handling of ties,
+                        O(n log^(d-1) n) for all fronts at once.
+    ParetoArchive       incremental front: ``add(chunk)`` as sweep chunks
+                        stream in, keeping only non-dominated rows.
+    epsilon_thin(f)     epsilon-box dominance thinning (one point per
+                        non-dominated box) for plotting.
+
+Usage:
+    python pareto.py
+    python pareto.py --points 5000000 --eps 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from bisect import bisect_right
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+
+from batch_model import run_batch
+from mcf_to_watts import DEFAULT_BURNER, HOURS_PER_DAY, KWH_THERMAL_PER_MCF
+from sweep import HEAT_PER_BOREHOLE_KW
+from teg_system_model import SystemConfig
+
+DEFAULT_OBJECTIVES = {"net_kw": "max", "cost_per_kwh": "min",
+                      "boreholes": "min", "mcf_day": "min"}
+
+LEAF_SIZE = 64           # recursions switch to brute force below this
+BRUTE_PAIRS = 1 << 16    # rank merges test all pairs up to this many
+BLOCK = 4096             # rows per vectorized dominance block
+SAMPLE_SIZE = 16384      # rows sampled for skyline prefilter pivots
+
+
+# ---------------------------------------------------------------------------
+# Columns -> objective matrix
+# ---------------------------------------------------------------------------
+
+def sweep_metrics(cols: Mapping[str, np.ndarray], gas_price: float = 4.00
+                  ) -> dict[str, np.ndarray]:
+    """Net kW, fuel $/kWh, McF/day and boreholes (as in sweep.py) from batch columns."""
+    net_kw = np.asarray(cols["net_electrical_kw"], dtype=float)
+    fuel_kw = np.asarray(cols["total_heat_input_w"]) / 1000.0 / DEFAULT_BURNER.delivery_efficiency
+    mcf_day = fuel_kw * HOURS_PER_DAY / KWH_THERMAL_PER_MCF
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cost = np.where(net_kw > 0, mcf_day * gas_price / (net_kw * HOURS_PER_DAY), np.inf)
+    boreholes = np.ceil(np.asarray(cols["total_heat_rejection_w"]) / 1000.0
+                        / HEAT_PER_BOREHOLE_KW)
+    return {"net_kw": net_kw, "cost_per_kwh": cost, "mcf_day": mcf_day,
+            "boreholes": boreholes}
+
+
+def to_minimize(cols: Mapping[str, np.ndarray],
+                objectives: Mapping[str, str] = DEFAULT_OBJECTIVES) -> np.ndarray:
+    """(n, d) matrix with "max" objectives negated; NaN counts as worst."""
+    out = []
+    for key, sense in objectives.items():
+        if sense not in ("min", "max"):
+            raise ValueError(f"{key}: sense must be 'min' or 'max', not {sense!r}")
+        v = np.asarray(cols[key], dtype=float)
+        out.append(np.nan_to_num(-v if sense == "max" else v, nan=np.inf))
+    return np.column_stack(out)
+
+
+# ---------------------------------------------------------------------------
+# Dominance kernels
+# ---------------------------------------------------------------------------
+
+def _dominated_by(t: np.ndarray, b: np.ndarray, strict: bool = False) -> np.ndarray:
+    """Mask over rows of ``b`` that some row of ``t`` dominates.
+
+    Weak (``t <= b`` everywhere) unless ``strict``, which also requires
+    ``t < b`` somewhere.
+    """
+    out = np.zeros(len(b), dtype=bool)
+    if len(t) == 0 or len(b) == 0:
+        return out
+    # Rows of b better than every t in some objective cannot be dominated
+    cand = np.flatnonzero(~(b < t.min(axis=0)).any(axis=1))
+    if len(t) * 64 <= cand.size:
+        # Few dominators, many rows: column-wise passes per t row, compacting
+        # the candidate set every few rows
+        cols = [np.ascontiguousarray(b[cand, j]) for j in range(b.shape[1])]
+        dead = np.zeros(cand.size, dtype=bool)
+        for i, row in enumerate(t):
+            hit = cols[0] >= row[0]
+            for j in range(1, len(cols)):
+                hit &= cols[j] >= row[j]
+            if strict:
+                idx = np.flatnonzero(hit)
+                hit[idx[(b[cand[idx]] == row).all(axis=1)]] = False
+            dead |= hit
+            if i % 16 == 15:
+                out[cand[dead]] = True
+                keep = ~dead
+                cand, cols = cand[keep], [c[keep] for c in cols]
+                dead = dead[keep]
+        out[cand[dead]] = True
+        return out
+    step = max(1, BLOCK * BLOCK // len(t) // 8)
+    for lo in range(0, cand.size, step):
+        rows = cand[lo:lo + step]
+        le = (t[None, :, :] <= b[rows, None, :]).all(axis=2)
+        if strict:
+            le &= (t[None, :, :] < b[rows, None, :]).any(axis=2)
+        out[rows] = le.any(axis=1)
+    return out
+
+
+def _dominated_2d(tx, ty, bx, by) -> np.ndarray:
+    """Mask over points (bx, by) weakly dominated by some (tx, ty): a sweep
+    over ``tx`` order with a running minimum of ``ty``."""
+    order = np.argsort(tx, kind="stable")
+    run_min = np.minimum.accumulate(ty[order])
+    pos = np.searchsorted(tx[order], bx, side="right")   # t rows with tx <= bx
+    return (pos > 0) & (run_min[np.maximum(pos - 1, 0)] <= by)
+
+
+def _split(tv: np.ndarray, bv: np.ndarray):
+    """Low-side masks for splitting two row sets at the median of one objective.
+
+    A low row of one set is never worse there than a high row of the
+    other.  Returns None when every value is equal (the objective cannot
+    separate anything).
+    """
+    v = np.concatenate([tv, bv])
+    m = np.partition(v, (len(v) - 1) // 2)[(len(v) - 1) // 2]    # lower median
+    lo_t, lo_b = tv <= m, bv <= m
+    if lo_t.all() and lo_b.all():
+        # m is the maximum: put the ties on the high side instead
+        lo_t, lo_b = tv < m, bv < m
+        if not (lo_t.any() or lo_b.any()):
+            return None
+    return lo_t, lo_b
+
+
+def _dominated(t: np.ndarray, b: np.ndarray, k: int = 0) -> np.ndarray:
+    """Mask over rows of ``b`` weakly dominated by a row of ``t`` on objectives ``k:``.
+
+    Bentley's marriage before conquest: both sets are split at the median of
+    objective ``k``.  Low ``t`` rows already beat high ``b`` rows there, so
+    that pair only recurses on ``k + 1:``; high ``t`` rows cannot dominate
+    low ``b`` rows at all.  Two objectives left is ``_dominated_2d``, so the
+    cost is O(N log^(d-k-1) N) for N = len(t) + len(b).
+    """
+    d = b.shape[1]
+    if len(t) == 0 or len(b) == 0:
+        return np.zeros(len(b), dtype=bool)
+    if k == d - 1:
+        return b[:, k] >= t[:, k].min()
+    if k == d - 2:
+        return _dominated_2d(t[:, k], t[:, k + 1], b[:, k], b[:, k + 1])
+    if min(len(t), len(b)) <= LEAF_SIZE:
+        return _dominated_by(t[:, k:], b[:, k:])
+    halves = _split(t[:, k], b[:, k])
+    if halves is None:
+        return _dominated(t, b, k + 1)
+    lo_t, lo_b = halves
+    out = np.zeros(len(b), dtype=bool)
+    out[lo_b] = _dominated(t[lo_t], b[lo_b], k)
+    hi = np.flatnonzero(~lo_b)
+    dead = _dominated(t[lo_t], b[hi], k + 1)
+    live = hi[~dead]
+    out[hi[dead]] = True
+    out[live] = _dominated(t[~lo_t], b[live], k)
+    return out
+
+
+def _front_sorted(u: np.ndarray) -> np.ndarray:
+    """Indices of the front of unique, lexicographically sorted rows ``u``."""
+    n, d = u.shape
+    if n == 0:
+        return np.zeros(0, dtype=int)
+    if d == 1:
+        return np.zeros(1, dtype=int)
+    if d == 2:
+        prev_min = np.concatenate([[np.inf], np.minimum.accumulate(u[:-1, 1])])
+        return np.flatnonzero(u[:, 1] < prev_min)
+    if n <= LEAF_SIZE:
+        le = (u[:, None, :] <= u[None, :, :]).all(axis=2)
+        np.fill_diagonal(le, False)
+        return np.flatnonzero(~le.any(axis=0))
+    h = n // 2
+    top = _front_sorted(u[:h])
+    bot = h + _front_sorted(u[h:])
+    # Every top row precedes every bottom row in f0, so only f1.. matter
+    keep = ~_dominated(u[top], u[bot], 1)
+    return np.concatenate([top, bot[keep]])
+
+
+def _front(u: np.ndarray) -> np.ndarray:
+    """``_front_sorted`` after discarding rows dominated by pivot points.
+
+    The pivots are the front of a random sample of rows.  Filtering every
+    row against them removes most rows of a real sweep before the recursion
+    starts.
+    """
+    n, d = u.shape
+    if d <= 2 or n <= 4 * SAMPLE_SIZE:
+        return _front_sorted(u)
+    sample = np.sort(np.random.default_rng(0).choice(n, SAMPLE_SIZE, replace=False))
+    pivot_rows = sample[_front_sorted(u[sample])]
+    # Rows are unique, so weak dominance by a pivot is strict except for itself
+    alive = ~_dominated(u[pivot_rows], u)
+    alive[pivot_rows] = True
+    alive = np.flatnonzero(alive)
+    return alive[_front_sorted(u[alive])]
+
+
+def _nd_ranks(u: np.ndarray, cap: Optional[int] = None) -> np.ndarray:
+    """Pareto rank of unique, lexicographically sorted rows ``u`` (d >= 2).
+
+    Jensen's divide and conquer as generalized by Fortin et al. (2013) to
+    tied objective values.  Row order stands in for f0: a row can only be
+    dominated by an earlier one.  ``assign(S, k)`` ranks the rows S on
+    f0..fk; ``update(L, H, k)`` raises the ranks of H by those of L, whose
+    rows already weakly beat H on f(k+1).., on f0..fk.  Both split at the
+    median of fk, and at k = 1 they become staircase sweeps, so all fronts
+    take O(n log^(d-1) n).  With ``cap`` ranks are clipped to it.
+    """
+    n, d = u.shape
+    rank = np.zeros(n, dtype=np.int64)
+    y = u[:, 1].tolist()
+
+    def brute_assign(S, k):
+        sub = u[S, 1:k + 1]
+        le = np.triu((sub[:, None, :] <= sub[None, :, :]).all(axis=2), 1)
+        r = rank[S]
+        for j in range(1, len(S)):
+            dom = le[:j, j]
+            if dom.any():
+                r[j] = max(r[j], r[:j][dom].max() + 1)
+        rank[S] = r
+
+    def sweep_assign(S):
+        # Staircase of (f1, rank) with both increasing: the last step at or
+        # below a row's f1 carries the highest rank among its dominators
+        ys: list[float] = []
+        rs: list[int] = []
+        for i in S.tolist():
+            yi = y[i]
+            pos = bisect_right(ys, yi)
+            r = rank[i]
+            if pos and rs[pos - 1] >= r:
+                r = rank[i] = rs[pos - 1] + 1
+            end = pos
+            while end < len(ys) and rs[end] <= r:
+                end += 1
+            ys[pos:end] = [yi]
+            rs[pos:end] = [int(r)]
+
+    def sweep_update(L, H):
+        order = np.argsort(np.concatenate([L, H]), kind="stable")
+        rows = np.concatenate([L, H])[order].tolist()
+        from_l = (order < len(L)).tolist()
+        ys: list[float] = []
+        rs: list[int] = []
+        for i, is_l in zip(rows, from_l):
+            yi = y[i]
+            pos = bisect_right(ys, yi)
+            if not is_l:
+                if pos and rs[pos - 1] >= rank[i]:
+                    rank[i] = rs[pos - 1] + 1
+                continue
+            r = int(rank[i])
+            if pos and rs[pos - 1] >= r:
+                continue
+            end = pos
+            while end < len(ys) and rs[end] <= r:
+                end += 1
+            ys[pos:end] = [yi]
+            rs[pos:end] = [r]
+
+    def update(L, H, k):
+        if len(L) == 0 or len(H) == 0:
+            return
+        if len(L) * len(H) <= BRUTE_PAIRS:
+            a, b = u[L, 1:k + 1], u[H, 1:k + 1]
+            le = (a[:, None, :] <= b[None, :, :]).all(axis=2) & (L[:, None] < H[None, :])
+            best = np.where(le, rank[L][:, None] + 1, 0).max(axis=0)
+            rank[H] = np.maximum(rank[H], best)
+            return
+        if k == 1:
+            sweep_update(L, H)
+            return
+        lv, hv = u[L, k], u[H, k]
+        if lv.max() <= hv.min():
+            update(L, H, k - 1)
+            return
+        if lv.min() > hv.max():
+            return
+        lo_l, lo_h = _split(lv, hv)
+        update(L[lo_l], H[lo_h], k)
+        update(L[lo_l], H[~lo_h], k - 1)
+        update(L[~lo_l], H[~lo_h], k)
+
+    def assign(S, k):
+        if len(S) < 2:
+            return
+        if len(S) <= LEAF_SIZE:
+            brute_assign(S, k)
+            return
+        if k == 1:
+            sweep_assign(S)
+            return
+        v = u[S, k]
+        halves = _split(v, v[:0])
+        if halves is None:
+            assign(S, k - 1)
+            return
+        lo = halves[0]
+        assign(S[lo], k)
+        update(S[lo], S[~lo], k - 1)
+        assign(S[~lo], k)
+
+    assign(np.arange(n), d - 1)
+    if cap is not None:
+        np.minimum(rank, cap, out=rank)
+    return rank
+
+
+def _unique_rows(f: np.ndarray):
+    """Lexicographically sorted unique rows and the inverse index."""
+    f = np.asarray(f, dtype=float)
+    if f.ndim != 2:
+        raise ValueError("objective matrix must be 2-D (n, d)")
+    order = np.lexsort(f.T[::-1])
+    s = f[order]
+    new = np.ones(len(s), dtype=bool)
+    new[1:] = (s[1:] != s[:-1]).any(axis=1)
+    inv = np.empty(len(s), dtype=np.int64)
+    inv[order] = np.cumsum(new) - 1
+    return s[new], inv
+
+
+def skyline(f: np.ndarray) -> np.ndarray:
+    """Boolean mask of non-dominated rows (all objectives minimized).
+
+    Exact duplicates of a front point are all kept.
+    """
+    u, inv = _unique_rows(f)
+    front = np.zeros(len(u), dtype=bool)
+    front[_front(u)] = True
+    return front[inv]
+
+
+def pareto_ranks(f: np.ndarray, max_rank: Optional[int] = None) -> np.ndarray:
+    """Pareto rank per row: 0 = non-dominated, 1 = next front, ...
+
+    With ``max_rank`` (d >= 3 only matters for speed) rows beyond that front
+    get ``max_rank + 1``.
+    """
+    u, inv = _unique_rows(f)
+    n, d = u.shape
+    rank = np.full(n, -1)
+    if d <= 2:
+        minima: list[float] = []          # last (smallest) f1 of each front
+        y = u[:, -1]
+        for i in range(n):
+            k = bisect_right(minima, y[i])
+            if k == len(minima):
+                minima.append(y[i])
+            else:
+                minima[k] = y[i]
+            rank[i] = k
+    elif max_rank is None or n <= 4 * SAMPLE_SIZE:
+        rank = _nd_ranks(u)
+    else:
+        # Rows dominated by a sample row of sample rank >= max_rank are past
+        # the cutoff, and so is everything they dominate: drop them first
+        sample = np.sort(np.random.default_rng(0).choice(n, SAMPLE_SIZE, replace=False))
+        pivots = sample[_nd_ranks(u[sample], max_rank) >= max_rank]
+        alive = ~_dominated(u[pivots], u)
+        alive[pivots] = True
+        rank[~alive] = max_rank + 1
+        alive = np.flatnonzero(alive)
+        rank[alive] = _nd_ranks(u[alive], max_rank + 1)
+    if max_rank is not None:
+        rank = np.minimum(rank, max_rank + 1)
+    return rank[inv]
+
+
+def epsilon_thin(f: np.ndarray, eps) -> np.ndarray:
+    """Indices of an epsilon-dominance subset of ``f``.
+
+    Objective space is cut into boxes of size ``eps`` (scalar or per
+    objective); one point per box (closest to the box corner) survives, and
+    only boxes not dominated by another box are kept.
+    """
+    f = np.asarray(f, dtype=float)
+    if len(f) == 0:
+        return np.zeros(0, dtype=int)
+    finite = np.isfinite(f).all(axis=1)
+    idx = np.flatnonzero(finite)
+    g = f[idx]
+    eps = np.broadcast_to(np.asarray(eps, dtype=float), (f.shape[1],))
+    origin = g.min(axis=0)
+    box = np.floor((g - origin) / eps)
+    ub, inv = _unique_rows(box)
+    dist = (((g - origin) / eps - ub[inv]) ** 2).sum(axis=1)
+    order = np.lexsort((dist, inv))
+    first = order[np.r_[True, np.diff(inv[order]) != 0]]      # one per box
+    keep_box = np.zeros(len(ub), dtype=bool)
+    keep_box[_front(ub)] = True
+    return np.sort(idx[first[keep_box[inv[first]]]])
+
+
+# ---------------------------------------------------------------------------
+# Incremental archive
+# ---------------------------------------------------------------------------
+
+class ParetoArchive:
+    """Running non-dominated set over streamed column chunks.
+
+    ``keep`` names extra columns carried along with each front row; ``ids``
+    holds each row's global index in the stream.
+    """
+
+    def __init__(self, objectives: Mapping[str, str] = DEFAULT_OBJECTIVES,
+                 keep: Sequence[str] = ()):
+        self.objectives = dict(objectives)
+        self.keep = list(keep)
+        self.f = np.empty((0, len(self.objectives)))
+        self.ids = np.empty(0, dtype=np.int64)
+        self.columns: dict[str, np.ndarray] = {}
+        self.seen = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, cols: Mapping[str, np.ndarray]) -> int:
+        """Merge a chunk; returns how many of its rows entered the front."""
+        f = to_minimize(cols, self.objectives)
+        n = len(f)
+        new = np.flatnonzero(skyline(f))
+        new = new[~_dominated_by(self.f, f[new], strict=True)]
+        old_keep = ~_dominated_by(f[new], self.f, strict=True)
+
+        self.f = np.concatenate([self.f[old_keep], f[new]])
+        self.ids = np.concatenate([self.ids[old_keep], self.seen + new])
+        for k in set(self.keep) | set(self.objectives):
+            v = np.asarray(cols[k])
+            prev = self.columns.get(k, v[:0])
+            self.columns[k] = np.concatenate([prev[old_keep], v[new]])
+        self.seen += n
+        return len(new)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Pareto front of a large random sweep")
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=100_000)
+    parser.add_argument("--gas-price", type=float, default=4.00)
+    parser.add_argument("--eps", type=float, default=0.05,
+                        help="Thinning box size as a fraction of each objective's "
+                             "range on the front (default: 0.05)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    base = SystemConfig()
+    archive = ParetoArchive(keep=["teg_count", "hot_inlet_c", "target_dt_fluid_c"])
+    all_f = []
+    t_model = t_front = 0.0
+    for lo in range(0, args.points, args.chunk):
+        n = min(args.chunk, args.points - lo)
+        draws = {"teg_count": rng.integers(10, 250, n) * 36.0,
+                 "hot_inlet_c": rng.uniform(150.0, 210.0, n).round(),
+                 "cold_inlet_c": rng.uniform(25.0, 60.0, n).round(),
+                 "target_dt_fluid_c": rng.uniform(3.0, 40.0, n).round(1)}
+        t0 = time.perf_counter()
+        res = run_batch(base, draws)
+        cols = {**sweep_metrics(res.columns, args.gas_price), **draws}
+        t1 = time.perf_counter()
+        archive.add(cols)
+        t_front += time.perf_counter() - t1
+        t_model += t1 - t0
+        all_f.append(to_minimize(cols))
+
+    f = np.concatenate(all_f)
+    t0 = time.perf_counter()
+    front = skyline(f)
+    t_sky = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ranks = pareto_ranks(f, max_rank=9)
+    t_rank = time.perf_counter() - t0
+    assert front.sum() == len(archive) and (ranks == 0).sum() == front.sum()
+
+    fr = archive.f
+    span = np.where(np.isfinite(fr).all(axis=1)[:, None], fr, np.nan)
+    eps = args.eps * np.maximum(np.nanmax(span, 0) - np.nanmin(span, 0), 1e-12)
+    thin = epsilon_thin(fr, eps)
+
+    print("=" * 82)
+    print(f"  PARETO FRONT -- {len(f):,} sweep points, objectives: "
+          + ", ".join(f"{k} ({s})" for k, s in DEFAULT_OBJECTIVES.items()))
+    print(f"  model {t_model:.1f} s | streaming archive {t_front:.2f} s | "
+          f"skyline {t_sky:.2f} s | ranks 0-9 {t_rank:.2f} s")
+    print(f"  front: {front.sum():,} points, {len(thin)} after eps-thinning "
+          f"({args.eps:g} of range)")
+    print("  rank histogram: " + ", ".join(
+        f"{r}:{c:,}" for r, c in zip(*np.unique(ranks, return_counts=True))))
+    print("=" * 82)
+    c = archive.columns
+    order = thin[np.argsort(-c["net_kw"][thin])]
+    print(f"  {'TEGs':>6s}  {'Hot C':>6s}  {'dT':>5s}  {'Net kW':>7s}  {'$/kWh':>7s}  "
+          f"{'McF/d':>7s}  {'Bores':>5s}")
+    print(f"  {'─' * 54}")
+    for i in order:
+        print(f"  {int(c['teg_count'][i]):>6d}  {c['hot_inlet_c'][i]:>6.0f}  "
+              f"{c['target_dt_fluid_c'][i]:>5.1f}  {c['net_kw'][i]:>7.2f}  "
+              f"{c['cost_per_kwh'][i]:>7.3f}  {c['mcf_day'][i]:>7.2f}  "
+              f"{int(c['boreholes'][i]):>5d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+pcm_string.py  --  PCM board electrical model for mismatched TEGs.
+
+``run_model`` multiplies one per-TEG MPP power by ``teg_count``, which assumes
+every module sits at its own maximum power point.  In the field each PCM board
+runs one MPPT over 36 TEGs wired as S series x P parallel strings, so modules
+with different delta-T drag each other off their individual MPPs.
+
+Each TEG is a Thevenin source (Voc = S*dT, Ri).  With no bypass diodes the
+board is exactly linear:
+
+    string:   Voc_s = sum(Voc_i),  R_s = sum(Ri) + S * r_link
+    board:    Isc = sum(Voc_s / R_s),  R_b = 1 / sum(1 / R_s) + r_lead,
+              V_b = Isc / sum(1 / R_s)
+    P_board   = V_b^2 / (4 * R_b)
+
+Mismatch loss is 1 - P_board / sum(Voc_i^2 / (4 Ri)).  Everything is array
+math over a trailing (..., boards, 36) axis, so many scenarios and layouts
+evaluate in a single call.  When ``teg_count`` is not a multiple of 36 the
+last board carries the remainder, wired as one series string.
+
+Usage:
+    python pcm_string.py
+    python pcm_string.py --teg-type thermonamic --hot-temp 350 --cold-temp 100
+    python pcm_string.py --sigma 0.08 --scenarios 2000
+    python pcm_string.py --check     # no scatter / wiring loss == run_model gross
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+
+from teg_system_model import (
+    SystemConfig, ModelResults, TEGSpec, TEG_CATALOG, run_model,
+)
+
+TEGS_PER_PCM = 36
+
+# (series, parallel) wirings that fill a 36-TEG board
+WIRINGS = [(36, 1), (18, 2), (12, 3), (9, 4), (6, 6), (4, 9)]
+
+
+# ---------------------------------------------------------------------------
+# Board electrical model
+# ---------------------------------------------------------------------------
+
+@dataclass
+class BoardOutput:
+    """Board-level MPP results (arrays shaped like the input minus the TEG axis)."""
+    p_mpp_w: np.ndarray          # board MPP power including wiring loss
+    v_mpp_v: np.ndarray
+    i_mpp_a: np.ndarray
+    p_ideal_w: np.ndarray        # sum of individual TEG MPP powers
+    p_no_wiring_w: np.ndarray    # board MPP power with lossless wiring
+
+    @property
+    def mismatch_loss(self) -> np.ndarray:
+        """Fraction of ideal power lost to electrical mismatch alone."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.p_ideal_w > 0,
+                            1.0 - self.p_no_wiring_w / self.p_ideal_w, 0.0)
+
+    @property
+    def wiring_loss(self) -> np.ndarray:
+        """Fraction of ideal power lost in string wiring / interconnect."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.p_ideal_w > 0,
+                            (self.p_no_wiring_w - self.p_mpp_w) / self.p_ideal_w, 0.0)
+
+
+def _thevenin(voc: np.ndarray, r_int: np.ndarray, n_series: int,
+              r_link_ohm: float, r_lead_ohm: float) -> tuple[np.ndarray, np.ndarray]:
+    """Board Thevenin equivalent (V, R) for the last axis wired S x P."""
+    n_parallel = voc.shape[-1] // n_series
+    shape = voc.shape[:-1] + (n_parallel, n_series)
+    v_str = voc.reshape(shape).sum(axis=-1)
+    r_str = r_int.reshape(shape).sum(axis=-1) + r_link_ohm * n_series
+    g = (1.0 / r_str).sum(axis=-1)
+    i_sc = (v_str / r_str).sum(axis=-1)
+    return i_sc / g, 1.0 / g + r_lead_ohm
+
+
+def board_mpp(voc, r_int, n_series: int = 36, r_link_ohm: float = 0.0,
+              r_lead_ohm: float = 0.0) -> BoardOutput:
+    """Board MPP for TEG sources along the last axis.
+
+    ``voc`` and ``r_int`` broadcast to (..., n_tegs) where n_tegs is a
+    multiple of ``n_series``; TEG k sits in string k // n_series.
+    ``r_link_ohm`` is the interconnect resistance added per series TEG and
+    ``r_lead_ohm`` the board-to-PCM lead resistance; the lead loss is what
+    favours high-voltage (long string) wirings.
+    """
+    voc, r_int = np.broadcast_arrays(np.asarray(voc, dtype=float),
+                                     np.asarray(r_int, dtype=float))
+    if voc.shape[-1] % n_series:
+        raise ValueError(f"{voc.shape[-1]} TEGs cannot be wired {n_series} in series")
+
+    v0, r0 = _thevenin(voc, r_int, n_series, 0.0, 0.0)
+    v, r = _thevenin(voc, r_int, n_series, r_link_ohm, r_lead_ohm)
+    return BoardOutput(
+        p_mpp_w=v**2 / (4.0 * r),
+        v_mpp_v=v / 2.0,
+        i_mpp_a=v / (2.0 * r),
+        p_ideal_w=(voc**2 / (4.0 * r_int)).sum(axis=-1),
+        p_no_wiring_w=v0**2 / (4.0 * r0),
+    )
+
+
+def teg_sources(spec: TEGSpec, dt_c, t_cold_c=None):
+    """Per-TEG (Voc, Ri) from delta-T, using measured curves when available."""
+    dt = np.asarray(dt_c, dtype=float)
+    if t_cold_c is None:
+        seebeck, r_int = spec.seebeck_v_per_k, spec.internal_r_ohm
+    else:
+        seebeck, r_int, _ = spec.properties(np.asarray(t_cold_c) + dt, t_cold_c)
+    return seebeck * dt, np.broadcast_to(r_int, dt.shape)
+
+
+# ---------------------------------------------------------------------------
+# Delta-T distribution across the array
+# ---------------------------------------------------------------------------
+
+def dt_field(cfg: SystemConfig, r: ModelResults, n_scenarios: int = 1,
+             sigma_frac: float = 0.0, flow: str = "parallel",
+             rng: np.random.Generator | None = None) -> np.ndarray:
+    """Per-TEG delta-T for the array in flow order, shape (n_scenarios, teg_count).
+
+    Starts from the model's average TEG delta-T and applies
+    - the loop temperature glide: TEGs are placed in flow order, and with
+      parallel flow the local fluid-to-fluid span falls by the hot plus
+      cold loop dT from inlet to outlet (counter-flow keeps it constant);
+    - independent Gaussian scatter of ``sigma_frac`` (TIM / clamp variation).
+    """
+    x = (np.arange(cfg.teg_count) + 0.5) / cfg.teg_count
+    span_avg = r.t_hot_fluid_avg_c - r.t_cold_fluid_avg_c
+    if flow == "parallel" and span_avg > 0:
+        dt_cold = (cfg.target_dt_fluid_c if cfg.cold_dt_fluid_c is None
+                   else cfg.cold_dt_fluid_c)
+        glide = (cfg.target_dt_fluid_c + dt_cold) * (0.5 - x) / span_avg
+    else:
+        glide = np.zeros_like(x)
+    dt = r.dt_across_teg_c * (1.0 + glide)
+
+    rng = np.random.default_rng(0) if rng is None else rng
+    scatter = rng.normal(0.0, sigma_frac, size=(n_scenarios, dt.size)) if sigma_frac else 0.0
+    dt = np.maximum(dt * (1.0 + scatter), 0.0)
+    return np.broadcast_to(dt, (n_scenarios, x.size))
+
+
+def split_boards(a: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Split a trailing TEG axis into full boards (..., boards, 36) and the
+    remainder (..., teg_count % 36) that sits on the last, partial board."""
+    n_full = a.shape[-1] // TEGS_PER_PCM * TEGS_PER_PCM
+    full = a[..., :n_full].reshape(a.shape[:-1] + (-1, TEGS_PER_PCM))
+    return full, a[..., n_full:]
+
+
+def array_output(cfg: SystemConfig, r: ModelResults, n_series: int = 36,
+                 r_link_ohm: float = 0.0, r_lead_ohm: float = 0.0,
+                 n_scenarios: int = 1, sigma_frac: float = 0.0,
+                 sigma_r_frac: float = 0.0, flow: str = "parallel",
+                 seed: int | None = 0) -> dict:
+    """Gross array power with board-level MPPT, per scenario.
+
+    ``sigma_r_frac`` adds independent Gaussian scatter to each module's
+    internal resistance (manufacturing tolerance).  The same seed gives the
+    same draws for every wiring, so wirings compare on identical arrays.
+
+    Full boards are wired ``n_series`` x (36 / ``n_series``); a partial
+    last board wires its TEGs as one series string.
+
+    Returns arrays over scenarios: gross_w, ideal_w, mismatch_loss,
+    wiring_loss, and the run_model gross for reference.
+    """
+    rng = np.random.default_rng(seed)
+    dt = dt_field(cfg, r, n_scenarios, sigma_frac, flow, rng)
+    t_cold = r.t_teg_cold_c if cfg.teg_spec.curves is not None else None
+    voc, r_int = teg_sources(cfg.teg_spec, dt, t_cold)
+    if sigma_r_frac:
+        r_int = r_int * np.clip(1.0 + rng.normal(0.0, sigma_r_frac, dt.shape), 0.2, None)
+    (voc, voc_rest), (r_int, r_rest) = split_boards(voc), split_boards(r_int)
+    out = board_mpp(voc, r_int, n_series, r_link_ohm, r_lead_ohm)
+    ideal = out.p_ideal_w.sum(axis=-1)
+    gross = out.p_mpp_w.sum(axis=-1)
+    no_wire = out.p_no_wiring_w.sum(axis=-1)
+    if voc_rest.shape[-1]:
+        rest = board_mpp(voc_rest, r_rest, voc_rest.shape[-1], r_link_ohm, r_lead_ohm)
+        ideal = ideal + rest.p_ideal_w
+        gross = gross + rest.p_mpp_w
+        no_wire = no_wire + rest.p_no_wiring_w
+    return {
+        "gross_w": gross,
+        "ideal_w": ideal,
+        "mismatch_loss": 1.0 - no_wire / ideal,
+        "wiring_loss": (no_wire - gross) / ideal,
+        "model_gross_w": r.gross_electrical_w,
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def check() -> None:
+    """Counter flow, no scatter and no wiring loss must give run_model gross."""
+    worst = 0.0
+    cases = 0
+    for teg_type in TEG_CATALOG:
+        for n in (20, 36, 1000, 1620, 5003):
+            cfg = SystemConfig(teg_count=n, teg_spec=TEG_CATALOG[teg_type])
+            r = run_model(cfg)
+            for n_s, _ in WIRINGS:
+                out = array_output(cfg, r, n_s, flow="counter")
+                worst = max(worst, abs(out["gross_w"][0] / r.gross_electrical_w - 1.0))
+                cases += 1
+    print(f"  {cases} cases: max relative deviation vs run_model gross = {worst:.2e}")
+    assert worst < 1e-12, worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PCM board mismatch model")
+    parser.add_argument("--teg-type", choices=list(TEG_CATALOG.keys()), default="marlow")
+    parser.add_argument("--teg-count", type=int, default=1620)
+    parser.add_argument("--hot-temp", type=float, default=200.0)
+    parser.add_argument("--cold-temp", type=float, default=40.0)
+    parser.add_argument("--sigma", type=float, default=0.05,
+                        help="Per-TEG delta-T scatter, fraction (default: 0.05)")
+    parser.add_argument("--sigma-r", type=float, default=0.05,
+                        help="Per-TEG internal resistance scatter, fraction (default: 0.05)")
+    parser.add_argument("--flow", choices=["parallel", "counter"], default="parallel")
+    parser.add_argument("--r-link", type=float, default=0.005,
+                        help="Interconnect resistance per series TEG, ohm (default: 0.005)")
+    parser.add_argument("--r-lead", type=float, default=0.05,
+                        help="Board-to-PCM lead resistance, ohm (default: 0.05)")
+    parser.add_argument("--scenarios", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true",
+                        help="Check that uniform dT with lossless wiring reproduces "
+                             "run_model gross for every wiring")
+    args = parser.parse_args()
+
+    if args.check:
+        check()
+        return
+
+    fluid = "therminol" if args.hot_temp > 220 else "water_glycol"
+    cfg = SystemConfig(teg_count=args.teg_count, teg_spec=TEG_CATALOG[args.teg_type],
+                       hot_fluid=fluid, cold_fluid=fluid,
+                       hot_inlet_c=args.hot_temp, cold_inlet_c=args.cold_temp)
+    r = run_model(cfg)
+
+    print("=" * 78)
+    print(f"  PCM BOARD MISMATCH -- {cfg.teg_spec.name}")
+    print(f"  {cfg.teg_count} TEGs, {args.flow} flow, sigma {args.sigma * 100:.1f}% dT, "
+          f"{args.scenarios} scenarios")
+    print(f"  run_model gross (every TEG at its own MPP): "
+          f"{r.gross_electrical_w / 1000:.2f} kW")
+    print("=" * 78)
+    print(f"  {'Wiring':>8s}  {'Board V':>8s}  {'Gross kW':>9s}  {'P10 kW':>8s}  "
+          f"{'Mismatch':>9s}  {'Wiring':>7s}")
+    print(f"  {'─' * 60}")
+    for n_s, n_p in WIRINGS:
+        out = array_output(cfg, r, n_s, args.r_link, args.r_lead,
+                           n_scenarios=args.scenarios, sigma_frac=args.sigma,
+                           sigma_r_frac=args.sigma_r, flow=args.flow, seed=args.seed)
+        v_board = n_s * cfg.teg_spec.seebeck_v_per_k * r.dt_across_teg_c / 2.0
+        print(f"  {f'{n_s}s{n_p}p':>8s}  {v_board:>8.1f}  "
+              f"{out['gross_w'].mean() / 1000:>9.3f}  "
+              f"{np.percentile(out['gross_w'], 10) / 1000:>8.3f}  "
+              f"{out['mismatch_loss'].mean() * 100:>8.2f}%  "
+              f"{out['wiring_loss'].mean() * 100:>6.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+progress.py  --  Live progress and metrics export for long sweeps.
+
+A ``SweepProgress`` is fed one update per evaluated point or chunk and keeps
+
+    points done / planned, points/s, ETA, elapsed
+    per-worker busy time and utilization (busy / wall, by worker slot)
+    property cache hit rate (rows served by the batch model's per-chunk
+        de-duplication or the precomputed fluid table, over rows requested)
+    failed points (non-finite net output) and non-converged points
+        (thermal-chain residual above CONVERGENCE_TOL)
+
+It draws a live status line on stderr when that is a terminal, and with a
+metrics path rewrites a Prometheus text file (``.prom``; atomic replace, for
+the node_exporter textfile collector) or appends JSON lines (``.jsonl``)
+every ``interval`` seconds and once at the end.
+
+Usage:
+    python sweep_plot.py --points 10000000 --workers 4 --metrics sweep.prom
+    python sweep.py --metrics sweep.jsonl --no-progress
+
+In code::
+
+    with SweepProgress(total, "study", metrics_path="study.prom") as prog:
+        cols = run_batch_chunked(base, draws, outputs, progress=prog)
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Mapping, Optional, TextIO
+
+import numpy as np
+
+from instrumentation import PROFILE
+
+# ``convergence_residual`` (relative change in R_total over the model's last
+# fixed-point pass) above which a point counts as non-converged
+CONVERGENCE_TOL = 1e-6
+
+METRIC_PREFIX = "teg_sweep"
+LIVE_REFRESH_S = 0.25
+
+
+# ---------------------------------------------------------------------------
+# Per-point health and property counters
+# ---------------------------------------------------------------------------
+
+def result_health(cols: Mapping[str, object]) -> tuple[int, int]:
+    """(failed, non-converged) point counts for model result columns.
+
+    Accepts ``BatchResults.columns`` or a single ``ModelResults`` as a dict
+    (``vars(r)``).  Failed: net output not finite.  Non-converged: the
+    model's ``convergence_residual`` is above ``CONVERGENCE_TOL``.
+    """
+    net = np.asarray(cols["net_electrical_kw"], dtype=float)
+    resid = np.asarray(cols["convergence_residual"], dtype=float)
+    failed = ~np.isfinite(net)
+    nonconv = ~failed & ~(resid <= CONVERGENCE_TOL)
+    return int(failed.sum()), int(nonconv.sum())
+
+
+def property_cache_counts(counters: Mapping[str, int]) -> tuple[int, int]:
+    """(rows requested, rows served from a cache) from PROFILE counters.
+
+    Batch rows beyond the unique (fluid, T) evaluations are de-duplication
+    hits; water/glycol evaluations answered by the fluid table are hits too.
+    """
+    evaluations = counters.get("property_lookups", 0)
+    requested = counters.get("batch_property_rows", 0) or evaluations
+    hits = requested - evaluations + counters.get("fluid_table_hits", 0)
+    return requested, hits
+
+
+@contextmanager
+def counting():
+    """Collect PROFILE counters over a block; yields the delta Counter."""
+    was_enabled = PROFILE.enabled
+    before = Counter(PROFILE.counters)
+    delta: Counter = Counter()
+    PROFILE.enable()
+    try:
+        yield delta
+    finally:
+        if not was_enabled:
+            PROFILE.disable()
+        delta.update(PROFILE.counters)
+        delta.subtract(before)
+
+
+# ---------------------------------------------------------------------------
+# Progress tracker
+# ---------------------------------------------------------------------------
+
+class SweepProgress:
+    """Progress, throughput and health of one sweep."""
+
+    def __init__(self, total: int, study: str = "sweep", workers: int = 1,
+                 live: Optional[bool] = None, metrics_path: Optional[str] = None,
+                 interval: float = 5.0, file: TextIO = sys.stderr):
+        self.total = int(total)
+        self.study = study
+        self.workers = max(1, int(workers))
+        self.file = file
+        self.live = file.isatty() if live is None else live
+        self.metrics_path = Path(metrics_path) if metrics_path else None
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.nonconverged = 0
+        self.property_rows = 0
+        self.property_hits = 0
+        self.busy: defaultdict = defaultdict(float)    # worker slot -> busy s
+        self._slots: dict = {}
+        self.started = time.perf_counter()
+        self.started_unix = time.time()
+        self.finished = False
+        self._last_draw = 0.0
+        self._last_write = 0.0
+        self._line_len = 0
+
+    # -- feeding ----------------------------------------------------------
+
+    def update(self, points: int, busy_s: float = 0.0, worker: object = None,
+               failed: int = 0, nonconverged: int = 0,
+               counters: Optional[Mapping[str, int]] = None) -> None:
+        """Record ``points`` finished points (one unit of work)."""
+        self.done += int(points)
+        self.failed += int(failed)
+        self.nonconverged += int(nonconverged)
+        # Pools may be recreated per batch: fold process ids onto worker slots
+        worker = os.getpid() if worker is None else worker
+        slot = self._slots.setdefault(worker, len(self._slots) % self.workers)
+        self.busy[slot] += busy_s
+        if counters:
+            rows, hits = property_cache_counts(counters)
+            self.property_rows += rows
+            self.property_hits += hits
+        now = time.perf_counter()
+        draw = self.live and now - self._last_draw >= LIVE_REFRESH_S
+        write = self.metrics_path is not None and now - self._last_write >= self.interval
+        if draw or write:
+            self.emit(draw, write)
+
+    def record(self, cols: Mapping[str, object], points: int, busy_s: float,
+               counters: Optional[Mapping[str, int]] = None, worker: object = None) -> None:
+        """``update`` with failure / convergence counts taken from results."""
+        failed, nonconv = result_health(cols)
+        self.update(points, busy_s, worker, failed, nonconv, counters)
+
+    # -- derived values ---------------------------------------------------
+
+    def snapshot(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        left = max(self.total - self.done, 0)
+        eta = left / rate if rate > 0 else None
+        util = {str(w): (b / elapsed if elapsed > 0 else 0.0)
+                for w, b in sorted(self.busy.items())}
+        return {
+            "study": self.study, "time": time.time(), "started": self.started_unix,
+            "elapsed_s": elapsed, "points_done": self.done, "points_total": self.total,
+            "fraction": self.done / self.total if self.total else 1.0,
+            "points_per_s": rate, "eta_s": 0.0 if self.finished else eta,
+            "failed": self.failed, "nonconverged": self.nonconverged,
+            "cache_hit_rate": (self.property_hits / self.property_rows
+                               if self.property_rows else None),
+            "workers": self.workers,
+            "utilization": sum(util.values()) / self.workers,
+            "worker_utilization": util, "finished": self.finished,
+        }
+
+    # -- output -----------------------------------------------------------
+
+    def emit(self, draw: bool = True, write: bool = True) -> None:
+        snap = self.snapshot()
+        now = time.perf_counter()
+        if self.live and draw:
+            self._last_draw = now
+            self._draw(snap)
+        if self.metrics_path and write:
+            self._last_write = now
+            write_metrics(self.metrics_path, snap)
+
+    def _draw(self, s: dict) -> None:
+        cache = f"{s['cache_hit_rate'] * 100:.1f}%" if s["cache_hit_rate"] is not None else "-"
+        line = (f"  {s['study']}  {s['points_done']:,}/{s['points_total']:,} "
+                f"({s['fraction'] * 100:.0f}%)  {s['points_per_s']:,.0f} pts/s  "
+                f"ETA {format_duration(s['eta_s'])}  "
+                f"util {s['utilization'] * 100:.0f}% x{s['workers']}  cache {cache}  "
+                f"failed {s['failed']:,}  non-conv {s['nonconverged']:,}")
+        pad = max(self._line_len - len(line), 0)
+        self._line_len = len(line)
+        print("\r" + line + " " * pad, end="", file=self.file, flush=True)
+
+    def close(self) -> None:
+        self.finished = True
+        self.emit()
+        if self.live:
+            print(file=self.file, flush=True)
+
+    def __enter__(self) -> "SweepProgress":
+        self.emit()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def format_duration(s: Optional[float]) -> str:
+    if s is None or not math.isfinite(s):
+        return "--"
+    s = int(round(s))
+    if s >= 3600:
+        return f"{s // 3600}h{s % 3600 // 60:02d}m"
+    if s >= 60:
+        return f"{s // 60}m{s % 60:02d}s"
+    return f"{s}s"
+
+
+# ---------------------------------------------------------------------------
+# Metrics files
+# ---------------------------------------------------------------------------
+
+# (name, type, help, snapshot key)
+_METRICS = [
+    ("points_evaluated_total", "counter", "Sweep points evaluated.", "points_done"),
+    ("points_planned", "gauge", "Sweep points planned.", "points_total"),
+    ("points_per_second", "gauge", "Mean evaluation rate since start.", "points_per_s"),
+    ("eta_seconds", "gauge", "Estimated seconds to completion.", "eta_s"),
+    ("elapsed_seconds", "gauge", "Seconds since the sweep started.", "elapsed_s"),
+    ("failed_points_total", "counter", "Points with non-finite net output.", "failed"),
+    ("nonconverged_points_total", "counter", "Points whose thermal chain did not converge.",
+     "nonconverged"),
+    ("property_cache_hit_ratio", "gauge",
+     "Fluid property rows served from a cache over rows requested.", "cache_hit_rate"),
+    ("utilization_ratio", "gauge", "Mean worker busy time over wall time.", "utilization"),
+    ("finished", "gauge", "1 once the sweep has completed.", "finished"),
+]
+
+
+def prometheus_text(snap: dict) -> str:
+    """Snapshot in the Prometheus text exposition format."""
+    study = snap["study"].replace("\\", "\\\\").replace('"', '\\"')
+    lines = []
+    for name, kind, help_, key in _METRICS:
+        value = snap[key]
+        if value is None:
+            continue
+        lines += [f"# HELP {METRIC_PREFIX}_{name} {help_}",
+                  f"# TYPE {METRIC_PREFIX}_{name} {kind}",
+                  f'{METRIC_PREFIX}_{name}{{study="{study}"}} {float(value):.6g}']
+    name = f"{METRIC_PREFIX}_worker_utilization_ratio"
+    lines += [f"# HELP {name} Worker busy time over wall time.", f"# TYPE {name} gauge"]
+    for worker, u in snap["worker_utilization"].items():
+        lines.append(f'{name}{{study="{study}",worker="{worker}"}} {u:.6g}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: Path, snap: dict) -> None:
+    """Rewrite ``path`` (Prometheus text) or append to it (``.jsonl``)."""
+    if path.suffix == ".jsonl":
+        with open(path, "a") as f:
+            f.write(json.dumps(snap) + "\n")
+        return
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(prometheus_text(snap))
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# CLI helpers
+# ---------------------------------------------------------------------------
+
+def add_progress_arguments(parser) -> None:
+    """``--no-progress`` / ``--metrics`` on a CLI's argparse parser."""
+    parser.add_argument("--no-progress", action="store_true",
+                        help="No live progress line (default: shown when stderr is a terminal)")
+    parser.add_argument("--metrics", metavar="FILE", default=None,
+                        help="Write progress metrics to FILE: Prometheus text, or "
+                             "JSON lines if it ends in .jsonl")
+    parser.add_argument("--metrics-interval", type=float, default=5.0, metavar="S",
+                        help="Seconds between metrics updates (default: 5)")
+
+
+def progress_from_args(args, total: int, study: str, workers: int = 1
+                       ) -> Optional[SweepProgress]:
+    """A ``SweepProgress`` per ``add_progress_arguments`` flags, or None."""
+    live = not args.no_progress and sys.stderr.isatty()
+    if not live and not args.metrics:
+        return None
+    return SweepProgress(total, study, workers, live=live, metrics_path=args.metrics,
+                         interval=args.metrics_interval)
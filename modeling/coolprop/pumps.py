@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+pumps.py  --  Pump curves, system-curve intersection, and VFD speed selection.
+
+Replaces the constant ``SystemConfig.pump_efficiency`` with datasheet-style
+polynomial curves at rated speed (Q in m^3/h, H in m of head):
+
+    H(Q)   = h0 + h1*Q + h2*Q^2
+    eta(Q) = e0 + e1*Q + e2*Q^2
+
+scaled to a VFD speed ratio s = n / n_rated with the affinity laws:
+
+    H(Q, s)   = h0*s^2 + h1*s*Q + h2*Q^2
+    eta(Q, s) = eta(Q / s)
+
+The hot and cold loops are closed, so there is no static head and the system
+curve is H_sys = k*Q^2, with k taken from the model's pressure drop at its
+design flow.  Every solver here is closed-form and broadcasts over NumPy
+arrays, so a sweep of thousands of operating points -- against every pump in
+the library and every parallel-pump count -- is a single call.
+
+Usage:
+    python pumps.py
+    python pumps.py --teg-type thermonamic --hot-temp 350 --cold-temp 100
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+
+G = 9.80665                 # m/s^2
+M3S_TO_M3H = 3600.0
+
+# ---------------------------------------------------------------------------
+# Pump library
+# ---------------------------------------------------------------------------
+
+def _bep_coeffs(eta_bep: float, q_bep_m3h: float) -> tuple[float, float, float]:
+    """Efficiency parabola through the origin peaking at the BEP."""
+    return (0.0, 2.0 * eta_bep / q_bep_m3h, -eta_bep / q_bep_m3h**2)
+
+
+@dataclass(frozen=True)
+class PumpCurve:
+    """Centrifugal pump head/efficiency curves at rated speed."""
+    name: str
+    head_coeffs: tuple[float, float, float]   # h0, h1, h2 (m, Q in m^3/h)
+    eff_coeffs: tuple[float, float, float]    # e0, e1, e2 (-, Q in m^3/h)
+    max_flow_m3h: float                       # runout flow at rated speed
+    motor_efficiency: float = 0.90            # motor + VFD, wire-to-shaft
+    min_speed: float = 0.30                   # VFD lower limit (fraction)
+    max_speed: float = 1.00                   # VFD upper limit (fraction)
+
+
+# Representative curves digitized from vendor literature (60 Hz, 3500 rpm
+# close-coupled units).  Good enough for parasitic estimates, not for
+# procurement.
+INLINE_1HP = PumpCurve(
+    name="In-line circulator 1 hp",
+    head_coeffs=(14.0, 0.05, -0.030),
+    eff_coeffs=_bep_coeffs(0.52, 12.0),
+    max_flow_m3h=21.0,
+    motor_efficiency=0.84,
+)
+
+END_SUCTION_3HP = PumpCurve(
+    name="End-suction 3 hp",
+    head_coeffs=(28.0, 0.10, -0.018),
+    eff_coeffs=_bep_coeffs(0.66, 24.0),
+    max_flow_m3h=40.0,
+    motor_efficiency=0.88,
+)
+
+END_SUCTION_7HP = PumpCurve(
+    name="End-suction 7.5 hp",
+    head_coeffs=(40.0, 0.05, -0.0065),
+    eff_coeffs=_bep_coeffs(0.74, 50.0),
+    max_flow_m3h=78.0,
+    motor_efficiency=0.91,
+)
+
+HOT_OIL_MAGDRIVE = PumpCurve(
+    name="Hot-oil mag-drive 5 hp",
+    head_coeffs=(36.0, 0.0, -0.0090),
+    eff_coeffs=_bep_coeffs(0.60, 35.0),
+    max_flow_m3h=58.0,
+    motor_efficiency=0.89,
+)
+
+PUMP_LIBRARY = {
+    "inline_1hp": INLINE_1HP,
+    "endsuction_3hp": END_SUCTION_3HP,
+    "endsuction_7hp": END_SUCTION_7HP,
+    "hot_oil_5hp": HOT_OIL_MAGDRIVE,
+}
+
+
+# ---------------------------------------------------------------------------
+# Curves and affinity laws
+# ---------------------------------------------------------------------------
+
+def pump_head(pump: PumpCurve, q_m3h, speed=1.0):
+    """Pump head (m) at flow Q (m^3/h, per pump) and speed ratio s."""
+    h0, h1, h2 = pump.head_coeffs
+    q = np.asarray(q_m3h, dtype=float)
+    s = np.asarray(speed, dtype=float)
+    return h0 * s**2 + h1 * s * q + h2 * q**2
+
+
+def pump_efficiency(pump: PumpCurve, q_m3h, speed=1.0):
+    """Hydraulic efficiency at flow Q and speed ratio s (affinity-scaled)."""
+    e0, e1, e2 = pump.eff_coeffs
+    q_rated = np.asarray(q_m3h, dtype=float) / np.asarray(speed, dtype=float)
+    return np.clip(e0 + e1 * q_rated + e2 * q_rated**2, 0.05, 1.0)
+
+
+def system_curve_k(dp_pa, q_m3s, rho):
+    """System-curve coefficient k (m per (m^3/h)^2) from a design point."""
+    head = np.asarray(dp_pa, dtype=float) / (np.asarray(rho, dtype=float) * G)
+    q_m3h = np.asarray(q_m3s, dtype=float) * M3S_TO_M3H
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(q_m3h > 0, head / q_m3h**2, 0.0)
+
+
+# ---------------------------------------------------------------------------
+# Solvers
+# ---------------------------------------------------------------------------
+
+def operating_point(pump: PumpCurve, k, speed=1.0, n_parallel=1):
+    """Intersect the pump and system curves.
+
+    Solves h0*s^2 + h1*s*q + h2*q^2 = k*(n*q)^2 for the per-pump flow q.
+    Returns (total flow m^3/h, head m).  Broadcasts over all arguments.
+    """
+    h0, h1, h2 = pump.head_coeffs
+    k = np.asarray(k, dtype=float)
+    s = np.asarray(speed, dtype=float)
+    n = np.asarray(n_parallel, dtype=float)
+    a = h2 - k * n**2                  # always < 0 for a falling curve
+    b = h1 * s
+    c = h0 * s**2
+    q = (-b - np.sqrt(b**2 - 4.0 * a * c)) / (2.0 * a)
+    q_total = n * q
+    return q_total, k * q_total**2
+
+
+def speed_for_flow(pump: PumpCurve, k, q_total_m3h, n_parallel=1):
+    """VFD speed ratio at which n parallel pumps deliver Q on the system curve.
+
+    Solves h0*s^2 + h1*q*s + h2*q^2 - k*Q^2 = 0 for s, with q = Q/n.
+    """
+    h0, h1, h2 = pump.head_coeffs
+    big_q = np.asarray(q_total_m3h, dtype=float)
+    q = big_q / np.asarray(n_parallel, dtype=float)
+    c = h2 * q**2 - np.asarray(k, dtype=float) * big_q**2
+    disc = np.maximum(h1**2 * q**2 - 4.0 * h0 * c, 0.0)
+    return (-h1 * q + np.sqrt(disc)) / (2.0 * h0)
+
+
+@dataclass
+class PumpOperation:
+    """Pump operating state per point (all fields are arrays)."""
+    speed: np.ndarray            # VFD speed ratio
+    n_parallel: np.ndarray       # pumps running in parallel
+    head_m: np.ndarray           # pump head (includes any throttled excess)
+    efficiency: np.ndarray       # wire-to-water efficiency
+    power_w: np.ndarray          # electrical input, all pumps
+    feasible: np.ndarray         # bool: pump can deliver the flow
+
+
+def run_at_flow(pump: PumpCurve, dp_pa, q_m3s, rho, n_parallel=1) -> PumpOperation:
+    """Run a pump at the minimum-power VFD speed that delivers the flow.
+
+    On a closed loop with no static head the shaft power rises roughly with
+    s^3, so the optimum is the lowest speed that meets the flow.  Below the
+    VFD minimum the pump runs at ``min_speed`` and the balancing valve takes
+    up the excess head, which is charged to the pump.
+    """
+    q_total = np.asarray(q_m3s, dtype=float) * M3S_TO_M3H
+    n = np.asarray(n_parallel, dtype=float)
+    k = system_curve_k(dp_pa, q_m3s, rho)
+
+    s_req = speed_for_flow(pump, k, q_total, n)
+    speed = np.maximum(s_req, pump.min_speed)
+    q_each = q_total / n
+    head = pump_head(pump, q_each, speed)
+    eta_h = pump_efficiency(pump, q_each, speed)
+    eta = eta_h * pump.motor_efficiency
+
+    hydraulic_w = np.asarray(rho, dtype=float) * G * head * q_total / M3S_TO_M3H
+    power = hydraulic_w / eta
+    feasible = (s_req <= pump.max_speed) & (q_each / speed <= pump.max_flow_m3h)
+    return PumpOperation(
+        speed=speed, n_parallel=np.broadcast_to(n, speed.shape).copy(),
+        head_m=head, efficiency=eta, power_w=np.where(feasible, power, np.inf),
+        feasible=feasible,
+    )
+
+
+@dataclass
+class PumpSelection:
+    """Best pump per point from a library search."""
+    names: list[str]             # library keys, indexed by ``choice``
+    choice: np.ndarray           # index into ``names`` (-1 if infeasible)
+    op: PumpOperation
+
+
+def select_pumps(dp_pa, q_m3s, rho, library: dict[str, PumpCurve] | None = None,
+                 max_parallel: int = 3) -> PumpSelection:
+    """Pick the pump, parallel count and VFD speed minimizing power.
+
+    Evaluates every (point, pump, n_parallel) combination in one broadcast
+    pass, so the cost is a few array ops regardless of sweep size.
+    """
+    library = PUMP_LIBRARY if library is None else library
+    names = list(library)
+    dp = np.atleast_1d(np.asarray(dp_pa, dtype=float))
+    q = np.atleast_1d(np.asarray(q_m3s, dtype=float))
+    rho_a = np.atleast_1d(np.asarray(rho, dtype=float))
+    dp, q, rho_a = np.broadcast_arrays(dp, q, rho_a)
+    n_opts = np.arange(1, max_parallel + 1, dtype=float)
+
+    fields = ("speed", "n_parallel", "head_m", "efficiency", "power_w", "feasible")
+    stacked = {f: [] for f in fields}
+    for key in names:
+        op = run_at_flow(library[key], dp[:, None], q[:, None], rho_a[:, None],
+                         n_opts[None, :])
+        for f in fields:
+            stacked[f].append(getattr(op, f))
+    # shape: (points, pumps * n_opts)
+    cube = {f: np.concatenate(v, axis=1) for f, v in stacked.items()}
+
+    best = np.argmin(cube["power_w"], axis=1)
+    rows = np.arange(len(best))
+    picked = {f: cube[f][rows, best] for f in fields}
+    choice = np.where(picked["feasible"], best // max_parallel, -1)
+    return PumpSelection(names=names, choice=choice, op=PumpOperation(**picked))
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    from teg_system_model import SystemConfig, TEG_CATALOG, get_fluid_props, run_model
+
+    parser = argparse.ArgumentParser(description="Pump selection for the TEG loops")
+    parser.add_argument("--teg-type", choices=list(TEG_CATALOG.keys()), default="marlow")
+    parser.add_argument("--hot-temp", type=float, default=200.0)
+    parser.add_argument("--cold-temp", type=float, default=40.0)
+    parser.add_argument("--max-parallel", type=int, default=3)
+    args = parser.parse_args()
+
+    fluid = "therminol" if args.hot_temp > 220 else "water_glycol"
+    teg_counts = np.array([500, 1000, 1620, 3000, 5000, 8000])
+    dp_hot, q_hot, rho_hot, dp_cold, q_cold, rho_cold = ([] for _ in range(6))
+    for n in teg_counts:
+        cfg = SystemConfig(teg_count=int(n), teg_spec=TEG_CATALOG[args.teg_type],
+                           hot_fluid=fluid, cold_fluid=fluid,
+                           hot_inlet_c=args.hot_temp, cold_inlet_c=args.cold_temp)
+        r = run_model(cfg)
+        dp_hot.append(r.hot_dp_total_pa)
+        q_hot.append(r.hot_flow_rate_m3s)
+        rho_hot.append(get_fluid_props(fluid, r.t_hot_fluid_avg_c)["rho"])
+        dp_cold.append(r.cold_dp_total_pa)
+        q_cold.append(r.cold_flow_rate_m3s)
+        rho_cold.append(get_fluid_props(fluid, r.t_cold_fluid_avg_c)["rho"])
+
+    for loop, dp, q, rho in (("HOT", dp_hot, q_hot, rho_hot),
+                             ("COLD", dp_cold, q_cold, rho_cold)):
+        sel = select_pumps(dp, q, rho, max_parallel=args.max_parallel)
+        fixed_w = np.asarray(dp) * np.asarray(q) / 0.65
+        print(f"\n{'=' * 88}")
+        print(f"  {loop} LOOP PUMP SELECTION  ({args.teg_type}, {fluid})")
+        print(f"{'=' * 88}")
+        print(f"  {'TEGs':>6s}  {'GPM':>6s}  {'dp kPa':>7s}  {'Pump':<24s}  "
+              f"{'N':>2s}  {'Speed':>6s}  {'Eff':>6s}  {'Power W':>8s}  {'@0.65':>8s}")
+        print(f"  {'─' * 84}")
+        for i, n in enumerate(teg_counts):
+            c = sel.choice[i]
+            if c >= 0:
+                name = PUMP_LIBRARY[sel.names[c]].name
+                op = (f"{sel.op.n_parallel[i]:>2.0f}  {sel.op.speed[i]:>6.2f}  "
+                      f"{sel.op.efficiency[i] * 100:>5.1f}%  {sel.op.power_w[i]:>8.0f}")
+            else:
+                name = "(none feasible)"
+                op = f"{'-':>2s}  {'-':>6s}  {'-':>6s}  {'-':>8s}"
+            print(f"  {n:>6d}  {q[i] * 15850.3:>6.1f}  {dp[i] / 1000:>7.1f}  {name:<24s}  "
+                  f"{op}  {fixed_w[i]:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+result_store.py  --  Memory-mapped columnar store and query layer for sweeps.
+
+Answering "net kW at 3,000 TEGs, 320 C, $4 gas" should not mean re-running
+a sweep or grepping printed tables.  A store is a directory
+
+    meta.json        input (index) dimensions, categories, grid axes
+    <column>.npy     one array per column
+
+with rows sorted lexicographically on the input dimensions (categorical
+inputs such as ``teg_type`` are stored as integer codes).  Columns are
+opened with ``np.load(mmap_mode="r")``, so opening a study is instant and a
+query only pages in what it reads.  On that sorted layout:
+
+    lookup(point)       exact row, nested binary search -- O(d log n)
+    select(where)       equality and (lo, hi) range filters; leading
+                        dimensions narrow by binary search, the rest by a
+                        mask over the narrowed slice
+    interpolate(point)  multilinear between stored points when the inputs
+                        form a full grid (detected when the store is written)
+
+``StoreWriter`` streams chunks to disk and sorts on close one column at a
+time, so building a store does not need the whole study in memory.
+
+Usage:
+    python result_store.py build studies/baseline
+    python result_store.py info studies/baseline
+    python result_store.py query studies/baseline --where teg_type=thermonamic \\
+        --where hot_inlet_c=320 --where cold_inlet_c=100 --where teg_count=3000 --gas-price 4
+    python result_store.py query studies/baseline --where teg_type=marlow \\
+        --where teg_count=1000:3000 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from batch_model import run_batch_chunked
+from pareto import sweep_metrics
+from teg_system_model import SystemConfig, TEG_CATALOG, _json_value
+
+FORMAT_VERSION = 1
+CHUNK_ROWS = 1_000_000       # rows per copy when sorting columns on close
+
+#: Model outputs written by ``build_grid`` (``sweep_metrics`` needs the last two).
+STORED_OUTPUTS = (
+    "net_electrical_kw", "gross_electrical_w", "power_per_teg_w", "teg_efficiency",
+    "t_teg_hot_c", "t_teg_cold_c", "hot_flow_rate_gpm", "cold_flow_rate_gpm",
+    "pump_power_total_w", "total_heat_input_w", "total_heat_rejection_w",
+)
+#: Stored outputs ``with_metrics`` derives its columns from.
+METRIC_INPUTS = ("net_electrical_kw", "total_heat_input_w", "total_heat_rejection_w")
+
+Criterion = Union[float, str, tuple]
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+class StoreWriter:
+    """Append column chunks, then sort and index them on ``close()``.
+
+    ``inputs`` are the index dimensions, most significant first.  String
+    valued inputs are categorical; their codes follow first appearance.
+    """
+
+    def __init__(self, path: Union[str, Path], inputs: Sequence[str]):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.inputs = list(inputs)
+        self.categories: dict[str, list[str]] = {}
+        self.dtypes: dict[str, str] = {}
+        self.n = 0
+        self._raw: dict = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    def append(self, cols: Mapping[str, np.ndarray]) -> None:
+        missing = set(self.inputs) - set(cols)
+        if missing:
+            raise KeyError(f"Chunk is missing input columns: {sorted(missing)}")
+        if self._raw and set(cols) != set(self._raw):
+            raise KeyError("Chunk columns differ from earlier chunks")
+        size = max(np.size(v) for v in cols.values())
+        for k, v in cols.items():
+            arr = np.broadcast_to(np.asarray(v), (size,))
+            if arr.dtype.kind in "OUS":
+                cats = self.categories.setdefault(k, [])
+                for s in dict.fromkeys(arr.tolist()):
+                    if s not in cats:
+                        cats.append(s)
+                arr = np.array([cats.index(s) for s in arr.tolist()], dtype=np.int32)
+            elif arr.dtype.kind not in "biuf":
+                raise TypeError(f"Column {k!r} has unsupported dtype {arr.dtype}")
+            dtype = self.dtypes.setdefault(k, arr.dtype.str)
+            if k not in self._raw:
+                self._raw[k] = open(self.path / f"{k}.raw", "wb")
+            np.ascontiguousarray(arr, dtype=dtype).tofile(self._raw[k])
+        self.n += size
+
+    def _discard(self) -> None:
+        for k, fh in self._raw.items():
+            fh.close()
+            (self.path / f"{k}.raw").unlink(missing_ok=True)
+
+    def close(self) -> "ResultStore":
+        for fh in self._raw.values():
+            fh.close()
+        raw = {k: np.memmap(self.path / f"{k}.raw", dtype=self.dtypes[k], mode="r",
+                            shape=(self.n,)) if self.n else np.zeros(0, self.dtypes[k])
+               for k in self._raw}
+
+        # np.lexsort takes the most significant key last
+        order = np.lexsort([np.asarray(raw[k]) for k in reversed(self.inputs)])
+        for k, src in raw.items():
+            dst = np.lib.format.open_memmap(self.path / f"{k}.npy", mode="w+",
+                                            dtype=self.dtypes[k], shape=(self.n,))
+            for lo in range(0, self.n, CHUNK_ROWS):
+                dst[lo:lo + CHUNK_ROWS] = src[order[lo:lo + CHUNK_ROWS]]
+            dst.flush()
+            del dst
+        del raw
+        for k in self._raw:
+            (self.path / f"{k}.raw").unlink()
+
+        store_cols = {k: np.load(self.path / f"{k}.npy", mmap_mode="r") for k in self._raw}
+        meta = {
+            "version": FORMAT_VERSION,
+            "rows": self.n,
+            "inputs": self.inputs,
+            "columns": {k: self.dtypes[k] for k in self._raw},
+            "categories": self.categories,
+            "grid": _detect_grid(store_cols, self.inputs, self.n),
+        }
+        (self.path / "meta.json").write_text(json.dumps(meta, indent=2))
+        return ResultStore(self.path)
+
+
+def _detect_grid(cols, inputs, n) -> Optional[list[list[float]]]:
+    """Axis values if the sorted rows are a full, duplicate-free grid."""
+    if n == 0:
+        return None
+    axes = [np.unique(cols[k]) for k in inputs]
+    if int(np.prod([len(a) for a in axes])) != n:
+        return None
+    # A full grid in lexicographic order repeats each axis with a fixed stride
+    stride = n
+    for k, a in zip(inputs, axes):
+        stride //= len(a)
+        expected = np.repeat(a, stride)
+        for lo in range(0, n, len(expected)):
+            if not np.array_equal(cols[k][lo:lo + len(expected)], expected):
+                return None
+    return [a.tolist() for a in axes]
+
+
+# ---------------------------------------------------------------------------
+# Reading and queries
+# ---------------------------------------------------------------------------
+
+class ResultStore:
+    """Read-only view of a store directory."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        meta = json.loads((self.path / "meta.json").read_text())
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: unsupported store version {meta['version']}")
+        self.meta = meta
+        self.n: int = meta["rows"]
+        self.inputs: list[str] = meta["inputs"]
+        self.categories: dict[str, list[str]] = meta["categories"]
+        self.grid: Optional[list[np.ndarray]] = (
+            None if meta["grid"] is None else [np.asarray(a) for a in meta["grid"]])
+        self.columns = {k: np.load(self.path / f"{k}.npy", mmap_mode="r")
+                        for k in meta["columns"]}
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def outputs(self) -> list[str]:
+        return [k for k in self.columns if k not in self.inputs]
+
+    def _code(self, dim: str, value) -> float:
+        if dim in self.categories:
+            try:
+                return self.categories[dim].index(value)
+            except ValueError:
+                raise KeyError(f"{dim}={value!r} not in store "
+                               f"({', '.join(self.categories[dim])})") from None
+        return float(value)
+
+    def decode(self, cols: Mapping[str, np.ndarray]) -> dict[str, np.ndarray]:
+        """Replace categorical codes with their labels."""
+        return {k: (np.asarray(self.categories[k], dtype=object)[np.asarray(v)]
+                    if k in self.categories else v) for k, v in cols.items()}
+
+    def _rows(self, where: Mapping[str, Criterion]) -> tuple[int, int, Optional[np.ndarray]]:
+        """Row slice [lo, hi) and an optional mask within it matching ``where``."""
+        unknown = set(where) - set(self.columns)
+        if unknown:
+            raise KeyError(f"Unknown columns: {sorted(unknown)}")
+        lo, hi = 0, self.n
+        rest = dict(where)
+        for dim in self.inputs:
+            if dim not in rest:
+                break
+            col = self.columns[dim][lo:hi]
+            crit = rest.pop(dim)
+            if isinstance(crit, tuple):
+                a, b = (self._code(dim, c) for c in crit)
+                lo, hi = (lo + int(np.searchsorted(col, a, "left")),
+                          lo + int(np.searchsorted(col, b, "right")))
+                break            # rows below a range are no longer sorted
+            v = self._code(dim, crit)
+            lo, hi = (lo + int(np.searchsorted(col, v, "left")),
+                      lo + int(np.searchsorted(col, v, "right")))
+
+        if not rest or hi <= lo:
+            return lo, hi, None
+        mask = np.ones(hi - lo, dtype=bool)
+        for k, crit in rest.items():
+            col = np.asarray(self.columns[k][lo:hi])
+            if isinstance(crit, tuple):
+                a, b = (self._code(k, c) for c in crit)
+                mask &= (col >= a) & (col <= b)
+            else:
+                mask &= col == self._code(k, crit)
+        return lo, hi, mask
+
+    def select(self, where: Mapping[str, Criterion],
+               columns: Optional[Sequence[str]] = None) -> dict[str, np.ndarray]:
+        """Rows matching ``where`` (value, or (lo, hi) inclusive range per column)."""
+        lo, hi, mask = self._rows(where)
+        out = {}
+        for k in columns or list(self.columns):
+            v = np.asarray(self.columns[k][lo:hi])
+            out[k] = v if mask is None else v[mask]
+        return self.decode(out)
+
+    def lookup(self, point: Mapping[str, Criterion],
+               columns: Optional[Sequence[str]] = None) -> dict[str, object]:
+        """The stored row at an exact input point (all inputs given)."""
+        missing = set(self.inputs) - set(point)
+        if missing:
+            raise KeyError(f"lookup needs every input; missing {sorted(missing)}")
+        lo, hi, _ = self._rows({k: point[k] for k in self.inputs})
+        if hi <= lo:
+            raise KeyError(f"No stored row at {dict(point)}")
+        return {k: (v[0].item() if isinstance(v[0], np.generic) else v[0])
+                for k, v in self.decode({k: self.columns[k][lo:lo + 1]
+                                         for k in columns or list(self.columns)}).items()}
+
+    def interpolate(self, point: Mapping[str, Criterion],
+                    columns: Optional[Sequence[str]] = None) -> dict[str, float]:
+        """Multilinear interpolation between grid points.
+
+        Categorical inputs must match a stored label; numeric inputs must lie
+        inside the grid's axis range.
+        """
+        if self.grid is None:
+            raise ValueError(f"{self.path} is not a full grid; use lookup() or select()")
+        missing = set(self.inputs) - set(point)
+        if missing:
+            raise KeyError(f"interpolate needs every input; missing {sorted(missing)}")
+
+        idx, frac = [], []
+        for dim, axis in zip(self.inputs, self.grid):
+            v = self._code(dim, point[dim])
+            if dim in self.categories or len(axis) == 1:
+                i = int(np.searchsorted(axis, v))
+                if i == len(axis) or axis[i] != v:
+                    raise KeyError(f"{dim}={point[dim]!r} is not a grid value")
+                idx.append(i)
+                frac.append(0.0)
+                continue
+            if not axis[0] <= v <= axis[-1]:
+                raise ValueError(f"{dim}={v:g} outside grid range "
+                                 f"[{axis[0]:g}, {axis[-1]:g}]")
+            i = int(np.clip(np.searchsorted(axis, v, "right") - 1, 0, len(axis) - 2))
+            idx.append(i)
+            frac.append((v - axis[i]) / (axis[i + 1] - axis[i]))
+
+        strides = np.cumprod([1] + [len(a) for a in self.grid[:0:-1]])[::-1]
+        out = {k: 0.0 for k in columns or self.outputs}
+        live = [d for d, f in enumerate(frac) if f > 0.0]
+        for corner in range(1 << len(live)):
+            w, flat = 1.0, int(np.dot(idx, strides))
+            for bit, d in enumerate(live):
+                up = corner >> bit & 1
+                w *= frac[d] if up else 1.0 - frac[d]
+                flat += up * int(strides[d])
+            for k in out:
+                out[k] += w * float(self.columns[k][flat])
+        return out
+
+
+def with_metrics(cols: Mapping[str, np.ndarray], gas_price: float) -> dict[str, np.ndarray]:
+    """Add sweep.py's net kW / $/kWh / McF/day / boreholes at ``gas_price``."""
+    metrics = sweep_metrics(cols, gas_price)
+    if np.ndim(cols["net_electrical_kw"]) == 0:
+        metrics = {k: float(v) for k, v in metrics.items()}
+    return {**cols, **metrics}
+
+
+# ---------------------------------------------------------------------------
+# Building a study
+# ---------------------------------------------------------------------------
+
+def build_grid(path: Union[str, Path], teg_types: Sequence[str], hot_temps: Sequence[float],
+               cold_temps: Sequence[float], teg_counts: Sequence[float],
+               outputs: Sequence[str] = STORED_OUTPUTS, workers: int = 1) -> ResultStore:
+    """Full teg_type x hot x cold x count grid, fluid chosen as in sweep.py."""
+    with StoreWriter(path, ["teg_type", "hot_inlet_c", "cold_inlet_c", "teg_count"]) as w:
+        for key in teg_types:
+            for hot in hot_temps:
+                fluid = "therminol" if hot > 220 else "water_glycol"
+                cold, count = (a.ravel() for a in np.meshgrid(
+                    np.asarray(cold_temps, dtype=float),
+                    np.asarray(teg_counts, dtype=float), indexing="ij"))
+                base = SystemConfig(teg_spec=TEG_CATALOG[key], hot_fluid=fluid,
+                                    cold_fluid=fluid, hot_inlet_c=float(hot))
+                cols = run_batch_chunked(base, {"cold_inlet_c": cold, "teg_count": count},
+                                         outputs, workers=workers)
+                w.append({"teg_type": np.full(cold.size, key, dtype=object),
+                          "hot_inlet_c": np.full(cold.size, float(hot)),
+                          "cold_inlet_c": cold, "teg_count": count, **cols})
+    return ResultStore(path)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _span(text: str) -> np.ndarray:
+    """'lo:hi:step' or 'a,b,c'."""
+    if ":" in text:
+        lo, hi, step = (float(x) for x in text.split(":"))
+        return np.round(np.arange(lo, hi + step * 1e-6, step), 6)
+    return np.array([float(x) for x in text.split(",")])
+
+
+def _parse_where(items: Sequence[str]) -> dict[str, Criterion]:
+    where = {}
+    for item in items:
+        key, _, val = item.partition("=")
+        if ":" in val:
+            a, b = val.split(":")
+            where[key] = (float(a), float(b))
+        else:
+            try:
+                where[key] = float(val)
+            except ValueError:
+                where[key] = val
+    return where
+
+
+def _print_rows(cols: Mapping[str, np.ndarray], limit: int) -> None:
+    keys = list(cols)
+    n = len(next(iter(cols.values()))) if cols else 0
+    width = {k: max(len(k), 10) for k in keys}
+    print("  " + "  ".join(f"{k:>{width[k]}s}" for k in keys))
+    print(f"  {'─' * (sum(width.values()) + 2 * (len(keys) - 1))}")
+    for i in range(min(n, limit)):
+        print("  " + "  ".join(
+            f"{cols[k][i]:>{width[k]}s}" if isinstance(cols[k][i], str)
+            else f"{cols[k][i]:>{width[k]}.4g}" for k in keys))
+    if n > limit:
+        print(f"  ... {n - limit:,} more rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped sweep result store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    b = sub.add_parser("build", help="Evaluate a grid study and store it")
+    b.add_argument("path")
+    b.add_argument("--teg-types", default=",".join(TEG_CATALOG))
+    b.add_argument("--hot-temps", default="150:420:10", help="lo:hi:step or a,b,c")
+    b.add_argument("--cold-temps", default="25:110:5")
+    b.add_argument("--teg-counts", default="504:7992:144")
+    b.add_argument("--workers", type=int, default=1)
+
+    i = sub.add_parser("info", help="Describe a store")
+    i.add_argument("path")
+
+    q = sub.add_parser("query", help="Look up, filter or interpolate a store")
+    q.add_argument("path")
+    q.add_argument("--where", action="append", default=[],
+                   help="column=value or column=lo:hi (repeatable)")
+    q.add_argument("--columns", default=None, help="Comma-separated output columns")
+    q.add_argument("--gas-price", type=float, default=None,
+                   help="Add net kW, $/kWh, McF/day and boreholes at this $/McF")
+    q.add_argument("--limit", type=int, default=20)
+    q.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        t0 = time.perf_counter()
+        store = build_grid(args.path, args.teg_types.split(","), _span(args.hot_temps),
+                           _span(args.cold_temps), _span(args.teg_counts),
+                           workers=args.workers)
+        print(f"  {len(store):,} rows written to {store.path} "
+              f"in {time.perf_counter() - t0:.1f} s")
+        return
+
+    store = ResultStore(args.path)
+    if args.command == "info":
+        print("=" * 70)
+        print(f"  RESULT STORE -- {store.path}, {len(store):,} rows")
+        print("=" * 70)
+        for dim in store.inputs:
+            col = store.columns[dim]
+            if dim in store.categories:
+                desc = ", ".join(store.categories[dim])
+            elif store.grid is not None:
+                axis = store.grid[store.inputs.index(dim)]
+                desc = f"{axis[0]:g} .. {axis[-1]:g} ({len(axis)} grid values)"
+            else:
+                desc = f"{col[0]:g} .. {np.max(col):g}"
+            print(f"  {dim:<20s} {desc}")
+        print(f"  {'layout':<20s} {'full grid' if store.grid is not None else 'scattered'}")
+        print(f"  {'outputs':<20s} {', '.join(store.outputs)}")
+        return
+
+    where = _parse_where(args.where)
+    columns = args.columns.split(",") if args.columns else None
+    # Metrics need their inputs loaded even when --columns leaves them out
+    extra = ([c for c in METRIC_INPUTS if c not in columns]
+             if columns and args.gas_price is not None else [])
+    load = columns + extra if columns else None
+    exact = (set(store.inputs) <= set(where)
+             and not any(isinstance(where[k], tuple) for k in store.inputs))
+    if exact:
+        try:
+            row, how = store.lookup(where, load), "stored"
+        except KeyError:
+            row, how = {**where, **store.interpolate(where, load)}, "interpolated"
+        if args.gas_price is not None:
+            row = with_metrics(row, args.gas_price)
+        row = {k: v for k, v in row.items() if k not in extra}
+        if args.json:
+            print(json.dumps({"source": how, **{k: _json_value(v) for k, v in row.items()}},
+                             allow_nan=False))
+        else:
+            print(f"  {how} point:")
+            for k, v in row.items():
+                print(f"    {k:<24s} {v:.6g}" if not isinstance(v, str) else
+                      f"    {k:<24s} {v}")
+        return
+
+    cols = store.select(where, load)
+    if args.gas_price is not None:
+        cols = with_metrics(cols, args.gas_price)
+    cols = {k: v for k, v in cols.items() if k not in extra}
+    if args.json:
+        n = len(next(iter(cols.values())))
+        for r in range(min(n, args.limit)):
+            print(json.dumps({k: _json_value(v[r].item() if isinstance(v[r], np.generic)
+                                             else v[r])
+                              for k, v in cols.items()}, allow_nan=False))
+    else:
+        _print_rows(cols, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+sensitivity.py  --  Global (Sobol) sensitivity of net output and fuel $/kWh.
+
+Which of the two dozen fields in ``SystemConfig``, ``HXGeometry`` and ``TEGSpec``
+actually drive the answer?  This varies all of them at once over a box around
+the base configuration and computes variance-based Sobol indices:
+
+    S1  first-order  -- share of output variance explained by x_i alone
+    ST  total        -- share involving x_i, including interactions
+
+Sampling follows Saltelli: two scrambled-Sobol base matrices A, B (N x d) and
+d mixed matrices AB_i (A with column i from B), N*(d+2) model runs in total,
+evaluated through the batch model in chunks (on a process pool if asked).
+Estimators are Saltelli (2010) for S1 and Jansen for ST, with bootstrap
+confidence intervals.
+
+Usage:
+    python sensitivity.py
+    python sensitivity.py --log2n 15 --workers 4
+    python sensitivity.py --rel 0.10 --param hx.n_channels=7,12
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from statistics import NormalDist
+from dataclasses import dataclass
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+
+from batch_model import INPUT_COLUMNS, INTEGER_FIELDS, get_field, run_batch_chunked
+from mcf_to_watts import DEFAULT_BURNER, HOURS_PER_DAY, KWH_THERMAL_PER_MCF
+from teg_system_model import SystemConfig, TEG_CATALOG
+
+# Fields varied by default (each over base * (1 +/- rel) unless overridden)
+DEFAULT_FIELDS = [
+    "teg_count", "hot_inlet_c", "cold_inlet_c", "target_dt_fluid_c",
+    "pump_efficiency", "hot_pipe_length_m", "pipe_id_m",
+    "hx.n_channels", "hx.channel_width_m", "hx.channel_height_m",
+    "hx.channel_length_m", "hx.fin_thickness_m", "hx.n_fins",
+    "hx.manifold_id_m", "hx.hot_tim_k", "hx.hot_tim_thickness_m",
+    "hx.cold_tim_k", "hx.cold_tim_thickness_m",
+    "teg_spec.r_thermal", "teg_spec.seebeck_v_per_k", "teg_spec.internal_r_ohm",
+    "tegs_per_panel", "panels_per_tower",
+]
+
+# $/kWh is capped so configs with ~zero net output do not swamp the variance
+COST_CAP_PER_KWH = 5.0
+
+
+@dataclass(frozen=True)
+class Param:
+    """One input dimension: field path and [lo, hi] bounds."""
+    path: str
+    lo: float
+    hi: float
+
+    @property
+    def integer(self) -> bool:
+        return self.path in INTEGER_FIELDS
+
+
+def default_params(base: SystemConfig, rel: float = 0.15,
+                   fields: Sequence[str] = DEFAULT_FIELDS) -> list[Param]:
+    """+/- ``rel`` box around the base value of each field."""
+    params = []
+    for path in fields:
+        v = float(get_field(base, path))
+        lo, hi = v * (1.0 - rel), v * (1.0 + rel)
+        if path in INTEGER_FIELDS:
+            lo, hi = np.floor(lo), np.ceil(hi)
+        params.append(Param(path, lo, hi))
+    return params
+
+
+# ---------------------------------------------------------------------------
+# Sampling
+# ---------------------------------------------------------------------------
+
+def saltelli_matrices(d: int, log2n: int, seed: int = 0):
+    """Unit-cube base matrices A, B (each 2^log2n x d).
+
+    Uses a scrambled Sobol sequence in 2d dimensions when SciPy is
+    available, otherwise plain uniform random numbers.
+    """
+    n = 2**log2n
+    try:
+        from scipy.stats import qmc
+        u = qmc.Sobol(d=2 * d, scramble=True, seed=seed).random_base2(log2n)
+    except ImportError:
+        u = np.random.default_rng(seed).random((n, 2 * d))
+    return u[:, :d], u[:, d:]
+
+
+def scale(u: np.ndarray, params: Sequence[Param]) -> dict[str, np.ndarray]:
+    """Map unit-cube columns to parameter ranges (integers rounded)."""
+    out = {}
+    for j, p in enumerate(params):
+        x = p.lo + u[:, j] * (p.hi - p.lo)
+        out[p.path] = np.round(x) if p.integer else x
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Outputs
+# ---------------------------------------------------------------------------
+
+def outputs_from_batch(cols: Mapping[str, np.ndarray],
+                       gas_price: float) -> dict[str, np.ndarray]:
+    """Net kW and fuel $/kWh (same chain as sweep.py) from batch columns."""
+    net_kw = cols["net_electrical_kw"]
+    fuel_kw = cols["total_heat_input_w"] / 1000.0 / DEFAULT_BURNER.delivery_efficiency
+    mcf_day = fuel_kw * HOURS_PER_DAY / KWH_THERMAL_PER_MCF
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cost = np.where(net_kw > 0, mcf_day * gas_price / (net_kw * HOURS_PER_DAY),
+                        COST_CAP_PER_KWH)
+    return {"net_kw": net_kw, "cost_per_kwh": np.minimum(cost, COST_CAP_PER_KWH)}
+
+
+# ---------------------------------------------------------------------------
+# Estimators
+# ---------------------------------------------------------------------------
+
+@dataclass
+class SobolIndices:
+    """First-order and total indices with bootstrap confidence half-widths."""
+    params: list[Param]
+    s1: np.ndarray
+    s1_ci: np.ndarray
+    st: np.ndarray
+    st_ci: np.ndarray
+    variance: float
+
+
+def sobol_indices(f_a: np.ndarray, f_b: np.ndarray, f_ab: np.ndarray,
+                  params: list[Param], n_boot: int = 200, conf: float = 0.95,
+                  seed: int = 0) -> SobolIndices:
+    """Saltelli S1 / Jansen ST from f(A), f(B) and f(AB_i) (shape d x N)."""
+    n = len(f_a)
+    rng = np.random.default_rng(seed)
+    boot = rng.integers(0, n, size=(n_boot, n))
+    z = NormalDist().inv_cdf(0.5 + 0.5 * conf)
+
+    def estimate(idx):
+        a, b = f_a[idx], f_b[idx]
+        var = np.var(np.concatenate([a, b], axis=-1), axis=-1)
+        s1, st = [], []
+        for i in range(f_ab.shape[0]):
+            ab = f_ab[i][idx]
+            s1.append(np.mean(b * (ab - a), axis=-1) / var)
+            st.append(0.5 * np.mean((a - ab)**2, axis=-1) / var)
+        return np.array(s1), np.array(st), var
+
+    s1, st, var = estimate(np.arange(n))
+    s1_b, st_b, _ = estimate(boot)
+    return SobolIndices(params, s1, z * s1_b.std(axis=1), st,
+                        z * st_b.std(axis=1), float(var))
+
+
+def run_sobol(base: SystemConfig, params: list[Param], log2n: int = 13,
+              seed: int = 0, workers: int = 1, gas_price: float = 4.00,
+              n_boot: int = 200) -> dict[str, SobolIndices]:
+    """Run the Saltelli design and return indices per output."""
+    d = len(params)
+    u_a, u_b = saltelli_matrices(d, log2n, seed)
+    n = len(u_a)
+    blocks = [u_a, u_b]
+    for i in range(d):
+        ab = u_a.copy()
+        ab[:, i] = u_b[:, i]
+        blocks.append(ab)
+    x = scale(np.vstack(blocks), params)
+
+    cols = run_batch_chunked(base, x, ("net_electrical_kw", "total_heat_input_w"),
+                             workers=workers)
+    results = {}
+    for name, y in outputs_from_batch(cols, gas_price).items():
+        y = y.reshape(d + 2, n)
+        results[name] = sobol_indices(y[0], y[1], y[2:], params, n_boot, seed=seed)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def print_indices(label: str, idx: SobolIndices, top: Optional[int] = None) -> None:
+    """Print indices sorted by total effect."""
+    order = np.argsort(-idx.st)[:top]
+    print(f"\n  --- {label}  (output variance {idx.variance:.4g}) ---")
+    print(f"  {'Parameter':<28s}  {'Range':>21s}  {'S1':>7s}  {'+/-':>6s}  "
+          f"{'ST':>7s}  {'+/-':>6s}")
+    print(f"  {'─' * 84}")
+    for i in order:
+        p = idx.params[i]
+        print(f"  {p.path:<28s}  {p.lo:>10.4g}-{p.hi:<10.4g}  {idx.s1[i]:>7.3f}  "
+              f"{idx.s1_ci[i]:>6.3f}  {idx.st[i]:>7.3f}  {idx.st_ci[i]:>6.3f}")
+    print(f"  {'sum':<28s}  {'':>21s}  {idx.s1.sum():>7.3f}  {'':>6s}  "
+          f"{idx.st.sum():>7.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sobol global sensitivity analysis")
+    parser.add_argument("--teg-type", choices=list(TEG_CATALOG.keys()), default="marlow")
+    parser.add_argument("--teg-count", type=int, default=1000)
+    parser.add_argument("--hot-temp", type=float, default=200.0)
+    parser.add_argument("--cold-temp", type=float, default=40.0)
+    parser.add_argument("--rel", type=float, default=0.15,
+                        help="Default +/- range as a fraction of base (default: 0.15)")
+    parser.add_argument("--param", action="append", default=[], metavar="PATH=LO,HI",
+                        help="Explicit range for a field (repeatable)")
+    parser.add_argument("--log2n", type=int, default=13,
+                        help="Base sample size N = 2^log2n (default: 13)")
+    parser.add_argument("--gas-price", type=float, default=4.00)
+    parser.add_argument("--bootstrap", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=None)
+    args = parser.parse_args()
+
+    fluid = "therminol" if args.hot_temp > 220 else "water_glycol"
+    base = SystemConfig(teg_count=args.teg_count, teg_spec=TEG_CATALOG[args.teg_type],
+                        hot_fluid=fluid, cold_fluid=fluid,
+                        hot_inlet_c=args.hot_temp, cold_inlet_c=args.cold_temp)
+    params = {p.path: p for p in default_params(base, args.rel)}
+    for item in args.param:
+        path, _, rng = item.partition("=")
+        if path not in INPUT_COLUMNS:
+            raise SystemExit(f"Unknown config field: {path}")
+        lo, hi = (float(v) for v in rng.split(","))
+        params[path] = Param(path, lo, hi)
+    params = list(params.values())
+
+    n_evals = 2**args.log2n * (len(params) + 2)
+    t0 = time.perf_counter()
+    results = run_sobol(base, params, args.log2n, args.seed, args.workers,
+                        args.gas_price, args.bootstrap)
+    elapsed = time.perf_counter() - t0
+
+    print("=" * 90)
+    print(f"  SOBOL SENSITIVITY -- {base.teg_spec.name}, {base.teg_count} TEGs, "
+          f"hot {base.hot_inlet_c} C / cold {base.cold_inlet_c} C")
+    print(f"  {len(params)} parameters, N = {2**args.log2n}, {n_evals:,} model runs "
+          f"in {elapsed:.1f} s, 95% bootstrap CI")
+    print("=" * 90)
+    print_indices("Net electrical output (kW)", results["net_kw"], args.top)
+    print_indices(f"Fuel cost ($/kWh @ ${args.gas_price:.2f}/McF, capped at "
+                  f"${COST_CAP_PER_KWH:.0f})", results["cost_per_kwh"], args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+study_plan.py  --  Declarative studies compiled into one de-duplicated plan.
+
+``sweep.py``, ``mcf_to_watts.py`` and ``costs/cost_model.py`` each carry
+their own scenario lists and evaluate overlapping configurations one
+``run_model`` call at a time.  A study file (TOML, YAML or JSON) instead
+lists scenarios once and the reports wanted from them:
+
+    sweep          sweep.py tables over a TEG-count ladder (+ comparison, plot)
+    mcf            mcf_to_watts.py report: TEG count and McF/day per kW target
+    store          scenario x TEG-count grid written to a result_store
+    cost           cost_model.py breakdowns and side-by-side comparison
+    cost_scaling   cost_model.py cost vs. system size
+
+Compiling collects every ``SystemConfig`` point the reports need, keyed by
+(TEG type, hot inlet, cold inlet, TEG count), and every cost case.  The
+plan evaluates each unique point once: all fixed points and the first
+step of every McF target search go in one batch.  The binary searches then
+advance in lockstep, one batch per step, and shared steps are reused.
+Fluid properties are looked up once per unique (fluid, temperature) per
+batch.  Results are then fanned out to every table, plot and store that
+asked for them, through the scripts' own printing functions.
+
+    studies/default.toml    the three scripts' built-in scenarios and reports
+
+Usage:
+    python study_plan.py studies/default.toml
+    python study_plan.py studies/default.toml --plan      # compile only
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Mapping, Sequence, Union
+
+import numpy as np
+
+from batch_model import BatchResults, run_configs
+from cost_bridge import TEG_OPTIONS, SystemCost, calculate_system_cost, \
+    print_comparison as print_cost_comparison, print_cost, print_scaling
+from mcf_to_watts import McfResult, mcf_result, print_full_report, target_config, \
+    teg_count_search
+from progress import counting
+from result_store import STORED_OUTPUTS, StoreWriter
+from sweep import TEG_COUNTS, board_count, plot_sweeps, print_comparison, \
+    print_sweep_table, sweep_point
+from teg_system_model import ModelResults, TEG_CATALOG
+
+
+REPORT_TYPES = ("sweep", "mcf", "store", "cost", "cost_scaling")
+PLOT_STYLES = [("o", "tab:blue"), ("s", "tab:orange"), ("^", "tab:red"),
+               ("D", "tab:green"), ("v", "tab:purple"), ("P", "tab:brown")]
+
+# (teg_type, hot inlet C, cold inlet C, TEG count)
+PointKey = tuple[str, float, float, int]
+
+
+# ---------------------------------------------------------------------------
+# Study files
+# ---------------------------------------------------------------------------
+
+def load_study(path: Union[str, Path]) -> dict:
+    """Parse a study file (.toml, .yaml / .yml or .json)."""
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:                          # Python < 3.11
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise RuntimeError("TOML studies need Python 3.11+ or: pip install tomli")
+        return tomllib.loads(text)
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError("YAML studies need PyYAML: pip install pyyaml")
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+def _counts(spec) -> list[int]:
+    """TEG-count ladder: a list, or {start, stop, step}; rounded to whole boards."""
+    if spec is None:
+        values = TEG_COUNTS
+    elif isinstance(spec, Mapping):
+        values = np.arange(spec["start"], spec["stop"] + 1, spec.get("step", 36))
+    else:
+        values = spec
+    return [board_count(n) for n in values]
+
+
+@dataclass
+class Report:
+    type: str
+    spec: dict
+    scenarios: list[dict] = field(default_factory=list)
+
+
+@dataclass
+class Study:
+    name: str
+    scenarios: list[dict]
+    reports: list[Report]
+
+
+def compile_study(data: Mapping) -> Study:
+    """Validate a parsed study and resolve scenario references."""
+    scenarios = []
+    for i, sc in enumerate(data.get("scenarios", [])):
+        missing = {"label", "teg_type", "hot_temp", "cold_temp"} - set(sc)
+        if missing:
+            raise ValueError(f"scenario {i + 1}: missing {', '.join(sorted(missing))}")
+        if sc["teg_type"] not in TEG_CATALOG:
+            raise ValueError(f"scenario {sc['label']!r}: unknown teg_type {sc['teg_type']!r}")
+        marker, color = PLOT_STYLES[i % len(PLOT_STYLES)]
+        scenarios.append({"marker": marker, "color": color, **sc,
+                          "hot_temp": float(sc["hot_temp"]),
+                          "cold_temp": float(sc["cold_temp"])})
+    by_label = {sc["label"]: sc for sc in scenarios}
+
+    reports = []
+    for i, spec in enumerate(data.get("reports", [])):
+        kind = spec.get("type")
+        if kind not in REPORT_TYPES:
+            raise ValueError(f"report {i + 1}: type must be one of {', '.join(REPORT_TYPES)}")
+        report = Report(kind, dict(spec))
+        if kind in ("sweep", "mcf", "store"):
+            labels = spec.get("scenarios", list(by_label))
+            unknown = [lb for lb in labels if lb not in by_label]
+            if unknown:
+                raise ValueError(f"report {i + 1}: unknown scenarios {unknown}")
+            report.scenarios = [by_label[lb] for lb in labels]
+        if kind == "store" and "path" not in spec:
+            raise ValueError(f"report {i + 1}: store needs a path")
+        for key in ("tegs", "teg"):
+            tegs = spec.get(key, [])
+            for t in [tegs] if isinstance(tegs, str) else tegs:
+                if t not in TEG_OPTIONS:
+                    raise ValueError(f"report {i + 1}: unknown cost TEG {t!r} "
+                                     f"(choose from {', '.join(TEG_OPTIONS)})")
+        reports.append(report)
+    return Study(data.get("name", "study"), scenarios, reports)
+
+
+def _key(sc: dict, teg_count: int) -> PointKey:
+    return (sc["teg_type"], sc["hot_temp"], sc["cold_temp"], int(teg_count))
+
+
+# ---------------------------------------------------------------------------
+# Plan
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Plan:
+    """Unique work behind a study's reports."""
+    study: Study
+    points: list[PointKey]                               # fixed points, first-use order
+    searches: list[tuple[str, float, float, float]]      # (teg_type, hot, cold, target kW)
+    costs: list[tuple[str, float, str]]                  # (TEG_OPTIONS key, kW, cooling)
+    requested_points: int                                # fixed, before de-duplication
+    requested_costs: int
+
+    def summary(self) -> str:
+        lines = [
+            f"  {'Reports':<34s} {len(self.study.reports):>10,d}",
+            f"  {'Fixed points requested / unique':<34s} "
+            f"{self.requested_points:>10,d} / {len(self.points):,d}",
+            f"  {'McF target searches':<34s} {len(self.searches):>10,d}",
+            f"  {'Cost cases requested / unique':<34s} "
+            f"{self.requested_costs:>10,d} / {len(self.costs):,d}",
+        ]
+        return "\n".join(lines)
+
+
+def make_plan(study: Study) -> Plan:
+    points: dict[PointKey, None] = {}
+    searches: dict[tuple, None] = {}
+    costs: dict[tuple, None] = {}
+    requested_points = requested_costs = 0
+    for rep in study.reports:
+        s = rep.spec
+        if rep.type in ("sweep", "store"):
+            counts = _counts(s.get("teg_counts"))
+            for sc in rep.scenarios:
+                for n in counts:
+                    points.setdefault(_key(sc, n))
+                requested_points += len(counts)
+        elif rep.type == "mcf":
+            for sc in rep.scenarios:
+                for kw in s.get("targets_kw", [10, 25, 50]):
+                    searches.setdefault((sc["teg_type"], sc["hot_temp"], sc["cold_temp"],
+                                         float(kw)))
+        elif rep.type == "cost":
+            for t in s.get("tegs", list(TEG_OPTIONS)):
+                costs.setdefault((t, float(s.get("target_kw", 10.0)), s.get("cooling", "dry")))
+                requested_costs += 1
+        elif rep.type == "cost_scaling":
+            for kw in s.get("targets_kw", [5, 10, 25, 50]):
+                costs.setdefault((s.get("teg", "marlow"), float(kw), s.get("cooling", "dry")))
+                requested_costs += 1
+    return Plan(study, list(points), list(searches), list(costs),
+                requested_points, requested_costs)
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+@dataclass
+class PlanResults:
+    """Evaluated points and costs, addressable by key."""
+    batches: list[BatchResults] = field(default_factory=list)
+    index: dict[PointKey, tuple[int, int]] = field(default_factory=dict)
+    targets: dict[tuple, int] = field(default_factory=dict)     # search -> TEG count
+    costs: dict[tuple, SystemCost] = field(default_factory=dict)
+    requested: int = 0                                          # evaluations asked for
+    counters: dict = field(default_factory=dict)
+    elapsed_s: float = 0.0
+
+    def evaluate(self, keys: Sequence[PointKey]) -> None:
+        """Evaluate the keys not seen yet, as one batch."""
+        self.requested += len(keys)
+        new = [k for k in dict.fromkeys(keys) if k not in self.index]
+        if not new:
+            return
+        batch = run_configs([target_config(t, n, hot, cold) for t, hot, cold, n in new])
+        b = len(self.batches)
+        self.batches.append(batch)
+        self.index.update({k: (b, i) for i, k in enumerate(new)})
+
+    def value(self, key: PointKey, column: str) -> float:
+        b, i = self.index[key]
+        return self.batches[b].columns[column][i]
+
+    def row(self, key: PointKey) -> ModelResults:
+        b, i = self.index[key]
+        return self.batches[b].row(i)
+
+    def columns(self, keys: Sequence[PointKey], names: Sequence[str]) -> dict[str, np.ndarray]:
+        loc = np.array([self.index[k] for k in keys])
+        out = {}
+        for name in names:
+            out[name] = np.empty(len(keys))
+            for b, batch in enumerate(self.batches):
+                sel = loc[:, 0] == b
+                out[name][sel] = batch.columns[name][loc[sel, 1]]
+        return out
+
+    @property
+    def unique_points(self) -> int:
+        return len(self.index)
+
+
+def execute(plan: Plan) -> PlanResults:
+    """Evaluate a plan: fixed points plus lockstep target searches."""
+    res = PlanResults()
+    t0 = time.perf_counter()
+    with counting() as counters:
+        active = {}
+        pending = list(plan.points)
+        for s in plan.searches:
+            gen = teg_count_search(s[3])
+            active[s] = (gen, next(gen))
+            pending.append((s[0], s[1], s[2], active[s][1]))
+        while pending:
+            res.evaluate(pending)
+            pending = []
+            for s, (gen, count) in list(active.items()):
+                key = (s[0], s[1], s[2], count)
+                try:
+                    nxt = gen.send(res.value(key, "net_electrical_kw"))
+                except StopIteration as stop:
+                    res.targets[s] = stop.value
+                    del active[s]
+                    pending.append((s[0], s[1], s[2], stop.value))
+                    continue
+                active[s] = (gen, nxt)
+                pending.append((s[0], s[1], s[2], nxt))
+    for teg, kw, cooling in plan.costs:
+        res.costs[(teg, kw, cooling)] = calculate_system_cost(TEG_OPTIONS[teg], kw, cooling)
+    res.counters = dict(counters)
+    res.elapsed_s = time.perf_counter() - t0
+    return res
+
+
+def render(plan: Plan, res: PlanResults) -> None:
+    """Fan results out to each report, in study order."""
+    for rep in plan.study.reports:
+        s = rep.spec
+        if rep.type == "sweep":
+            counts = _counts(s.get("teg_counts"))
+            all_results = {sc["label"]: [sweep_point(n, res.row(_key(sc, n))) for n in counts]
+                           for sc in rep.scenarios}
+            for sc in rep.scenarios:
+                print_sweep_table(sc["label"], all_results[sc["label"]])
+            compare = s.get("compare_kw", [10, 25, 50])
+            if compare:
+                print_comparison(all_results, rep.scenarios, compare)
+            if s.get("plot"):
+                plot_sweeps(all_results, rep.scenarios, s["plot"])
+        elif rep.type == "mcf":
+            targets = s.get("targets_kw", [10, 25, 50])
+            results: dict[str, list[McfResult]] = {}
+            for sc in rep.scenarios:
+                results[sc["label"]] = []
+                for kw in targets:
+                    search = (sc["teg_type"], sc["hot_temp"], sc["cold_temp"], float(kw))
+                    n = res.targets[search]
+                    results[sc["label"]].append(mcf_result(
+                        sc["teg_type"], n, sc["hot_temp"], sc["cold_temp"],
+                        res.row(_key(sc, n))))
+            print_full_report(rep.scenarios, results, targets)
+        elif rep.type == "store":
+            counts = _counts(s.get("teg_counts"))
+            with StoreWriter(s["path"], ["teg_type", "hot_inlet_c", "cold_inlet_c",
+                                         "teg_count"]) as w:
+                for sc in rep.scenarios:
+                    keys = [_key(sc, n) for n in counts]
+                    w.append({"teg_type": np.full(len(keys), sc["teg_type"], dtype=object),
+                              "hot_inlet_c": np.full(len(keys), sc["hot_temp"]),
+                              "cold_inlet_c": np.full(len(keys), sc["cold_temp"]),
+                              "teg_count": np.array(counts, dtype=float),
+                              **res.columns(keys, STORED_OUTPUTS)})
+            print(f"\n  {len(rep.scenarios) * len(counts):,} rows written to {s['path']}")
+        elif rep.type == "cost":
+            kw, cooling = float(s.get("target_kw", 10.0)), s.get("cooling", "dry")
+            costs = [res.costs[(t, kw, cooling)] for t in s.get("tegs", list(TEG_OPTIONS))]
+            if s.get("breakdown", True):
+                for c in costs:
+                    print_cost(c)
+            if s.get("comparison", True) and len(costs) > 1:
+                print_cost_comparison(costs)
+        elif rep.type == "cost_scaling":
+            teg, cooling = s.get("teg", "marlow"), s.get("cooling", "dry")
+            kws = s.get("targets_kw", [5, 10, 25, 50])
+            print_scaling(TEG_OPTIONS[teg], kws, cooling,
+                          s.get("label", f"{TEG_OPTIONS[teg].name}, {cooling} cooling"),
+                          [res.costs[(teg, float(kw), cooling)] for kw in kws])
+
+
+def print_execution(plan: Plan, res: PlanResults, file=sys.stderr) -> None:
+    c = res.counters
+    rows = c.get("batch_property_rows", 0)
+    print("=" * 70, file=file)
+    print(f"  STUDY {plan.study.name} -- evaluated in {res.elapsed_s:.2f} s", file=file)
+    print("=" * 70, file=file)
+    print(plan.summary(), file=file)
+    print(f"  {'Evaluations requested / unique':<34s} "
+          f"{res.requested:>10,d} / {res.unique_points:,d}"
+          f"   in {len(res.batches)} batches", file=file)
+    print(f"  {'Property rows / unique lookups':<34s} "
+          f"{rows:>10,d} / {c.get('property_lookups', 0):,d}", file=file)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile and run a declarative study")
+    parser.add_argument("study", help="Study file (.toml, .yaml or .json)")
+    parser.add_argument("--plan", action="store_true",
+                        help="Print the compiled plan and exit")
+    parser.add_argument("--quiet", action="store_true",
+                        help="No execution summary on stderr")
+    args = parser.parse_args()
+
+    try:
+        study = compile_study(load_study(args.study))
+    except (ValueError, KeyError, RuntimeError) as e:
+        sys.exit(f"  study error: {e}")
+    plan = make_plan(study)
+    if args.plan:
+        print("=" * 70)
+        print(f"  STUDY PLAN -- {study.name}")
+        print("=" * 70)
+        print(plan.summary())
+        return
+
+    res = execute(plan)
+    render(plan, res)
+    if not args.quiet:
+        print_execution(plan, res)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,28 +7,36 @@ Sweeps:
   - Hot-side temperature: 200 C (Marlow), 320 C (PbTe derated), 400 C (Alphabet Pb)
   - Gas price: $2.50, $4.00, $6.00 per McF
 
-Outputs tables and (optionally) matplotlib plots.
+Outputs tables and (optionally) matplotlib plots.  A live progress line
+goes to stderr on a terminal; ``--metrics FILE`` also exports progress as
+Prometheus text or JSON lines (see progress.py).
 
 Usage:
     python sweep.py
     python sweep.py --no-plot    # tables only, no matplotlib
+    python sweep.py --metrics sweep.prom
 """
 
 from __future__ import annotations
 
 import argparse
 import sys
+import time
+from contextlib import nullcontext
 from dataclasses import dataclass
+from typing import Optional, Sequence
 
 import numpy as np
 
 from teg_system_model import (
-    SystemConfig, run_model, TEG_CATALOG,
+    ModelResults, SystemConfig, run_model, TEG_CATALOG,
     MARLOW_TG1_1008, THERMONAMIC_PB12611, ALPHABET_PB_ENHANCED,
 )
 from mcf_to_watts import (
-    DEFAULT_BURNER, KWH_THERMAL_PER_MCF, HOURS_PER_DAY, GAS_PRICES,
+    BurnerSpec, DEFAULT_BURNER, KWH_THERMAL_PER_MCF, HOURS_PER_DAY, GAS_PRICES,
 )
+from instrumentation import add_profile_arguments, profiling_from_args
+from progress import SweepProgress, add_progress_arguments, counting, progress_from_args
 
 # ---------------------------------------------------------------------------
 # Sweep configurations
@@ -89,66 +97,85 @@ class SweepPoint:
     cost_per_kwh: dict   # {gas_price: $/kWh}
 
 
-def sweep_scenario(scenario: dict) -> list[SweepPoint]:
-    """Run the model across all TEG counts for one scenario."""
-    teg_spec = TEG_CATALOG[scenario["teg_type"]]
-    hot_temp = scenario["hot_temp"]
-    cold_temp = scenario["cold_temp"]
+def board_count(n: float) -> int:
+    """TEG count rounded to whole 36-TEG PCM boards (at least one)."""
+    return max(36, int(round(n / 36) * 36))
 
-    fluid = "therminol" if hot_temp > 220 else "water_glycol"
-    burner = DEFAULT_BURNER
 
+def scenario_config(scenario: dict, teg_count: int) -> SystemConfig:
+    """System config for one sweep point (fluid chosen from the hot inlet)."""
+    hot_temp = scenario["hot_temp"]
+    fluid = "therminol" if hot_temp > 220 else "water_glycol"
+    return SystemConfig(
+        teg_count=teg_count,
+        teg_spec=TEG_CATALOG[scenario["teg_type"]],
+        hot_fluid=fluid,
+        cold_fluid=fluid,
+        hot_inlet_c=hot_temp,
+        cold_inlet_c=scenario["cold_temp"],
+    )
+
+
+def sweep_scenario(scenario: dict,
+                   progress: Optional[SweepProgress] = None) -> list[SweepPoint]:
+    """Run the model across all TEG counts for one scenario.
+
+    Each point is reported to ``progress`` if given.
+    """
     points = []
     for n in TEG_COUNTS:
-        n_rounded = max(36, int(round(n / 36) * 36))
-
-        cfg = SystemConfig(
-            teg_count=n_rounded,
-            teg_spec=teg_spec,
-            hot_fluid=fluid,
-            cold_fluid=fluid,
-            hot_inlet_c=hot_temp,
-            cold_inlet_c=cold_temp,
-        )
-        r = run_model(cfg)
-
-        total_heat_kw = r.total_heat_input_w / 1000.0
-        fuel_thermal_kw = total_heat_kw / burner.delivery_efficiency
-        mcf_day = fuel_thermal_kw * HOURS_PER_DAY / KWH_THERMAL_PER_MCF
-        parasitic_kw = (r.pump_power_total_w + r.fan_power_w + r.electronics_w) / 1000.0
-
-        # Ground loop sizing
-        reject_kw = r.total_heat_rejection_w / 1000.0
-        boreholes = int(np.ceil(reject_kw / HEAT_PER_BOREHOLE_KW))
-        borehole_cost = boreholes * BOREHOLE_DEPTH_M * BOREHOLE_COST_PER_M
-
-        # Cost per kWh at each gas price
-        daily_kwh = r.net_electrical_kw * HOURS_PER_DAY
-        cpkwh = {}
-        for price in GAS_PRICES:
-            daily_fuel = mcf_day * price
-            cpkwh[price] = daily_fuel / daily_kwh if daily_kwh > 0 else float("inf")
-
-        system_eff = (r.net_electrical_w / 1000.0) / fuel_thermal_kw if fuel_thermal_kw > 0 else 0
-
-        points.append(SweepPoint(
-            teg_count=n_rounded,
-            net_kw=r.net_electrical_kw,
-            gross_kw=r.gross_electrical_w / 1000.0,
-            heat_rejection_kw=reject_kw,
-            mcf_per_day=mcf_day,
-            parasitic_kw=parasitic_kw,
-            teg_efficiency=r.teg_efficiency,
-            system_efficiency=system_eff,
-            flow_rate_gpm=r.hot_flow_rate_gpm,
-            boreholes=boreholes,
-            borehole_cost_usd=borehole_cost,
-            cost_per_kwh=cpkwh,
-        ))
+        n_rounded = board_count(n)
+        cfg = scenario_config(scenario, n_rounded)
+        if progress is None:
+            r = run_model(cfg)
+        else:
+            t0 = time.perf_counter()
+            with counting() as counters:
+                r = run_model(cfg)
+            progress.record(vars(r), 1, time.perf_counter() - t0, counters)
+        points.append(sweep_point(n_rounded, r))
 
     return points
 
 
+def sweep_point(teg_count: int, r: ModelResults, burner: BurnerSpec = DEFAULT_BURNER
+                ) -> SweepPoint:
+    """Fuel, ground-loop and cost figures for one evaluated sweep point."""
+    total_heat_kw = r.total_heat_input_w / 1000.0
+    fuel_thermal_kw = total_heat_kw / burner.delivery_efficiency
+    mcf_day = fuel_thermal_kw * HOURS_PER_DAY / KWH_THERMAL_PER_MCF
+    parasitic_kw = (r.pump_power_total_w + r.fan_power_w + r.electronics_w) / 1000.0
+
+    # Ground loop sizing
+    reject_kw = r.total_heat_rejection_w / 1000.0
+    boreholes = int(np.ceil(reject_kw / HEAT_PER_BOREHOLE_KW))
+    borehole_cost = boreholes * BOREHOLE_DEPTH_M * BOREHOLE_COST_PER_M
+
+    # Cost per kWh at each gas price
+    daily_kwh = r.net_electrical_kw * HOURS_PER_DAY
+    cpkwh = {}
+    for price in GAS_PRICES:
+        daily_fuel = mcf_day * price
+        cpkwh[price] = daily_fuel / daily_kwh if daily_kwh > 0 else float("inf")
+
+    system_eff = (r.net_electrical_w / 1000.0) / fuel_thermal_kw if fuel_thermal_kw > 0 else 0
+
+    return SweepPoint(
+        teg_count=teg_count,
+        net_kw=r.net_electrical_kw,
+        gross_kw=r.gross_electrical_w / 1000.0,
+        heat_rejection_kw=reject_kw,
+        mcf_per_day=mcf_day,
+        parasitic_kw=parasitic_kw,
+        teg_efficiency=r.teg_efficiency,
+        system_efficiency=system_eff,
+        flow_rate_gpm=r.hot_flow_rate_gpm,
+        boreholes=boreholes,
+        borehole_cost_usd=borehole_cost,
+        cost_per_kwh=cpkwh,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Table output
 # ---------------------------------------------------------------------------
@@ -177,11 +204,35 @@ def print_sweep_table(label: str, points: list[SweepPoint]) -> None:
               f"${p.cost_per_kwh[6.00]:>7.4f}")
 
 
+def print_comparison(all_results: dict[str, list[SweepPoint]], scenarios: list[dict],
+                     targets_kw: Sequence[float] = (10, 25, 50)) -> None:
+    """Cross-scenario comparison: the sweep point closest to each target."""
+    print(f"\n\n{'=' * 80}")
+    print(f"  CROSS-SCENARIO COMPARISON")
+    print(f"{'=' * 80}")
+
+    for target_kw in targets_kw:
+        print(f"\n  --- Target: {target_kw:g} kW net ---")
+        print(f"  {'Scenario':<30s}  {'TEGs':>6s}  {'McF/d':>6s}  "
+              f"{'Holes':>5s}  {'@$4/McF':>8s}")
+        print(f"  {'─' * 62}")
+
+        for sc in scenarios:
+            pts = all_results[sc["label"]]
+            # Find closest point to target
+            closest = min(pts, key=lambda p: abs(p.net_kw - target_kw))
+            print(f"  {sc['label']:<30s}  {closest.teg_count:>6d}  "
+                  f"{closest.mcf_per_day:>6.1f}  "
+                  f"{closest.boreholes:>5d}  "
+                  f"${closest.cost_per_kwh[4.00]:>7.4f}")
+
+
 # ---------------------------------------------------------------------------
 # Plotting
 # ---------------------------------------------------------------------------
 
-def plot_sweeps(all_results: dict[str, list[SweepPoint]], scenarios: list[dict]) -> None:
+def plot_sweeps(all_results: dict[str, list[SweepPoint]], scenarios: list[dict],
+                outfile: str = "sweep_results.png") -> None:
     """Generate matplotlib plots for the sweep results."""
     try:
         import matplotlib
@@ -247,7 +298,6 @@ def plot_sweeps(all_results: dict[str, list[SweepPoint]], scenarios: list[dict])
     ax.grid(True, alpha=0.3)
 
     plt.tight_layout()
-    outfile = "sweep_results.png"
     plt.savefig(outfile, dpi=150)
     print(f"\n  Plots saved to: {outfile}")
     plt.close()
@@ -261,36 +311,23 @@ def main():
     parser = argparse.ArgumentParser(description="TEG system parametric sweep")
     parser.add_argument("--no-plot", action="store_true",
                         help="Skip plot generation")
+    add_profile_arguments(parser)
+    add_progress_arguments(parser)
     args = parser.parse_args()
 
-    all_results = {}
-    for sc in SCENARIOS:
-        points = sweep_scenario(sc)
-        all_results[sc["label"]] = points
-        print_sweep_table(sc["label"], points)
-
-    # Cross-scenario comparison at specific targets
-    print(f"\n\n{'=' * 80}")
-    print(f"  CROSS-SCENARIO COMPARISON")
-    print(f"{'=' * 80}")
-
-    for target_kw in [10, 25, 50]:
-        print(f"\n  --- Target: {target_kw} kW net ---")
-        print(f"  {'Scenario':<30s}  {'TEGs':>6s}  {'McF/d':>6s}  "
-              f"{'Holes':>5s}  {'@$4/McF':>8s}")
-        print(f"  {'─' * 62}")
-
+    progress = progress_from_args(args, len(SCENARIOS) * len(TEG_COUNTS), "sweep")
+    with profiling_from_args(args):
+        all_results = {}
+        with progress or nullcontext():
+            for sc in SCENARIOS:
+                all_results[sc["label"]] = sweep_scenario(sc, progress)
         for sc in SCENARIOS:
-            pts = all_results[sc["label"]]
-            # Find closest point to target
-            closest = min(pts, key=lambda p: abs(p.net_kw - target_kw))
-            print(f"  {sc['label']:<30s}  {closest.teg_count:>6d}  "
-                  f"{closest.mcf_per_day:>6.1f}  "
-                  f"{closest.boreholes:>5d}  "
-                  f"${closest.cost_per_kwh[4.00]:>7.4f}")
+            print_sweep_table(sc["label"], all_results[sc["label"]])
+
+        print_comparison(all_results, SCENARIOS)
 
-    if not args.no_plot:
-        plot_sweeps(all_results, SCENARIOS)
+        if not args.no_plot:
+            plot_sweeps(all_results, SCENARIOS)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+sweep_plot.py  --  Binned density plots for million-point sweeps.
+
+``sweep.plot_sweeps`` draws one marker per point, which is fine for the
+30-point scenario tables but unreadable (and slow) past a few thousand
+points.  Here results are streamed chunk by chunk into fixed 2-D grids:
+
+    count        points per bin (log colour scale)
+    min / max    extreme of a value column per bin (e.g. best $/kWh)
+
+plus, per x-column of the grid, the point with the best y -- enough to
+draw the Pareto front of each panel at pixel resolution.  Memory is set by
+the grid size, not the number of points, so 10^7-point sweeps render
+headless in seconds once evaluated.
+
+The figure is a small-multiples grid: one column per scenario (the
+``sweep.SCENARIOS`` list), one row per panel, axes shared along each row.
+
+Usage:
+    python sweep_plot.py
+    python sweep_plot.py --points 10000000 --out sweep_density.png
+    python sweep_plot.py --stat min --value cost_per_kwh
+    python sweep_plot.py --points 10000000 --workers 4 --metrics sweep.prom
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+
+from batch_model import run_batch_chunked
+from pareto import skyline, sweep_metrics
+from progress import SweepProgress, add_progress_arguments, progress_from_args
+from sweep import SCENARIOS
+from teg_system_model import SystemConfig, TEG_CATALOG
+
+CHUNK_SIZE = 500_000
+BINS = (320, 240)
+OUTPUTS = ("net_electrical_kw", "total_heat_input_w", "total_heat_rejection_w")
+
+
+@dataclass(frozen=True)
+class Panel:
+    """One scatter panel: axes columns, their Pareto senses and labels."""
+    x: str
+    y: str
+    x_sense: str
+    y_sense: str
+    xlabel: str
+    ylabel: str
+    title: str
+    y_quantile: float = 0.998     # upper plot limit, as a quantile of the pilot y values
+
+
+# Same four views as sweep.plot_sweeps
+PANELS = [
+    Panel("teg_count", "net_kw", "min", "max", "TEG Count",
+          "Net Electrical Output (kW)", "Scale: TEGs vs Power"),
+    Panel("mcf_day", "net_kw", "min", "max", "Natural Gas (McF/day)",
+          "Net Electrical Output (kW)", "Fuel Consumption vs Power"),
+    Panel("net_kw", "cost_per_kwh", "max", "min", "Net Electrical Output (kW)",
+          "Fuel Cost ($/kWh)", "Cost vs Scale", y_quantile=0.95),
+    Panel("net_kw", "boreholes", "max", "min", "Net Electrical Output (kW)",
+          "Ground Loop Boreholes (150m each)", "Heat Rejection: Borehole Count"),
+]
+
+
+# ---------------------------------------------------------------------------
+# Streaming 2-D aggregation
+# ---------------------------------------------------------------------------
+
+class Binned2D:
+    """Fixed-grid aggregate of (x, y[, value]) points.
+
+    Points outside ``extent`` are counted in ``dropped`` and otherwise
+    ignored.  ``y_sense`` / ``x_sense`` define the per-column front.
+    """
+
+    def __init__(self, extent: Sequence[float], bins: tuple[int, int] = BINS,
+                 x_sense: str = "min", y_sense: str = "max"):
+        self.extent = tuple(float(e) for e in extent)   # x0, x1, y0, y1
+        self.nx, self.ny = bins
+        self.x_sense, self.y_sense = x_sense, y_sense
+        self.count = np.zeros(self.nx * self.ny, dtype=np.int64)
+        self.vmin = np.full(self.nx * self.ny, np.inf)
+        self.vmax = np.full(self.nx * self.ny, -np.inf)
+        self.front_y = np.full(self.nx, np.inf)          # best y (minimized) per x column
+        self.front_x = np.full(self.nx, np.nan)
+        self.n = 0
+        self.dropped = 0
+
+    def _index(self, x, y):
+        x0, x1, y0, y1 = self.extent
+        fx = (x - x0) / (x1 - x0) * self.nx
+        fy = (y - y0) / (y1 - y0) * self.ny
+        ok = (fx >= 0) & (fx < self.nx) & (fy >= 0) & (fy < self.ny)
+        return fx[ok].astype(np.int64), fy[ok].astype(np.int64), ok
+
+    def add(self, x: np.ndarray, y: np.ndarray, value: Optional[np.ndarray] = None) -> None:
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        ix, iy, ok = self._index(x, y)
+        self.n += x.size
+        self.dropped += int(x.size - ok.sum())
+        flat = ix * self.ny + iy
+        self.count += np.bincount(flat, minlength=self.count.size)
+        if value is not None:
+            v = np.asarray(value, dtype=float)[ok]
+            np.minimum.at(self.vmin, flat, v)
+            np.maximum.at(self.vmax, flat, v)
+
+        # Best y per x column, keeping the x of the point that achieved it
+        ys = y[ok] if self.y_sense == "min" else -y[ok]
+        np.minimum.at(self.front_y, ix, ys)
+        hit = ys == self.front_y[ix]
+        self.front_x[ix[hit]] = x[ok][hit]
+
+    def image(self, stat: str = "count") -> np.ndarray:
+        """(ny, nx) array for imshow(origin="lower"); NaN where empty."""
+        if stat == "count":
+            img = np.where(self.count > 0, self.count, np.nan).astype(float)
+        elif stat == "min":
+            img = np.where(self.count > 0, self.vmin, np.nan)
+        elif stat == "max":
+            img = np.where(self.count > 0, self.vmax, np.nan)
+        else:
+            raise ValueError(f"Unknown stat: {stat}")
+        return img.reshape(self.nx, self.ny).T
+
+    def front(self) -> tuple[np.ndarray, np.ndarray]:
+        """Pareto front (x, y) at grid resolution, sorted by x."""
+        ok = np.isfinite(self.front_y)
+        x, ys = self.front_x[ok], self.front_y[ok]
+        f = np.column_stack([x if self.x_sense == "min" else -x, ys])
+        keep = skyline(f) if len(f) else np.zeros(0, dtype=bool)
+        x, ys = x[keep], ys[keep]
+        order = np.argsort(x)
+        y = ys if self.y_sense == "min" else -ys
+        return x[order], y[order]
+
+
+def extents(samples: Iterable[Mapping[str, np.ndarray]], panels: Sequence[Panel],
+            q: tuple[float, float] = (0.002, 0.998), pad: float = 0.04
+            ) -> list[tuple[float, float, float, float]]:
+    """Per-panel (x0, x1, y0, y1) covering quantile range ``q`` of the samples."""
+    samples = list(samples)
+    out = []
+    for p in panels:
+        lims = []
+        for key, qk in ((p.x, q), (p.y, (q[0], min(q[1], p.y_quantile)))):
+            v = np.concatenate([np.asarray(s[key], dtype=float) for s in samples])
+            v = v[np.isfinite(v)]
+            lo, hi = np.quantile(v, qk) if v.size else (0.0, 1.0)
+            span = hi - lo if hi > lo else max(abs(hi), 1.0)
+            lims += [lo - pad * span, hi + pad * span]
+        out.append(tuple(lims))
+    return out
+
+
+def accumulate(chunks: Iterable[Mapping[str, np.ndarray]], panels: Sequence[Panel],
+               exts: Sequence[Sequence[float]], bins: tuple[int, int] = BINS,
+               value: Optional[str] = None) -> list[Binned2D]:
+    """Stream column chunks into one ``Binned2D`` per panel."""
+    grids = [Binned2D(e, bins, p.x_sense, p.y_sense) for p, e in zip(panels, exts)]
+    for cols in chunks:
+        v = cols[value] if value else None
+        for p, g in zip(panels, grids):
+            g.add(cols[p.x], cols[p.y], v)
+    return grids
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+def render(grids: Mapping[str, Sequence[Binned2D]], scenarios: Sequence[dict],
+           panels: Sequence[Panel], outfile: str, stat: str = "count",
+           value_label: str = "", dpi: int = 120) -> None:
+    """Small-multiples PNG: rows = panels, columns = scenarios."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    n_r, n_c = len(panels), len(scenarios)
+    fig, axes = plt.subplots(n_r, n_c, figsize=(4.4 * n_c, 3.4 * n_r),
+                             squeeze=False, sharex="row", sharey="row")
+    total = sum(g[0].n for g in grids.values())
+    fig.suptitle(f"TEG System Parametric Sweep -- {total:,} points", fontsize=14)
+
+    for r, panel in enumerate(panels):
+        imgs = [grids[sc["label"]][r].image(stat) for sc in scenarios]
+        finite = np.concatenate([i[np.isfinite(i)] for i in imgs])
+        if stat == "count":
+            norm = LogNorm(vmin=1, vmax=max(finite.max(initial=1), 2))
+        else:
+            lo, hi = np.quantile(finite, (0.02, 0.98)) if finite.size else (0, 1)
+            norm = plt.Normalize(lo, hi)
+        for c, sc in enumerate(scenarios):
+            ax, g = axes[r, c], grids[sc["label"]][r]
+            im = ax.imshow(imgs[c], origin="lower", extent=g.extent, aspect="auto",
+                           interpolation="nearest", norm=norm,
+                           cmap="viridis" if stat == "count" else "viridis_r")
+            fx, fy = g.front()
+            ax.step(fx, fy, where="mid", color="tab:red", lw=1.4, label="Pareto front")
+            ax.grid(True, alpha=0.3)
+            if r == 0:
+                ax.set_title(sc["label"], fontsize=11)
+            ax.set_xlabel(panel.xlabel, fontsize=8)
+            if c == 0:
+                ax.set_ylabel(panel.ylabel, fontsize=8)
+            if r == 0 and c == 0:
+                ax.legend(fontsize=7, loc="best")
+        cb = fig.colorbar(im, ax=axes[r, :].tolist(), pad=0.01, fraction=0.02)
+        cb.set_label("points per bin" if stat == "count" else f"{stat} {value_label}",
+                     fontsize=8)
+        axes[r, 0].annotate(panel.title, (0.01, 0.97), xycoords="axes fraction",
+                            va="top", fontsize=8, alpha=0.8)
+
+    fig.savefig(outfile, dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+
+
+# ---------------------------------------------------------------------------
+# Sweep source
+# ---------------------------------------------------------------------------
+
+def scenario_base(sc: dict) -> SystemConfig:
+    fluid = "therminol" if sc["hot_temp"] > 220 else "water_glycol"
+    return SystemConfig(teg_spec=TEG_CATALOG[sc["teg_type"]], hot_fluid=fluid,
+                        cold_fluid=fluid, hot_inlet_c=sc["hot_temp"],
+                        cold_inlet_c=sc["cold_temp"])
+
+
+def scenario_chunks(sc: dict, n: int, chunk_size: int = CHUNK_SIZE, seed: int = 0,
+                    gas_price: float = 4.00, workers: int = 1,
+                    progress: Optional[SweepProgress] = None
+                    ) -> Iterator[dict[str, np.ndarray]]:
+    """Random sweep around a scenario, yielded as metric column chunks.
+
+    Varies TEG count (whole PCM boards, 500-8000), loop dT (5-30 C), hot and
+    cold inlet (+/-10 C) and hot TIM thickness (0.25-0.5 mm).
+    """
+    base = scenario_base(sc)
+    for i, lo in enumerate(range(0, n, chunk_size)):
+        m = min(chunk_size, n - lo)
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(i,)))
+        draws = {
+            "teg_count": np.round(rng.uniform(500, 8000, m) / 36) * 36,
+            "target_dt_fluid_c": rng.uniform(5.0, 30.0, m),
+            "hot_inlet_c": base.hot_inlet_c + rng.uniform(-10.0, 10.0, m),
+            "cold_inlet_c": base.cold_inlet_c + rng.uniform(-10.0, 10.0, m),
+            "hx.hot_tim_thickness_m": rng.uniform(0.00025, 0.0005, m),
+        }
+        cols = run_batch_chunked(base, draws, OUTPUTS, workers=workers, progress=progress)
+        yield {**sweep_metrics(cols, gas_price), "teg_count": draws["teg_count"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binned density plots of large sweeps")
+    parser.add_argument("--points", type=int, default=1_000_000,
+                        help="Total sweep points, split across scenarios")
+    parser.add_argument("--out", default="sweep_density.png")
+    parser.add_argument("--stat", choices=["count", "min", "max"], default="count")
+    parser.add_argument("--value", default="cost_per_kwh",
+                        help="Column aggregated by --stat min/max")
+    parser.add_argument("--bins", default=f"{BINS[0]}x{BINS[1]}")
+    parser.add_argument("--gas-price", type=float, default=4.00)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    add_progress_arguments(parser)
+    args = parser.parse_args()
+
+    bins = tuple(int(b) for b in args.bins.split("x"))
+    per = args.points // len(SCENARIOS)
+    # Plot ranges from a pilot sample; net <= 0 points (no $/kWh) stay off-plot
+    pilot = [next(scenario_chunks(sc, 20_000, seed=args.seed + 10_000,
+                                  gas_price=args.gas_price)) for sc in SCENARIOS]
+    exts = extents([{k: v[s["net_kw"] > 0] for k, v in s.items()} for s in pilot], PANELS)
+
+    progress = progress_from_args(args, per * len(SCENARIOS), "sweep_plot", args.workers)
+    t0 = time.perf_counter()
+    grids = {}
+    with progress or nullcontext():
+        for k, sc in enumerate(SCENARIOS):
+            chunks = scenario_chunks(sc, per, seed=args.seed + k, gas_price=args.gas_price,
+                                     workers=args.workers, progress=progress)
+            grids[sc["label"]] = accumulate(chunks, PANELS, exts, bins,
+                                            args.value if args.stat != "count" else None)
+    t1 = time.perf_counter()
+    render(grids, SCENARIOS, PANELS, args.out, args.stat, args.value)
+    t2 = time.perf_counter()
+
+    dropped = sum(g.dropped for gs in grids.values() for g in gs) / len(PANELS)
+    print(f"  {per * len(SCENARIOS):,} points: evaluate + bin {t1 - t0:.1f} s, "
+          f"render {t2 - t1:.1f} s ({dropped / max(per * len(SCENARIOS), 1) * 100:.1f}% "
+          f"outside plot ranges or net <= 0)")
+    print(f"  Plots saved to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+teg_catalog.py  --  TEG module catalog, one CSV row per module.
+
+``teg_modules.csv`` is the single source for both the physics specs
+(``TEGSpec`` fields, used by ``teg_system_model.TEG_CATALOG``) and the
+design-point ratings (``TEGCost`` fields, used by ``costs/cost_model.py``
+``TEG_OPTIONS``).  Columns:
+
+    key, name                   catalog key and display name
+    variant_of                  key of the module this row re-rates (blank
+                                physics columns are taken from it)
+    width_m .. life_years       TEGSpec fields
+    rated_power_w, rated_heat_w electrical output / heat flow at the rating point
+    rated_hot_c, rated_cold_c   rating point
+    fluid_type, hx_material     loop the rating assumes
+    notes                       provenance
+
+Rows load into one NumPy structured array so screening code can take whole
+columns (``catalog["r_thermal"]``).  This module only needs NumPy, so the
+model and the cost model can both import it.
+
+Usage:
+    python teg_catalog.py                       # list the catalog
+    python teg_catalog.py --catalog vendors.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import functools
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+CATALOG_PATH = Path(__file__).resolve().parent / "teg_modules.csv"
+
+#: TEGSpec fields stored in the catalog (all but ``curves``).
+SPEC_FIELDS = ("name", "width_m", "height_m", "r_thermal", "max_hot_c",
+               "seebeck_v_per_k", "internal_r_ohm", "price_usd", "life_years")
+RATING_FIELDS = ("rated_power_w", "rated_heat_w", "rated_hot_c", "rated_cold_c")
+TEXT_FIELDS = ("key", "name", "variant_of", "fluid_type", "hx_material", "notes")
+NUMERIC_FIELDS = SPEC_FIELDS[1:] + RATING_FIELDS
+COLUMNS = TEXT_FIELDS[:3] + NUMERIC_FIELDS + TEXT_FIELDS[3:]
+
+FLUID_TYPES = ("water_glycol", "therminol")
+HX_MATERIALS = ("copper", "stainless")
+
+
+@dataclass(eq=False)
+class TEGCatalog:
+    """Catalog rows as a structured array (``data``), in file order."""
+    data: np.ndarray
+    source: str = ""
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.data[column]
+
+    @functools.cached_property
+    def _index(self) -> dict[str, int]:
+        return {k: i for i, k in enumerate(self.data["key"])}
+
+    @property
+    def keys(self) -> list[str]:
+        return [str(k) for k in self.data["key"]]
+
+    def modules(self) -> "TEGCatalog":
+        """Physical modules only (rows that are not re-ratings)."""
+        return TEGCatalog(self.data[self.data["variant_of"] == ""], self.source)
+
+    def row(self, key: str) -> dict:
+        """One row as plain Python values."""
+        try:
+            rec = self.data[self._index[key]]
+        except KeyError:
+            raise KeyError(f"unknown TEG {key!r} in {self.source or 'catalog'}") from None
+        return {name: rec[name].item() for name in self.data.dtype.names}
+
+    def spec_kwargs(self, key: str) -> dict:
+        """``TEGSpec(**...)`` arguments for one row."""
+        r = self.row(key)
+        return {f: r[f] for f in SPEC_FIELDS}
+
+    def cost_kwargs(self, key: str) -> dict:
+        """``TEGCost(**...)`` arguments for one row."""
+        r = self.row(key)
+        return {"name": r["name"], "power_w": r["rated_power_w"],
+                "unit_price": r["price_usd"], "heat_flux_w": r["rated_heat_w"],
+                "life_years": r["life_years"], "cell_size_mm": round(r["width_m"] * 1000, 6),
+                "hot_temp_c": r["rated_hot_c"], "cold_temp_c": r["rated_cold_c"],
+                "fluid_type": r["fluid_type"], "hx_material": r["hx_material"]}
+
+
+def _dtype(rows: list[dict]) -> np.dtype:
+    def width(f):
+        return max([len(r[f]) for r in rows] + [1])
+    return np.dtype([(f, float) if f in NUMERIC_FIELDS else (f, f"U{width(f)}")
+                     for f in COLUMNS])
+
+
+@functools.lru_cache(maxsize=None)
+def load_catalog(path: Union[str, Path] = CATALOG_PATH) -> TEGCatalog:
+    """Parse a catalog CSV (header per ``COLUMNS``; extra columns ignored)."""
+    path = Path(path)
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path}: missing columns {missing}")
+        rows = [{c: (r[c] or "").strip() for c in COLUMNS} for r in reader]
+
+    keys = [r["key"] for r in rows]
+    dupes = sorted({k for k in keys if keys.count(k) > 1})
+    if dupes or "" in keys:
+        raise ValueError(f"{path}: keys must be unique and non-empty (duplicates: {dupes})")
+    by_key = {r["key"]: r for r in rows}
+    for r in rows:
+        base = r["variant_of"]
+        if base and (base not in by_key or by_key[base]["variant_of"]):
+            raise ValueError(f"{path}: {r['key']}: variant_of {base!r} is not a base module")
+        for f in NUMERIC_FIELDS:
+            if not r[f] and base:
+                r[f] = by_key[base][f]
+        bad = [f for f in NUMERIC_FIELDS if not r[f]]
+        if bad:
+            raise ValueError(f"{path}: {r['key']}: missing {bad}")
+        if r["fluid_type"] not in FLUID_TYPES or r["hx_material"] not in HX_MATERIALS:
+            raise ValueError(f"{path}: {r['key']}: fluid_type must be one of {FLUID_TYPES}, "
+                             f"hx_material one of {HX_MATERIALS}")
+
+    data = np.array([tuple(float(r[c]) if c in NUMERIC_FIELDS else r[c] for c in COLUMNS)
+                     for r in rows], dtype=_dtype(rows))
+    if (data["r_thermal"] <= 0).any() or (data["internal_r_ohm"] <= 0).any():
+        raise ValueError(f"{path}: r_thermal and internal_r_ohm must be positive")
+    return TEGCatalog(data, str(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the TEG module catalog")
+    parser.add_argument("--catalog", default=str(CATALOG_PATH), help="Catalog CSV")
+    args = parser.parse_args()
+
+    cat = load_catalog(args.catalog)
+    print("=" * 110)
+    print(f"  TEG CATALOG -- {len(cat)} entries ({len(cat.modules())} modules), {cat.source}")
+    print("=" * 110)
+    print(f"  {'Key':<22s}  {'Name':<40s}  {'Max C':>5s}  {'R_th':>5s}  {'S mV/K':>6s}  "
+          f"{'R ohm':>5s}  {'$':>6s}  {'Life':>4s}  {'Rated W':>7s}")
+    print(f"  {'─' * 106}")
+    for key in cat.keys:
+        r = cat.row(key)
+        name = r["name"] if not r["variant_of"] else f"  {r['name']}"
+        print(f"  {key:<22s}  {name[:40]:<40s}  {r['max_hot_c']:>5.0f}  "
+              f"{r['r_thermal']:>5.2f}  {r['seebeck_v_per_k'] * 1e3:>6.1f}  "
+              f"{r['internal_r_ohm']:>5.2f}  {r['price_usd']:>6.2f}  {r['life_years']:>4.0f}  "
+              f"{r['rated_power_w']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+teg_screen.py  --  Screen every catalog module against operating envelopes.
+
+Each module in ``teg_modules.csv`` (or a vendor CSV in the same format) is
+evaluated at each envelope (hot / cold inlet, array size) in one batched
+model pass: ``teg_spec.*`` columns come straight from the catalog's
+structured array, so hundreds of modules cost about as much as one sweep.
+Per (module, envelope) the screen reports
+
+    W/TEG        model output per module (gross, at the face temperatures reached)
+    $/W          module price over that output
+    life MWh     module output over its rated life (90% uptime)
+    LCOE         20-year $/kWh of a ``target_kw`` system built from the module
+                 (cost_model.calculate_system_cost, with the model's W/TEG and
+                 heat/TEG in place of the datasheet rating)
+
+and flags modules whose hot face exceeds ``max_hot_c``.  Feasible modules
+are ranked per envelope by the chosen metric; infeasible ones are listed last.
+
+Usage:
+    python teg_screen.py
+    python teg_screen.py --catalog vendors.csv --rank lcoe --top 20
+    python teg_screen.py --envelope 250/60 --envelope 350/100 --teg-count 1512
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+from dataclasses import dataclass, replace
+from typing import Optional, Sequence
+
+import numpy as np
+
+from batch_model import BatchResults, TEG_FIELDS, run_batch
+from cost_bridge import TEGCost, calculate_system_cost
+from teg_catalog import CATALOG_PATH, TEGCatalog, load_catalog
+from teg_system_model import SystemConfig
+
+
+UPTIME = 0.90
+HOURS_PER_YEAR = 8760
+
+#: metric -> (column, True if larger is better)
+METRICS = {
+    "usd_per_w": ("usd_per_w", False),
+    "lifetime": ("lifetime_mwh", True),
+    "lcoe": ("lcoe_usd_per_kwh", False),
+}
+
+
+@dataclass
+class Envelope:
+    """One operating point every module is screened at."""
+    label: str
+    hot_temp: float
+    cold_temp: float
+    teg_count: int = 1008
+    target_kw: float = 10.0       # system size for LCOE
+    cooling: str = "dry"
+
+    @property
+    def fluid(self) -> str:
+        # Same auto-selection as sweep.py / mcf_to_watts.py
+        return "therminol" if self.hot_temp > 220 else "water_glycol"
+
+
+DEFAULT_ENVELOPES = [
+    Envelope("BiTe 200/40", 200.0, 40.0),
+    Envelope("PbTe 320/100", 320.0, 100.0),
+    Envelope("Pb 400/100", 400.0, 100.0),
+]
+
+
+@dataclass
+class ScreenResults:
+    """One row per (module, envelope), module-major."""
+    catalog: TEGCatalog
+    envelopes: list[Envelope]
+    columns: dict[str, np.ndarray]
+
+    def envelope_rows(self, e: int) -> np.ndarray:
+        return np.flatnonzero(self.columns["envelope"] == e)
+
+    def ranked(self, e: int, metric: str = "usd_per_w") -> np.ndarray:
+        """Row indices for envelope ``e``: feasible best-first, then infeasible."""
+        col, larger_better = METRICS[metric]
+        rows = self.envelope_rows(e)
+        v = self.columns[col][rows]
+        key = np.where(np.isfinite(v), -v if larger_better else v, np.inf)
+        order = np.lexsort((key, ~self.columns["feasible"][rows]))
+        return rows[order]
+
+
+# ---------------------------------------------------------------------------
+# Screening
+# ---------------------------------------------------------------------------
+
+def screen(catalog: TEGCatalog, envelopes: Sequence[Envelope] = DEFAULT_ENVELOPES
+           ) -> ScreenResults:
+    """Evaluate every catalog module at every envelope in one batch."""
+    mods = catalog.modules()
+    n_mod, n_env = len(mods), len(envelopes)
+    module = np.repeat(np.arange(n_mod), n_env)
+    env = np.tile(np.arange(n_env), n_mod)
+    fluid = np.array([e.fluid for e in envelopes], dtype=object)[env]
+
+    overrides = {f"teg_spec.{f}": mods[f][module] for f in TEG_FIELDS}
+    overrides.update({
+        "hot_inlet_c": np.array([e.hot_temp for e in envelopes])[env],
+        "cold_inlet_c": np.array([e.cold_temp for e in envelopes])[env],
+        "teg_count": np.array([e.teg_count for e in envelopes])[env],
+        "hot_fluid": fluid, "cold_fluid": fluid,
+    })
+    res = run_batch(SystemConfig(), overrides)
+
+    price = mods["price_usd"][module]
+    life = mods["life_years"][module]
+    power = res.power_per_teg_w
+    with np.errstate(divide="ignore", invalid="ignore"):
+        usd_per_w = np.where(power > 0, price / power, np.inf)
+    feasible = (np.isfinite(res.net_electrical_kw) & (power > 0)
+                & (res.t_teg_hot_c <= mods["max_hot_c"][module]))
+
+    cols = {
+        "module": module, "envelope": env, "feasible": feasible,
+        "power_w": power, "t_teg_hot_c": res.t_teg_hot_c,
+        "net_kw": res.net_electrical_kw, "usd_per_w": usd_per_w,
+        "lifetime_mwh": power * life * HOURS_PER_YEAR * UPTIME / 1e6,
+        "lcoe_usd_per_kwh": _lcoe(mods, envelopes, module, env, res),
+    }
+    return ScreenResults(mods, list(envelopes), cols)
+
+
+def _lcoe(mods: TEGCatalog, envelopes: Sequence[Envelope], module: np.ndarray,
+          env: np.ndarray, res: BatchResults) -> np.ndarray:
+    """20-year $/kWh per row; the cost rollup is scalar arithmetic per system."""
+    keys = mods.keys
+    out = np.full(len(module), np.inf)
+    for i, (m, e) in enumerate(zip(module, env)):
+        if not res.power_per_teg_w[i] > 0:
+            continue
+        envl = envelopes[e]
+        teg = replace(TEGCost(**mods.cost_kwargs(keys[m])),
+                      power_w=float(res.power_per_teg_w[i]),
+                      heat_flux_w=float(res.heat_per_teg_w[i]),
+                      hot_temp_c=envl.hot_temp, cold_temp_c=envl.cold_temp,
+                      fluid_type=envl.fluid,
+                      hx_material="copper" if envl.fluid == "water_glycol" else "stainless")
+        out[i] = calculate_system_cost(teg, envl.target_kw,
+                                       envl.cooling).lifecycle_cost_per_kwh
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def print_screen(sr: ScreenResults, metric: str = "usd_per_w",
+                 top: Optional[int] = None) -> None:
+    c = sr.columns
+    for e, envl in enumerate(sr.envelopes):
+        rows = sr.ranked(e, metric)
+        n_ok = int(c["feasible"][rows].sum())
+        print(f"\n{'=' * 100}")
+        print(f"  {envl.label}: hot {envl.hot_temp:g} C / cold {envl.cold_temp:g} C, "
+              f"{envl.teg_count:,} TEGs, {envl.fluid}  --  ranked by {metric}, "
+              f"{n_ok}/{len(rows)} feasible")
+        print(f"{'=' * 100}")
+        print(f"  {'#':>3s}  {'Module':<40s}  {'W/TEG':>6s}  {'Hot C':>5s}  {'$/W':>6s}  "
+              f"{'life MWh':>8s}  {'LCOE':>8s}  Note")
+        print(f"  {'─' * 96}")
+        shown = rows if top is None else rows[:top]
+        for rank, i in enumerate(shown, 1):
+            name = str(sr.catalog["name"][c["module"][i]])
+            note = "" if c["feasible"][i] else "over max_hot_c" \
+                if c["power_w"][i] > 0 else "no output"
+            print(f"  {rank:>3d}  {name[:40]:<40s}  {c['power_w'][i]:>6.2f}  "
+                  f"{c['t_teg_hot_c'][i]:>5.0f}  {c['usd_per_w'][i]:>6.2f}  "
+                  f"{c['lifetime_mwh'][i]:>8.3f}  ${c['lcoe_usd_per_kwh'][i]:>7.4f}  "
+                  f"{note}".rstrip())
+        if len(shown) < len(rows):
+            print(f"  ... {len(rows) - len(shown)} more")
+
+
+def write_csv(sr: ScreenResults, path: str) -> None:
+    c = sr.columns
+    names = ["module", "envelope", "feasible", "power_w", "t_teg_hot_c", "net_kw",
+             "usd_per_w", "lifetime_mwh", "lcoe_usd_per_kwh"]
+    keys = sr.catalog.keys
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(names)
+        for i in range(len(c["module"])):
+            w.writerow([keys[c["module"][i]], sr.envelopes[c["envelope"][i]].label,
+                        bool(c["feasible"][i])]
+                       + [f"{c[n][i]:.6g}" for n in names[3:]])
+
+
+def parse_envelope(text: str) -> Envelope:
+    """``HOT/COLD`` or ``LABEL=HOT/COLD``."""
+    label, _, temps = text.rpartition("=")
+    hot, _, cold = temps.partition("/")
+    try:
+        return Envelope(label or temps, float(hot), float(cold))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HOT/COLD or LABEL=HOT/COLD, got {text!r}")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen TEG modules against envelopes")
+    parser.add_argument("--catalog", default=str(CATALOG_PATH), help="Catalog CSV")
+    parser.add_argument("--envelope", type=parse_envelope, action="append", default=None,
+                        metavar="[LABEL=]HOT/COLD",
+                        help="Operating envelope (repeatable; default: 200/40, 320/100, 400/100)")
+    parser.add_argument("--teg-count", type=int, default=1008,
+                        help="Array size each module is evaluated in")
+    parser.add_argument("--target-kw", type=float, default=10.0,
+                        help="System size for LCOE")
+    parser.add_argument("--cooling", choices=["dry", "ground"], default="dry")
+    parser.add_argument("--rank", choices=list(METRICS), default="usd_per_w")
+    parser.add_argument("--top", type=int, default=None, help="Rows per envelope")
+    parser.add_argument("--csv", default=None, metavar="FILE",
+                        help="Also write every (module, envelope) row to FILE")
+    args = parser.parse_args()
+
+    try:
+        catalog = load_catalog(args.catalog)
+    except (OSError, ValueError) as e:
+        sys.exit(f"  catalog error: {e}")
+    envelopes = [replace(e, teg_count=args.teg_count, target_kw=args.target_kw,
+                         cooling=args.cooling)
+                 for e in (args.envelope or DEFAULT_ENVELOPES)]
+
+    sr = screen(catalog, envelopes)
+    print_screen(sr, args.rank, args.top)
+    if args.csv:
+        write_csv(sr, args.csv)
+        print(f"\n  {len(sr.columns['module']):,} rows written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,29 +11,97 @@ Geometry from HEAT-EXCHANGER-SPEC-V1.md (SynergyThermogen/engineering).
 Usage:
     python teg_system_model.py
     python teg_system_model.py --teg-count 1620 --hot-temp 200 --cold-temp 50
+    python teg_system_model.py --jsonl configs.jsonl --workers 4 > results.jsonl
+    python teg_system_model.py --build-fluid-tables   # refresh fluid_tables.npz
+
+CoolProp is imported only when a property is needed that the precomputed
+table (fluid_tables.npz) does not cover, so importing this module and most
+runs never load it.
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
+import json
 import math
 import sys
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, fields, replace
+from pathlib import Path
 from typing import Optional
 
-try:
-    import CoolProp.CoolProp as CP
-except ImportError:
-    CP = None
-    print("WARNING: CoolProp not installed. Using fallback fluid properties.")
-    print("         Install with: pip install CoolProp")
-
 import numpy as np
 
+from instrumentation import (
+    PROFILE, add_profile_arguments, perf_counter, profiling_from_args,
+)
+from pumps import PUMP_LIBRARY, select_pumps
+from teg_catalog import load_catalog
+
 # ---------------------------------------------------------------------------
 # TEG data
 # ---------------------------------------------------------------------------
 
+@dataclass(eq=False)
+class TEGCurves:
+    """Measured TEG characteristics on a (hot-side, cold-side) temperature grid.
+
+    Tables are indexed [hot, cold] and stored as one stacked float array so a
+    single bilinear lookup returns all three properties.  Queries outside the
+    measured grid are clamped to its edge.
+    """
+    t_hot_c: np.ndarray     # ascending hot-side grid (C)
+    t_cold_c: np.ndarray    # ascending cold-side grid (C)
+    table: np.ndarray       # (n_hot, n_cold, 3): seebeck V/K, R ohm, K W/K
+    source: str = ""
+
+    SEEBECK, RESISTANCE, CONDUCTANCE = 0, 1, 2
+
+    def lookup(self, t_hot_c, t_cold_c) -> np.ndarray:
+        """Bilinear interpolation; returns array (..., 3) in table order."""
+        gx, gy = self.t_hot_c, self.t_cold_c
+        x = np.clip(np.asarray(t_hot_c, dtype=float), gx[0], gx[-1])
+        y = np.clip(np.asarray(t_cold_c, dtype=float), gy[0], gy[-1])
+        x, y = np.broadcast_arrays(x, y)
+        i = np.clip(np.searchsorted(gx, x, side="right") - 1, 0, len(gx) - 2)
+        j = np.clip(np.searchsorted(gy, y, side="right") - 1, 0, len(gy) - 2)
+        tx = ((x - gx[i]) / (gx[i + 1] - gx[i]))[..., None]
+        ty = ((y - gy[j]) / (gy[j + 1] - gy[j]))[..., None]
+        t = self.table
+        return ((1 - tx) * (1 - ty) * t[i, j] + tx * (1 - ty) * t[i + 1, j]
+                + (1 - tx) * ty * t[i, j + 1] + tx * ty * t[i + 1, j + 1])
+
+
+CURVE_COLUMNS = ("t_hot_c", "t_cold_c", "seebeck_v_per_k",
+                 "internal_r_ohm", "thermal_conductance_w_per_k")
+
+
+@functools.lru_cache(maxsize=None)
+def load_teg_curves(path: str) -> TEGCurves:
+    """Load a characterization CSV (one row per measured Th/Tc point).
+
+    Expected header: t_hot_c, t_cold_c, seebeck_v_per_k, internal_r_ohm,
+    thermal_conductance_w_per_k.  Rows must cover the full Th x Tc grid.
+    The parsed grid is cached in-process by path.
+    """
+    csv_path = Path(path)
+    data = np.genfromtxt(csv_path, delimiter=",", names=True, dtype=float)
+    missing = [c for c in CURVE_COLUMNS if c not in data.dtype.names]
+    if missing:
+        raise ValueError(f"{csv_path}: missing columns {missing}")
+
+    t_hot, hi = np.unique(data["t_hot_c"], return_inverse=True)
+    t_cold, ci = np.unique(data["t_cold_c"], return_inverse=True)
+    if len(t_hot) < 2 or len(t_cold) < 2:
+        raise ValueError(f"{csv_path}: need at least a 2x2 Th/Tc grid")
+    table = np.full((len(t_hot), len(t_cold), 3), np.nan)
+    for k, col in enumerate(CURVE_COLUMNS[2:]):
+        table[hi, ci, k] = data[col]
+    if np.isnan(table).any():
+        raise ValueError(f"{csv_path}: Th/Tc grid is incomplete")
+    return TEGCurves(t_hot, t_cold, table, str(csv_path))
+
+
 @dataclass
 class TEGSpec:
     """Thermoelectric generator module specification."""
@@ -46,23 +114,54 @@ class TEGSpec:
     internal_r_ohm: float   # internal resistance at operating point (Ohm)
     price_usd: float        # unit price at qty 100+
     life_years: float       # expected life at rated temp
+    curves: Optional[TEGCurves] = None  # measured curves override the constants
+
+    def properties(self, t_hot_c, t_cold_c):
+        """Seebeck (V/K), internal R (ohm) and thermal R (C/W) at Th/Tc.
+
+        Constant datasheet values unless the spec carries measured curves.
+        Accepts scalars or NumPy arrays.
+        """
+        if self.curves is None:
+            return self.seebeck_v_per_k, self.internal_r_ohm, self.r_thermal
+        p = self.curves.lookup(t_hot_c, t_cold_c)
+        return (p[..., TEGCurves.SEEBECK], p[..., TEGCurves.RESISTANCE],
+                1.0 / p[..., TEGCurves.CONDUCTANCE])
+
+    def thermal_resistance(self, t_hot_c, t_cold_c):
+        """Module thermal resistance (C/W) at the given face temperatures."""
+        return self.properties(t_hot_c, t_cold_c)[2]
 
-    def electrical_output(self, dt_c: float) -> dict:
+    def electrical_output(self, dt_c, t_cold_c=None) -> dict:
         """Estimate electrical output at a given delta-T across the TEG.
 
-        Uses a simple quadratic fit calibrated to datasheet points.
+        Uses a simple quadratic fit calibrated to datasheet points, or the
+        measured curves evaluated at (t_cold_c + dt_c, t_cold_c) when the
+        spec has them.  Accepts scalars or NumPy arrays.
         Returns dict with power_w, voltage_v, current_a, efficiency.
         """
+        if self.curves is not None and t_cold_c is not None:
+            seebeck, r_int, r_th = self.properties(
+                np.asarray(t_cold_c) + dt_c, t_cold_c)
+        else:
+            seebeck, r_int, r_th = (self.seebeck_v_per_k, self.internal_r_ohm,
+                                    self.r_thermal)
+
         # Seebeck voltage
-        v_oc = self.seebeck_v_per_k * dt_c
+        v_oc = seebeck * dt_c
         # At MPP, V = Voc/2, I = Voc/(2*Ri)
         v_mpp = v_oc / 2.0
-        i_mpp = v_oc / (2.0 * self.internal_r_ohm)
+        i_mpp = v_oc / (2.0 * r_int)
         p_mpp = v_mpp * i_mpp
 
         # Heat flow through TEG
-        q_teg = dt_c / self.r_thermal if self.r_thermal > 0 else 0.0
-        eff = p_mpp / q_teg if q_teg > 0 else 0.0
+        if np.ndim(dt_c) == 0 and np.ndim(r_th) == 0:
+            q_teg = dt_c / r_th if r_th > 0 else 0.0
+            eff = p_mpp / q_teg if q_teg > 0 else 0.0
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                q_teg = np.where(r_th > 0, dt_c / r_th, 0.0)
+                eff = np.where(q_teg > 0, p_mpp / q_teg, 0.0)
 
         return {
             "power_w": p_mpp,
@@ -72,49 +171,19 @@ class TEGSpec:
             "efficiency": eff,
         }
 
+    def with_curves(self, path: str) -> "TEGSpec":
+        """Copy of this spec backed by a characterization CSV."""
+        return replace(self, curves=load_teg_curves(str(Path(path).resolve())))
 
-# Pre-defined TEG specifications
-MARLOW_TG1_1008 = TEGSpec(
-    name="Marlow TG1-1008 (BiTe)",
-    width_m=0.040,
-    height_m=0.040,
-    r_thermal=1.52,       # average of 1.47-1.58
-    max_hot_c=200.0,
-    seebeck_v_per_k=0.033,  # ~6V Voc at 180K dT -> 0.033 V/K
-    internal_r_ohm=1.5,     # calibrated to give ~6.16W at 180K dT
-    price_usd=25.00,
-    life_years=20.0,
-)
-
-THERMONAMIC_PB12611 = TEGSpec(
-    name="Thermonamic TEG1-PB-12611 (PbTe hybrid)",
-    width_m=0.056,
-    height_m=0.056,
-    r_thermal=0.95,        # estimated from 310W heat flux at 320K dT
-    max_hot_c=360.0,
-    seebeck_v_per_k=0.029,  # 9.2V Voc at 320K dT -> 0.029 V/K
-    internal_r_ohm=0.97,
-    price_usd=50.00,
-    life_years=8.0,         # at 320C continuous
-)
 
-ALPHABET_PB_ENHANCED = TEGSpec(
-    name="Alphabet PowerCard Pb-enhanced (est.)",
-    width_m=0.040,
-    height_m=0.040,
-    r_thermal=1.10,        # estimated improvement over BiTe
-    max_hot_c=400.0,
-    seebeck_v_per_k=0.035,
-    internal_r_ohm=1.2,
-    price_usd=65.00,       # from bench test BOM
-    life_years=10.0,        # estimated with Pb enhancement
-)
+# Pre-defined TEG specifications, from teg_modules.csv (see teg_catalog.py).
+# Re-rated variants there (e.g. thermonamic_derated) are cost-model entries.
+CATALOG = load_catalog()
+TEG_CATALOG = {key: TEGSpec(**CATALOG.spec_kwargs(key)) for key in CATALOG.modules().keys}
 
-TEG_CATALOG = {
-    "marlow": MARLOW_TG1_1008,
-    "thermonamic": THERMONAMIC_PB12611,
-    "alphabet": ALPHABET_PB_ENHANCED,
-}
+MARLOW_TG1_1008 = TEG_CATALOG["marlow"]
+THERMONAMIC_PB12611 = TEG_CATALOG["thermonamic"]
+ALPHABET_PB_ENHANCED = TEG_CATALOG["alphabet"]
 
 # ---------------------------------------------------------------------------
 # HX geometry (from HEAT-EXCHANGER-SPEC-V1.md Section 3)
@@ -176,26 +245,105 @@ class HXGeometry:
 # Fluid property helpers
 # ---------------------------------------------------------------------------
 
+MEG_FLUID = "INCOMP::MEG[0.5]"   # CoolProp 50% mono-ethylene glycol
+FLUID_TABLE_PATH = Path(__file__).with_name("fluid_tables.npz")
+FLUID_TABLE_PRESSURE_PA = 200_000.0
+FLUID_TABLE_STEP_C = 0.1
+
+
+@functools.lru_cache(maxsize=None)
+def _coolprop():
+    """CoolProp.CoolProp, imported on first use; None if not installed."""
+    try:
+        import CoolProp.CoolProp as CP
+    except ImportError:
+        print("WARNING: CoolProp not installed. Using fallback fluid properties.",
+              file=sys.stderr)
+        print("         Install with: pip install CoolProp", file=sys.stderr)
+        return None
+    return CP
+
+
+@functools.lru_cache(maxsize=None)
+def _water_glycol_table() -> Optional[dict]:
+    """Precomputed CoolProp water/glycol table, or None if not built."""
+    if not FLUID_TABLE_PATH.exists():
+        return None
+    with np.load(FLUID_TABLE_PATH) as z:
+        table = {k: z[k] for k in z.files}
+    table["log_mu"] = np.log(table["mu"])
+    return table
+
+
+def _coolprop_water_glycol(temp_c: float, pressure_pa: float) -> Optional[dict]:
+    CP = _coolprop()
+    if CP is None:
+        return None
+    if PROFILE.enabled:
+        PROFILE.count("coolprop_calls", 4)
+    try:
+        t_k = temp_c + 273.15
+        rho = CP.PropsSI("D", "T", t_k, "P", pressure_pa, MEG_FLUID)
+        cp = CP.PropsSI("C", "T", t_k, "P", pressure_pa, MEG_FLUID)
+        mu = CP.PropsSI("V", "T", t_k, "P", pressure_pa, MEG_FLUID)
+        k = CP.PropsSI("L", "T", t_k, "P", pressure_pa, MEG_FLUID)
+    except Exception:
+        return None      # outside CoolProp's range for the mixture
+    return {"rho": rho, "cp": cp, "mu": mu, "k": k}
+
+
+def build_fluid_tables(path: Path = FLUID_TABLE_PATH,
+                       step_c: float = FLUID_TABLE_STEP_C) -> dict:
+    """Tabulate CoolProp water/glycol properties over its valid range.
+
+    The range is CoolProp's own (freezing point to Tmax for the mixture);
+    outside it ``water_glycol_props`` uses the hardcoded fallback either way.
+    """
+    CP = _coolprop()
+    if CP is None:
+        raise RuntimeError("CoolProp is required to build the fluid tables")
+    import CoolProp
+
+    lo = max(CP.PropsSI("Tmin", MEG_FLUID), CP.PropsSI("T_freeze", MEG_FLUID)) - 273.15
+    hi = CP.PropsSI("Tmax", MEG_FLUID) - 273.15
+    inner = np.arange(math.ceil(lo / step_c) * step_c, hi, step_c).round(9)
+    t = np.unique(np.concatenate([[lo], inner[(inner > lo) & (inner < hi)], [hi]]))
+    rows = [_coolprop_water_glycol(float(x), FLUID_TABLE_PRESSURE_PA) for x in t]
+    ok = np.array([r is not None for r in rows])
+    t = t[ok]
+    rows = [r for r in rows if r is not None]
+    table = {"t_c": t, **{k: np.array([r[k] for r in rows]) for k in ("rho", "cp", "mu", "k")},
+             "pressure_pa": np.array(FLUID_TABLE_PRESSURE_PA),
+             "coolprop_version": np.array(CoolProp.__version__)}
+    np.savez(path, **table)
+    _water_glycol_table.cache_clear()
+    return table
+
+
 def water_glycol_props(temp_c: float, pressure_pa: float = 200_000.0) -> dict:
     """Get water/glycol (50/50) properties at temperature.
 
-    Uses CoolProp for pure water with manual corrections for glycol mix,
-    or hardcoded fallbacks if CoolProp is not available.
+    Uses CoolProp's 50% MEG mixture -- through the precomputed table at the
+    default pressure, CoolProp itself otherwise -- or hardcoded fallbacks
+    outside its range or if CoolProp is not available.
     """
-    if CP is not None:
-        try:
-            t_k = temp_c + 273.15
-            # CoolProp IncompressibleMixture for ethylene glycol
-            fluid = "INCOMP::MEG[0.5]"  # 50% mono-ethylene glycol
-            rho = CP.PropsSI("D", "T", t_k, "P", pressure_pa, fluid)
-            cp = CP.PropsSI("C", "T", t_k, "P", pressure_pa, fluid)
-            mu = CP.PropsSI("V", "T", t_k, "P", pressure_pa, fluid)
-            k = CP.PropsSI("L", "T", t_k, "P", pressure_pa, fluid)
-            pr = cp * mu / k
-            return {"rho": rho, "cp": cp, "mu": mu, "k": k, "pr": pr,
-                    "name": "Water/Glycol 50/50"}
-        except Exception:
-            pass  # fall through to hardcoded
+    table = _water_glycol_table() if pressure_pa == FLUID_TABLE_PRESSURE_PA else None
+    if table is not None:
+        t = table["t_c"]
+        props = None
+        if t[0] <= temp_c <= t[-1]:
+            props = {k: float(np.interp(temp_c, t, table[k])) for k in ("rho", "cp", "k")}
+            # Viscosity is close to exponential in T: interpolate its log
+            props["mu"] = math.exp(float(np.interp(temp_c, t, table["log_mu"])))
+    else:
+        props = _coolprop_water_glycol(temp_c, pressure_pa)
+    if PROFILE.enabled:
+        PROFILE.count("fluid_table_hits" if table is not None and props is not None
+                      else "fluid_fallbacks" if props is None else "fluid_coolprop_lookups")
+    if props is not None:
+        props["pr"] = props["cp"] * props["mu"] / props["k"]
+        props["name"] = "Water/Glycol 50/50"
+        return props
 
     # Fallback: approximate properties at ~80 C bulk (reasonable mid-point)
     return {
@@ -234,11 +382,17 @@ def thermal_oil_props(temp_c: float, pressure_pa: float = 200_000.0) -> dict:
     }
 
 
+WATER_GLYCOL_NAMES = ("water_glycol", "glycol", "water")
+THERMAL_OIL_NAMES = ("therminol", "thermal_oil", "vp1")
+
+
 def get_fluid_props(fluid_type: str, temp_c: float) -> dict:
     """Get fluid properties by type name."""
-    if fluid_type in ("water_glycol", "glycol", "water"):
+    if PROFILE.enabled:
+        PROFILE.count("property_lookups")
+    if fluid_type in WATER_GLYCOL_NAMES:
         return water_glycol_props(temp_c)
-    elif fluid_type in ("therminol", "thermal_oil", "vp1"):
+    elif fluid_type in THERMAL_OIL_NAMES:
         return thermal_oil_props(temp_c)
     else:
         raise ValueError(f"Unknown fluid type: {fluid_type}")
@@ -272,18 +426,22 @@ def nusselt_dittus_boelter(re: float, pr: float, heating: bool = True) -> float:
 def friction_factor(re: float, roughness_m: float = 1e-6,
                     d_h: float = 0.005) -> float:
     """Darcy friction factor (Moody). Colebrook for turbulent, 64/Re for laminar."""
+    if PROFILE.enabled:
+        PROFILE.count("friction_solves")
     if re < 2300:
         return 64.0 / max(re, 1.0)
     else:
         # Colebrook-White (iterative)
         eps_d = roughness_m / d_h
         f = 0.02  # initial guess
-        for _ in range(20):
+        for it in range(20):
             rhs = -2.0 * math.log10(eps_d / 3.7 + 2.51 / (re * math.sqrt(f)))
             f_new = 1.0 / rhs**2
             if abs(f_new - f) < 1e-8:
                 break
             f = f_new
+        if PROFILE.enabled:
+            PROFILE.count("colebrook_iterations", it + 1)
         return f
 
 
@@ -303,14 +461,21 @@ class SystemConfig:
     hot_inlet_c: float = 200.0       # hot fluid inlet to HX
     cold_inlet_c: float = 40.0       # cold fluid inlet to HX
     target_dt_fluid_c: float = 10.0  # fluid temp change across HX
+    cold_dt_fluid_c: Optional[float] = None  # cold-loop dT (None -> target_dt_fluid_c)
 
     # TEGs per panel and panels per tower
     tegs_per_panel: int = 16
     panels_per_tower: int = 5
 
-    # Pump efficiency
+    # Pump efficiency (used when no pump curve is selected)
     pump_efficiency: float = 0.65
 
+    # Pump curves: None -> constant pump_efficiency, "auto" -> best pump from
+    # pumps.PUMP_LIBRARY at minimum-power VFD speed, or a library key
+    hot_pump: Optional[str] = None
+    cold_pump: Optional[str] = None
+    max_parallel_pumps: int = 3
+
     # Pipe lengths (m) for pressure-drop estimate
     hot_pipe_length_m: float = 30.0
     cold_pipe_length_m: float = 30.0
@@ -358,6 +523,14 @@ class ModelResults:
     pump_power_hot_w: float = 0.0
     pump_power_cold_w: float = 0.0
     pump_power_total_w: float = 0.0
+    hot_pump_name: str = ""
+    hot_pump_count: int = 0
+    hot_pump_speed: float = 0.0     # VFD speed ratio
+    hot_pump_efficiency: float = 0.0
+    cold_pump_name: str = ""
+    cold_pump_count: int = 0
+    cold_pump_speed: float = 0.0
+    cold_pump_efficiency: float = 0.0
     fan_power_w: float = 0.0        # if dry cooler
     electronics_w: float = 0.0
 
@@ -382,17 +555,51 @@ class ModelResults:
     t_cold_fin_surface_c: float = 0.0
     t_cold_fluid_avg_c: float = 0.0
 
+    # Solver: |change in R_total| / R_total over the last fixed-point pass
+    convergence_residual: float = 0.0
+
+
+def _pump_power(cfg: SystemConfig, pump: Optional[str], dp_pa: float,
+                vol_flow_m3s: float, rho: float) -> tuple[float, tuple]:
+    """Electrical pump power for one loop and (name, count, speed, eff).
+
+    Falls back to the constant ``cfg.pump_efficiency`` when no pump is
+    selected or no pump in the library can deliver the flow.
+    """
+    fixed = (dp_pa * vol_flow_m3s) / cfg.pump_efficiency
+    if pump is None:
+        return fixed, ("", 0, 1.0, cfg.pump_efficiency)
+
+    if PROFILE.enabled:
+        PROFILE.count("pump_selections")
+    library = PUMP_LIBRARY if pump == "auto" else {pump: PUMP_LIBRARY[pump]}
+    max_parallel = cfg.max_parallel_pumps if pump == "auto" else 1
+    sel = select_pumps(dp_pa, vol_flow_m3s, rho, library, max_parallel)
+    choice = int(sel.choice[0])
+    if choice < 0:
+        return fixed, ("(none feasible)", 0, 1.0, cfg.pump_efficiency)
+    op = sel.op
+    return float(op.power_w[0]), (library[sel.names[choice]].name,
+                                  int(op.n_parallel[0]), float(op.speed[0]),
+                                  float(op.efficiency[0]))
+
 
 def run_model(cfg: SystemConfig) -> ModelResults:
     """Run the thermal-hydraulic model for the given configuration."""
+    prof = PROFILE.enabled
+    if prof:
+        PROFILE.count("run_model_calls")
+        t = perf_counter()
     r = ModelResults()
     r.total_teg_count = cfg.teg_count
     hx = cfg.hx
     teg = cfg.teg_spec
 
     # ---- Fluid properties at bulk average temp ----
+    dt_cold_fluid = (cfg.target_dt_fluid_c if cfg.cold_dt_fluid_c is None
+                     else cfg.cold_dt_fluid_c)
     t_hot_avg = cfg.hot_inlet_c - cfg.target_dt_fluid_c / 2.0
-    t_cold_avg = cfg.cold_inlet_c + cfg.target_dt_fluid_c / 2.0
+    t_cold_avg = cfg.cold_inlet_c + dt_cold_fluid / 2.0
 
     hot_props = get_fluid_props(cfg.hot_fluid, t_hot_avg)
     cold_props = get_fluid_props(cfg.cold_fluid, t_cold_avg)
@@ -400,6 +607,8 @@ def run_model(cfg: SystemConfig) -> ModelResults:
     r.cold_fluid_name = cold_props["name"]
     r.t_hot_fluid_avg_c = t_hot_avg
     r.t_cold_fluid_avg_c = t_cold_avg
+    if prof:
+        t = PROFILE.lap("properties", t)
 
     # ---- Estimate heat per TEG (first pass: use TEG R_th) ----
     # Approximate: hot fluid avg - cold fluid avg spans the total resistance chain
@@ -462,7 +671,10 @@ def run_model(cfg: SystemConfig) -> ModelResults:
     r.r_total = r_total
 
     # ---- Iterate to converge Q and flow rate ----
-    for _ in range(10):
+    n_iter = 10
+    r_prev = math.inf
+    for _ in range(n_iter):
+        r_prev = r_total
         q_per_teg = dt_total / r_total
         total_heat = q_per_teg * cfg.teg_count
 
@@ -477,7 +689,7 @@ def run_model(cfg: SystemConfig) -> ModelResults:
         r_hot_conv_new = 1.0 / (h_hot * a_wetted) if h_hot > 0 else 999.0
 
         # Also iterate cold side
-        cold_mass_flow = total_heat / (cold_props["cp"] * cfg.target_dt_fluid_c)
+        cold_mass_flow = total_heat / (cold_props["cp"] * dt_cold_fluid)
         cold_vol_flow = cold_mass_flow / cold_props["rho"]
         cold_vol_per_teg = cold_vol_flow / cfg.teg_count
         cold_vel = cold_vol_per_teg / hx.total_flow_area
@@ -486,11 +698,29 @@ def run_model(cfg: SystemConfig) -> ModelResults:
         h_cold = nu_cold * cold_props["k"] / dh
         r_cold_conv_new = 1.0 / (h_cold * a_wetted) if h_cold > 0 else 999.0
 
+        # Measured TEG curves: re-evaluate module R_th at the face temperatures
+        if teg.curves is not None:
+            t_face_hot = t_hot_avg - q_per_teg * (r_hot_conv_new + r_hot_tim)
+            t_face_cold = t_cold_avg + q_per_teg * (r_cold_conv_new + r_cold_tim)
+            r_teg = float(teg.thermal_resistance(t_face_hot, t_face_cold))
+            r.r_teg = r_teg
+
         r_total = r_hot_conv_new + r_hot_tim + r_teg + r_cold_tim + r_cold_conv_new
         r.r_hot_conv = r_hot_conv_new
         r.r_cold_conv = r_cold_conv_new
         r.r_total = r_total
 
+    # Heat flow through the final resistances (each pass used the previous ones)
+    q_per_teg = dt_total / r_total
+    total_heat = q_per_teg * cfg.teg_count
+    r.convergence_residual = abs(r_total - r_prev) / abs(r_total)
+
+    if prof:
+        PROFILE.count("fixed_point_iterations", n_iter)
+        if teg.curves is not None:
+            PROFILE.count("teg_curve_lookups", n_iter)
+        t = PROFILE.lap("convergence", t)
+
     # ---- Final values ----
     r.heat_per_teg_w = q_per_teg
     r.total_heat_input_w = total_heat
@@ -505,11 +735,11 @@ def run_model(cfg: SystemConfig) -> ModelResults:
     r.dt_across_teg_c = r.t_teg_hot_c - r.t_teg_cold_c
 
     # TEG electrical performance
-    teg_perf = teg.electrical_output(r.dt_across_teg_c)
-    r.power_per_teg_w = teg_perf["power_w"]
-    r.teg_efficiency = teg_perf["efficiency"]
-    r.teg_voltage_v = teg_perf["voltage_v"]
-    r.teg_current_a = teg_perf["current_a"]
+    teg_perf = teg.electrical_output(r.dt_across_teg_c, r.t_teg_cold_c)
+    r.power_per_teg_w = float(teg_perf["power_w"])
+    r.teg_efficiency = float(teg_perf["efficiency"])
+    r.teg_voltage_v = float(teg_perf["voltage_v"])
+    r.teg_current_a = float(teg_perf["current_a"])
 
     r.gross_electrical_w = r.power_per_teg_w * cfg.teg_count
     r.total_heat_rejection_w = r.total_heat_input_w - r.gross_electrical_w
@@ -524,6 +754,8 @@ def run_model(cfg: SystemConfig) -> ModelResults:
 
     r.cold_flow_rate_m3s = cold_vol_flow
     r.cold_flow_rate_gpm = cold_vol_flow * 15850.3
+    if prof:
+        t = PROFILE.lap("electrical", t)
 
     # ---- Pressure drop ----
     # Channel pressure drop (Darcy-Weisbach)
@@ -553,11 +785,19 @@ def run_model(cfg: SystemConfig) -> ModelResults:
 
     # Cold side: similar (simplified)
     r.cold_dp_total_pa = r.hot_dp_total_pa * 0.9  # slightly lower viscosity
+    if prof:
+        t = PROFILE.lap("pressure_drop", t)
 
     # ---- Pump power ----
-    r.pump_power_hot_w = (r.hot_dp_total_pa * hot_vol_flow) / cfg.pump_efficiency
-    r.pump_power_cold_w = (r.cold_dp_total_pa * cold_vol_flow) / cfg.pump_efficiency
+    r.pump_power_hot_w, pump = _pump_power(
+        cfg, cfg.hot_pump, r.hot_dp_total_pa, hot_vol_flow, hot_props["rho"])
+    r.hot_pump_name, r.hot_pump_count, r.hot_pump_speed, r.hot_pump_efficiency = pump
+    r.pump_power_cold_w, pump = _pump_power(
+        cfg, cfg.cold_pump, r.cold_dp_total_pa, cold_vol_flow, cold_props["rho"])
+    r.cold_pump_name, r.cold_pump_count, r.cold_pump_speed, r.cold_pump_efficiency = pump
     r.pump_power_total_w = r.pump_power_hot_w + r.pump_power_cold_w
+    if prof:
+        t = PROFILE.lap("pumps", t)
 
     # Fan power (dry cooler estimate: ~15 W per kW rejected)
     r.fan_power_w = r.total_heat_rejection_w / 1000.0 * 15.0
@@ -572,6 +812,8 @@ def run_model(cfg: SystemConfig) -> ModelResults:
     r.net_electrical_w = r.gross_electrical_w - total_parasitic
     r.net_electrical_kw = r.net_electrical_w / 1000.0
     r.parasitic_fraction = total_parasitic / r.gross_electrical_w if r.gross_electrical_w > 0 else 0.0
+    if prof:
+        PROFILE.lap("assembly", t)
 
     return r
 
@@ -643,6 +885,17 @@ def print_results(cfg: SystemConfig, r: ModelResults) -> None:
     print(f"  Gross electrical:      {r.gross_electrical_w / 1000:8.2f} kW")
     print(f"  Pump power (hot):      {r.pump_power_hot_w:8.1f} W")
     print(f"  Pump power (cold):     {r.pump_power_cold_w:8.1f} W")
+    for loop, name, count, speed, eff in (
+            ("hot", r.hot_pump_name, r.hot_pump_count, r.hot_pump_speed,
+             r.hot_pump_efficiency),
+            ("cold", r.cold_pump_name, r.cold_pump_count, r.cold_pump_speed,
+             r.cold_pump_efficiency)):
+        if count:
+            print(f"    {loop + ' pump:':<10s} {count} x {name} @ {speed * 100:.0f}% "
+                  f"speed, {eff * 100:.0f}% wire-to-water")
+        elif name:
+            print(f"    {loop + ' pump:':<10s} no library pump feasible, "
+                  f"using {eff * 100:.0f}% fixed efficiency")
     print(f"  Fan power (est):       {r.fan_power_w:8.1f} W")
     print(f"  Electronics:           {r.electronics_w:8.1f} W")
     print(f"  Total parasitic:       {r.pump_power_total_w + r.fan_power_w + r.electronics_w:8.1f} W")
@@ -659,6 +912,8 @@ def print_results(cfg: SystemConfig, r: ModelResults) -> None:
 def build_config_from_args(args) -> SystemConfig:
     """Build a SystemConfig from CLI args."""
     teg = TEG_CATALOG.get(args.teg_type, MARLOW_TG1_1008)
+    if getattr(args, "teg_curves", None):
+        teg = teg.with_curves(args.teg_curves)
 
     # Auto-select fluid based on temperature
     if args.hot_temp > 220:
@@ -676,9 +931,187 @@ def build_config_from_args(args) -> SystemConfig:
         hot_inlet_c=args.hot_temp,
         cold_inlet_c=args.cold_temp,
         target_dt_fluid_c=args.dt_fluid,
+        hot_pump=None if args.pump == "fixed" else args.pump,
+        cold_pump=None if args.pump == "fixed" else args.pump,
     )
 
 
+# ---------------------------------------------------------------------------
+# JSONL batch mode
+# ---------------------------------------------------------------------------
+
+JSONL_BATCH_SIZE = 1000
+
+# CLI flag spellings accepted in JSONL configs
+CONFIG_ALIASES = {"hot_temp": "hot_inlet_c", "cold_temp": "cold_inlet_c",
+                  "dt_fluid": "target_dt_fluid_c"}
+
+# Sizes and counts a JSONL config must keep strictly positive
+POSITIVE_FIELDS = ("teg_count", "target_dt_fluid_c", "pipe_id_m",
+                   "hx.n_channels", "hx.channel_width_m", "hx.channel_height_m",
+                   "hx.channel_length_m", "hx.manifold_id_m",
+                   "hx.hot_tim_k", "hx.cold_tim_k")
+
+
+def config_from_dict(d: dict) -> SystemConfig:
+    """Build a SystemConfig from one JSON object.
+
+    Keys are SystemConfig fields, dotted ``hx.*`` / ``teg_spec.*`` fields,
+    ``teg_type`` (TEG_CATALOG key), ``teg_curves`` (CSV path), ``pump``
+    (as the --pump flag) and the CLI names in CONFIG_ALIASES.  Fluids
+    follow the CLI rule (therminol above 220 C) unless given.  ``id`` is
+    ignored here and echoed in the output.
+    """
+    d = {CONFIG_ALIASES.get(k, k): v for k, v in d.items() if k != "id"}
+    key = d.pop("teg_type", "marlow")
+    if key not in TEG_CATALOG:
+        raise ValueError(f"Unknown teg_type {key!r} (expected one of {', '.join(TEG_CATALOG)})")
+    teg = TEG_CATALOG[key]
+    curves = d.pop("teg_curves", None)
+    if curves:
+        teg = teg.with_curves(curves)
+    spec_kw = {k[len("teg_spec."):]: d.pop(k) for k in list(d) if k.startswith("teg_spec.")}
+    hx_kw = {k[len("hx."):]: d.pop(k) for k in list(d) if k.startswith("hx.")}
+    if spec_kw:
+        teg = replace(teg, **spec_kw)
+
+    pump = d.pop("pump", None)
+    if pump is not None:
+        if pump != "fixed" and pump != "auto" and pump not in PUMP_LIBRARY:
+            raise ValueError(f"Unknown pump {pump!r}")
+        d.setdefault("hot_pump", None if pump == "fixed" else pump)
+        d.setdefault("cold_pump", None if pump == "fixed" else pump)
+    fluid = "therminol" if d.get("hot_inlet_c", SystemConfig.hot_inlet_c) > 220 else "water_glycol"
+    d.setdefault("hot_fluid", fluid)
+    d.setdefault("cold_fluid", fluid)
+    for side in ("hot_fluid", "cold_fluid"):
+        if d[side] not in WATER_GLYCOL_NAMES + THERMAL_OIL_NAMES:
+            raise ValueError(f"Unknown fluid type: {d[side]}")
+    cfg = SystemConfig(teg_spec=teg, hx=HXGeometry(**hx_kw), **d)
+    for name in POSITIVE_FIELDS:
+        obj, attr = (cfg.hx, name[3:]) if name.startswith("hx.") else (cfg, name)
+        if not getattr(obj, attr) > 0:
+            raise ValueError(f"{name} must be positive (got {getattr(obj, attr)!r})")
+    return cfg
+
+
+def _json_value(v):
+    # Strict JSON: non-finite floats become null
+    return None if isinstance(v, float) and not math.isfinite(v) else v
+
+
+def evaluate_jsonl(lines: list[str], numbers: Optional[list[int]] = None,
+                   outputs: Optional[list[str]] = None) -> list[str]:
+    """Evaluate a block of JSONL config lines; one output line per input.
+
+    ``numbers`` are the input line numbers echoed as ``"line"`` (default
+    1..n).  Valid configs go through the batch model together; if the batch
+    fails, configs are re-run one at a time so each error lands on its own
+    line.  A config whose results come out non-finite is reported as an
+    error rather than a row of nulls.
+    """
+    from batch_model import run_configs   # batch_model imports this module
+
+    out: list[Optional[dict]] = [None] * len(lines)
+    ids: list = [None] * len(lines)
+    cfgs, where = [], []
+    for i, line in enumerate(lines):
+        try:
+            d = json.loads(line)
+            if not isinstance(d, dict):
+                raise ValueError("expected a JSON object")
+            ids[i] = d.get("id")
+            cfgs.append(config_from_dict(d))
+            where.append(i)
+        except Exception as e:
+            out[i] = {"error": f"{type(e).__name__}: {e}"}
+
+    if cfgs:
+        with np.errstate(all="ignore"):
+            try:
+                res = run_configs(cfgs)
+                rows = [res.row(j) for j in range(len(cfgs))]
+            except Exception:
+                rows = []
+                for cfg in cfgs:
+                    try:
+                        rows.append(run_model(cfg))
+                    except Exception as e:
+                        rows.append(e)
+        for i, r in zip(where, rows):
+            if not isinstance(r, Exception):
+                bad = [k for k, v in asdict(r).items()
+                       if isinstance(v, float) and not math.isfinite(v)]
+                if bad:
+                    r = ValueError(f"non-finite results ({', '.join(bad[:3])}"
+                                   f"{', ...' if len(bad) > 3 else ''})")
+            if isinstance(r, Exception):
+                out[i] = {"error": f"{type(r).__name__}: {r}"}
+            else:
+                vals = asdict(r)
+                if outputs:
+                    vals = {k: vals[k] for k in outputs}
+                out[i] = {"result": {k: _json_value(v) for k, v in vals.items()}}
+
+    numbers = numbers or list(range(1, len(lines) + 1))
+    return [json.dumps({"line": numbers[i], "id": ids[i], **o})
+            for i, o in enumerate(out)]
+
+
+def _jsonl_blocks(src, batch_size: int):
+    """(lines, line numbers) blocks; blank lines are skipped."""
+    block, numbers = [], []
+    for n, line in enumerate(src, start=1):
+        if not line.strip():
+            continue
+        block.append(line)
+        numbers.append(n)
+        if len(block) >= batch_size:
+            yield block, numbers
+            block, numbers = [], []
+    if block:
+        yield block, numbers
+
+
+def run_jsonl(src, dst, batch_size: int = JSONL_BATCH_SIZE, workers: int = 1,
+              outputs: Optional[list[str]] = None) -> int:
+    """Stream configs from ``src`` to results on ``dst`` in input order.
+
+    Blocks of ``batch_size`` lines are evaluated in-process or on a pool of
+    ``workers`` processes (at most 2 blocks in flight per worker).  Returns
+    the number of lines written.
+    """
+    if outputs:
+        unknown = set(outputs) - {f.name for f in fields(ModelResults)}
+        if unknown:
+            raise ValueError(f"Unknown result fields: {sorted(unknown)}")
+    written = 0
+
+    def emit(lines):
+        nonlocal written
+        dst.write("\n".join(lines) + "\n")
+        dst.flush()
+        written += len(lines)
+
+    if workers <= 1:
+        for block, numbers in _jsonl_blocks(src, batch_size):
+            emit(evaluate_jsonl(block, numbers, outputs))
+        return written
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for block, numbers in _jsonl_blocks(src, batch_size):
+            pending.append(pool.submit(evaluate_jsonl, block, numbers, outputs))
+            if len(pending) >= 2 * workers:
+                emit(pending.popleft().result())
+        while pending:
+            emit(pending.popleft().result())
+    return written
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="TEG system thermal-hydraulic model (CoolProp)")
@@ -693,25 +1126,72 @@ def main():
                         help="Cold fluid inlet temperature C (default: 40)")
     parser.add_argument("--dt-fluid", type=float, default=10.0,
                         help="Target fluid temperature change across HX (default: 10)")
+    parser.add_argument("--pump", choices=["fixed", "auto"] + list(PUMP_LIBRARY.keys()),
+                        default="fixed",
+                        help="Pump model: fixed efficiency, auto-select from the "
+                             "pump library, or a library pump (default: fixed)")
+    parser.add_argument("--teg-curves", default=None, metavar="CSV",
+                        help="Measured Seebeck/R/K vs Th,Tc characterization CSV "
+                             "for the selected TEG type")
+    parser.add_argument("--what-if", action="store_true",
+                        help="Also print local sensitivities of the key outputs")
+    parser.add_argument("--jsonl", nargs="?", const="-", default=None, metavar="FILE",
+                        help="Batch mode: read one JSON config per line from FILE "
+                             "(or stdin) and write one JSON result per line to stdout")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for --jsonl (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=JSONL_BATCH_SIZE,
+                        help=f"Configs per batch for --jsonl (default: {JSONL_BATCH_SIZE})")
+    parser.add_argument("--fields", default=None,
+                        help="Comma-separated result fields for --jsonl (default: all)")
+    parser.add_argument("--build-fluid-tables", action="store_true",
+                        help=f"Regenerate {FLUID_TABLE_PATH.name} from CoolProp and exit")
+    add_profile_arguments(parser)
     args = parser.parse_args()
 
-    cfg = build_config_from_args(args)
-    results = run_model(cfg)
-    print_results(cfg, results)
-
-    # Also run quick comparison if default
-    if args.teg_count == 1620 and args.teg_type == "marlow":
-        print("\n\n")
-        cfg2 = SystemConfig(
-            teg_count=792,
-            teg_spec=THERMONAMIC_PB12611,
-            hot_fluid="therminol",
-            cold_fluid="therminol",
-            hot_inlet_c=350.0,
-            cold_inlet_c=100.0,
-        )
-        r2 = run_model(cfg2)
-        print_results(cfg2, r2)
+    if args.build_fluid_tables:
+        table = build_fluid_tables()
+        print(f"  {FLUID_TABLE_PATH.name}: water/glycol {table['t_c'][0]:.2f} to "
+              f"{table['t_c'][-1]:.2f} C, {len(table['t_c'])} points "
+              f"(CoolProp {table['coolprop_version']})")
+        return
+
+    outputs = None
+    if args.fields:
+        outputs = [f.strip() for f in args.fields.split(",") if f.strip()]
+        unknown = sorted(set(outputs) - {f.name for f in fields(ModelResults)})
+        if unknown:
+            parser.error(f"--fields: unknown result field(s) {', '.join(unknown)}")
+
+    with profiling_from_args(args):
+        if args.jsonl is not None:
+            if args.jsonl == "-":
+                run_jsonl(sys.stdin, sys.stdout, args.batch_size, args.workers, outputs)
+            else:
+                with open(args.jsonl) as src:
+                    run_jsonl(src, sys.stdout, args.batch_size, args.workers, outputs)
+            return
+
+        cfg = build_config_from_args(args)
+        results = run_model(cfg)
+        print_results(cfg, results)
+        if args.what_if:
+            from jacobian import jacobian, print_whatif
+            print_whatif(jacobian(cfg))
+
+        # Also run quick comparison if default
+        if args.teg_count == 1620 and args.teg_type == "marlow":
+            print("\n\n")
+            cfg2 = SystemConfig(
+                teg_count=792,
+                teg_spec=THERMONAMIC_PB12611,
+                hot_fluid="therminol",
+                cold_fluid="therminol",
+                hot_inlet_c=350.0,
+                cold_inlet_c=100.0,
+            )
+            r2 = run_model(cfg2)
+            print_results(cfg2, r2)
 
 
 if __name__ == "__main__":
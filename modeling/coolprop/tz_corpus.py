@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+tz_corpus.py  --  Sharded TZ-AI training corpus from randomized model runs.
+
+``docs/ESTREAM_CONTROLS_PLAN.md`` section 6 feeds CoolProp simulation output
+into the TZ-AI corpus.  This generator samples the PGC operating envelope
+
+    ambient     dry-cooler ambient; cold supply = ambient + cooler approach
+    hot supply  per module, up to its max_hot_c + HOT_MARGIN_C (so
+                over-temperature rows are represented)
+    loop dT     hot and cold loop fluid delta-T (these set the pump flows)
+    gas rate    McF/day and burner efficiency; the array is sized so the
+                burner's delivered heat matches the model's heat per TEG
+    TEG type    catalog modules (teg_modules.csv)
+
+and evaluates it with the batch model.  A corpus is a directory
+
+    manifest.json       schema (dtype, unit, role, lex topic per column),
+                        generation settings and one entry per finished shard
+    shard-00000.npz     ``shard_rows`` rows, one compressed array per column
+
+Columns follow the section 6.3 training features (hot / cold supply and
+return, gas per kWh_e, delta-T vs power, ambient vs efficiency, flow vs
+delta-T) and are named after the section 2-3 lex topics.  Shard ``i`` draws
+from child ``i`` of ``SeedSequence(seed)``: a corpus is reproducible,
+identical for any worker count, and an interrupted run resumes at the
+missing shards.  Each worker samples, evaluates and writes one shard at a
+time, so memory is bounded by ``workers x shard_rows`` whatever the total.
+
+Usage:
+    python tz_corpus.py corpus/tz-ai --rows 1000000
+    python tz_corpus.py corpus/tz-ai --rows 20000000 --workers 8 --seed 7
+    python tz_corpus.py corpus/tz-ai --rows 1000000 --range ambient_c=-30:50 \\
+        --teg-types marlow,thermonamic
+    python tz_corpus.py corpus/tz-ai --info
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, fields, replace
+from pathlib import Path
+from typing import Iterator, Optional, Sequence, Union
+
+import numpy as np
+
+from batch_model import TEG_FIELDS, run_batch
+from mcf_to_watts import DEFAULT_BURNER, HOURS_PER_DAY, KWH_THERMAL_PER_MCF
+from progress import (SweepProgress, add_progress_arguments, counting,
+                      progress_from_args, result_health)
+from teg_catalog import CATALOG_PATH, TEGCatalog, load_catalog
+from teg_system_model import SystemConfig
+
+FORMAT_VERSION = 2
+SHARD_ROWS = 500_000
+CHUNK_ROWS = 50_000          # rows per model call within a shard
+HOT_MARGIN_C = 25.0          # sample hot supply this far past max_hot_c
+NOMINAL_COUNT = 1000         # sizing pass (heat per TEG does not depend on count)
+LPM_PER_GPM = 3.78541
+
+# State-machine thresholds, ESTREAM_CONTROLS_PLAN.md section 2.3.  There is
+# no "producing" flag: every sampled row is a producing steady state.
+THROTTLE_HOT_C = 380.0
+THROTTLE_COLD_C = 90.0
+
+#: column -> (dtype, unit, role, lex topic, description).  Roles: "input" is
+#: a sampled setting with no sensor, "sensor" is observable on a running
+#: plant (section 2.2 / 3.1), "model" exists only in simulation.
+SCHEMA = {
+    "teg_type": ("i1", "", "input", "", "index into categories.teg_type"),
+    "teg_count": ("i4", "", "input", "", "array size matched to the gas rate"),
+    "burner_efficiency": ("f4", "", "input", "", "burner thermal efficiency"),
+    "ambient_c": ("f4", "C", "sensor", "tz.system.identity.ambient_c",
+                  "ambient temperature"),
+    "hot_supply_c": ("f4", "C", "sensor", "tz.teg.thermal.profile.hot_side_avg_c",
+                     "hot manifold supply"),
+    "hot_return_c": ("f4", "C", "sensor", "tz.teg.thermal.profile.hot_return_c",
+                     "hot manifold return"),
+    "cold_supply_c": ("f4", "C", "sensor", "tz.teg.thermal.profile.cold_side_avg_c",
+                      "cold manifold supply"),
+    "cold_return_c": ("f4", "C", "sensor", "tz.teg.thermal.profile.cold_return_c",
+                      "cold manifold return"),
+    "delta_t_c": ("f4", "C", "sensor", "tz.teg.thermal.profile.delta_t_c",
+                  "hot supply - cold supply"),
+    "hot_flow_lpm": ("f4", "L/min", "sensor", "tz.teg.thermal.profile.flow_lpm",
+                     "hot loop flow"),
+    "cold_flow_lpm": ("f4", "L/min", "sensor", "tz.teg.thermal.profile.cold_flow_lpm",
+                      "cold loop flow"),
+    "gas_mcf_per_day": ("f4", "McF/day", "sensor", "tz.gas.consumption.mcf_per_day",
+                        "fuel for the evaluated array"),
+    "total_power_w": ("f4", "W", "sensor", "", "gross TEG electrical output"),
+    "net_power_w": ("f4", "W", "sensor", "", "gross output less pumps, fans, electronics"),
+    "efficiency_pct": ("f4", "%", "sensor", "tz.teg.power.summary.efficiency_pct",
+                       "gross output / hot-side heat"),
+    "kwh_e_per_mcf": ("f4", "kWh/McF", "sensor", "tz.gas.efficiency.kwh_e_per_mcf",
+                      "net energy per McF"),
+    "mcf_per_kwh_e": ("f4", "McF/kWh", "sensor", "",
+                      "gas per net kWh_e; NaN where net output <= 0"),
+    "throttle": ("b1", "", "sensor", "",
+                 f"hot supply > {THROTTLE_HOT_C:g} or cold supply > {THROTTLE_COLD_C:g}"),
+    "teg_hot_c": ("f4", "C", "model", "", "TEG hot face"),
+    "teg_cold_c": ("f4", "C", "model", "", "TEG cold face"),
+    "heat_input_kw": ("f4", "kW", "model", "", "heat delivered to the hot HX"),
+    "heat_rejection_kw": ("f4", "kW", "model", "", "heat rejected by the cold HX"),
+    "parasitic_w": ("f4", "W", "model", "", "pumps + fans + electronics"),
+    "hot_dp_kpa": ("f4", "kPa", "model", "", "hot loop pressure drop"),
+    "cold_dp_kpa": ("f4", "kPa", "model", "", "cold loop pressure drop"),
+    "over_max_hot": ("b1", "", "model", "", "TEG hot face above the module's max_hot_c"),
+}
+
+
+@dataclass
+class SamplingEnvelope:
+    """Uniform (lo, hi) sampling ranges and the TEG types drawn from."""
+    ambient_c: tuple = (-20.0, 45.0)
+    cooler_approach_c: tuple = (8.0, 20.0)
+    hot_supply_c: tuple = (150.0, 400.0)      # hi is capped per module
+    hot_dt_c: tuple = (5.0, 25.0)
+    cold_dt_c: tuple = (5.0, 15.0)
+    gas_mcf_per_day: tuple = (0.5, 10.0)
+    burner_efficiency: tuple = (0.85, 0.92)
+    teg_types: tuple = ("marlow", "thermonamic", "alphabet")
+
+
+RANGES = tuple(f.name for f in fields(SamplingEnvelope) if f.name != "teg_types")
+
+
+# ---------------------------------------------------------------------------
+# Sampling and evaluation
+# ---------------------------------------------------------------------------
+
+def sample_inputs(rng: np.random.Generator, n: int, env: SamplingEnvelope,
+                  catalog: TEGCatalog) -> dict[str, np.ndarray]:
+    """Draw ``n`` operating points; the draw order is part of the format."""
+    code = rng.integers(len(env.teg_types), size=n).astype(np.int8)
+    u = dict(zip(RANGES, rng.random((len(RANGES), n))))
+
+    def span(name, hi=None):
+        lo, top = getattr(env, name)
+        return lo + ((top if hi is None else hi) - lo) * u[name]
+
+    max_hot = np.array([catalog.row(k)["max_hot_c"] for k in env.teg_types])[code]
+    ambient = span("ambient_c")
+    return {
+        "teg_type": code,
+        "ambient_c": ambient,
+        "cold_supply_c": ambient + span("cooler_approach_c"),
+        "hot_supply_c": span("hot_supply_c",
+                             np.minimum(env.hot_supply_c[1], max_hot + HOT_MARGIN_C)),
+        "hot_dt_c": span("hot_dt_c"),
+        "cold_dt_c": span("cold_dt_c"),
+        "gas_mcf_per_day": span("gas_mcf_per_day"),
+        "burner_efficiency": span("burner_efficiency"),
+    }
+
+
+def evaluate_rows(inputs: dict[str, np.ndarray], env: SamplingEnvelope,
+                  catalog: TEGCatalog) -> tuple[dict[str, np.ndarray], int, int]:
+    """Corpus columns for sampled inputs, plus (failed, non-converged) counts.
+
+    A first pass at ``NOMINAL_COUNT`` gives heat per TEG; the array is then
+    sized to the burner's delivered heat and evaluated again.
+    """
+    code = inputs["teg_type"]
+    idx = np.array([catalog._index[k] for k in env.teg_types])[code]
+    hot, cold = inputs["hot_supply_c"], inputs["cold_supply_c"]
+    fluid = np.where(hot > 220, "therminol", "water_glycol").astype(object)
+    # The dry-cooler loop runs glycol: cold supply goes well below
+    # Therminol VP-1's 12 C freezing point
+    cold_fluid = np.full(len(cold), "water_glycol", dtype=object)
+    overrides = {f"teg_spec.{f}": catalog[f][idx] for f in TEG_FIELDS}
+    overrides.update({
+        "hot_inlet_c": hot, "cold_inlet_c": cold,
+        "target_dt_fluid_c": inputs["hot_dt_c"], "cold_dt_fluid_c": inputs["cold_dt_c"],
+        "hot_fluid": fluid, "cold_fluid": cold_fluid,
+    })
+    base = SystemConfig()
+
+    delivery = inputs["burner_efficiency"] * (1.0 - DEFAULT_BURNER.pipe_loss_fraction)
+    heat_w = inputs["gas_mcf_per_day"] * KWH_THERMAL_PER_MCF / HOURS_PER_DAY * 1000.0 * delivery
+    per_teg = run_batch(base, {**overrides, "teg_count": NOMINAL_COUNT}).heat_per_teg_w
+    with np.errstate(divide="ignore", invalid="ignore"):
+        count = np.where(per_teg > 0, np.rint(heat_w / per_teg), 0.0)
+    count = np.maximum(count, base.tegs_per_panel).astype(np.int64)
+    r = run_batch(base, {**overrides, "teg_count": count})
+    failed, nonconv = result_health(r.columns)
+
+    heat_kw = r.total_heat_input_w / 1000.0
+    mcf = heat_kw / delivery * HOURS_PER_DAY / KWH_THERMAL_PER_MCF
+    net_kwh = r.net_electrical_kw * HOURS_PER_DAY
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kwh_per_mcf = net_kwh / mcf
+        mcf_per_kwh = np.where(net_kwh > 0, mcf / net_kwh, np.nan)
+    cols = {
+        "teg_type": code, "teg_count": count,
+        "burner_efficiency": inputs["burner_efficiency"],
+        "ambient_c": inputs["ambient_c"],
+        "hot_supply_c": hot, "hot_return_c": hot - inputs["hot_dt_c"],
+        "cold_supply_c": cold, "cold_return_c": cold + inputs["cold_dt_c"],
+        "delta_t_c": hot - cold,
+        "hot_flow_lpm": r.hot_flow_rate_gpm * LPM_PER_GPM,
+        "cold_flow_lpm": r.cold_flow_rate_gpm * LPM_PER_GPM,
+        "gas_mcf_per_day": mcf,
+        "total_power_w": r.gross_electrical_w,
+        "net_power_w": r.net_electrical_w,
+        "efficiency_pct": r.teg_efficiency * 100.0,
+        "kwh_e_per_mcf": kwh_per_mcf,
+        "mcf_per_kwh_e": mcf_per_kwh,
+        "throttle": (hot > THROTTLE_HOT_C) | (cold > THROTTLE_COLD_C),
+        "teg_hot_c": r.t_teg_hot_c,
+        "teg_cold_c": r.t_teg_cold_c,
+        "heat_input_kw": heat_kw,
+        "heat_rejection_kw": r.total_heat_rejection_w / 1000.0,
+        "parasitic_w": r.pump_power_total_w + r.fan_power_w + r.electronics_w,
+        "hot_dp_kpa": r.hot_dp_total_pa / 1000.0,
+        "cold_dp_kpa": r.cold_dp_total_pa / 1000.0,
+        "over_max_hot": r.t_teg_hot_c > catalog["max_hot_c"][idx],
+    }
+    return {k: np.asarray(cols[k], dtype=SCHEMA[k][0]) for k in SCHEMA}, failed, nonconv
+
+
+# ---------------------------------------------------------------------------
+# Shards
+# ---------------------------------------------------------------------------
+
+def shard_name(index: int) -> str:
+    return f"shard-{index:05d}.npz"
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def write_shard(out: Union[str, Path], index: int, seed: np.random.SeedSequence,
+                rows: int, env: SamplingEnvelope, catalog_path: str) -> dict:
+    """Sample, evaluate and write one shard; returns its manifest entry + stats."""
+    t0 = time.perf_counter()
+    catalog = load_catalog(catalog_path)
+    inputs = sample_inputs(np.random.default_rng(seed), rows, env, catalog)
+    parts, failed, nonconv = [], 0, 0
+    with counting() as counters:
+        for lo in range(0, rows, CHUNK_ROWS):
+            cols, f, nc = evaluate_rows({k: v[lo:lo + CHUNK_ROWS] for k, v in inputs.items()},
+                                        env, catalog)
+            parts.append(cols)
+            failed, nonconv = failed + f, nonconv + nc
+    del inputs
+    cols = {k: np.concatenate([p[k] for p in parts]) for k in SCHEMA}
+    del parts
+
+    path = Path(out) / shard_name(index)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        np.savez_compressed(fh, **cols)
+    os.replace(tmp, path)
+    return {"index": index, "file": path.name, "rows": rows, "bytes": path.stat().st_size,
+            "sha256": _sha256(path), "failed": failed, "nonconverged": nonconv,
+            "stats": dict(points=rows, busy_s=time.perf_counter() - t0, worker=os.getpid(),
+                          failed=failed, nonconverged=nonconv, counters=dict(counters))}
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+def _settings(rows: int, shard_rows: int, seed: int, env: SamplingEnvelope,
+              catalog_path: str) -> dict:
+    # Round-trip through JSON so a reloaded manifest compares equal
+    return json.loads(json.dumps({
+        "version": FORMAT_VERSION, "rows": rows, "shard_rows": shard_rows, "seed": seed,
+        "envelope": asdict(env),
+        "catalog_sha256": _sha256(Path(catalog_path)),
+    }))
+
+
+def read_manifest(out: Union[str, Path]) -> dict:
+    return json.loads((Path(out) / "manifest.json").read_text())
+
+
+def _write_manifest(out: Path, manifest: dict) -> None:
+    tmp = out / "manifest.json.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, out / "manifest.json")
+
+
+def generate(out: Union[str, Path], rows: int, shard_rows: int = SHARD_ROWS, seed: int = 0,
+             env: SamplingEnvelope = SamplingEnvelope(), workers: int = 1,
+             catalog_path: Union[str, Path] = CATALOG_PATH,
+             progress: Optional[SweepProgress] = None) -> dict:
+    """Write (or finish) a corpus of ``rows`` rows; returns the manifest.
+
+    Shards already listed in an existing manifest with the same settings are
+    kept; a manifest with different settings is an error.
+    """
+    out, catalog_path = Path(out), str(catalog_path)
+    catalog = load_catalog(catalog_path)
+    unknown = [k for k in env.teg_types if k not in catalog]
+    if unknown:
+        raise ValueError(f"unknown TEG types {unknown}; catalog has {catalog.keys}")
+    if rows < 1 or shard_rows < 1:
+        raise ValueError("rows and shard_rows must be positive")
+    settings = _settings(rows, shard_rows, seed, env, catalog_path)
+
+    out.mkdir(parents=True, exist_ok=True)
+    done = {}
+    if (out / "manifest.json").exists():
+        old = read_manifest(out)
+        if old.get("settings") != settings:
+            raise ValueError(f"{out} holds a corpus generated with different settings")
+        done = {s["index"]: s for s in old["shards"] if (out / s["file"]).exists()}
+
+    n_shards = math.ceil(rows / shard_rows)
+    sizes = [min(shard_rows, rows - i * shard_rows) for i in range(n_shards)]
+    seeds = np.random.SeedSequence(seed).spawn(n_shards)
+    manifest = {
+        "version": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": settings,
+        "columns": {k: dict(zip(("dtype", "unit", "role", "topic", "description"), v))
+                    for k, v in SCHEMA.items()},
+        "categories": {"teg_type": list(env.teg_types)},
+        "rows": 0, "complete": False, "shards": [],
+    }
+
+    def finish(entry):
+        stats = entry.pop("stats", None)
+        done[entry["index"]] = entry
+        manifest["shards"] = [done[i] for i in sorted(done)]
+        manifest["rows"] = sum(s["rows"] for s in manifest["shards"])
+        manifest["complete"] = len(done) == n_shards
+        _write_manifest(out, manifest)
+        if progress is not None and stats is not None:
+            progress.update(**stats)
+
+    todo = [i for i in range(n_shards) if i not in done]
+    manifest["shards"] = [done[i] for i in sorted(done)]
+    manifest["rows"] = sum(s["rows"] for s in manifest["shards"])
+    manifest["complete"] = not todo
+    _write_manifest(out, manifest)
+
+    if workers > 1 and len(todo) > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(write_shard, out, i, seeds[i], sizes[i], env, catalog_path)
+                       for i in todo]
+            for fut in as_completed(futures):
+                finish(fut.result())
+    else:
+        for i in todo:
+            finish(write_shard(out, i, seeds[i], sizes[i], env, catalog_path))
+    return manifest
+
+
+def iter_shards(out: Union[str, Path], columns: Optional[Sequence[str]] = None
+                ) -> Iterator[dict[str, np.ndarray]]:
+    """Columns of each finished shard in order, one shard in memory at a time."""
+    out = Path(out)
+    manifest = read_manifest(out)
+    names = list(columns or manifest["columns"])
+    for s in manifest["shards"]:
+        with np.load(out / s["file"]) as z:
+            yield {k: z[k] for k in names}
+
+
+def verify(out: Union[str, Path]) -> list[str]:
+    """Problems found checking shard files against the manifest."""
+    out = Path(out)
+    manifest = read_manifest(out)
+    problems = []
+    for s in manifest["shards"]:
+        path = out / s["file"]
+        if not path.exists():
+            problems.append(f"{s['file']}: missing")
+        elif _sha256(path) != s["sha256"]:
+            problems.append(f"{s['file']}: checksum mismatch")
+    if not manifest["complete"]:
+        problems.append(f"incomplete: {manifest['rows']:,} of "
+                        f"{manifest['settings']['rows']:,} rows")
+    return problems
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _raw_bytes(manifest: dict) -> int:
+    width = sum(np.dtype(c["dtype"]).itemsize for c in manifest["columns"].values())
+    return manifest["rows"] * width
+
+
+def print_info(out: Union[str, Path]) -> None:
+    m = read_manifest(out)
+    s = m["settings"]
+    size = sum(sh["bytes"] for sh in m["shards"])
+    print("=" * 100)
+    print(f"  TZ-AI CORPUS -- {out}")
+    print("=" * 100)
+    print(f"  Rows:        {m['rows']:,} of {s['rows']:,} in {len(m['shards'])} shards "
+          f"of {s['shard_rows']:,}{'' if m['complete'] else '  (incomplete)'}")
+    print(f"  Seed:        {s['seed']}")
+    print(f"  On disk:     {size / 1e6:,.1f} MB ({size / max(_raw_bytes(m), 1):.0%} of raw)")
+    print(f"  TEG types:   {', '.join(m['categories']['teg_type'])}")
+    print(f"  Failed:      {sum(sh['failed'] for sh in m['shards']):,} rows, "
+          f"{sum(sh['nonconverged'] for sh in m['shards']):,} non-converged")
+    print()
+    print(f"  {'Column':<18s}  {'Type':<4s}  {'Unit':<8s}  {'Role':<6s}  {'Lex topic':<40s}")
+    print(f"  {'─' * 96}")
+    for name, c in m["columns"].items():
+        print(f"  {name:<18s}  {c['dtype']:<4s}  {c['unit']:<8s}  {c['role']:<6s}  "
+              f"{c['topic'] or '-':<40s}")
+
+
+def parse_range(text: str) -> tuple[str, tuple]:
+    """``NAME=LO:HI`` for a ``SamplingEnvelope`` range."""
+    name, _, span = text.partition("=")
+    lo, _, hi = span.partition(":")
+    if name not in RANGES:
+        raise argparse.ArgumentTypeError(f"unknown range {name!r}; one of {', '.join(RANGES)}")
+    try:
+        lo, hi = float(lo), float(hi)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME=LO:HI, got {text!r}")
+    if not lo < hi:
+        raise argparse.ArgumentTypeError(f"{name}: LO must be below HI")
+    return name, (lo, hi)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a sharded TZ-AI training corpus")
+    parser.add_argument("out", help="Corpus directory")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Total rows")
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS,
+                        help=f"Rows per shard; bounds memory per worker (default: {SHARD_ROWS:,})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="Shards written in parallel")
+    parser.add_argument("--catalog", default=str(CATALOG_PATH), help="Catalog CSV")
+    parser.add_argument("--teg-types", default=None, metavar="K1,K2",
+                        help="Catalog keys to sample (default: marlow,thermonamic,alphabet)")
+    parser.add_argument("--range", type=parse_range, action="append", default=[],
+                        metavar="NAME=LO:HI",
+                        help=f"Override a sampling range (repeatable): {', '.join(RANGES)}")
+    parser.add_argument("--info", action="store_true",
+                        help="Print the corpus manifest and exit")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check shard checksums and exit")
+    add_progress_arguments(parser)
+    args = parser.parse_args()
+
+    if args.info or args.verify:
+        if not (Path(args.out) / "manifest.json").exists():
+            sys.exit(f"  no corpus at {args.out}")
+        if args.info:
+            print_info(args.out)
+        if args.verify:
+            problems = verify(args.out)
+            for p in problems:
+                print(f"  {p}")
+            print(f"  {'ok' if not problems else f'{len(problems)} problem(s)'}")
+            sys.exit(1 if problems else 0)
+        return
+
+    env = replace(SamplingEnvelope(), **dict(args.range))
+    if args.teg_types:
+        env = replace(env, teg_types=tuple(args.teg_types.split(",")))
+
+    out = Path(args.out)
+    resumed = sum(s["rows"] for s in read_manifest(out)["shards"] if (out / s["file"]).exists()
+                  ) if (out / "manifest.json").exists() else 0
+    t0 = time.perf_counter()
+    progress = progress_from_args(args, args.rows - resumed, "tz_corpus", args.workers)
+    try:
+        if progress is not None:
+            with progress:
+                manifest = generate(args.out, args.rows, args.shard_rows, args.seed, env,
+                                    args.workers, args.catalog, progress)
+        else:
+            manifest = generate(args.out, args.rows, args.shard_rows, args.seed, env,
+                                args.workers, args.catalog)
+    except (OSError, ValueError) as e:
+        sys.exit(f"  corpus error: {e}")
+    elapsed = time.perf_counter() - t0
+
+    size = sum(s["bytes"] for s in manifest["shards"])
+    written = manifest["rows"] - resumed
+    print(f"  {manifest['rows']:,} rows in {len(manifest['shards'])} shards, "
+          f"{size / 1e6:,.1f} MB -> {args.out}")
+    print(f"  {written:,} rows written in {elapsed:.1f} s "
+          f"({written / elapsed:,.0f} rows/s)" + (f", {resumed:,} resumed" if resumed else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+uncertainty.py  --  Monte Carlo propagation of TIM, TEG and HX tolerances.
+
+Point estimates such as ``hot_tim_thickness_m`` (0.375 mm "average"),
+``r_thermal`` ("average of 1.47-1.58") and ``seebeck_v_per_k`` are replaced by
+distributions.  Draws are evaluated in fixed-size chunks through the batch
+model, so 10^5-10^6 draws take seconds.
+
+Reproducibility: chunk i always draws from SeedSequence(seed, spawn_key=(i,)),
+in sorted parameter order, so the result is bit-identical for any number of
+workers.
+
+Distribution syntax (``--param path=kind:args``):
+    normal:mu,sd          uniform:lo,hi          triangular:lo,mode,hi
+    lognormal:median,s    relnormal:sd_frac      reluniform:lo_frac,hi_frac
+The ``rel*`` kinds scale the config's own value (e.g. relnormal:0.03 = +/-3%
+one-sigma on whatever TEG is selected).
+
+Usage:
+    python uncertainty.py
+    python uncertainty.py --draws 1000000 --workers 4
+    python uncertainty.py --teg-type thermonamic --hot-temp 350 --cold-temp 100 \\
+        --param teg_spec.seebeck_v_per_k=relnormal:0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+import numpy as np
+
+from batch_model import INPUT_COLUMNS, get_field, run_batch
+from teg_system_model import SystemConfig, TEG_CATALOG
+
+CHUNK_SIZE = 50_000
+
+# Outputs kept per draw (everything else is discarded chunk by chunk)
+MC_OUTPUTS = ("net_electrical_kw", "power_per_teg_w", "t_teg_hot_c",
+              "dt_across_teg_c", "gross_electrical_w")
+
+# ---------------------------------------------------------------------------
+# Distributions
+# ---------------------------------------------------------------------------
+
+# Distribution kinds and their argument names (``kind:a,b``)
+DIST_ARGS = {
+    "normal": ("mu", "sd"), "uniform": ("lo", "hi"),
+    "triangular": ("lo", "mode", "hi"), "lognormal": ("median", "s"),
+    "relnormal": ("sd_frac",), "reluniform": ("lo_frac", "hi_frac"),
+}
+
+
+@dataclass(frozen=True)
+class Dist:
+    """A scalar input distribution."""
+    kind: str
+    args: tuple[float, ...]
+
+    def sample(self, rng: np.random.Generator, n: int, base: float) -> np.ndarray:
+        a = self.args
+        if self.kind == "normal":
+            return rng.normal(a[0], a[1], n)
+        if self.kind == "uniform":
+            return rng.uniform(a[0], a[1], n)
+        if self.kind == "triangular":
+            return rng.triangular(a[0], a[1], a[2], n)
+        if self.kind == "lognormal":
+            return a[0] * np.exp(rng.normal(0.0, a[1], n))
+        if self.kind == "relnormal":
+            return base * (1.0 + rng.normal(0.0, a[0], n))
+        if self.kind == "reluniform":
+            return base * (1.0 + rng.uniform(a[0], a[1], n))
+        raise ValueError(f"Unknown distribution kind: {self.kind}")
+
+    @classmethod
+    def parse(cls, text: str) -> "Dist":
+        """``kind:a,b`` -> Dist; ValueError naming the expected form."""
+        kind, _, args = text.partition(":")
+        if kind not in DIST_ARGS:
+            raise ValueError(f"unknown distribution {kind!r} in {text!r} "
+                             f"(choose from {', '.join(DIST_ARGS)})")
+        form = f"{kind}:{','.join(DIST_ARGS[kind])}"
+        try:
+            values = tuple(float(x) for x in args.split(",") if x.strip())
+        except ValueError:
+            raise ValueError(f"{text!r}: expected {form} with numeric arguments") from None
+        if len(values) != len(DIST_ARGS[kind]):
+            raise ValueError(f"{text!r}: expected {form}")
+        return cls(kind, values)
+
+
+# Defaults from the tolerances noted in HXGeometry / TEGSpec
+DEFAULT_UNCERTAINTY = {
+    "hx.hot_tim_thickness_m": Dist("uniform", (0.00025, 0.0005)),
+    "hx.hot_tim_k": Dist("triangular", (5.0, 7.5, 10.0)),
+    "hx.cold_tim_thickness_m": Dist("uniform", (0.0004, 0.0006)),
+    "hx.cold_tim_k": Dist("triangular", (3.0, 4.5, 6.0)),
+    "teg_spec.r_thermal": Dist("reluniform", (-0.033, 0.04)),
+    "teg_spec.seebeck_v_per_k": Dist("relnormal", (0.03,)),
+    "teg_spec.internal_r_ohm": Dist("relnormal", (0.05,)),
+}
+
+
+def parse_params(items: list[str]) -> dict[str, Dist]:
+    """Parse ``path=kind:args`` strings."""
+    out = {}
+    for item in items:
+        path, _, spec = item.partition("=")
+        if path not in INPUT_COLUMNS:
+            raise SystemExit(f"Unknown config field: {path}")
+        try:
+            out[path] = Dist.parse(spec)
+        except ValueError as e:
+            raise SystemExit(f"--param {path}: {e}") from None
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Monte Carlo engine
+# ---------------------------------------------------------------------------
+
+def sample_chunk(base: SystemConfig, dists: Mapping[str, Dist], seed: int,
+                 chunk: int, n: int) -> dict[str, np.ndarray]:
+    """Input draws for one chunk (deterministic in seed and chunk index)."""
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk,)))
+    return {p: dists[p].sample(rng, n, float(get_field(base, p)))
+            for p in sorted(dists)}
+
+
+def _run_chunk(base: SystemConfig, dists: Mapping[str, Dist], seed: int,
+               chunk: int, n: int) -> dict[str, np.ndarray]:
+    draws = sample_chunk(base, dists, seed, chunk, n)
+    res = run_batch(base, draws, n)
+    out = {k: np.asarray(res.columns[k], dtype=float) for k in MC_OUTPUTS}
+    max_hot = draws.get("teg_spec.max_hot_c", base.teg_spec.max_hot_c)
+    out["over_max_hot"] = res.t_teg_hot_c > max_hot
+    out.update({f"in:{k}": v for k, v in draws.items()})
+    return out
+
+
+@dataclass
+class MonteCarloResult:
+    """Per-draw outputs and inputs (``in:<path>``) of a Monte Carlo run."""
+    samples: dict[str, np.ndarray]
+    seed: int
+
+    @property
+    def n(self) -> int:
+        return len(self.samples["net_electrical_kw"])
+
+    def exceedance(self, key: str, prob: float) -> float:
+        """Value exceeded with probability ``prob`` (P90 -> prob=0.90)."""
+        return float(np.percentile(self.samples[key], 100.0 * (1.0 - prob)))
+
+    @property
+    def p_over_max_hot(self) -> float:
+        return float(self.samples["over_max_hot"].mean())
+
+
+def run_monte_carlo(base: SystemConfig, dists: Mapping[str, Dist], draws: int,
+                    seed: int = 0, workers: int = 1,
+                    chunk_size: int = CHUNK_SIZE) -> MonteCarloResult:
+    """Propagate input distributions through the batch model."""
+    sizes = [min(chunk_size, draws - i) for i in range(0, draws, chunk_size)]
+    args = [(base, dict(dists), seed, i, n) for i, n in enumerate(sizes)]
+    if workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_chunk, *zip(*args)))
+    else:
+        parts = [_run_chunk(*a) for a in args]
+    samples = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    return MonteCarloResult(samples, seed)
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def print_report(base: SystemConfig, dists: Mapping[str, Dist],
+                 mc: MonteCarloResult, elapsed_s: Optional[float] = None) -> None:
+    """Print output distributions and exceedance levels."""
+    print("=" * 78)
+    print(f"  MONTE CARLO UNCERTAINTY -- {base.teg_spec.name}")
+    print(f"  {base.teg_count} TEGs, hot {base.hot_inlet_c} C, cold {base.cold_inlet_c} C, "
+          f"{mc.n:,} draws, seed {mc.seed}")
+    if elapsed_s:
+        print(f"  {elapsed_s:.2f} s  ({mc.n / elapsed_s:,.0f} draws/s)")
+    print("=" * 78)
+
+    print(f"\n  {'Input':<28s}  {'Distribution':<28s}  {'Nominal':>10s}")
+    print(f"  {'─' * 70}")
+    for p in sorted(dists):
+        d = dists[p]
+        args = ",".join(f"{a:g}" for a in d.args)
+        print(f"  {p:<28s}  {d.kind + ':' + args:<28s}  {get_field(base, p):>10.4g}")
+
+    print(f"\n  {'Output':<24s}  {'Mean':>9s}  {'Std':>8s}  {'P90':>9s}  "
+          f"{'P50':>9s}  {'P10':>9s}")
+    print(f"  {'':<24s}  {'':>9s}  {'':>8s}  {'(exceed)':>9s}  {'':>9s}  {'(exceed)':>9s}")
+    print(f"  {'─' * 74}")
+    for key, label in (("net_electrical_kw", "Net output (kW)"),
+                       ("power_per_teg_w", "Power per TEG (W)"),
+                       ("dt_across_teg_c", "Delta-T across TEG (C)"),
+                       ("t_teg_hot_c", "TEG hot side (C)")):
+        s = mc.samples[key]
+        print(f"  {label:<24s}  {s.mean():>9.3f}  {s.std():>8.3f}  "
+              f"{mc.exceedance(key, 0.90):>9.3f}  {mc.exceedance(key, 0.50):>9.3f}  "
+              f"{mc.exceedance(key, 0.10):>9.3f}")
+
+    p = mc.p_over_max_hot
+    se = np.sqrt(p * (1.0 - p) / mc.n)
+    print(f"\n  P(TEG hot side > max_hot_c {base.teg_spec.max_hot_c:.0f} C): "
+          f"{p * 100:.3f} %  (+/- {se * 100:.3f} %)")
+    print(f"  P90 net output guarantee:  {mc.exceedance('net_electrical_kw', 0.90):.2f} kW")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo tolerance propagation")
+    parser.add_argument("--teg-type", choices=list(TEG_CATALOG.keys()), default="marlow")
+    parser.add_argument("--teg-count", type=int, default=1620)
+    parser.add_argument("--hot-temp", type=float, default=200.0)
+    parser.add_argument("--cold-temp", type=float, default=40.0)
+    parser.add_argument("--draws", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--param", action="append", default=[], metavar="PATH=KIND:ARGS",
+                        help="Input distribution (repeatable); overrides defaults")
+    parser.add_argument("--no-defaults", action="store_true",
+                        help="Only use --param distributions")
+    args = parser.parse_args()
+
+    fluid = "therminol" if args.hot_temp > 220 else "water_glycol"
+    base = SystemConfig(teg_count=args.teg_count, teg_spec=TEG_CATALOG[args.teg_type],
+                        hot_fluid=fluid, cold_fluid=fluid,
+                        hot_inlet_c=args.hot_temp, cold_inlet_c=args.cold_temp)
+    dists = {} if args.no_defaults else dict(DEFAULT_UNCERTAINTY)
+    dists.update(parse_params(args.param))
+    if not dists:
+        raise SystemExit("No input distributions given")
+
+    t0 = time.perf_counter()
+    mc = run_monte_carlo(base, dists, args.draws, args.seed, args.workers)
+    print_report(base, dists, mc, time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main()